@@ -9,7 +9,7 @@ Responsibilities:
 """
 from typing import Dict, Optional
 from datetime import datetime
-from utils.data_models import Claim, AgentResponse
+from utils.data_models import Claim, FinancialEstimate, AgentResponse
 
 
 class ClaimDraftingAgent:
@@ -35,21 +35,14 @@ class ClaimDraftingAgent:
             AgentResponse with draft HTML/PDF
         """
         try:
-            # Generate HTML draft
-            html_content = self._generate_html_draft(claim, financial_data)
-
-            # Generate summary
-            summary = self._generate_summary(claim)
+            estimate = None
+            if financial_data and financial_data.get("estimate"):
+                estimate = FinancialEstimate(**financial_data["estimate"])
 
             return AgentResponse(
                 agent_name=self.name,
                 success=True,
-                data={
-                    "claim_id": claim.claim_id,
-                    "html_draft": html_content,
-                    "summary": summary,
-                    "ready_for_submission": True
-                },
+                data=self.build_draft(claim, estimate),
                 message=f"Claim draft generated for {claim.claim_id}",
                 confidence=0.95
             )
@@ -62,13 +55,31 @@ class ClaimDraftingAgent:
                 message=f"Error generating draft: {str(e)}"
             )
 
-    def _generate_html_draft(self, claim: Claim, financial_data: Optional[Dict] = None) -> str:
+    def build_draft(self, claim: Claim, estimate: Optional[FinancialEstimate] = None) -> Dict:
+        """
+        Build the claim draft payload
+
+        Args:
+            claim: Claim object
+            estimate: Optional FinTrack estimate to include
+
+        Returns:
+            Dictionary with the HTML draft and summary
+        """
+        return {
+            "claim_id": claim.claim_id,
+            "html_draft": self._generate_html_draft(claim, estimate),
+            "summary": self._generate_summary(claim),
+            "ready_for_submission": True
+        }
+
+    def _generate_html_draft(self, claim: Claim, estimate: Optional[FinancialEstimate] = None) -> str:
         """
         Generate HTML claim draft
 
         Args:
             claim: Claim object
-            financial_data: Optional financial data
+            estimate: Optional financial estimate
 
         Returns:
             HTML string
@@ -184,26 +195,25 @@ class ClaimDraftingAgent:
 """
 
         # Add financial information if available
-        if financial_data:
-            estimate = financial_data.get('estimate', {})
+        if estimate:
             html += f"""
     <div class="section">
         <div class="section-title">Financial Estimate</div>
         <div class="field">
             <span class="field-label">Total Estimated Damage:</span>
-            ${estimate.get('estimated_damage', 0):,.2f}
+            ${estimate.estimated_damage:,.2f}
         </div>
         <div class="field">
             <span class="field-label">Insurance Coverage:</span>
-            {estimate.get('insurance_coverage', 0) * 100:.0f}%
+            {estimate.insurance_coverage * 100:.0f}%
         </div>
         <div class="field">
             <span class="field-label">Deductible (Your Cost):</span>
-            ${estimate.get('deductible', 0):,.2f}
+            ${estimate.deductible:,.2f}
         </div>
         <div class="field">
             <span class="field-label">Insurance Payout:</span>
-            ${estimate.get('payout_after_deductible', 0):,.2f}
+            ${estimate.payout_after_deductible:,.2f}
         </div>
     </div>
 """
@@ -8,19 +8,55 @@ Responsibilities:
 - Track claim status
 - Coordinate with other agents when needed
 """
+import os
+import threading
 import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import IO, Dict, Iterator, Optional, List, Tuple
+from utils.claim_cache import ClaimCache
+from utils.claim_io import IMPORT_CHUNK_SIZE, check_format, decode_claims, encode_claims
+from utils.claim_store import ClaimStore, decode_cursor, encode_cursor
 from utils.data_models import Claim, ClaimStatus, Party, AgentResponse
-from utils.pdf_parser import pdf_parser
-from utils.supabase_client import (
-    save_claim_to_db,
-    get_claim_from_db,
-    list_claims_from_db,
-    update_claim_in_db
-)
+from utils.pdf_parser import IncrementalExtractor, pdf_parser
+from utils.portfolio import portfolio
+from utils.write_behind import write_behind
+from utils.storage import claim_data_from_record, storage
 from config.database import supabase_client
 
+# Documents parsed at once by process_documents()
+BATCH_INGEST_CONCURRENCY = int(os.getenv("BATCH_INGEST_CONCURRENCY", "4"))
+BATCH_INGEST_MAX_CONCURRENCY = int(os.getenv("BATCH_INGEST_MAX_CONCURRENCY", "16"))
+
+# Claims table column holding each Claim field (fields not listed are not stored)
+DB_COLUMNS_BY_FIELD = {
+    "claim_id": "claim_id",
+    "status": "status",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "incident_type": "incident_data",
+    "date": "incident_data",
+    "location": "incident_data",
+    "summary": "incident_data",
+    "parties_involved": "incident_data",
+    "confidence": "incident_data",
+    "damages_description": "damage_data",
+    "estimated_damage": "damage_data",
+}
+
+# Largest batch accepted by /api/claims/batch-ingest
+BATCH_INGEST_MAX_DOCUMENTS = int(os.getenv("BATCH_INGEST_MAX_DOCUMENTS", "100"))
+
+# Claims read and encoded at a time by export_claims()
+CLAIM_EXPORT_BATCH_SIZE = int(os.getenv("CLAIM_EXPORT_BATCH_SIZE", "5000"))
+
+# Invalid records listed in an import_claims() result (all are counted)
+IMPORT_MAX_REPORTED_ERRORS = 100
+
+# Streaming parse reports kept (least recently reported are evicted)
+PARSE_REPORT_MAX_ENTRIES = int(os.getenv("PARSE_REPORT_MAX_ENTRIES", "1024"))
+
 
 class ClaimPilotAgent:
     """
@@ -32,14 +68,23 @@ class ClaimPilotAgent:
     def __init__(self):
         self.name = "ClaimPilot"
         self.version = "1.0.0"
-        self.claims_database = {}  # In-memory storage (replace with real DB in production)
+        self.claims_database = ClaimStore()  # Indexed in-memory storage (replace with real DB in production)
+        self.claim_cache = ClaimCache()  # Read-through cache in front of get_claim lookups
+        self.parse_reports: "OrderedDict[str, Dict]" = OrderedDict()  # Streaming parse reports by claim ID
+        self._parse_lock = threading.Lock()
+        self._pending_ingests: Dict[str, Future] = {}  # Background parses still running
+        self._parse_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("STREAM_PARSE_WORKERS", "4")),
+            thread_name_prefix="claim-parse"
+        )
         self.db = supabase_client
 
     def process_document(
         self,
         file_data: Optional[str] = None,
         file_name: Optional[str] = None,
-        raw_text: Optional[str] = None
+        raw_text: Optional[str] = None,
+        file_path: Optional[str] = None
     ) -> AgentResponse:
         """
         Process a document and create a structured claim
@@ -48,52 +93,18 @@ class ClaimPilotAgent:
             file_data: Base64 encoded file content
             file_name: Name of the file
             raw_text: Raw text input (alternative to file)
+            file_path: Path to a spooled upload (alternative to file_data)
 
         Returns:
             AgentResponse with claim data
         """
         try:
-            # Extract text from document
-            if raw_text:
-                text = raw_text
-            elif file_data and file_name:
-                text = pdf_parser.parse_document(file_data, file_name)
-            else:
-                return AgentResponse(
-                    agent_name=self.name,
-                    success=False,
-                    data={},
-                    message="No document or text provided"
-                )
-
-            # Extract structured data
-            extracted_data = pdf_parser.extract_structured_data(text)
-
-            # Create claim
-            claim = self._create_claim(text, extracted_data)
-
-            # Store claim in memory
-            self.claims_database[claim.claim_id] = claim
-
-            # Save to Supabase database
-            save_claim_to_db(claim.model_dump())
-
-            # Generate summary
-            summary = self._generate_summary(claim)
-
-            # Generate summary
-            summary = self._generate_summary(claim)
-
-            # Store claim in database
-            self._save_claim_to_db(claim)
+            claim = self.ingest_document(file_data, file_name, raw_text, file_path)
 
             return AgentResponse(
                 agent_name=self.name,
                 success=True,
-                data={
-                    "claim": claim.model_dump(),
-                    "summary": summary
-                },
+                data=self.to_payload(claim),
                 message=f"Successfully processed claim {claim.claim_id}",
                 confidence=claim.confidence
             )
@@ -106,6 +117,288 @@ class ClaimPilotAgent:
                 message=f"Error processing document: {str(e)}"
             )
 
+    def ingest_document(
+        self,
+        file_data: Optional[str] = None,
+        file_name: Optional[str] = None,
+        raw_text: Optional[str] = None,
+        file_path: Optional[str] = None,
+        stream: bool = False
+    ) -> Claim:
+        """
+        Parse a document, create and store the claim, and generate its summary
+
+        Args:
+            file_data: Base64 encoded file content
+            file_name: Name of the file
+            raw_text: Raw text input (alternative to file)
+            file_path: Path to a spooled upload (alternative to file_data)
+            stream: Create the claim as soon as the required fields are
+                confident; the rest of the file is parsed in the background
+                (see finish_ingest)
+
+        Returns:
+            Claim object with summary populated
+
+        Raises:
+            ValueError: If neither a document nor text is provided
+        """
+        if stream and file_path and not raw_text:
+            return self._ingest_streaming(file_path, file_name)
+
+        text, extracted_data = self._parse_document(file_data, file_name, raw_text, file_path)
+
+        return self._store_new_claim(text, extracted_data)
+
+    def _parse_document(
+        self,
+        file_data: Optional[str] = None,
+        file_name: Optional[str] = None,
+        raw_text: Optional[str] = None,
+        file_path: Optional[str] = None
+    ) -> Tuple[str, Dict]:
+        """
+        Extract the text and structured data of one document
+
+        Returns:
+            (text, extracted data)
+
+        Raises:
+            ValueError: If neither a document nor text is provided
+        """
+        # Extract text from document
+        if raw_text:
+            text = raw_text
+        elif file_path:
+            text = pdf_parser.parse_file(file_path, file_name)
+        elif file_data and file_name:
+            text = pdf_parser.parse_document(file_data, file_name)
+        else:
+            raise ValueError("No document or text provided")
+
+        # Extract structured data
+        return text, pdf_parser.extract_structured_data(text)
+
+    def process_documents(self, documents: List[Dict], concurrency: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Process a batch of documents, yielding per-document events as they happen
+
+        Documents are parsed and extracted in parallel, at most `concurrency`
+        at a time. Summaries for the whole batch are then requested together,
+        and every resulting claim is queued for the write-behind queue, which
+        writes them in bulk.
+
+        Events, in order of occurrence:
+            {"index", "file_name", "stage": "parsed", "claim_id", "incident_type", "confidence"}
+            {"index", "file_name", "stage": "failed", "error"}
+            {"index", "file_name", "stage": "completed", "claim", "summary"}
+            {"stage": "persisted", "documents", "claims", "failed"} (last)
+
+        Args:
+            documents: Dicts of ingest_document() arguments (raw_text,
+                file_path, file_data, file_name)
+            concurrency: Documents parsed at once (defaults to
+                BATCH_INGEST_CONCURRENCY, capped at BATCH_INGEST_MAX_CONCURRENCY)
+
+        Yields:
+            Event dictionaries; "index" is the document's position in `documents`
+        """
+        concurrency = min(concurrency or BATCH_INGEST_CONCURRENCY, BATCH_INGEST_MAX_CONCURRENCY)
+        claims: Dict[int, Claim] = {}
+
+        if documents:
+            with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="claim-batch") as pool:
+                futures = {
+                    pool.submit(
+                        self._parse_document,
+                        document.get("file_data"),
+                        document.get("file_name"),
+                        document.get("raw_text"),
+                        document.get("file_path")
+                    ): index
+                    for index, document in enumerate(documents)
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    event = {"index": index, "file_name": documents[index].get("file_name")}
+                    try:
+                        text, extracted_data = future.result()
+                    except Exception as e:
+                        yield {**event, "stage": "failed", "error": f"Error processing document: {str(e)}"}
+                        continue
+
+                    claim = self._create_claim(text, extracted_data)
+                    self.claims_database[claim.claim_id] = claim
+                    claims[index] = claim
+                    yield {
+                        **event,
+                        "stage": "parsed",
+                        "claim_id": claim.claim_id,
+                        "incident_type": claim.incident_type,
+                        "confidence": claim.confidence
+                    }
+
+        for index in self._generate_summaries(claims):
+            yield {
+                "index": index,
+                "file_name": documents[index].get("file_name"),
+                "stage": "completed",
+                **self.to_payload(claims[index])
+            }
+
+        # Queued together so they flush as one write per table
+        ordered = [claims[index] for index in sorted(claims)]
+        storage.save_claims([claim.model_dump() for claim in ordered])
+        self._save_claims_to_db(ordered)
+
+        yield {
+            "stage": "persisted",
+            "documents": len(documents),
+            "claims": len(claims),
+            "failed": len(documents) - len(claims)
+        }
+
+    def _ingest_streaming(self, file_path: str, file_name: Optional[str] = None) -> Claim:
+        """
+        Create a claim from the first pages that make the required fields confident
+
+        The remaining pages keep streaming through the same extractor on the
+        parse pool; finish_ingest() waits for them.
+
+        Args:
+            file_path: Path to a spooled upload
+            file_name: Original file name
+
+        Returns:
+            Claim built from the pages consumed so far
+        """
+        pages = pdf_parser.iter_file_pages(file_path, file_name)
+        extractor = pdf_parser.extract_streaming(pages)
+        claim = self._store_new_claim(extractor.text, extractor.data)
+        self._record_parse_report(claim.claim_id, {**extractor.report(), "complete": False})
+        future = self._parse_pool.submit(self._finish_streaming, claim.claim_id, extractor, pages)
+        self._pending_ingests[claim.claim_id] = future
+        # Forget the parse once it is done, whether or not anyone waits for it
+        future.add_done_callback(lambda done: self._pending_ingests.pop(claim.claim_id, None))
+        return claim
+
+    def _finish_streaming(self, claim_id: str, extractor: IncrementalExtractor, pages: Iterator[str]):
+        """Feed the remaining pages and store the claim with the late fields"""
+        try:
+            consumed = len(extractor.pages)
+            for page in pages:
+                extractor.feed(page)
+            report = extractor.report()
+            report["complete"] = True
+            if len(extractor.pages) > consumed:
+                self._store_parsed_claim(claim_id, extractor)
+            self._record_parse_report(claim_id, report)
+        except Exception as e:
+            print(f"Error parsing remaining pages of claim {claim_id}: {str(e)}")
+            self._record_parse_report(claim_id, {**extractor.report(), "complete": False, "error": str(e)})
+
+    def _store_parsed_claim(self, claim_id: str, extractor: IncrementalExtractor):
+        """
+        Store an updated copy of a streamed claim with the whole document's
+        text, parties and amounts, and a summary of that text
+
+        Required fields stay as the claim was created. The copy is taken
+        from the claim as currently stored, so changes made while the
+        document was parsed (e.g. its status) are kept.
+        """
+        claim = self.claims_database.get(claim_id) or self.get_claim(claim_id)
+        if claim is None:
+            return
+        data = extractor.data
+        updates = {
+            "raw_text": extractor.text,
+            "parties_involved": [Party(**party) for party in data["parties"]],
+            "confidence": self._calculate_confidence(data, extractor.text),
+            "updated_at": datetime.now().isoformat()
+        }
+        if data["amounts"]:
+            updates["estimated_damage"] = f"${max(data['amounts']):,.2f}"
+        parsed = claim.model_copy(update=updates, deep=True)
+
+        # The summary was written from the early pages only
+        self._generate_summary(parsed)
+
+        self.claims_database.put(parsed)
+        storage.save_claim(parsed.model_dump())
+        self._save_claim_to_db(parsed)
+
+    def _record_parse_report(self, claim_id: str, report: Dict):
+        """Keep a claim's parse report, evicting the least recently reported"""
+        with self._parse_lock:
+            self.parse_reports[claim_id] = report
+            self.parse_reports.move_to_end(claim_id)
+            while len(self.parse_reports) > PARSE_REPORT_MAX_ENTRIES:
+                self.parse_reports.popitem(last=False)
+
+    def finish_ingest(self, claim_id: str, timeout: Optional[float] = None) -> Optional[Claim]:
+        """
+        Wait for the background parse of a streamed document
+
+        Args:
+            claim_id: Claim identifier
+            timeout: Seconds to wait (None waits until done)
+
+        Returns:
+            The claim as stored once every page was parsed (its parse report
+            is in to_payload()), or None if the claim was not streamed
+        """
+        future = self._pending_ingests.get(claim_id)
+        if future is not None:
+            future.result(timeout=timeout)
+        if claim_id not in self.parse_reports:
+            return None
+        return self.claims_database.get(claim_id)
+
+    def _store_new_claim(self, text: str, extracted_data: Dict) -> Claim:
+        """
+        Create, store and summarize a claim from extracted data
+
+        Args:
+            text: Document text
+            extracted_data: Structured data extracted from the text
+
+        Returns:
+            Claim object with summary populated
+        """
+        # Create claim
+        claim = self._create_claim(text, extracted_data)
+
+        # Store claim in memory
+        self.claims_database[claim.claim_id] = claim
+
+        # Generate summary
+        self._generate_summary(claim)
+
+        # Save to claim storage and database
+        storage.save_claim(claim.model_dump())
+        self._save_claim_to_db(claim)
+
+        return claim
+
+    def to_payload(self, claim: Claim) -> Dict:
+        """
+        Serialize a processed claim into the agent response payload
+
+        Args:
+            claim: Claim object
+
+        Returns:
+            Dictionary with claim data and summary
+        """
+        payload = {
+            "claim": claim.model_dump(),
+            "summary": claim.summary
+        }
+        report = self.parse_reports.get(claim.claim_id)
+        if report is not None:
+            payload["parse"] = report
+        return payload
+
     def _create_claim(self, raw_text: str, extracted_data: Dict) -> Claim:
         """
         Create a Claim object from extracted data
@@ -209,22 +502,11 @@ class ClaimPilotAgent:
             from utils.mcp_tools import summarize_claim
 
             # If we have raw_text, use AI summarization
-            if claim.raw_text and len(claim.raw_text.strip()) > 50:
-                ai_summary = summarize_claim(claim.raw_text)
-
-                # Append claim ID and status info
-                summary = (
-                    f"{ai_summary}\n\n"
-                    f"This claim has been assigned ID {claim.claim_id} "
-                    f"and is currently in {claim.status.value} status."
-                )
-            else:
-                # Fallback to template-based summary if raw text is unavailable
-                summary = self._generate_template_summary(claim)
+            if self._wants_ai_summary(claim):
+                return self._apply_ai_summary(claim, summarize_claim(claim.raw_text))
 
-            # Update claim with summary
-            claim.summary = summary
-            return summary
+            # Fallback to template-based summary if raw text is unavailable
+            return self._generate_template_summary(claim)
 
         except Exception as e:
             print(f"Error using MCP summarize_claim, falling back to template: {str(e)}")
@@ -233,6 +515,56 @@ class ClaimPilotAgent:
             claim.summary = summary
             return summary
 
+    def _generate_summaries(self, claims: Dict[int, Claim]) -> Iterator[int]:
+        """
+        Generate summaries for a batch of claims with one batched LLM request
+
+        Args:
+            claims: Claims by batch index
+
+        Yields:
+            Batch index of each claim as its summary is set
+        """
+        ai_claims = {}
+        for index, claim in claims.items():
+            if self._wants_ai_summary(claim):
+                ai_claims[index] = claim
+            else:
+                self._generate_template_summary(claim)
+                yield index
+
+        if not ai_claims:
+            return
+
+        try:
+            from utils.mcp_tools import summarize_claims
+            results = summarize_claims({index: claim.raw_text for index, claim in ai_claims.items()})
+        except Exception as e:
+            results = ((index, e) for index in ai_claims)
+
+        for index, result in results:
+            claim = ai_claims[index]
+            if isinstance(result, Exception):
+                print(f"Error using MCP summarize_claim, falling back to template: {str(result)}")
+                self._generate_template_summary(claim)
+            else:
+                self._apply_ai_summary(claim, result)
+            yield index
+
+    def _wants_ai_summary(self, claim: Claim) -> bool:
+        """Whether the claim has enough raw text for AI summarization"""
+        return bool(claim.raw_text and len(claim.raw_text.strip()) > 50)
+
+    def _apply_ai_summary(self, claim: Claim, ai_summary: str) -> str:
+        """Set the claim summary from an AI summary plus claim ID and status"""
+        summary = (
+            f"{ai_summary}\n\n"
+            f"This claim has been assigned ID {claim.claim_id} "
+            f"and is currently in {claim.status.value} status."
+        )
+        claim.summary = summary
+        return summary
+
     def _generate_template_summary(self, claim: Claim) -> str:
         """
         Generate template-based summary as fallback
@@ -280,43 +612,48 @@ class ClaimPilotAgent:
 
         return summary
 
-    def get_claim(self, claim_id: str) -> Optional[Claim]:
-        """
-        Retrieve a claim by ID from Supabase or in-memory storage
-        return " ".join(summary_parts)
+    def _claim_db_row(self, claim: Claim) -> Dict:
+        """Convert a claim to a row of the claims table"""
+        return {
+            "claim_id": claim.claim_id,
+            "claim_number": claim.claim_id,  # Using claim_id as claim_number
+            "incident_type": claim.incident_type,
+            "incident_date": claim.date,
+            "incident_location": claim.location,
+            "description": claim.damages_description,
+            "status": claim.status.value,
+            "estimated_amount": self._extract_amount_from_string(claim.estimated_damage) if claim.estimated_damage else None,
+            "claimant_name": claim.parties_involved[0].name if claim.parties_involved else None,
+            "claimant_contact": claim.parties_involved[0].contact if claim.parties_involved and claim.parties_involved[0].contact else None,
+            "items_damaged": [{"description": claim.damages_description}],
+            "supporting_documents": [],
+            "created_at": claim.created_at,
+            "updated_at": claim.updated_at
+        }
 
     def _save_claim_to_db(self, claim: Claim) -> None:
         """
-        Save claim to Supabase database
+        Queue a claim upsert to Supabase database
+
+        The row is snapshotted now and written by the write-behind queue, so
+        the request does not wait on the database.
 
         Args:
             claim: Claim object to save
         """
-        try:
-            claim_data = {
-                "claim_id": claim.claim_id,
-                "claim_number": claim.claim_id,  # Using claim_id as claim_number
-                "incident_type": claim.incident_type,
-                "incident_date": claim.date,
-                "incident_location": claim.location,
-                "description": claim.damages_description,
-                "status": claim.status.value,
-                "estimated_amount": self._extract_amount_from_string(claim.estimated_damage) if claim.estimated_damage else None,
-                "claimant_name": claim.parties_involved[0].name if claim.parties_involved else None,
-                "claimant_contact": claim.parties_involved[0].contact if claim.parties_involved and claim.parties_involved[0].contact else None,
-                "items_damaged": [{"description": claim.damages_description}],
-                "supporting_documents": [],
-                "created_at": claim.created_at,
-                "updated_at": claim.updated_at
-            }
+        self.claim_cache.invalidate(claim.claim_id)
+        portfolio.observe_claim(claim)
+        write_behind.upsert(self.db, 'claims', self._claim_db_row(claim), on_conflict='claim_id')
 
-            # Insert or update claim
-            result = self.db.table('claims').upsert(claim_data, on_conflict='claim_id').execute()
+    def _save_claims_to_db(self, claims: List[Claim]) -> None:
+        """
+        Queue upserts of many claims to Supabase database
 
-        except Exception as e:
-            print(f"Error saving claim to database: {str(e)}")
-            # Don't fail the entire operation if DB save fails
-            pass
+        Args:
+            claims: Claim objects to save
+        """
+        for claim in claims:
+            self._save_claim_to_db(claim)
 
     def _extract_amount_from_string(self, amount_str: str) -> Optional[float]:
         """Extract numeric amount from string like '$1,234.56'"""
@@ -327,7 +664,7 @@ class ClaimPilotAgent:
 
     def get_claim(self, claim_id: str) -> Optional[Claim]:
         """
-        Retrieve a claim by ID from database
+        Retrieve a claim by ID from the claim cache, claim storage or in-memory storage
 
         Args:
             claim_id: Claim identifier
@@ -335,52 +672,36 @@ class ClaimPilotAgent:
         Returns:
             Claim object or None
         """
-        # Try Supabase first
-        db_claim = get_claim_from_db(claim_id)
+        claim = self.claim_cache.get(claim_id)
+        if claim is not None:
+            return claim
+
+        # Try claim storage next (shared with other workers)
+        db_claim = storage.get_claim(claim_id)
         if db_claim:
             # Convert database format to Claim object
             try:
-                claim_data = {
-                    'claim_id': db_claim['claim_id'],
-                    'incident_type': db_claim['incident_data'].get('type', 'Unknown'),
-                    'date': db_claim['incident_data'].get('date', ''),
-                    'location': db_claim['incident_data'].get('location', ''),
-                    'parties_involved': [],
-                    'damages_description': db_claim['damage_data'].get('description', ''),
-                    'estimated_damage': db_claim['damage_data'].get('estimated_damage', ''),
-                    'confidence': 0.8,
-                    'status': ClaimStatus(db_claim['status']) if db_claim['status'] in ['Open', 'Processing', 'Closed', 'Pending Info'] else ClaimStatus.OPEN,
-                    'summary': db_claim['incident_data'].get('description', ''),
-                    'created_at': db_claim.get('created_at', datetime.now().isoformat()),
-                    'updated_at': db_claim.get('updated_at', datetime.now().isoformat())
-                }
-                claim = Claim(**claim_data)
+                claim = self._claim_from_db_record(db_claim)
+                # Document text is not stored; keep it from this worker's copy
+                local = self.claims_database.get(claim_id)
+                if local is not None:
+                    claim.raw_text = local.raw_text
                 # Cache in memory
                 self.claims_database[claim_id] = claim
+                self.claim_cache.put(claim)
                 return claim
             except Exception as e:
                 print(f"Error converting DB claim to Claim object: {e}")
 
         # Fall back to in-memory
-        return self.claims_database.get(claim_id)
+        claim = self.claims_database.get(claim_id)
+        if claim is not None:
+            self.claim_cache.put(claim)
+        return claim
 
     def update_claim_status(self, claim_id: str, status: ClaimStatus) -> AgentResponse:
         """
         Update the status of a claim
-        try:
-            result = self.db.table('claims').select('*').eq('claim_id', claim_id).execute()
-
-            if result.data and len(result.data) > 0:
-                return self._claim_from_db(result.data[0])
-            return None
-
-        except Exception as e:
-            print(f"Error retrieving claim {claim_id}: {str(e)}")
-            return None
-
-    def update_claim_status(self, claim_id: str, status: ClaimStatus) -> AgentResponse:
-        """
-        Update the status of a claim in database
 
         Args:
             claim_id: Claim identifier
@@ -400,6 +721,10 @@ class ClaimPilotAgent:
 
         claim.status = status
         claim.updated_at = datetime.now().isoformat()
+        self.claims_database.put(claim)  # Re-index under the new status
+        self.claim_cache.invalidate(claim_id)
+        portfolio.observe_claim(claim)
+        storage.update_claim(claim_id, {"status": status.value, "updated_at": claim.updated_at})
 
         return AgentResponse(
             agent_name=self.name,
@@ -408,94 +733,205 @@ class ClaimPilotAgent:
             message=f"Claim {claim_id} status updated to {status.value}"
         )
 
-    def list_claims(self, status: Optional[ClaimStatus] = None) -> List[Claim]:
+    def list_claims(self, status: Optional[ClaimStatus] = None, limit: Optional[int] = None) -> List[Claim]:
         """
-        List all claims from Supabase or in-memory storage, optionally filtered by status
-        try:
-            # Update in database
-            self.db.table('claims').update({
-                'status': status.value,
-                'updated_at': datetime.now().isoformat()
-            }).eq('claim_id', claim_id).execute()
-
-            claim.status = status
-            claim.updated_at = datetime.now().isoformat()
+        List all claims from claim storage or in-memory storage, optionally filtered by status
 
-            return AgentResponse(
-                agent_name=self.name,
-                success=True,
-                data={"claim": claim.model_dump()},
-                message=f"Claim {claim_id} status updated to {status.value}"
-            )
+        Args:
+            status: Filter by status (optional)
+            limit: Only the newest N claims (optional)
 
-        except Exception as e:
-            return AgentResponse(
-                agent_name=self.name,
-                success=False,
-                data={},
-                message=f"Error updating claim status: {str(e)}"
-            )
+        Returns:
+            List of claims, newest first
+        """
+        claims, _ = self.list_claims_page(status=status, limit=limit)
+        return claims
 
-    def list_claims(self, status: Optional[ClaimStatus] = None) -> List[Claim]:
+    def list_claims_page(
+        self,
+        status: Optional[ClaimStatus] = None,
+        incident_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Claim], Optional[str]]:
         """
-        List all claims from database, optionally filtered by status
+        List claims newest first, one page at a time
+
+        Pages are keyset-paginated on (created_at, claim_id) in claim storage
+        and in the in-memory store alike, so a page costs the same however many
+        claims exist.
 
         Args:
             status: Filter by status (optional)
+            incident_type: Filter by incident type (optional)
+            limit: Page size (None returns every remaining claim)
+            cursor: next_cursor from the previous page (optional)
+            fields: Claim fields the caller needs; claim storage only selects
+                the matching columns (optional, all when omitted)
 
         Returns:
-            List of claims
+            (claims, next_cursor); next_cursor is None on the last page.
+            With `fields`, fields outside it may hold defaults.
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        # Try Supabase first
-        db_claims = list_claims_from_db(status.value if status else None)
+        after = decode_cursor(cursor) if cursor else None
+
+        # Try claim storage first; one extra row tells whether another page exists
+        db_claims = storage.list_claims(
+            status.value if status else None,
+            incident_type=incident_type,
+            columns=self._db_columns(fields),
+            limit=limit + 1 if limit is not None else None,
+            after=after
+        )
         if db_claims:
+            has_more = limit is not None and len(db_claims) > limit
             claims = []
-            for db_claim in db_claims:
+            for db_claim in db_claims[:limit]:
                 try:
-                    claim_data = {
-                        'claim_id': db_claim['claim_id'],
-                        'incident_type': db_claim['incident_data'].get('type', 'Unknown'),
-                        'date': db_claim['incident_data'].get('date', ''),
-                        'location': db_claim['incident_data'].get('location', ''),
-                        'parties_involved': [],
-                        'damages_description': db_claim['damage_data'].get('description', ''),
-                        'estimated_damage': db_claim['damage_data'].get('estimated_damage', ''),
-                        'confidence': 0.8,
-                        'status': ClaimStatus(db_claim['status']) if db_claim['status'] in ['Open', 'Processing', 'Closed', 'Pending Info'] else ClaimStatus.OPEN,
-                        'summary': db_claim['incident_data'].get('description', ''),
-                        'created_at': db_claim.get('created_at', datetime.now().isoformat()),
-                        'updated_at': db_claim.get('updated_at', datetime.now().isoformat())
-                    }
-                    claims.append(Claim(**claim_data))
+                    claims.append(self._claim_from_db_record(db_claim))
                 except Exception as e:
                     print(f"Error converting DB claim: {e}")
                     continue
-            return claims
+            last = db_claims[limit - 1] if has_more else None
+            return claims, encode_cursor(str(last["created_at"]), last["claim_id"]) if last else None
+
+        # Fall back to the indexed in-memory store
+        return self.claims_database.page(status=status, incident_type=incident_type, limit=limit, cursor=cursor)
+
+    def _db_columns(self, fields: Optional[List[str]]) -> str:
+        """Claims table columns holding the given Claim fields"""
+        if not fields:
+            return "*"
+        # claim_id and created_at are always needed for the cursor
+        columns = {"claim_id", "created_at"}
+        columns.update(DB_COLUMNS_BY_FIELD[field] for field in fields if field in DB_COLUMNS_BY_FIELD)
+        return ",".join(sorted(columns))
+
+    def claim_stats(self) -> Dict:
+        """
+        Count claims by status and incident type
 
-        # Fall back to in-memory
-        claims = list(self.claims_database.values())
+        Returns:
+            Dictionary with total, by_status (ClaimStatus -> count) and by_type
+        """
+        counts = storage.count_claims()
+        if counts["total"]:
+            by_status = {status: counts["by_status"].get(status.value, 0) for status in ClaimStatus}
+            return {"total": counts["total"], "by_status": by_status, "by_type": counts["by_type"]}
+
+        return {
+            "total": len(self.claims_database),
+            "by_status": self.claims_database.counts_by_status(),
+            "by_type": self.claims_database.counts_by_type()
+        }
 
-        if status:
-            claims = [c for c in claims if c.status == status]
+    def export_claims(
+        self,
+        fmt: str = "jsonl",
+        status: Optional[ClaimStatus] = None,
+        incident_type: Optional[str] = None,
+        batch_size: int = CLAIM_EXPORT_BATCH_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Stream every matching claim as a JSONL, Parquet or Arrow file
 
-        # Sort by created_at (newest first)
-        claims.sort(key=lambda x: x.created_at, reverse=True)
+        Claims are read from claim storage in one pass (or from the in-memory
+        store when storage holds none) and encoded batch by batch, so memory
+        use does not grow with the number of claims.
 
-        return claims
-        try:
-            query = self.db.table('claims').select('*')
+        Args:
+            fmt: "jsonl", "parquet" or "arrow"
+            status: Only claims with this status (optional)
+            incident_type: Only claims of this incident type (optional)
+            batch_size: Claims read and encoded at a time
 
-            if status:
-                query = query.eq('status', status.value)
+        Returns:
+            Iterator of file bytes, newest claims first
+
+        Raises:
+            ValueError: If the format is unknown
+            RuntimeError: If the format needs pyarrow and it is not installed
+        """
+        check_format(fmt)
+        return encode_claims(self._export_batches(status, incident_type, batch_size), fmt)
 
-            result = query.order('created_at', desc=True).execute()
+    def _export_batches(
+        self,
+        status: Optional[ClaimStatus],
+        incident_type: Optional[str],
+        batch_size: int
+    ) -> Iterator[List[str]]:
+        """Batches of Claim JSON texts from claim storage, else the in-memory store"""
+        found = False
+        for batch in storage.iter_claims_json(status.value if status else None, incident_type, batch_size):
+            found = True
+            yield batch
+        if found:
+            return
+
+        cursor = None
+        while True:
+            claims, cursor = self.claims_database.page(status, incident_type, limit=batch_size, cursor=cursor)
+            if claims:
+                yield [claim.model_dump_json() for claim in claims]
+            if not cursor:
+                return
+
+    def import_claims(self, source: IO[bytes], fmt: str = "jsonl", chunk_size: int = IMPORT_CHUNK_SIZE) -> Dict:
+        """
+        Load claims from a JSONL, Parquet or Arrow file
 
-            claims = [self._claim_from_db(claim_data) for claim_data in result.data]
-            return claims
+        Each chunk of records is validated together and upserted into claim
+        storage in one write (the in-memory store when storage is not
+        available). Existing claims with the same claim_id are replaced.
+        Invalid records are skipped and reported.
 
-        except Exception as e:
-            print(f"Error listing claims: {str(e)}")
-            return []
+        Args:
+            source: Binary file object (seekable for Parquet)
+            fmt: "jsonl", "parquet" or "arrow"
+            chunk_size: Records validated and written at a time
+
+        Returns:
+            Dictionary with imported and failed counts, and errors listing
+            the first invalid records ({"record": position, "error": message})
+
+        Raises:
+            ValueError: If the format is unknown
+            RuntimeError: If the format needs pyarrow and it is not installed
+        """
+        imported, failed, errors = 0, 0, []
+        for claims, chunk_errors in decode_claims(source, fmt, chunk_size):
+            failed += len(chunk_errors)
+            errors.extend(chunk_errors[:IMPORT_MAX_REPORTED_ERRORS - len(errors)])
+            if not claims:
+                continue
+
+            if not storage.save_claims([claim.model_dump() for claim in claims]):
+                for claim in claims:
+                    self.claims_database.put(claim)
+            for claim in claims:
+                self.claim_cache.invalidate(claim.claim_id)
+                portfolio.observe_claim(claim)
+            imported += len(claims)
+
+        print(f"✅ Imported {imported} claims ({failed} invalid records skipped)")
+        return {"imported": imported, "failed": failed, "errors": errors}
+
+    def _claim_from_db_record(self, db_claim: Dict) -> Claim:
+        """
+        Convert a claims table record (incident_data/damage_data layout) to a Claim
+
+        Args:
+            db_claim: Record from the claims table
+
+        Returns:
+            Claim object
+        """
+        return Claim(**claim_data_from_record(db_claim))
 
     def _claim_from_db(self, db_data: Dict) -> Claim:
         """
@@ -51,39 +51,14 @@ class ComplianceAgent:
             AgentResponse with validation results
         """
         try:
-            # Run validation checks
-            validation_results = {
-                "required_fields": self._check_required_fields(claim),
-                "data_quality": self._check_data_quality(claim),
-                "pii_check": self._check_pii(claim),
-                "completeness_score": self._calculate_completeness(claim)
-            }
-
-            # Determine if ready for submission
-            all_required_present = validation_results["required_fields"]["all_present"]
-            no_exposed_pii = len(validation_results["pii_check"]["found"]) == 0
-            quality_score = validation_results["data_quality"]["score"]
-
-            is_ready = all_required_present and no_exposed_pii and quality_score >= 0.7
-
-            # Generate recommendations
-            recommendations = self._generate_recommendations(validation_results, claim)
-
-            # Create summary
-            summary = self._generate_summary(validation_results, is_ready)
+            report = self.check_claim(claim, draft_html)
 
             return AgentResponse(
                 agent_name=self.name,
                 success=True,
-                data={
-                    "claim_id": claim.claim_id,
-                    "validation_results": validation_results,
-                    "submission_ready": is_ready,
-                    "recommendations": recommendations,
-                    "summary": summary
-                },
+                data=report,
                 message=f"Compliance check completed for {claim.claim_id}",
-                confidence=validation_results["completeness_score"]
+                confidence=report["validation_results"]["completeness_score"]
             )
 
         except Exception as e:
@@ -94,6 +69,46 @@ class ComplianceAgent:
                 message=f"Error during compliance check: {str(e)}"
             )
 
+    def check_claim(self, claim: Claim, draft_html: Optional[str] = None) -> Dict:
+        """
+        Run all compliance checks and build the report payload
+
+        Args:
+            claim: Claim object
+            draft_html: Optional HTML draft to validate
+
+        Returns:
+            Dictionary with validation results, readiness and recommendations
+        """
+        # Run validation checks
+        validation_results = {
+            "required_fields": self._check_required_fields(claim),
+            "data_quality": self._check_data_quality(claim),
+            "pii_check": self._check_pii(claim),
+            "completeness_score": self._calculate_completeness(claim)
+        }
+
+        # Determine if ready for submission
+        all_required_present = validation_results["required_fields"]["all_present"]
+        no_exposed_pii = len(validation_results["pii_check"]["found"]) == 0
+        quality_score = validation_results["data_quality"]["score"]
+
+        is_ready = all_required_present and no_exposed_pii and quality_score >= 0.7
+
+        # Generate recommendations
+        recommendations = self._generate_recommendations(validation_results, claim)
+
+        # Create summary
+        summary = self._generate_summary(validation_results, is_ready)
+
+        return {
+            "claim_id": claim.claim_id,
+            "validation_results": validation_results,
+            "submission_ready": is_ready,
+            "recommendations": recommendations,
+            "summary": summary
+        }
+
     def _check_required_fields(self, claim: Claim) -> Dict:
         """
         Check if all required fields are present
@@ -7,9 +7,20 @@ Responsibilities:
 - Provide post-deductible payout calculations
 - Generate cost breakdowns
 """
-from typing import Dict, Optional
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Union
 from datetime import datetime
 from utils.data_models import Claim, FinancialEstimate, AgentResponse
+from agents.fintrack_batch import BatchEstimator, EstimateBatch
+from agents.fintrack_simulation import (
+    DEFAULT_POLICY_DEDUCTIBLE, DISTRIBUTION_SAMPLES, claim_seed, sample_range, simulate_payouts
+)
+from utils.estimate_cache import EstimateCache
+from utils.portfolio import portfolio
+from utils.rate_tables import RateTable, check_coverage_override, rate_tables
+
+# Claims priced per /api/estimate/batch request
+ESTIMATE_BATCH_MAX_CLAIMS = int(os.getenv("ESTIMATE_BATCH_MAX_CLAIMS", "10000"))
 
 
 class FinTrackAgent:
@@ -17,54 +28,27 @@ class FinTrackAgent:
     FinTrack - Financial Estimation & Deductible Calculator Agent
 
     This agent provides cost estimates and calculates insurance payouts.
+    Damage ranges, coverage and breakdown ratios come from the shared rate
+    tables (utils/rate_tables.py).
     """
 
     def __init__(self):
         self.name = "FinTrack"
         self.version = "1.0.0"
 
-        # Damage estimation models (simplified - in production, use ML models)
-        self.damage_estimates = {
-            "Car Accident": {
-                "minor": {"min": 500, "max": 2000},
-                "moderate": {"min": 2000, "max": 8000},
-                "severe": {"min": 8000, "max": 25000},
-                "total_loss": {"min": 25000, "max": 100000}
-            },
-            "Home Damage": {
-                "minor": {"min": 1000, "max": 5000},
-                "moderate": {"min": 5000, "max": 15000},
-                "severe": {"min": 15000, "max": 50000},
-                "catastrophic": {"min": 50000, "max": 500000}
-            },
-            "Property Damage": {
-                "minor": {"min": 300, "max": 1500},
-                "moderate": {"min": 1500, "max": 5000},
-                "severe": {"min": 5000, "max": 20000}
-            },
-            "Medical": {
-                "minor": {"min": 500, "max": 3000},
-                "moderate": {"min": 3000, "max": 10000},
-                "severe": {"min": 10000, "max": 50000},
-                "critical": {"min": 50000, "max": 500000}
-            }
-        }
+        # Compiled batch rules of the current rate table
+        self._batch_estimator: Optional[BatchEstimator] = None
 
-        # Default insurance coverage percentages
-        self.default_coverage = {
-            "Car Accident": 0.80,  # 80% coverage
-            "Home Damage": 0.90,   # 90% coverage
-            "Property Damage": 0.75,  # 75% coverage
-            "Medical": 0.85,       # 85% coverage
-            "Theft": 0.70,         # 70% coverage
-            "Other": 0.75          # 75% coverage
-        }
+        self.estimate_cache = EstimateCache()  # Memoized calculate_estimate results
+        self._cached_table: Optional[RateTable] = None
 
     def estimate_damage(
         self,
         claim: Claim,
         severity: Optional[str] = None,
-        coverage_override: Optional[float] = None
+        coverage_override: Optional[float] = None,
+        distribution: bool = False,
+        deductible: Optional[float] = None
     ) -> AgentResponse:
         """
         Estimate damage costs and calculate insurance payout
@@ -73,63 +57,28 @@ class FinTrackAgent:
             claim: Claim object
             severity: Severity level override (optional)
             coverage_override: Custom coverage percentage (optional)
+            distribution: Add the Monte Carlo payout distribution of the severity
+            deductible: Policy deductible amount the distribution's
+                prob_exceeds_deductible is computed against (optional)
 
         Returns:
             AgentResponse with financial estimate
         """
         try:
-            # Determine severity if not provided
-            if not severity:
-                severity = self._assess_severity(claim)
-
-            # Estimate damage amount
-            estimated_damage = self._calculate_damage_estimate(
-                claim.incident_type,
-                severity,
-                claim.estimated_damage
-            )
-
-            # Get insurance coverage
-            coverage = coverage_override or self.default_coverage.get(
-                claim.incident_type,
-                0.75
-            )
-
-            # Calculate deductible and payout
-            deductible = estimated_damage * (1 - coverage)
-            payout = estimated_damage - deductible
-
-            # Generate cost breakdown
-            breakdown = self._generate_breakdown(
-                claim,
-                estimated_damage,
-                severity
-            )
-
-            # Calculate confidence
-            confidence = self._calculate_confidence(claim, severity)
-
-            # Create financial estimate
-            estimate = FinancialEstimate(
-                claim_id=claim.claim_id,
-                estimated_damage=estimated_damage,
-                insurance_coverage=coverage,
-                deductible=round(deductible, 2),
-                payout_after_deductible=round(payout, 2),
-                breakdown=breakdown,
-                confidence=confidence,
-                notes=self._generate_notes(claim, severity, coverage)
-            )
+            estimate = self.calculate_estimate(claim, severity, coverage_override)
+            data = self.to_payload(estimate)
+            if distribution:
+                severity = severity or self._assess_severity(claim)
+                data["distribution"] = self.estimate_distribution(
+                    claim, [severity], coverage_override, deductible
+                )[severity]
 
             return AgentResponse(
                 agent_name=self.name,
                 success=True,
-                data={
-                    "estimate": estimate.model_dump(),
-                    "summary": self._generate_summary(estimate)
-                },
+                data=data,
                 message=f"Financial estimate completed for claim {claim.claim_id}",
-                confidence=confidence
+                confidence=estimate.confidence
             )
 
         except Exception as e:
@@ -140,154 +89,217 @@ class FinTrackAgent:
                 message=f"Error estimating damage: {str(e)}"
             )
 
-    def _assess_severity(self, claim: Claim) -> str:
+    def calculate_estimate(
+        self,
+        claim: Claim,
+        severity: Optional[str] = None,
+        coverage_override: Optional[float] = None
+    ) -> FinancialEstimate:
         """
-        Assess damage severity based on claim data
+        Calculate the financial estimate for a claim
 
         Args:
             claim: Claim object
+            severity: Severity level override (optional)
+            coverage_override: Custom coverage percentage (optional)
 
         Returns:
-            Severity level
+            FinancialEstimate object (cached until a field that drives it
+            or the rate table changes; callers must not modify it)
+
+        Raises:
+            ValueError: If coverage_override is outside 0-1
         """
-        # Check if estimated damage is provided
-        if claim.estimated_damage:
-            amount_str = claim.estimated_damage.replace('$', '').replace(',', '')
-            try:
-                amount = float(amount_str)
-
-                # Severity based on amount
-                if claim.incident_type == "Car Accident":
-                    if amount >= 25000:
-                        return "total_loss"
-                    elif amount >= 8000:
-                        return "severe"
-                    elif amount >= 2000:
-                        return "moderate"
-                    else:
-                        return "minor"
-
-                elif claim.incident_type == "Home Damage":
-                    if amount >= 50000:
-                        return "catastrophic"
-                    elif amount >= 15000:
-                        return "severe"
-                    elif amount >= 5000:
-                        return "moderate"
-                    else:
-                        return "minor"
-
-                elif claim.incident_type == "Medical":
-                    if amount >= 50000:
-                        return "critical"
-                    elif amount >= 10000:
-                        return "severe"
-                    elif amount >= 3000:
-                        return "moderate"
-                    else:
-                        return "minor"
-
-            except ValueError:
-                pass
-
-        # Analyze damage description for severity keywords
-        damages_lower = claim.damages_description.lower()
-
-        severe_keywords = ["total", "destroyed", "severe", "major", "extensive", "critical"]
-        moderate_keywords = ["moderate", "significant", "substantial"]
-
-        if any(keyword in damages_lower for keyword in severe_keywords):
-            return "severe"
-        elif any(keyword in damages_lower for keyword in moderate_keywords):
-            return "moderate"
-
-        # Default to minor
-        return "minor"
-
-    def _calculate_damage_estimate(
+        check_coverage_override(coverage_override)
+        table = rate_tables.current()
+        if table is not self._cached_table:
+            # A reload can change a table without bumping its version
+            self.estimate_cache.clear()
+            self._cached_table = table
+        return self.estimate_cache.get_or_compute(
+            claim,
+            table.version,
+            lambda: self._price(claim, table, severity, coverage_override),
+            severity,
+            coverage_override
+        )
+
+    def _price(
         self,
-        incident_type: str,
-        severity: str,
-        existing_estimate: Optional[str] = None
-    ) -> float:
+        claim: Claim,
+        table: RateTable,
+        severity: Optional[str],
+        coverage_override: Optional[float]
+    ) -> FinancialEstimate:
+        """Compute a claim's estimate from a rate table (no caching)"""
+        default = severity is None and coverage_override is None
+
+        # Severity, damage, coverage, deductible, payout and breakdown from the rate table
+        priced = table.estimate(
+            claim.incident_type,
+            claim.damages_description,
+            claim.estimated_damage,
+            severity,
+            coverage_override
+        )
+        severity = priced.pop("severity")
+
+        # Calculate confidence
+        confidence = self._calculate_confidence(claim, severity)
+
+        estimate = FinancialEstimate(
+            claim_id=claim.claim_id,
+            **priced,
+            confidence=confidence,
+            notes=self._generate_notes(claim, severity, priced["insurance_coverage"])
+        )
+
+        # Default estimates feed the portfolio totals (bookkeeping never raises)
+        if default:
+            portfolio.observe_estimate(
+                claim, estimate.estimated_damage, estimate.payout_after_deductible, estimate.deductible, severity
+            )
+        return estimate
+
+    def estimate_batch(
+        self,
+        claims: Iterable[Claim],
+        severity: Union[str, Sequence[Optional[str]], None] = None,
+        coverage_override: Optional[float] = None
+    ) -> EstimateBatch:
         """
-        Calculate damage estimate based on incident type and severity
+        Calculate financial estimates for many claims in one vectorized pass
+
+        Gives the same numbers as calculate_estimate() for each claim, but
+        keeps them in NumPy arrays instead of building a FinancialEstimate
+        per claim (the batch builds them on demand).
 
         Args:
-            incident_type: Type of incident
-            severity: Severity level
-            existing_estimate: Existing estimate from claim
+            claims: Claim objects
+            severity: Severity level override for every claim, or one per
+                claim (None for an assessed severity) (optional)
+            coverage_override: Custom coverage percentage for every claim (optional)
 
         Returns:
-            Estimated damage amount
+            EstimateBatch, in the order of the claims
+
+        Raises:
+            ValueError: If coverage_override is outside 0-1, or the number
+                of severities does not match the claims
         """
-        # If existing estimate is available, use it
-        if existing_estimate:
-            amount_str = existing_estimate.replace('$', '').replace(',', '')
-            try:
-                return float(amount_str)
-            except ValueError:
-                pass
-
-        # Use damage model
-        if incident_type in self.damage_estimates:
-            severity_ranges = self.damage_estimates[incident_type]
-            if severity in severity_ranges:
-                range_data = severity_ranges[severity]
-                # Use midpoint of range
-                return (range_data["min"] + range_data["max"]) / 2
-
-        # Default estimate
-        return 3000.0
-
-    def _generate_breakdown(
+        table = rate_tables.current()
+        estimator = self._batch_estimator
+        if estimator is None or estimator.table is not table:
+            estimator = self._batch_estimator = BatchEstimator(table)
+        return estimator.estimate(
+            claims,
+            severity,
+            coverage_override,
+            notes=lambda level, coverage: self._generate_notes(None, level, coverage)
+        )
+
+    def seed_portfolio(self, claims: List[Claim]) -> int:
+        """
+        Add stored claims to the portfolio totals, priced in one batch
+
+        Args:
+            claims: Claim objects
+
+        Returns:
+            Number of claims added (claims already tracked are skipped)
+        """
+        batch = self.estimate_batch(claims)
+        return portfolio.seed(
+            claims,
+            batch.estimated_damage.tolist(),
+            batch.payout_after_deductible.tolist(),
+            batch.deductible.tolist(),
+            [batch.severity(index) for index in range(len(batch))]
+        )
+
+    def estimate_distribution(
         self,
         claim: Claim,
-        total_damage: float,
-        severity: str
-    ) -> Dict:
+        severities: Optional[List[str]] = None,
+        coverage_override: Optional[float] = None,
+        deductible: Optional[float] = None,
+        samples: int = DISTRIBUTION_SAMPLES
+    ) -> Dict[str, Dict]:
         """
-        Generate detailed cost breakdown
+        Simulate the payout distribution of a claim at one or more severities
+
+        Damage amounts are drawn uniformly from each severity's damage range,
+        scaled to be centered on the point estimate (the stated amount when
+        the claim has one), in one vectorized draw; a severity without a
+        range for the incident type keeps the point estimate's damage.
 
         Args:
             claim: Claim object
-            total_damage: Total estimated damage
-            severity: Severity level
+            severities: Severity levels (optional; default the assessed severity)
+            coverage_override: Custom coverage percentage (optional)
+            deductible: Policy deductible amount (optional; default
+                FINTRACK_POLICY_DEDUCTIBLE)
+            samples: Damage amounts drawn per severity
 
         Returns:
-            Cost breakdown dictionary
+            Dictionary of severity -> distribution (p10/p50/p90 of damage,
+            payout and deductible, and prob_exceeds_deductible, the
+            probability that the damage exceeds the policy deductible)
         """
-        breakdown = {}
+        severities = severities or [self._assess_severity(claim)]
+        batch = self.estimate_batch([claim] * len(severities), severities, coverage_override)
+        distributions = self._distributions(claim, batch, deductible, samples)
+        return {batch.severity(index): distribution for index, distribution in enumerate(distributions)}
 
-        if claim.incident_type == "Car Accident":
-            breakdown = {
-                "parts": round(total_damage * 0.60, 2),
-                "labor": round(total_damage * 0.30, 2),
-                "paint_and_materials": round(total_damage * 0.10, 2)
-            }
+    def _distributions(
+        self,
+        claim: Claim,
+        batch: EstimateBatch,
+        deductible: Optional[float],
+        samples: int
+    ) -> List[Dict]:
+        """Payout distributions of the estimates in a batch of one claim"""
+        levels = batch.rate_table.damage_ranges.get(claim.incident_type, {})
+        ranges = [
+            sample_range(float(batch.estimated_damage[index]), levels.get(batch.severity(index)))
+            for index in range(len(batch))
+        ]
+        return simulate_payouts(
+            ranges,
+            batch.insurance_coverage,
+            samples,
+            seed=claim_seed(claim.claim_id),
+            policy_deductible=DEFAULT_POLICY_DEDUCTIBLE if deductible is None else deductible
+        )
 
-        elif claim.incident_type == "Home Damage":
-            breakdown = {
-                "materials": round(total_damage * 0.50, 2),
-                "labor": round(total_damage * 0.40, 2),
-                "permits_and_fees": round(total_damage * 0.10, 2)
-            }
+    def to_payload(self, estimate: FinancialEstimate) -> Dict:
+        """
+        Serialize an estimate into the agent response payload
 
-        elif claim.incident_type == "Medical":
-            breakdown = {
-                "medical_treatment": round(total_damage * 0.70, 2),
-                "medications": round(total_damage * 0.15, 2),
-                "rehabilitation": round(total_damage * 0.15, 2)
-            }
+        Args:
+            estimate: FinancialEstimate object
 
-        else:
-            breakdown = {
-                "repair_costs": round(total_damage * 0.80, 2),
-                "service_fees": round(total_damage * 0.20, 2)
-            }
+        Returns:
+            Dictionary with estimate data and summary
+        """
+        return {
+            "estimate": estimate.model_dump(),
+            "summary": self._generate_summary(estimate)
+        }
 
-        breakdown["total"] = total_damage
-        return breakdown
+    def _assess_severity(self, claim: Claim, table: Optional[RateTable] = None) -> str:
+        """
+        Assess damage severity based on claim data
+
+        Args:
+            claim: Claim object
+            table: Rate table (optional; default the current one)
+
+        Returns:
+            Severity level
+        """
+        table = table or rate_tables.current()
+        return table.assess_severity(claim.incident_type, claim.estimated_damage, claim.damages_description)
 
     def _calculate_confidence(self, claim: Claim, severity: str) -> float:
         """
@@ -371,25 +383,29 @@ class FinTrackAgent:
         """
         Compare estimates across different severity levels
 
+        Point estimates for every severity come from one batch pass, and
+        their payout distributions from one Monte Carlo draw.
+
         Args:
             claim: Claim object
             severities: List of severity levels to compare
 
         Returns:
-            AgentResponse with comparison data
+            AgentResponse with comparison data (point estimates and
+            distributions by severity)
         """
         try:
-            comparisons = {}
-
-            for severity in severities:
-                result = self.estimate_damage(claim, severity=severity)
-                if result.success:
-                    comparisons[severity] = result.data["estimate"]
+            batch = self.estimate_batch([claim] * len(severities), severities)
+            comparisons = {
+                severity: batch.estimate(index).model_dump()
+                for index, severity in enumerate(severities)
+            }
+            distributions = dict(zip(severities, self._distributions(claim, batch, None, DISTRIBUTION_SAMPLES)))
 
             return AgentResponse(
                 agent_name=self.name,
                 success=True,
-                data={"comparisons": comparisons},
+                data={"comparisons": comparisons, "distributions": distributions},
                 message="Estimate comparison completed"
             )
 
@@ -0,0 +1,347 @@
+"""
+Vectorized FinTrack estimates
+
+FinTrackAgent.calculate_estimate() walks the rate table's rules and builds
+a FinancialEstimate one claim at a time. BatchEstimator compiles the same
+RateTable (damage ranges, coverage rates, severity thresholds and
+breakdown ratios) into NumPy lookup tables indexed by incident type and
+severity codes, once per table version, and prices a whole list of claims
+in one pass:
+
+- the only per-claim Python work is reading the claim fields; stated
+  amounts and descriptions are parsed once per distinct text
+- severity, damage, coverage, deductible, payout, breakdown and confidence
+  are array expressions over every claim
+- rounding matches round() exactly, including values next to a halfway
+  case (see round_array)
+
+The result is an EstimateBatch of columns; FinancialEstimate objects are
+only built when a claim's estimate is read from it.
+"""
+from itertools import repeat
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils.data_models import Claim, FinancialEstimate
+from utils.rate_tables import RateTable, check_coverage_override, parse_amount
+
+# Writes an estimate's notes from its severity and coverage
+NotesWriter = Callable[[str, float], str]
+
+
+def round_array(values: np.ndarray, digits: int = 2) -> np.ndarray:
+    """
+    Round every value the way round() does
+
+    np.round() rounds the float product x * 10**digits, which can land on
+    a halfway point that x itself is not on (1.005 * 100 == 100.5, but
+    1.005 is stored as 1.00499...). The rounding error of the product is
+    recovered exactly (Dekker's product) and decides those cases. Huge and
+    non-finite values are rounded with round().
+
+    Args:
+        values: Float array
+        digits: Decimal places
+
+    Returns:
+        Rounded float array
+    """
+    scale = 10.0 ** digits
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = values * scale
+        # values * scale == scaled + error exactly
+        split = values * 134217729.0
+        high = split - (split - values)
+        error = (high * scale - scaled) + (values - high) * scale
+
+        floor = np.floor(scaled)
+        rounded = np.rint(scaled)
+        halfway = scaled - floor == 0.5
+        rounded[halfway & (error > 0)] = floor[halfway & (error > 0)] + 1
+        rounded[halfway & (error < 0)] = floor[halfway & (error < 0)]
+        rounded /= scale
+        unsure = ~(np.abs(scaled) < 2.0 ** 52)
+    flat_values, flat_rounded = values.reshape(-1), rounded.reshape(-1)
+    for index in np.flatnonzero(unsure).tolist():
+        flat_rounded[index] = round(float(flat_values[index]), digits)
+    return rounded
+
+
+class EstimateBatch:
+    """Financial estimates of many claims, held as arrays"""
+
+    def __init__(
+        self,
+        claim_ids: List[str],
+        severities: np.ndarray,
+        severity_names: List[str],
+        categories: np.ndarray,
+        category_names: List[Tuple[str, ...]],
+        estimated_damage: np.ndarray,
+        insurance_coverage: np.ndarray,
+        deductible: np.ndarray,
+        payout_after_deductible: np.ndarray,
+        breakdown: np.ndarray,
+        confidence: np.ndarray,
+        rate_table: RateTable,
+        notes: NotesWriter
+    ):
+        """
+        Args:
+            claim_ids: Claim IDs, in batch order
+            severities: Severity code per claim
+            severity_names: Severity level per code
+            categories: Breakdown category set per claim
+            category_names: Breakdown categories per set
+            estimated_damage: Total damage per claim
+            insurance_coverage: Coverage per claim
+            deductible: Deductible per claim
+            payout_after_deductible: Payout per claim
+            breakdown: Amount per claim and category (columns past a claim's categories are unused)
+            confidence: Confidence per claim
+            rate_table: Rate table the estimates were priced with
+            notes: Writes the notes of an estimate
+        """
+        self.claim_ids = claim_ids
+        self.severities = severities
+        self.severity_names = severity_names
+        self.categories = categories
+        self.category_names = category_names
+        self.estimated_damage = estimated_damage
+        self.insurance_coverage = insurance_coverage
+        self.deductible = deductible
+        self.payout_after_deductible = payout_after_deductible
+        self.breakdown = breakdown
+        self.confidence = confidence
+        self.rate_table = rate_table
+        self._write_notes = notes
+        self._notes: Dict[Tuple[int, float], str] = {}
+
+    def __len__(self) -> int:
+        return len(self.claim_ids)
+
+    def __iter__(self) -> Iterator[FinancialEstimate]:
+        return (self.estimate(index) for index in range(len(self)))
+
+    def severity(self, index: int) -> str:
+        """Severity level of the claim at a position"""
+        return self.severity_names[self.severities[index]]
+
+    def estimate(self, index: int) -> FinancialEstimate:
+        """
+        Build the FinancialEstimate of the claim at a position
+
+        Args:
+            index: Position of the claim in the batch
+
+        Returns:
+            FinancialEstimate, equal to calculate_estimate() for the claim
+        """
+        damage = float(self.estimated_damage[index])
+        coverage = float(self.insurance_coverage[index])
+        names = self.category_names[self.categories[index]]
+        breakdown = dict(zip(names, self.breakdown[index, :len(names)].tolist()))
+        breakdown["total"] = damage
+
+        notes_key = (int(self.severities[index]), coverage)
+        notes = self._notes.get(notes_key)
+        if notes is None:
+            notes = self._notes[notes_key] = self._write_notes(self.severity(index), coverage)
+
+        return FinancialEstimate(
+            claim_id=self.claim_ids[index],
+            estimated_damage=damage,
+            insurance_coverage=coverage,
+            deductible=float(self.deductible[index]),
+            payout_after_deductible=float(self.payout_after_deductible[index]),
+            breakdown=breakdown,
+            confidence=float(self.confidence[index]),
+            notes=notes,
+            rate_table_version=self.rate_table.version
+        )
+
+    def totals(self) -> Dict:
+        """
+        Get batch totals
+
+        Returns:
+            Dictionary with the claim count and summed damage, deductible and payout
+        """
+        return {
+            "claims": len(self),
+            "rate_table_version": self.rate_table.version,
+            "estimated_damage": round(float(self.estimated_damage.sum()), 2),
+            "deductible": round(float(self.deductible.sum()), 2),
+            "payout_after_deductible": round(float(self.payout_after_deductible.sum()), 2)
+        }
+
+
+class BatchEstimator:
+    """A rate table compiled into NumPy lookup tables"""
+
+    def __init__(self, table: RateTable):
+        """
+        Args:
+            table: Rate table whose damage ranges, coverage, severity rules and breakdown ratios to use
+        """
+        self.table = table
+
+        incident_types = list(table.incident_types)
+        self.type_codes = {name: code for code, name in enumerate(incident_types)}
+        # Code of every other incident type
+        self.other_type = len(incident_types)
+        type_count = len(incident_types) + 1
+
+        self.severity_names = list(table.severities)
+        self.severity_codes = {name: code for code, name in enumerate(self.severity_names)}
+
+        # Damage by [incident type, severity]: midpoint of the range
+        self.midpoints = np.full((type_count, len(self.severity_names)), table.default_damage)
+        for (name, level), midpoint in table.midpoints.items():
+            self.midpoints[self.type_codes[name], self.severity_codes[level]] = midpoint
+
+        self.coverage = np.array([table.coverage_for(name) for name in incident_types] + [table.default_coverage])
+
+        # Amount thresholds per incident type, lowest first
+        self.thresholds = {
+            self.type_codes[name]: [(minimum, self.severity_codes[level]) for minimum, level in reversed(thresholds)]
+            for name, thresholds in table.severity_thresholds.items()
+        }
+        self.has_thresholds = np.zeros(type_count, dtype=bool)
+        self.has_thresholds[list(self.thresholds)] = True
+
+        # Breakdown category set per incident type, and ratios by [set, category]
+        self.category_names: List[Tuple[str, ...]] = []
+        self.category_sets = np.empty(type_count, dtype=np.intp)
+        set_codes: Dict[Tuple, int] = {}
+        for code in range(type_count):
+            name = incident_types[code] if code < self.other_type else None
+            key = table.ratios_for(name) if name is not None else table.default_breakdown
+            if key not in set_codes:
+                set_codes[key] = len(self.category_names)
+                self.category_names.append(tuple(category for category, _ in key))
+            self.category_sets[code] = set_codes[key]
+        width = max(len(names) for names in self.category_names)
+        self.ratios = np.zeros((len(self.category_names), width))
+        for key, set_code in set_codes.items():
+            self.ratios[set_code, :len(key)] = [ratio for _, ratio in key]
+
+    def estimate(
+        self,
+        claims: Iterable[Claim],
+        severity: Union[str, Sequence[Optional[str]], None] = None,
+        coverage_override: Optional[float] = None,
+        notes: Optional[NotesWriter] = None
+    ) -> EstimateBatch:
+        """
+        Calculate the financial estimates of claims
+
+        Args:
+            claims: Claim objects
+            severity: Severity level override for every claim, or one per
+                claim (None for an assessed severity) (optional)
+            coverage_override: Custom coverage percentage for every claim (optional)
+            notes: Writes the notes of an estimate (optional; default none)
+
+        Returns:
+            EstimateBatch, in the order of the claims
+
+        Raises:
+            ValueError: If coverage_override is outside 0-1
+        """
+        check_coverage_override(coverage_override)
+
+        claims = list(claims)
+        count = len(claims)
+        severity_names = list(self.severity_names)
+        midpoints = self.midpoints
+
+        types = np.fromiter(
+            map(self.type_codes.get, map(attrgetter("incident_type"), claims), repeat(self.other_type)),
+            np.intp,
+            count
+        )
+        texts = list(map(attrgetter("estimated_damage"), claims))
+        stated = np.fromiter(map(bool, texts), bool, count)
+        amounts_by_text = {}
+        for text in set(texts):
+            amount = parse_amount(text) if text else None
+            if amount is not None:
+                amounts_by_text[text] = amount
+        parsed = np.fromiter(map(amounts_by_text.__contains__, texts), bool, count)
+        amounts = np.fromiter(map(amounts_by_text.get, texts, repeat(0.0)), np.float64, count)
+        claim_confidence = np.fromiter(map(attrgetter("confidence"), claims), np.float64, count)
+
+        # Severity
+        overrides = [] if severity is None or isinstance(severity, str) else list(severity)
+        if overrides and len(overrides) != count:
+            raise ValueError(f"Got {len(overrides)} severities for {count} claims")
+        for name in [severity] if isinstance(severity, str) else dict.fromkeys(overrides):
+            if name and name not in severity_names:
+                # No damage range anywhere: priced at the default damage
+                severity_names.append(name)
+                midpoints = np.hstack([midpoints, np.full((len(midpoints), 1), self.table.default_damage)])
+        codes = {name: code for code, name in enumerate(severity_names)}
+
+        if isinstance(severity, str) and severity:
+            severities = np.full(count, codes[severity], dtype=np.intp)
+        else:
+            severities = np.full(count, self.severity_codes[self.table.base_severity], dtype=np.intp)
+            by_amount = parsed & self.has_thresholds[types]
+            for type_code, thresholds in self.thresholds.items():
+                rows = by_amount & (types == type_code)
+                for minimum, level in thresholds:
+                    severities[rows & (amounts >= minimum)] = level
+
+            by_keyword = np.flatnonzero(~by_amount)
+            descriptions = [claims[index].damages_description for index in by_keyword.tolist()]
+            levels_by_text = {text: self._keyword_severity(text) for text in set(descriptions)}
+            severities[by_keyword] = np.fromiter(
+                map(levels_by_text.__getitem__, descriptions), np.intp, len(descriptions)
+            )
+
+            overridden = [index for index, name in enumerate(overrides) if name]
+            severities[overridden] = [codes[overrides[index]] for index in overridden]
+
+        # Amounts
+        estimated_damage = np.where(parsed, amounts, midpoints[types, severities])
+        if coverage_override:
+            coverage = np.full(count, coverage_override, dtype=np.float64)
+        else:
+            coverage = self.coverage[types]
+        categories = self.category_sets[types]
+        # Stated amounts such as "inf" or "nan" price as they do in calculate_estimate()
+        with np.errstate(invalid="ignore", over="ignore"):
+            deductible = estimated_damage * (1 - coverage)
+            payout = round_array(estimated_damage - deductible)
+            deductible = round_array(deductible)
+            breakdown = round_array(estimated_damage[:, None] * self.ratios[categories])
+
+        confidence = np.where(stated, 0.5 + 0.3, 0.5) + claim_confidence * 0.2
+        confidence = np.minimum(round_array(confidence), 1.0)
+
+        return EstimateBatch(
+            claim_ids=list(map(attrgetter("claim_id"), claims)),
+            severities=severities,
+            severity_names=severity_names,
+            categories=categories,
+            category_names=self.category_names,
+            estimated_damage=estimated_damage,
+            insurance_coverage=coverage,
+            deductible=deductible,
+            payout_after_deductible=payout,
+            breakdown=breakdown,
+            confidence=confidence,
+            rate_table=self.table,
+            notes=notes or (lambda severity, coverage: None)
+        )
+
+    def _keyword_severity(self, description: str) -> int:
+        """Severity code from damage description keywords"""
+        damages_lower = description.lower()
+        for level, keywords in self.table.severity_keywords:
+            if any(keyword in damages_lower for keyword in keywords):
+                return self.severity_codes[level]
+        return self.severity_codes[self.table.base_severity]
@@ -144,64 +144,18 @@ class ShopFinderAgent:
             AgentResponse with shop recommendations
         """
         try:
-            # Get shops for this incident type
-            shops = self._get_relevant_shops(claim.incident_type)
-
-            if not shops:
-                return AgentResponse(
-                    agent_name=self.name,
-                    success=False,
-                    data={},
-                    message=f"No repair shops found for {claim.incident_type}"
-                )
-
-            # Calculate distances (mock - in production use geolocation API)
-            shops_with_distance = self._calculate_distances(shops, claim.location, radius_miles)
-
-            # Filter by price preference if specified
-            if price_preference:
-                shops_with_distance = [
-                    s for s in shops_with_distance
-                    if s["price_level"] == price_preference
-                ]
-
-            # Rank shops
-            ranked_shops = self._rank_shops(shops_with_distance)
-
-            # Select top results
-            top_shops = ranked_shops[:max_results]
-
-            # Convert to RepairShop objects
-            repair_shops = []
-            for shop_data in top_shops:
-                repair_shops.append(RepairShop(
-                    name=shop_data["name"],
-                    rating=shop_data["rating"],
-                    price_level=shop_data["price_level"],
-                    distance=shop_data["distance"],
-                    address=shop_data.get("address"),
-                    phone=shop_data.get("phone"),
-                    specialties=shop_data.get("specialties", []),
-                    estimated_wait_time=shop_data.get("estimated_wait_time")
-                ))
-
-            # Create recommendations
-            recommendations = ShopRecommendations(
-                claim_id=claim.claim_id,
-                location=claim.location,
-                incident_type=claim.incident_type,
-                recommended_shops=repair_shops,
-                search_radius_miles=radius_miles
+            recommendations = self.recommend_shops(
+                claim,
+                max_results=max_results,
+                radius_miles=radius_miles,
+                price_preference=price_preference
             )
 
             return AgentResponse(
                 agent_name=self.name,
                 success=True,
-                data={
-                    "recommendations": recommendations.model_dump(),
-                    "summary": self._generate_summary(recommendations)
-                },
-                message=f"Found {len(repair_shops)} recommended shops for claim {claim.claim_id}"
+                data=self.to_payload(recommendations),
+                message=f"Found {len(recommendations.recommended_shops)} recommended shops for claim {claim.claim_id}"
             )
 
         except Exception as e:
@@ -212,6 +166,87 @@ class ShopFinderAgent:
                 message=f"Error finding shops: {str(e)}"
             )
 
+    def recommend_shops(
+        self,
+        claim: Claim,
+        max_results: int = 3,
+        radius_miles: float = 10.0,
+        price_preference: Optional[str] = None
+    ) -> ShopRecommendations:
+        """
+        Build ranked shop recommendations for a claim
+
+        Args:
+            claim: Claim object
+            max_results: Maximum number of shops to return
+            radius_miles: Search radius in miles
+            price_preference: Price level preference ("$", "$$", "$$$")
+
+        Returns:
+            ShopRecommendations object
+
+        Raises:
+            LookupError: If no shops exist for the claim's incident type
+        """
+        # Get shops for this incident type
+        shops = self._get_relevant_shops(claim.incident_type)
+
+        if not shops:
+            raise LookupError(f"No repair shops found for {claim.incident_type}")
+
+        # Calculate distances (mock - in production use geolocation API)
+        shops_with_distance = self._calculate_distances(shops, claim.location, radius_miles)
+
+        # Filter by price preference if specified
+        if price_preference:
+            shops_with_distance = [
+                s for s in shops_with_distance
+                if s["price_level"] == price_preference
+            ]
+
+        # Rank shops
+        ranked_shops = self._rank_shops(shops_with_distance)
+
+        # Select top results
+        top_shops = ranked_shops[:max_results]
+
+        # Convert to RepairShop objects
+        repair_shops = []
+        for shop_data in top_shops:
+            repair_shops.append(RepairShop(
+                name=shop_data["name"],
+                rating=shop_data["rating"],
+                price_level=shop_data["price_level"],
+                distance=shop_data["distance"],
+                address=shop_data.get("address"),
+                phone=shop_data.get("phone"),
+                specialties=shop_data.get("specialties", []),
+                estimated_wait_time=shop_data.get("estimated_wait_time")
+            ))
+
+        return ShopRecommendations(
+            claim_id=claim.claim_id,
+            location=claim.location,
+            incident_type=claim.incident_type,
+            recommended_shops=repair_shops,
+            search_radius_miles=radius_miles
+        )
+
+    def to_payload(self, recommendations: ShopRecommendations) -> dict:
+        """
+        Serialize recommendations into the agent response payload
+
+        Args:
+            recommendations: ShopRecommendations object
+
+        Returns:
+            Dictionary with recommendations and summary
+        """
+        return {
+            "recommendations": recommendations.model_dump(),
+            "summary": self._generate_summary(recommendations)
+        }
+
     def _get_relevant_shops(self, incident_type: str) -> List[dict]:
         """
         Get shops relevant to the incident type
@@ -0,0 +1,115 @@
+"""
+Benchmark for the SQLite claim storage backend
+Run from the backend directory: python benchmarks/bench_claim_storage.py
+
+Seeds a temporary database (through CLAIMS_DB_PATH), then measures
+get_claim() and one listing page from several worker processes at once
+while another process keeps saving claims, the way uvicorn workers share
+one file on a host.
+"""
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SEED_CLAIMS = 20000
+READERS = 4
+READS_PER_READER = 5000
+WRITER_CLAIMS = 2000
+
+
+def make_claim(n: int, status: str = "Open") -> dict:
+    """Claim data in the Claim.model_dump() layout"""
+    return {
+        "claim_id": f"CLM-{n:08d}",
+        "incident_type": random.choice(["Car Accident", "Home Damage", "Theft", "Medical"]),
+        "date": "2025-11-07",
+        "location": "Nassau Street, Princeton, NJ",
+        "parties_involved": [{"name": "John Smith", "role": "Driver", "contact": None}],
+        "damages_description": "Rear bumper, trunk and tail light damage",
+        "estimated_damage": "$2,500.00",
+        "confidence": 0.9,
+        "status": status,
+        "summary": f"Car accident claim {n}",
+        "created_at": f"2025-11-07T12:{n // 60000 % 60:02d}:{n // 1000 % 60:02d}.{n % 1000:03d}000",
+    }
+
+
+def percentile(samples: list, pct: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * pct))]
+
+
+def reader(results):
+    from utils.storage import storage
+    lookups, pages = [], []
+    for _ in range(READS_PER_READER):
+        claim_id = f"CLM-{random.randrange(SEED_CLAIMS):08d}"
+        start = time.perf_counter()
+        record = storage.get_claim(claim_id)
+        lookups.append(time.perf_counter() - start)
+        assert record and record["claim_id"] == claim_id
+
+    for _ in range(READS_PER_READER // 10):
+        start = time.perf_counter()
+        storage.list_claims(status="Open", columns="claim_id,status,created_at,incident_data", limit=20)
+        pages.append(time.perf_counter() - start)
+    results.put((lookups, pages))
+
+
+def writer(done):
+    from utils.storage import storage
+    start = time.perf_counter()
+    for n in range(SEED_CLAIMS, SEED_CLAIMS + WRITER_CLAIMS):
+        storage.save_claim(make_claim(n))
+    done.put(time.perf_counter() - start)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        # Inherited by the worker processes
+        os.environ["STORAGE_BACKEND"] = "sqlite"
+        os.environ["CLAIMS_DB_PATH"] = os.path.join(tmp, "claims.db")
+        from utils.storage import storage
+
+        print("=" * 80)
+        print(f"SQLite claim storage: {SEED_CLAIMS} claims, {READERS} reader processes + 1 writer")
+        print("=" * 80)
+
+        start = time.perf_counter()
+        storage.save_claims([make_claim(n, random.choice(["Open", "Processing", "Closed"])) for n in range(SEED_CLAIMS)])
+        print(f"Seeded in one batch: {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        ctx = multiprocessing.get_context("spawn")
+        results, done = ctx.Queue(), ctx.Queue()
+        processes = [ctx.Process(target=writer, args=(done,))]
+        processes += [ctx.Process(target=reader, args=(results,)) for _ in range(READERS)]
+        for proc in processes:
+            proc.start()
+        lookups, pages = [], []
+        for _ in range(READERS):
+            reader_lookups, reader_pages = results.get()
+            lookups.extend(reader_lookups)
+            pages.extend(reader_pages)
+        write_time = done.get()
+        for proc in processes:
+            proc.join()
+
+        print(f"Writer: {WRITER_CLAIMS} single-claim saves, {write_time / WRITER_CLAIMS * 1000:.3f}ms each")
+        for name, samples in [("get_claim", lookups), ("list page (20)", pages)]:
+            print(
+                f"{name:<16} p50 {statistics.median(samples) * 1000:.3f}ms  "
+                f"p99 {percentile(samples, 0.99) * 1000:.3f}ms  ({len(samples)} reads)"
+            )
+        # Claims saved by the writer process are visible here
+        seen = storage.get_claim(f"CLM-{SEED_CLAIMS + WRITER_CLAIMS - 1:08d}") is not None
+        print(f"Writer's claims visible to other processes: {'✅' if seen else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
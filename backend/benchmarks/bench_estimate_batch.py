@@ -0,0 +1,99 @@
+"""
+Benchmark for vectorized FinTrack estimates
+Run from the backend directory: python benchmarks/bench_estimate_batch.py
+
+Prices books of 10k, 100k and 1M generated claims with
+FinTrackAgent.estimate_batch() and with calculate_estimate() per claim,
+and checks that a sample of batch estimates equals the scalar ones. The
+scalar path is timed up to SCALAR_MAX_CLAIMS; beyond that its time is
+extrapolated from the largest timed book.
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.fintrack_agent import fintrack_agent  # noqa: E402
+from utils.data_models import Claim, Party  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000]
+SCALAR_MAX_CLAIMS = 100_000
+CHECKED_CLAIMS = 2_000
+
+INCIDENT_TYPES = ["Car Accident", "Home Damage", "Property Damage", "Medical", "Theft", "Other"]
+DESCRIPTIONS = [
+    "Rear bumper, trunk and tail light damage",
+    "Extensive water damage to the basement and first floor",
+    "Significant smoke damage in the kitchen",
+    "Vehicle destroyed in a highway collision",
+    "Scratches on the driver side door",
+]
+
+
+def make_claims(count: int) -> list:
+    """Claims with a mix of incident types, stated amounts and descriptions"""
+    rng = random.Random(count)
+    party = [Party(name="John Smith", role="Driver")]
+    claims = []
+    for n in range(count):
+        amount = rng.random()
+        if amount < 0.3:
+            estimated_damage = None
+        else:
+            estimated_damage = f"${rng.uniform(200, 120000):,.2f}"
+        # Built without validation: the fields are known to be valid
+        claims.append(Claim.model_construct(
+            claim_id=f"CLM-{n:08d}",
+            incident_type=rng.choice(INCIDENT_TYPES),
+            date="2025-11-07",
+            location="Nassau Street, Princeton, NJ",
+            parties_involved=party,
+            damages_description=rng.choice(DESCRIPTIONS),
+            estimated_damage=estimated_damage,
+            confidence=round(rng.random(), 2),
+            summary=f"Claim {n}",
+        ))
+    return claims
+
+
+def main():
+    print("=" * 80)
+    print("FinTrack estimates: estimate_batch() vs calculate_estimate() per claim")
+    print("=" * 80)
+
+    scalar_rate = None
+    for size in SIZES:
+        claims = make_claims(size)
+
+        start = time.perf_counter()
+        batch = fintrack_agent.estimate_batch(claims)
+        batch_time = time.perf_counter() - start
+
+        if size <= SCALAR_MAX_CLAIMS:
+            start = time.perf_counter()
+            for claim in claims:
+                fintrack_agent.calculate_estimate(claim)
+            scalar_time = time.perf_counter() - start
+            scalar_rate = scalar_time / size
+            scalar_label = f"{scalar_time * 1000:9.0f}ms"
+        else:
+            scalar_time = scalar_rate * size
+            scalar_label = f"{scalar_time * 1000:9.0f}ms (est.)"
+
+        sample = random.Random(0).sample(range(size), min(CHECKED_CLAIMS, size))
+        identical = all(
+            batch.estimate(index) == fintrack_agent.calculate_estimate(claims[index]) for index in sample
+        )
+
+        print(
+            f"{size:>9,} claims  batch {batch_time * 1000:7.0f}ms "
+            f"({batch_time / size * 1e6:.2f}us/claim)  scalar {scalar_label}  "
+            f"speedup {scalar_time / batch_time:5.1f}x  identical: {'✅' if identical else '❌'}"
+        )
+        del claims, batch
+
+
+if __name__ == "__main__":
+    main()
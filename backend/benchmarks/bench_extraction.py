@@ -0,0 +1,181 @@
+"""
+Benchmark for the single-pass field extraction engine
+Run from the backend directory: python benchmarks/bench_extraction.py
+
+Compares ExtractionEngine.extract() with the previous multi-pass
+extract_structured_data() (kept below as the baseline) on claim packets from
+128 KB to 1 MB, and shows that time per MB stays flat as input grows.
+
+The "adversarial" case is a long run of "on ..." phrases without a street
+name or punctuation. The old street-location regex retried the whole run
+from every "on", which is quadratic; the baseline is only timed on small
+inputs there.
+"""
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.extraction_engine import DAMAGE_KEYWORDS, extraction_engine  # noqa: E402
+
+SIZES_KB = [128, 256, 512, 1024]
+ADVERSARIAL_BASELINE_MAX_KB = 32
+REPEATS = 3
+
+SAMPLE_PARAGRAPH = (
+    "POLICE ACCIDENT REPORT - Case #2025-{n:04d}\n"
+    "Incident Type: Car Accident\n"
+    "Date: November 7, 2025\n"
+    "Location: Nassau Street, Princeton, NJ\n"
+    "Driver: John Smith  Owner: Jane Doe\n"
+    "The vehicle was struck at low speed while stopped at the light. "
+    "Rear bumper, trunk and tail light damage estimated at $2,500. "
+    "Medical bill: emergency room visit, x-ray and treatment $1,180.50! "
+    "Repair estimate line {n}: labor 3.5 hours at $95.00/hr on 11/12/2025.\n\n"
+)
+
+
+def build_text(size_kb: int) -> str:
+    """Repeat a claim packet paragraph up to the given size"""
+    parts, size, n = [], 0, 0
+    while size < size_kb * 1024:
+        paragraph = SAMPLE_PARAGRAPH.format(n=n)
+        parts.append(paragraph)
+        size += len(paragraph)
+        n += 1
+    return "".join(parts)[:size_kb * 1024]
+
+
+def build_adversarial(size_kb: int) -> str:
+    """Letters and spaces only, with an "on" every few words and no street suffix"""
+    chunk = "on the way home from work the car "
+    return (chunk * (size_kb * 1024 // len(chunk) + 1))[:size_kb * 1024]
+
+
+def baseline_extract(text: str) -> dict:
+    """The previous multi-pass implementation, one regex scan per pattern"""
+    incident = "Other"
+    for name, pattern in [
+        ("Car Accident", r"(?i)(car accident|vehicle collision|auto accident|traffic accident|car crash)"),
+        ("Home Damage", r"(?i)(home damage|house damage|property damage|water damage|fire damage)"),
+        ("Theft", r"(?i)(theft|burglary|stolen|robbery)"),
+        ("Medical", r"(?i)(medical|injury|hospital|treatment|doctor)"),
+    ]:
+        if re.search(pattern, text):
+            incident = name
+            break
+
+    date = datetime.now().strftime("%Y-%m-%d")
+    for pattern in [
+        r"\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b",
+        r"\b(\d{4}[/-]\d{1,2}[/-]\d{1,2})\b",
+        r"\b([A-Za-z]+\s+\d{1,2},?\s+\d{4})\b",
+    ]:
+        match = re.search(pattern, text)
+        if match:
+            date = match.group(1)
+            break
+
+    location = "Location not specified"
+    for pattern in [
+        r"(?i)(?:location|address|scene):\s*([^\n]+)",
+        r"(?i)(?:at|near|on)\s+([A-Z][A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr)[^\n]*)",
+        r"\b([A-Z][a-z]+,\s*[A-Z]{2})\b",
+    ]:
+        match = re.search(pattern, text)
+        if match:
+            location = match.group(1).strip()
+            break
+
+    parties = []
+    for pattern in [
+        r"(?i)driver:\s*([A-Z][a-z]+\s+[A-Z][a-z]+)",
+        r"(?i)owner:\s*([A-Z][a-z]+\s+[A-Z][a-z]+)",
+        r"(?i)claimant:\s*([A-Z][a-z]+\s+[A-Z][a-z]+)",
+    ]:
+        for match in re.finditer(pattern, text):
+            parties.append({"name": match.group(1), "role": "involved party"})
+
+    damage_sentences = [
+        sentence.strip() for sentence in re.split(r'[.!?]+', text)
+        if any(keyword in sentence.lower() for keyword in DAMAGE_KEYWORDS)
+    ]
+
+    amounts = []
+    for match in re.findall(r"\$\s*[\d,]+(?:\.\d{2})?", text):
+        try:
+            amounts.append(float(match.replace('$', '').replace(',', '').strip()))
+        except ValueError:
+            continue
+
+    return {
+        "incident_type": incident,
+        "date": date,
+        "location": location,
+        "parties": parties,
+        "damages": " ".join(damage_sentences[:3]) or "Damage description not available",
+        "amounts": amounts,
+    }
+
+
+def best_of(func, repeats: int = REPEATS) -> tuple:
+    """Run func several times, returning (best seconds, last result)"""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_case(name: str, build, baseline_max_kb: int = max(SIZES_KB)):
+    print(f"\n{name}")
+    print(f"{'size':>8} {'baseline':>10} {'engine':>10} {'speedup':>8} {'engine ms/MB':>13}  match")
+    per_mb = []
+    for size_kb in SIZES_KB:
+        text = build(size_kb)
+        engine_time, engine_result = best_of(lambda: extraction_engine.extract(text))
+        per_mb.append(engine_time * 1000 / (size_kb / 1024))
+
+        if size_kb <= baseline_max_kb:
+            baseline_time, baseline_result = best_of(lambda: baseline_extract(text))
+            baseline_col = f"{baseline_time * 1000:>8.1f}ms"
+            speedup_col = f"{baseline_time / engine_time:>7.2f}x"
+            match_col = "✅" if baseline_result == engine_result else "❌"
+        else:
+            baseline_col, speedup_col, match_col = f"{'-':>10}", f"{'-':>8}", ""
+
+        print(
+            f"{size_kb:>6}KB {baseline_col} {engine_time * 1000:>8.1f}ms {speedup_col} "
+            f"{per_mb[-1]:>13.1f}  {match_col}"
+        )
+    print(f"Engine time per MB, largest / smallest input: {per_mb[-1] / per_mb[0]:.2f} (1.00 = linear)")
+
+
+def main():
+    print("=" * 80)
+    print(f"Field extraction benchmark (best of {REPEATS})")
+    print("=" * 80)
+
+    run_case("Claim packets", build_text)
+
+    # Show the baseline's quadratic growth on small inputs only
+    print("\nAdversarial, small inputs")
+    for size_kb in [8, 16, ADVERSARIAL_BASELINE_MAX_KB]:
+        text = build_adversarial(size_kb)
+        baseline_time, baseline_result = best_of(lambda: baseline_extract(text), repeats=1)
+        engine_time, engine_result = best_of(lambda: extraction_engine.extract(text), repeats=1)
+        print(
+            f"{size_kb:>6}KB baseline {baseline_time * 1000:>8.1f}ms  engine {engine_time * 1000:>6.1f}ms  "
+            f"{'✅' if baseline_result == engine_result else '❌'}"
+        )
+
+    run_case("Adversarial, large inputs (engine only)", build_adversarial, ADVERSARIAL_BASELINE_MAX_KB)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark for page-parallel PDF text extraction
+Run from the backend directory: python benchmarks/bench_pdf_extract.py
+
+Builds synthetic 1-, 10- and 100-page claim packets and compares inline
+extraction, page-parallel extraction and the first-page fast mode.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.pdf_extract import extract_text, shutdown_pool, PDF_PROCESS_WORKERS  # noqa: E402
+
+PAGE_COUNTS = [1, 10, 100]
+REPEATS = 3
+
+SAMPLE_LINES = [
+    "POLICE ACCIDENT REPORT - Case #2025-{page:04d}",
+    "Incident Type: Car Accident",
+    "Date: November 7, 2025",
+    "Location: Nassau Street, Princeton, NJ",
+    "Driver: John Smith  Owner: Jane Doe",
+    "Rear bumper, trunk and tail light damage estimated at $2,500.",
+    "Medical bill: emergency room visit, x-ray and treatment $1,180.",
+    "Repair estimate line item {line}: labor 3.5 hours at $95.00/hr",
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    """Build a simple text-only PDF with the given number of pages"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for page in range(pages):
+        lines = [
+            SAMPLE_LINES[i % len(SAMPLE_LINES)].format(page=page + 1, line=i)
+            for i in range(lines_per_page)
+        ]
+        stream = "BT /F1 10 Tf 14 TL 50 780 Td " + " ".join(f"({_escape(line)}) Tj T*" for line in lines) + " ET"
+        content = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+
+    kids = b" ".join(b"%d 0 R" % ref for ref in page_refs)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def best_of(func, repeats: int = REPEATS) -> tuple:
+    """Run func several times, returning (best seconds, last result)"""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    print("=" * 80)
+    print(f"PDF extraction benchmark ({PDF_PROCESS_WORKERS} worker processes, best of {REPEATS})")
+    print("=" * 80)
+
+    # Start the worker processes outside the measured runs
+    warm_path = os.path.join(tempfile.gettempdir(), "bench_warmup.pdf")
+    with open(warm_path, "wb") as f:
+        f.write(build_pdf(20))
+    start = time.perf_counter()
+    extract_text(warm_path)
+    print(f"Pool warm-up: {time.perf_counter() - start:.2f}s\n")
+    os.unlink(warm_path)
+
+    print(f"{'pages':>6} {'inline':>10} {'parallel':>10} {'speedup':>8} {'first page':>11}  match")
+    for pages in PAGE_COUNTS:
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            f.write(build_pdf(pages))
+            path = f.name
+
+        try:
+            inline_time, inline_text = best_of(lambda: extract_text(path, workers=1))
+            parallel_time, parallel_text = best_of(lambda: extract_text(path))
+            fast_time, _ = best_of(lambda: extract_text(path, max_pages=1))
+        finally:
+            os.unlink(path)
+
+        print(
+            f"{pages:>6} {inline_time * 1000:>8.1f}ms {parallel_time * 1000:>8.1f}ms "
+            f"{inline_time / parallel_time:>7.2f}x {fast_time * 1000:>9.1f}ms  "
+            f"{'✅' if inline_text == parallel_text else '❌'}"
+        )
+
+    shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
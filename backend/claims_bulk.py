@@ -0,0 +1,63 @@
+"""
+Bulk claim import/export
+
+Run from the backend directory:
+    python claims_bulk.py export claims.parquet [--status Open] [--incident-type Theft]
+    python claims_bulk.py import claims.jsonl
+
+The format (jsonl, parquet or arrow) is taken from the file extension
+unless --format is given. Export to "-" writes to stdout.
+"""
+import argparse
+import sys
+import time
+
+from agents.claimpilot_agent import claimpilot_agent
+from utils.claim_io import FORMATS, format_from_filename
+from utils.data_models import ClaimStatus
+
+
+def export_claims(args) -> int:
+    status = ClaimStatus(args.status) if args.status else None
+    start = time.perf_counter()
+    size = 0
+    output = sys.stdout.buffer if args.path == "-" else open(args.path, "wb")
+    try:
+        for chunk in claimpilot_agent.export_claims(args.format, status, args.incident_type):
+            output.write(chunk)
+            size += len(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    print(f"✅ Exported {size / (1024 * 1024):.1f} MB in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+def import_claims(args) -> int:
+    start = time.perf_counter()
+    with open(args.path, "rb") as source:
+        result = claimpilot_agent.import_claims(source, args.format)
+    for error in result["errors"]:
+        print(f"   record {error['record']}: {error['error']}", file=sys.stderr)
+    print(f"Done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 1 if result["failed"] else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk claim import/export")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="File to write or read ('-' exports to stdout)")
+    parser.add_argument("--format", choices=FORMATS, help="File format (default: from the extension)")
+    parser.add_argument("--status", choices=[status.value for status in ClaimStatus], help="Export only this status")
+    parser.add_argument("--incident-type", help="Export only this incident type")
+    args = parser.parse_args()
+
+    args.format = args.format or format_from_filename(args.path) or ("jsonl" if args.path == "-" else None)
+    if args.format is None:
+        parser.error(f"Cannot tell the format of {args.path}; pass --format")
+
+    return export_claims(args) if args.command == "export" else import_claims(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
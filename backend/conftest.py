@@ -0,0 +1,32 @@
+"""
+Shared pytest fixtures for the backend tests
+"""
+import pytest
+
+from utils.data_models import Claim, Party
+
+
+@pytest.fixture
+def make_claim():
+    """
+    Factory for a rear-end collision claim on Nassau Street
+
+    Call it with a claim ID and any Claim fields to override.
+    """
+    def make(claim_id: str = "CLM-TEST-1", **fields) -> Claim:
+        data = {
+            "claim_id": claim_id,
+            "incident_type": "Car Accident",
+            "date": "2025-01-08",
+            "location": "Nassau Street, Princeton, NJ",
+            "parties_involved": [Party(name="John Smith", role="Driver")],
+            "damages_description": "Rear bumper damage",
+            "estimated_damage": "$4,500",
+            "confidence": 0.9,
+            "summary": "Rear-end collision",
+            "created_at": "2025-01-08T10:00:00"
+        }
+        data.update(fields)
+        return Claim(**data)
+
+    return make
@@ -2,28 +2,31 @@
 Comprehensive MCP Server for ClaimPilot AI
 Integrates all agent capabilities into MCP tools with Gemini and OpenAI support
 """
-import pdfplumber
 from fastmcp import FastMCP
-from openai import OpenAI
-import google.generativeai as genai
 from dotenv import load_dotenv
 import os
-import io
+import sys
 import base64
 import json
 import re
+from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
 
+# Make the backend utils importable when run as a standalone MCP server
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.llm_gateway import llm_gateway
+from utils.llm_cache import llm_cache
+from utils.pdf_extract import extract_text
+from utils.rate_tables import rate_tables
+
 # Load environment variables
 load_dotenv()
-openai_api_key = os.getenv("OPENAI_API_KEY")
-gemini_api_key = os.getenv("GEMINI_API_KEY")
 
-# Initialize AI clients
-openai_client = OpenAI(api_key=openai_api_key) if openai_api_key else None
-if gemini_api_key:
-    genai.configure(api_key=gemini_api_key)
+# Bump a version whenever its prompt template changes so cached results are not reused
+SUMMARY_PROMPT_VERSION = "mcp-summary-v1"
+EXTRACTION_PROMPT_VERSION = "mcp-extract-v1"
 
 # Create MCP server with comprehensive instructions
 mcp = FastMCP(
@@ -74,13 +77,7 @@ def parse_pdf(file_path: str) -> str:
         Extracted text content from all pages
     """
     try:
-        text = ''
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n\n"
-        return text.strip()
+        return extract_text(file_path, separator="\n\n")
     except Exception as e:
         return f"Error parsing PDF: {str(e)}"
 
@@ -98,14 +95,7 @@ def parse_pdf_from_bytes(pdf_bytes_b64: str) -> str:
     """
     try:
         pdf_bytes = base64.b64decode(pdf_bytes_b64)
-        text = ''
-        pdf_file = io.BytesIO(pdf_bytes)
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n\n"
-        return text.strip()
+        return extract_text(pdf_bytes, separator="\n\n")
     except Exception as e:
         return f"Error parsing PDF from bytes: {str(e)}"
 
@@ -122,12 +112,15 @@ def summarize_claim_openai(claim_text: str, max_tokens: int = 250) -> str:
     Returns:
         AI-generated claim summary with key details
     """
-    if not openai_client:
+    if not llm_gateway.is_configured("openai"):
         return "Error: OpenAI API key not configured"
 
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
+        key = llm_cache.make_key(
+            "mcp_summary", claim_text, SUMMARY_PROMPT_VERSION,
+            llm_gateway.model_for("openai"), max_tokens=max_tokens
+        )
+        return llm_cache.get_or_compute(key, lambda: llm_gateway.complete_sync(
             messages=[
                 {"role": "system", "content": "You are an expert insurance claims analyst. Provide clear, concise summaries."},
                 {"role": "user", "content": f"""Analyze this insurance claim and provide a summary including:
@@ -141,10 +134,10 @@ def summarize_claim_openai(claim_text: str, max_tokens: int = 250) -> str:
 Claim text:
 {claim_text}"""}
             ],
+            provider="openai",
             max_tokens=max_tokens,
             temperature=0.3
-        )
-        return response.choices[0].message.content
+        ).text)
     except Exception as e:
         return f"Error generating summary with OpenAI: {str(e)}"
 
@@ -161,12 +154,10 @@ def summarize_claim_gemini(claim_text: str, max_tokens: int = 250) -> str:
     Returns:
         AI-generated claim summary with key details
     """
-    if not gemini_api_key:
+    if not llm_gateway.is_configured("gemini"):
         return "Error: Gemini API key not configured"
 
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
-
         prompt = f"""Analyze this insurance claim and provide a clear summary including:
 - Incident type and date
 - Key parties involved
@@ -178,14 +169,16 @@ def summarize_claim_gemini(claim_text: str, max_tokens: int = 250) -> str:
 Claim text:
 {claim_text}"""
 
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                max_output_tokens=max_tokens,
-                temperature=0.3
-            )
+        key = llm_cache.make_key(
+            "mcp_summary", claim_text, SUMMARY_PROMPT_VERSION,
+            llm_gateway.model_for("gemini"), max_tokens=max_tokens
         )
-        return response.text
+        return llm_cache.get_or_compute(key, lambda: llm_gateway.complete_sync(
+            messages=[{"role": "user", "content": prompt}],
+            provider="gemini",
+            max_tokens=max_tokens,
+            temperature=0.3
+        ).text)
     except Exception as e:
         return f"Error generating summary with Gemini: {str(e)}"
 
@@ -221,30 +214,28 @@ Claim text:
 
 Return ONLY the JSON object, no other text."""
 
-        if use_gemini and gemini_api_key:
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    max_output_tokens=1024,
-                    temperature=0.1
-                )
-            )
-            result_text = response.text
-        elif openai_client:
-            response = openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a data extraction specialist. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1024,
-                temperature=0.1
-            )
-            result_text = response.choices[0].message.content
+        if use_gemini and llm_gateway.is_configured("gemini"):
+            provider = "gemini"
+            messages = [{"role": "user", "content": prompt}]
+        elif llm_gateway.is_configured("openai"):
+            provider = "openai"
+            messages = [
+                {"role": "system", "content": "You are a data extraction specialist. Return only valid JSON."},
+                {"role": "user", "content": prompt}
+            ]
         else:
             return json.dumps({"error": "No AI provider configured"})
 
+        key = llm_cache.make_key(
+            "mcp_extract", claim_text, EXTRACTION_PROMPT_VERSION, llm_gateway.model_for(provider)
+        )
+        result_text = llm_cache.get_or_compute(key, lambda: llm_gateway.complete_sync(
+            messages=messages,
+            provider=provider,
+            max_tokens=1024,
+            temperature=0.1
+        ).text)
+
         # Extract JSON from response
         json_match = re.search(r'```json\n(.*?)\n```', result_text, re.DOTALL)
         if json_match:
@@ -281,91 +272,17 @@ def estimate_damage(
         JSON string with financial estimate including damage amount, deductible, payout
     """
     try:
-        # Damage estimation models
-        damage_ranges = {
-            "Car Accident": {
-                "minor": (500, 2000),
-                "moderate": (2000, 8000),
-                "severe": (8000, 25000),
-                "total_loss": (25000, 100000)
-            },
-            "Home Damage": {
-                "minor": (1000, 5000),
-                "moderate": (5000, 15000),
-                "severe": (15000, 50000),
-                "catastrophic": (50000, 500000)
-            },
-            "Medical": {
-                "minor": (500, 3000),
-                "moderate": (3000, 10000),
-                "severe": (10000, 50000),
-                "critical": (50000, 500000)
-            },
-            "Property Damage": {
-                "minor": (300, 1500),
-                "moderate": (1500, 5000),
-                "severe": (5000, 20000)
-            }
-        }
-
-        # Insurance coverage percentages
-        coverage_rates = {
-            "Car Accident": 0.80,
-            "Home Damage": 0.90,
-            "Medical": 0.85,
-            "Property Damage": 0.75
-        }
-
-        # Determine severity if not provided
-        if not severity:
-            description_lower = damages_description.lower()
-            if any(word in description_lower for word in ["total", "destroyed", "severe", "major", "extensive"]):
-                severity = "severe"
-            elif any(word in description_lower for word in ["moderate", "significant"]):
-                severity = "moderate"
-            else:
-                severity = "minor"
-
-        # Calculate estimate
-        if existing_estimate:
-            try:
-                estimated_damage = float(existing_estimate.replace('$', '').replace(',', ''))
-            except:
-                estimated_damage = None
-        else:
-            estimated_damage = None
-
-        if not estimated_damage:
-            ranges = damage_ranges.get(incident_type, damage_ranges["Property Damage"])
-            if severity in ranges:
-                min_val, max_val = ranges[severity]
-                estimated_damage = (min_val + max_val) / 2
-            else:
-                estimated_damage = 3000.0
-
-        # Calculate coverage and payout
-        coverage = coverage_rates.get(incident_type, 0.75)
-        deductible = round(estimated_damage * (1 - coverage), 2)
-        payout = round(estimated_damage - deductible, 2)
-
-        # Generate breakdown
-        if incident_type == "Car Accident":
-            breakdown = {
-                "parts": round(estimated_damage * 0.60, 2),
-                "labor": round(estimated_damage * 0.30, 2),
-                "paint_and_materials": round(estimated_damage * 0.10, 2)
-            }
-        elif incident_type == "Home Damage":
-            breakdown = {
-                "materials": round(estimated_damage * 0.50, 2),
-                "labor": round(estimated_damage * 0.40, 2),
-                "permits_and_fees": round(estimated_damage * 0.10, 2)
-            }
-        else:
-            breakdown = {
-                "repair_costs": round(estimated_damage * 0.80, 2),
-                "service_fees": round(estimated_damage * 0.20, 2)
-            }
+        # Same rate tables (and version) as the FinTrack agent
+        priced = rate_tables.current().estimate(
+            incident_type,
+            damages_description,
+            existing_estimate,
+            severity
+        )
+        estimated_damage = priced["estimated_damage"]
+        coverage = priced["insurance_coverage"]
+        deductible = priced["deductible"]
+        payout = priced["payout_after_deductible"]
 
         result = {
             "estimated_damage": estimated_damage,
@@ -373,8 +290,9 @@ def estimate_damage(
             "coverage_percentage": f"{coverage * 100:.0f}%",
             "deductible": deductible,
             "payout_after_deductible": payout,
-            "severity": severity,
-            "breakdown": breakdown,
+            "severity": priced["severity"],
+            "breakdown": priced["breakdown"],
+            "rate_table_version": priced["rate_table_version"],
             "summary": f"Total estimated damage: ${estimated_damage:,.2f}. With {coverage * 100:.0f}% coverage, your deductible is ${deductible:,.2f} and insurance will pay ${payout:,.2f}."
         }
 
@@ -719,27 +637,25 @@ def chat_with_context(message: str, use_gemini: bool = True) -> str:
 
         full_prompt = f"{context_text}\n\nUser message: {message}"
 
-        if use_gemini and gemini_api_key:
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            response = model.generate_content(
-                full_prompt,
-                generation_config=genai.GenerationConfig(
-                    max_output_tokens=1024,
-                    temperature=0.7
-                )
+        if use_gemini and llm_gateway.is_configured("gemini"):
+            response = llm_gateway.complete_sync(
+                messages=[{"role": "user", "content": full_prompt}],
+                provider="gemini",
+                max_tokens=1024,
+                temperature=0.7
             )
             return response.text
-        elif openai_client:
-            response = openai_client.chat.completions.create(
-                model="gpt-4o-mini",
+        elif llm_gateway.is_configured("openai"):
+            response = llm_gateway.complete_sync(
                 messages=[
                     {"role": "system", "content": "You are ClaimPilot AI, a helpful insurance claims assistant."},
                     {"role": "user", "content": full_prompt}
                 ],
+                provider="openai",
                 max_tokens=1024,
                 temperature=0.7
             )
-            return response.choices[0].message.content
+            return response.text
         else:
             return "Error: No AI provider configured"
 
@@ -803,27 +719,25 @@ Return ONLY a JSON object with this structure:
 Make the email professional, concise, and include all relevant claim information."""
 
         # Generate email using selected AI provider
-        if use_gemini and gemini_api_key:
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    max_output_tokens=1024,
-                    temperature=0.3
-                )
+        if use_gemini and llm_gateway.is_configured("gemini"):
+            response = llm_gateway.complete_sync(
+                messages=[{"role": "user", "content": prompt}],
+                provider="gemini",
+                max_tokens=1024,
+                temperature=0.3
             )
             result_text = response.text
-        elif openai_client:
-            response = openai_client.chat.completions.create(
-                model="gpt-4o-mini",
+        elif llm_gateway.is_configured("openai"):
+            response = llm_gateway.complete_sync(
                 messages=[
                     {"role": "system", "content": "You are a professional insurance claims specialist. Generate formal, professional email templates."},
                     {"role": "user", "content": prompt}
                 ],
+                provider="openai",
                 max_tokens=1024,
                 temperature=0.3
             )
-            result_text = response.choices[0].message.content
+            result_text = response.text
         else:
             return json.dumps({"error": "No AI provider configured"})
 
@@ -1,11 +1,14 @@
-import pdfplumber
 from fastmcp import FastMCP  # or: from mcp.server.fastmcp import FastMCP
-from openai import OpenAI
 from dotenv import load_dotenv
-import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.llm_gateway import llm_gateway
+from utils.pdf_extract import extract_text
 
 load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
 
 mcp = FastMCP("insurance")
 mcp_with_instructions = FastMCP(
@@ -27,25 +30,20 @@ Your job is to:
 
 @mcp.tool()
 def parse_pdf(file):
-    text = ''
-    with pdfplumber.open(file) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text()
-    return text
+    return extract_text(file, separator="")
 
 @mcp.tool()
 def summarize_claim(claim_text: str) -> str | None:
     """Generate a short summary of a claim document using OpenAI GPT."""
-    client = OpenAI(api_key=api_key)
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    response = llm_gateway.complete_sync(
         messages=[
             {"role": "system", "content": "You are an insurance claims summarization assistant."},
             {"role": "user", "content": f"Summarize the following claim in a few sentences, extract important information such as what may be owed, if the claim was denied, etc.:\n\n{claim_text}"}
         ],
+        provider="openai",
         max_tokens=200
     )
-    return response.choices[0].message.content
+    return response.text
 
 if __name__ == "__main__":
     # transport="stdio" is easiest for local testing; you can also use http/sse
@@ -3,26 +3,30 @@ ClaimPilot AI - FastAPI Backend
 
 Multi-agent orchestration system for insurance claim processing
 """
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional, List
-import base64
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from sse_starlette.sse import EventSourceResponse
+from starlette.background import BackgroundTask
+from contextlib import AsyncExitStack
+from typing import Dict, Optional, List
 from datetime import datetime
+import json
 import os
 from dotenv import load_dotenv
-import google.generativeai as genai
-from typing import Optional
-import base64
-from datetime import datetime
 
-from orchestrator.coordinator import orchestrator
-from agents.claimpilot_agent import claimpilot_agent
-from agents.fintrack_agent import fintrack_agent
+from orchestrator.coordinator import orchestrator, STREAM_PARSE_ENABLED, JOB_UPLOAD_DIR
+from orchestrator.events import claim_events, SSE_PING_SECONDS
+from agents.claimpilot_agent import claimpilot_agent, BATCH_INGEST_MAX_DOCUMENTS
+from agents.fintrack_agent import fintrack_agent, ESTIMATE_BATCH_MAX_CLAIMS
 from agents.shopfinder_agent import shopfinder_agent
 from agents.claim_drafting_agent import claim_drafting_agent
 from agents.compliance_agent import compliance_agent
 from agents.legal_advisor_agent import legal_advisor_agent
 from agents.medical_advisor_agent import medical_advisor_agent
+from utils.llm_gateway import llm_gateway
+from utils.llm_cache import llm_cache
 from utils.data_models import (
     UserMessage, ChatResponse, Claim, ClaimStatus
 )
@@ -30,16 +34,24 @@ from utils.data_models import (
 # Load environment variables
 load_dotenv()
 
-# Initialize Gemini
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    gemini_model = genai.GenerativeModel('gemini-2.0-flash-exp')
-else:
+# Gemini chat goes through the shared LLM gateway
+if not llm_gateway.is_configured("gemini"):
     print("Warning: GEMINI_API_KEY not set. Chat functionality will be limited.")
 from utils.data_models import (
-    UserMessage, ChatResponse, Claim, ClaimStatus
+    UserMessage, ChatResponse, Claim, ClaimStatus, Job, JobStatus
+)
+from utils.executors import (
+    run_io, run_cpu, iterate_io, executor_metrics, cpu_executor, io_executor, ExecutorSaturatedError
 )
+from utils.pdf_parser import pdf_parser
+from utils.pdf_extract import shutdown_pool as shutdown_pdf_pool
+from utils.uploads import spool_upload, keep_upload, MAX_UPLOAD_BYTES, MAX_BATCH_UPLOAD_BYTES, MAX_IMPORT_UPLOAD_BYTES
+from utils.claim_io import FORMATS, MEDIA_TYPES, EXTENSIONS, format_from_filename
+from utils.storage import CLAIM_DATA_COLUMNS, claim_data_from_record, storage
+from utils.write_behind import write_behind
+from utils.jobs import job_queue
+from utils.rate_tables import rate_tables
+from utils.portfolio import portfolio
 from routes.mcp_routes import router as mcp_router
 
 # Initialize FastAPI app
@@ -50,9 +62,6 @@ app = FastAPI(
 )
 
 # Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -68,6 +77,92 @@ app.add_middleware(
 app.include_router(mcp_router)
 
 
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized uploads from Content-Length before the body is read"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        limit = {
+            "/api/claims/batch-ingest": MAX_BATCH_UPLOAD_BYTES,
+            "/api/claims/import": MAX_IMPORT_UPLOAD_BYTES,
+        }.get(request.url.path, MAX_UPLOAD_BYTES)
+        # Allow some room for multipart boundaries and form fields
+        if int(content_length) > limit + 64 * 1024:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"Request exceeds the {limit / (1024 * 1024):g} MB upload limit"}
+            )
+    return await call_next(request)
+
+
+@app.exception_handler(ExecutorSaturatedError)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturatedError):
+    """Shed load with 503 when a worker pool is saturated"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
+
+@app.on_event("startup")
+async def start_job_queue():
+    """Resume jobs left queued (or interrupted) by a previous run"""
+    await run_io(job_queue.start)
+
+
+@app.on_event("startup")
+async def seed_portfolio():
+    """Load portfolio totals from stored claims once; later writes and estimates update them in place"""
+    await run_io(_seed_portfolio)
+
+
+def _seed_portfolio() -> Dict[str, int]:
+    """
+    Price every stored claim in batches and add it to the portfolio totals
+
+    A stored row that is not a valid claim is skipped and counted; the rest
+    are still seeded.
+
+    Returns:
+        Counts of seeded and skipped claims
+    """
+    seeded = skipped = 0
+    try:
+        for records in storage.iter_claims(columns=CLAIM_DATA_COLUMNS):
+            claims = []
+            for record in records:
+                try:
+                    claims.append(Claim(**claim_data_from_record(record)))
+                except Exception as e:
+                    skipped += 1
+                    print(f"⚠️ Portfolio analytics skipped claim {record.get('claim_id')}: {e}")
+            if not claims:
+                continue
+            try:
+                seeded += fintrack_agent.seed_portfolio(claims)
+            except Exception as e:
+                skipped += len(claims)
+                print(f"⚠️ Portfolio analytics skipped a batch of {len(claims)} claims: {e}")
+    except Exception as e:
+        print(f"⚠️ Portfolio analytics seeded with {seeded} claims only: {e}")
+    else:
+        print(f"✅ Portfolio analytics seeded with {seeded} stored claims ({skipped} skipped)")
+    portfolio.record_skipped(skipped)
+    return {"seeded": seeded, "skipped": skipped}
+
+
+@app.on_event("shutdown")
+async def shutdown_executors():
+    """Finish running jobs, flush queued database writes and release worker pool threads"""
+    await run_io(job_queue.close)
+    await run_io(write_behind.close)
+    cpu_executor.shutdown(wait=False)
+    io_executor.shutdown(wait=False)
+    llm_gateway.close()
+    shutdown_pdf_pool(wait=False)
+
+
 # ==================== Main Endpoints ====================
 
 @app.get("/")
@@ -82,6 +177,8 @@ async def root():
             "chat": "/api/chat",
             "upload": "/api/upload",
             "claims": "/api/claims",
+            "jobs": "/api/jobs",
+            "metrics": "/api/metrics",
             "health": "/health"
         }
     }
@@ -124,7 +221,7 @@ async def chat(request: dict):
         # Get claim data
         claim = None
         if claim_id:
-            claim = claimpilot_agent.get_claim(claim_id)
+            claim = await run_io(claimpilot_agent.get_claim, claim_id)
 
         # Build system prompt
         claim_data = claim.model_dump() if claim else {}
@@ -172,31 +269,28 @@ When the user asks you to:
 - Advice: Give DEFINITIVE expert recommendations in 2-4 sentences"""
 
         # Create chat with Gemini
-        if GEMINI_API_KEY:
+        if llm_gateway.is_configured("gemini"):
             conversation_history = context.get('conversation_history', [])
 
             # Build chat history for Gemini
             history = [
+                {'role': 'user', 'content': system_prompt},
                 {
-                    'role': 'user',
-                    'parts': [{'text': system_prompt}]
-                },
-                {
-                    'role': 'model',
-                    'parts': [{'text': "I understand. I'm ready to assist with this insurance claim. How can I help you today?"}]
+                    'role': 'assistant',
+                    'content': "I understand. I'm ready to assist with this insurance claim. How can I help you today?"
                 }
             ]
 
             # Add conversation history
             for msg in conversation_history:
                 history.append({
-                    'role': 'user' if msg['role'] == 'user' else 'model',
-                    'parts': [{'text': msg['content']}]
+                    'role': 'user' if msg['role'] == 'user' else 'assistant',
+                    'content': msg['content']
                 })
+            history.append({'role': 'user', 'content': message})
 
             # Send message to Gemini
-            chat = gemini_model.start_chat(history=history)
-            response = chat.send_message(message)
+            response = await llm_gateway.complete(history, provider="gemini", max_tokens=8192, temperature=1.0)
             response_text = response.text
 
             # Parse actions from response
@@ -225,6 +319,10 @@ When the user asks you to:
             # Clean response (remove JSON blocks)
             clean_response = re.sub(json_pattern, '', response_text).strip()
 
+            await run_io(
+                orchestrator.record_exchange, message, clean_response, claim_id, context.get('session_id')
+            )
+
             return {
                 'response': clean_response,
                 'actions': actions,
@@ -233,15 +331,20 @@ When the user asks you to:
         else:
             # Fallback to orchestrator if Gemini not configured
             user_message = UserMessage(message=message, claim_id=claim_id)
-            response = orchestrator.process_message(user_message)
+            response = await run_io(orchestrator.process_message, user_message)
             return {
                 'response': response.message if hasattr(response, 'message') else str(response),
                 'actions': [],
                 'timestamp': datetime.now().isoformat()
             }
 
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         print(f"Chat error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(user_message: UserMessage):
     """
@@ -254,8 +357,10 @@ async def chat(user_message: UserMessage):
         ChatResponse with agent results
     """
     try:
-        response = orchestrator.process_message(user_message)
+        response = await run_io(orchestrator.process_message, user_message)
         return response
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -276,21 +381,21 @@ async def upload_document(
         ChatResponse with claim data
     """
     try:
-        # Read file content
-        content = await file.read()
-        encoded_content = base64.b64encode(content).decode('utf-8')
-
-        # Create user message
-        user_message = UserMessage(
-            message=message or "Process this document",
-            file_data=encoded_content,
-            file_name=file.filename
-        )
+        # Spool to disk; the parser reads the file by path
+        async with spool_upload(file) as upload:
+            user_message = UserMessage(
+                message=message or "Process this document",
+                file_name=upload.file_name
+            )
 
-        # Process with orchestrator
-        response = orchestrator.process_message(user_message)
-        return response
+            # Process with orchestrator
+            response = await run_io(orchestrator.process_message, user_message, file_path=upload.path)
+            return response
 
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing upload: {str(e)}")
 
@@ -298,7 +403,8 @@ async def upload_document(
 @app.post("/api/process-claim")
 async def process_claim(
     file: Optional[UploadFile] = File(None),
-    text: Optional[str] = Form(None)
+    text: Optional[str] = Form(None),
+    max_pages: Optional[int] = Form(None)
 ):
     """
     Process a claim from file or text
@@ -306,23 +412,28 @@ async def process_claim(
     Args:
         file: PDF or text file (optional)
         text: Raw text input (optional)
+        max_pages: Only read the first N pages of a PDF (optional fast mode, at least 1)
 
     Returns:
         Processed claim data
     """
+    if max_pages is not None and max_pages < 1:
+        raise HTTPException(status_code=400, detail=f"max_pages must be at least 1, got {max_pages}")
+
     try:
         if file:
-            content = await file.read()
-            encoded_content = base64.b64encode(content).decode('utf-8')
-            result = claimpilot_agent.process_document(
-                file_data=encoded_content,
-                file_name=file.filename
-            )
-        elif text:
-            result = claimpilot_agent.process_document(raw_text=text)
-        else:
+            async with spool_upload(file) as upload:
+                try:
+                    text = await run_cpu(pdf_parser.parse_file, upload.path, upload.file_name, max_pages)
+                except ExecutorSaturatedError:
+                    raise
+                except Exception as e:
+                    raise HTTPException(status_code=400, detail=f"Failed to process document: {str(e)}")
+        elif not text:
             raise HTTPException(status_code=400, detail="Either file or text must be provided")
 
+        result = await run_io(claimpilot_agent.process_document, raw_text=text)
+
         if not result.success:
             raise HTTPException(status_code=400, detail=result.message)
 
@@ -330,10 +441,154 @@ async def process_claim(
 
     except HTTPException:
         raise
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/claims/batch-ingest")
+async def batch_ingest_claims(
+    files: Optional[List[UploadFile]] = File(None),
+    texts: Optional[List[str]] = Form(None),
+    concurrency: Optional[int] = Form(None)
+):
+    """
+    Create claims from many documents at once
+
+    Documents are parsed in parallel, summarized in one batch and saved in
+    one bulk write. Results stream back as newline-delimited JSON, one line
+    per event (see ClaimPilotAgent.process_documents), as each document
+    completes.
+
+    Args:
+        files: PDF or text files (optional)
+        texts: Raw text documents (optional); indexed after the files
+        concurrency: Documents parsed at once (optional)
+
+    Returns:
+        application/x-ndjson stream of document events
+    """
+    count = len(files or []) + len(texts or [])
+    if not count:
+        raise HTTPException(status_code=400, detail="Either files or texts must be provided")
+    if count > BATCH_INGEST_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has {count} documents; the limit is {BATCH_INGEST_MAX_DOCUMENTS}"
+        )
+    if concurrency is not None and concurrency < 1:
+        raise HTTPException(status_code=400, detail="concurrency must be at least 1")
+
+    # Spool every upload before streaming; the files live until the stream ends
+    uploads = AsyncExitStack()
+    try:
+        documents = []
+        for file in files or []:
+            upload = await uploads.enter_async_context(spool_upload(file))
+            documents.append({"file_path": upload.path, "file_name": upload.file_name})
+        documents.extend({"raw_text": text} for text in texts or [])
+    except BaseException:
+        await uploads.aclose()
+        raise
+
+    async def stream_events():
+        try:
+            async for event in iterate_io(claimpilot_agent.process_documents(documents, concurrency)):
+                yield json.dumps(event) + "\n"
+        except ExecutorSaturatedError as e:
+            yield json.dumps({"stage": "failed", "error": str(e)}) + "\n"
+        finally:
+            await uploads.aclose()
+
+    return StreamingResponse(
+        stream_events(),
+        media_type="application/x-ndjson",
+        # Covers clients that disconnect before the stream starts
+        background=BackgroundTask(uploads.aclose)
+    )
+
+
+@app.get("/api/claims/export")
+async def export_claims(
+    format: str = "jsonl",
+    status: Optional[str] = None,
+    incident_type: Optional[str] = None
+):
+    """
+    Download every claim as one JSONL, Parquet or Arrow file
+
+    The file is streamed batch by batch as claims are read, so memory use
+    stays flat however many claims are exported.
+
+    Args:
+        format: jsonl, parquet or arrow
+        status: Only claims with this status (optional)
+        incident_type: Only claims of this incident type (optional)
+
+    Returns:
+        Streamed file attachment, newest claims first
+    """
+    try:
+        claim_status = ClaimStatus(status) if status else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+
+    try:
+        chunks = claimpilot_agent.export_claims(format, claim_status, incident_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    return StreamingResponse(
+        iterate_io(chunks),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="claims{EXTENSIONS[format]}"'}
+    )
+
+
+@app.post("/api/claims/import")
+async def import_claims(
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None)
+):
+    """
+    Load claims from a JSONL, Parquet or Arrow file
+
+    Records are validated and upserted in chunks; claims with an existing
+    claim_id are replaced. Invalid records are skipped and reported.
+
+    Args:
+        file: Claims file, in the format produced by /api/claims/export
+        format: jsonl, parquet or arrow (optional; guessed from the file name)
+
+    Returns:
+        Imported and failed counts, with the first invalid records
+    """
+    fmt = format or format_from_filename(file.filename)
+    if fmt not in FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown import format for {file.filename}; pass format as one of {', '.join(FORMATS)}"
+        )
+
+    def load(path: str):
+        with open(path, "rb") as source:
+            return claimpilot_agent.import_claims(source, fmt)
+
+    try:
+        async with spool_upload(file, MAX_IMPORT_UPLOAD_BYTES) as upload:
+            result = await run_io(load, upload.path)
+        return {"success": True, "file_name": upload.file_name, **result}
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except (HTTPException, ExecutorSaturatedError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing claims: {str(e)}")
+
+
 # ==================== Claim Management Endpoints ====================
 
 @app.post("/api/claims")
@@ -377,10 +632,11 @@ async def create_claim(request: dict):
 
         # Store in database
         claimpilot_agent.claims_database[claim_id] = claim
+        claimpilot_agent.claim_cache.invalidate(claim_id)
+        portfolio.observe_claim(claim)
 
-        # Save to Supabase if enabled
-        from utils.supabase_client import save_claim_to_db
-        save_claim_to_db(request)
+        # Save to claim storage
+        await run_io(storage.save_claim, claim.model_dump())
 
         return {
             'success': True,
@@ -388,31 +644,70 @@ async def create_claim(request: dict):
             'claim': claim.model_dump()
         }
 
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         print(f"Error creating claim: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/claims")
-async def list_claims(status: Optional[str] = None):
+async def list_claims(
+    status: Optional[str] = None,
+    incident_type: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
     """
-    List all claims, optionally filtered by status
+    List claims newest first, optionally filtered, paginated and projected
 
     Args:
         status: Filter by status (Open, Processing, Closed)
+        incident_type: Filter by incident type
+        limit: Page size (optional; all claims when omitted)
+        cursor: next_cursor from the previous page
+        fields: Comma-separated claim fields to return, e.g.
+            "claim_id,status,summary" (optional; claim_id is always included)
 
     Returns:
-        List of claims
+        Page of claims and the cursor of the next page
     """
     try:
         claim_status = ClaimStatus(status) if status else None
-        claims = claimpilot_agent.list_claims(status=claim_status)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+
+    projection = None
+    if fields:
+        projection = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in projection if field not in Claim.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        projection = ["claim_id"] + [field for field in projection if field != "claim_id"]
+
+    try:
+        claims, next_cursor = await run_io(
+            claimpilot_agent.list_claims_page,
+            status=claim_status,
+            incident_type=incident_type,
+            limit=limit,
+            cursor=cursor,
+            fields=projection
+        )
+        # Only the requested fields are serialized (raw_text can be megabytes)
+        include = set(projection) if projection else None
         return {
             "count": len(claims),
-            "claims": [claim.model_dump() for claim in claims]
+            "claims": [claim.model_dump(include=include) for claim in claims],
+            "next_cursor": next_cursor
         }
-    except ValueError:
-        raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -428,7 +723,7 @@ async def get_claim(claim_id: str):
     Returns:
         Claim data
     """
-    claim = claimpilot_agent.get_claim(claim_id)
+    claim = await run_io(claimpilot_agent.get_claim, claim_id)
     if not claim:
         raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
 
@@ -449,14 +744,19 @@ async def update_claim_status(claim_id: str, status: str):
     """
     try:
         claim_status = ClaimStatus(status)
-        result = claimpilot_agent.update_claim_status(claim_id, claim_status)
+        result = await run_io(claimpilot_agent.update_claim_status, claim_id, claim_status)
 
         if not result.success:
             raise HTTPException(status_code=404, detail=result.message)
 
+        if claim_status == ClaimStatus.CLOSED:
+            orchestrator.agent_status.evict(claim_id, closed=True)
+
         return result.data
     except ValueError:
         raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -474,12 +774,12 @@ async def extract_claim_data(claim_id: str):
     """
     try:
         # Get claim
-        claim = claimpilot_agent.get_claim(claim_id)
+        claim = await run_io(claimpilot_agent.get_claim, claim_id)
         if not claim:
             raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
 
         # Analyze claim using ClaimPilot agent
-        result = claimpilot_agent.analyze_claim(claim_id)
+        result = await run_io(claimpilot_agent.analyze_claim, claim_id)
 
         if not result.success:
             raise HTTPException(status_code=400, detail=result.message)
@@ -491,30 +791,27 @@ async def extract_claim_data(claim_id: str):
 
     except HTTPException:
         raise
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error extracting claim data: {str(e)}")
 
 
 @app.get("/api/claims/{claim_id}/messages")
-async def get_claim_messages(claim_id: str):
+async def get_claim_messages(claim_id: str, session_id: Optional[str] = None, limit: Optional[int] = None):
     """
     Get chat messages for a specific claim
 
     Args:
         claim_id: Claim identifier
+        session_id: Only messages from this chat session (optional)
+        limit: Only the last `limit` messages (optional)
 
     Returns:
-        List of chat messages for this claim
+        List of chat messages for this claim, oldest first
     """
     try:
-        # Get conversation history from orchestrator
-        history = orchestrator.get_conversation_history()
-
-        # Filter messages for this claim
-        claim_messages = [
-            msg for msg in history
-            if msg.get('claim_id') == claim_id
-        ]
+        claim_messages = await run_io(orchestrator.get_conversation_history, claim_id, session_id, limit)
 
         return {
             "claim_id": claim_id,
@@ -537,7 +834,7 @@ async def analyze_claim(claim_id: str):
     Returns:
         Claim analysis
     """
-    result = claimpilot_agent.analyze_claim(claim_id)
+    result = await run_io(claimpilot_agent.analyze_claim, claim_id)
 
     if not result.success:
         raise HTTPException(status_code=404, detail=result.message)
@@ -547,11 +844,54 @@ async def analyze_claim(claim_id: str):
 
 # ==================== Financial Estimation Endpoints ====================
 
+@app.post("/api/estimate/batch")
+async def estimate_batch(
+    claim_ids: list[str],
+    severity: Optional[str] = None,
+    coverage_override: Optional[float] = None
+):
+    """
+    Re-price many claims in one vectorized pass
+
+    Args:
+        claim_ids: Claim identifiers (request body)
+        severity: Severity level override for every claim
+        coverage_override: Custom coverage percentage for every claim
+
+    Returns:
+        Estimates in request order, batch totals and the IDs not found
+    """
+    if len(claim_ids) > ESTIMATE_BATCH_MAX_CLAIMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(claim_ids)} claims; the limit is {ESTIMATE_BATCH_MAX_CLAIMS}"
+        )
+
+    claims = await run_io(lambda: [claimpilot_agent.get_claim(claim_id) for claim_id in claim_ids])
+    found = [claim for claim in claims if claim is not None]
+    missing = [claim_id for claim_id, claim in zip(claim_ids, claims) if claim is None]
+
+    def price():
+        batch = fintrack_agent.estimate_batch(found, severity, coverage_override)
+        return {
+            "estimates": [estimate.model_dump() for estimate in batch],
+            "totals": batch.totals(),
+            "missing": missing
+        }
+
+    try:
+        return await run_cpu(price)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.post("/api/estimate/{claim_id}")
 async def estimate_damage(
     claim_id: str,
     severity: Optional[str] = None,
-    coverage_override: Optional[float] = None
+    coverage_override: Optional[float] = None,
+    distribution: bool = False,
+    deductible: Optional[float] = None
 ):
     """
     Estimate damage and calculate payout for a claim
@@ -560,18 +900,24 @@ async def estimate_damage(
         claim_id: Claim identifier
         severity: Severity level override
         coverage_override: Custom coverage percentage
+        distribution: Add the Monte Carlo payout distribution (p10/p50/p90)
+        deductible: Policy deductible amount (the distribution gives the chance the damage exceeds it;
+            default FINTRACK_POLICY_DEDUCTIBLE)
 
     Returns:
         Financial estimate
     """
-    claim = claimpilot_agent.get_claim(claim_id)
+    claim = await run_io(claimpilot_agent.get_claim, claim_id)
     if not claim:
         raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
 
-    result = fintrack_agent.estimate_damage(
+    result = await run_io(
+        fintrack_agent.estimate_damage,
         claim,
         severity=severity,
-        coverage_override=coverage_override
+        coverage_override=coverage_override,
+        distribution=distribution,
+        deductible=deductible
     )
 
     if not result.success:
@@ -590,13 +936,13 @@ async def compare_estimates(claim_id: str, severities: list[str]):
         severities: List of severity levels to compare
 
     Returns:
-        Comparison data
+        Comparison data with the payout distribution of each severity
     """
-    claim = claimpilot_agent.get_claim(claim_id)
+    claim = await run_io(claimpilot_agent.get_claim, claim_id)
     if not claim:
         raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
 
-    result = fintrack_agent.compare_estimates(claim, severities)
+    result = await run_io(fintrack_agent.compare_estimates, claim, severities)
 
     if not result.success:
         raise HTTPException(status_code=400, detail=result.message)
@@ -604,6 +950,32 @@ async def compare_estimates(claim_id: str, severities: list[str]):
     return result.data
 
 
+@app.get("/api/rate-tables")
+async def get_rate_tables():
+    """
+    Get the rate tables estimates are priced with
+
+    Returns:
+        Version, source file and rates by incident type
+    """
+    return rate_tables.current().describe()
+
+
+@app.post("/api/rate-tables/reload")
+async def reload_rate_tables():
+    """
+    Reload the rate table file now (it is also picked up automatically when it changes)
+
+    Returns:
+        Version and rates of the new table
+    """
+    try:
+        table = await run_io(rate_tables.reload)
+    except (OSError, ValueError, RuntimeError) as e:
+        raise HTTPException(status_code=400, detail=f"Rate tables not reloaded: {e}")
+    return table.describe()
+
+
 # ==================== Shop Finder Endpoints ====================
 
 @app.get("/api/shops/{claim_id}")
@@ -623,11 +995,12 @@ async def find_shops(
     Returns:
         Shop recommendations
     """
-    claim = claimpilot_agent.get_claim(claim_id)
+    claim = await run_io(claimpilot_agent.get_claim, claim_id)
     if not claim:
         raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
 
-    result = shopfinder_agent.find_shops(
+    result = await run_io(
+        shopfinder_agent.find_shops,
         claim,
         max_results=max_results,
         price_preference=price_preference
@@ -656,11 +1029,11 @@ async def find_shops_by_specialty(
     Returns:
         Filtered shop recommendations
     """
-    claim = claimpilot_agent.get_claim(claim_id)
+    claim = await run_io(claimpilot_agent.get_claim, claim_id)
     if not claim:
         raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
 
-    result = shopfinder_agent.filter_by_specialty(claim, specialty, max_results)
+    result = await run_io(shopfinder_agent.filter_by_specialty, claim, specialty, max_results)
 
     if not result.success:
         raise HTTPException(status_code=400, detail=result.message)
@@ -671,28 +1044,46 @@ async def find_shops_by_specialty(
 # ==================== Conversation Endpoints ====================
 
 @app.get("/api/conversation/history")
-async def get_conversation_history():
+async def get_conversation_history(session_id: Optional[str] = None, limit: Optional[int] = None):
     """
     Get conversation history
 
+    Args:
+        session_id: Only this chat session's messages (optional; defaults
+            to the latest messages across all conversations)
+        limit: Only the last `limit` messages (optional)
+
     Returns:
         List of conversation messages
     """
     return {
-        "history": orchestrator.get_conversation_history()
+        "history": await run_io(orchestrator.get_conversation_history, None, session_id, limit)
     }
 
 
 @app.post("/api/conversation/clear")
-async def clear_conversation():
+async def clear_conversation(claim_id: Optional[str] = None, session_id: Optional[str] = None):
     """
     Clear conversation history
 
+    A claim's conversation is also deleted from claim storage, so it stays
+    cleared. Without claim_id only the conversations held in memory are
+    reset; stored claim messages come back on the next read.
+
+    Args:
+        claim_id: Only clear this claim's conversation (optional)
+        session_id: Only clear this session's conversation, or this
+            session's part of the claim's conversation (optional)
+
     Returns:
-        Success message
+        Success message and the number of stored messages deleted
     """
-    orchestrator.clear_conversation()
-    return {"message": "Conversation history cleared"}
+    deleted = await run_io(orchestrator.clear_conversation, claim_id, session_id)
+    if claim_id:
+        message = f"Conversation history for claim {claim_id} cleared"
+    else:
+        message = "In-memory conversation history cleared"
+    return {"message": message, "deleted_messages": deleted}
 
 
 # ==================== Agent Status & Workflow Endpoints ====================
@@ -715,12 +1106,45 @@ async def get_agent_status(claim_id: str):
     }
 
 
+@app.get("/api/claims/{claim_id}/events")
+async def stream_claim_events(claim_id: str, request: Request):
+    """
+    Stream a claim's workflow progress as Server-Sent Events
+
+    The first event ("snapshot") carries the current agent statuses and is
+    sent as soon as the client connects. It is followed by the latest
+    workflow's events so far, then live events as agents start and finish
+    (see orchestrator/events.py). Completed agents include their result.
+    Reconnecting clients resume after the Last-Event-ID header.
+
+    Args:
+        claim_id: Claim identifier
+
+    Returns:
+        text/event-stream response
+    """
+    last_event_id = request.headers.get("last-event-id")
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    async def events():
+        yield {
+            "event": "snapshot",
+            "data": json.dumps({"claim_id": claim_id, "agent_status": orchestrator.get_agent_status(claim_id)})
+        }
+        async for event in claim_events.subscribe(claim_id, after):
+            yield {
+                "id": str(event["id"]),
+                "event": event["event"],
+                "data": json.dumps(jsonable_encoder({**event["data"], "timestamp": event["timestamp"]}))
+            }
+
+    return EventSourceResponse(events(), ping=SSE_PING_SECONDS)
+
+
 @app.post("/api/process-full-claim")
 async def process_full_claim(
     files: Optional[List[UploadFile]] = File(None),
     claim_data: Optional[str] = Form(None)
-    file: UploadFile = File(...),
-    message: Optional[str] = Form(None)
 ):
     """
     Process a full claim workflow with all agents
@@ -728,8 +1152,6 @@ async def process_full_claim(
     Args:
         files: List of uploaded documents (optional)
         claim_data: JSON string of claim data (optional)
-        file: Uploaded document
-        message: Optional message
 
     Returns:
         Complete claim processing results
@@ -767,10 +1189,11 @@ async def process_full_claim(
 
             # Store in database
             claimpilot_agent.claims_database[claim_id] = claim
+            claimpilot_agent.claim_cache.invalidate(claim_id)
+            portfolio.observe_claim(claim)
 
-            # Save to Supabase if enabled
-            from utils.supabase_client import save_claim_to_db
-            save_claim_to_db(data)
+            # Save to claim storage
+            await run_io(storage.save_claim, claim.model_dump())
 
             # TODO: Process uploaded files if any
             # For now, just return the created claim
@@ -783,39 +1206,24 @@ async def process_full_claim(
         elif files and len(files) > 0:
             # Process first file with orchestrator
             file = files[0]
-            content = await file.read()
-            encoded_content = base64.b64encode(content).decode('utf-8')
-
-            # Create user message
-            user_message = UserMessage(
-                message="Process full claim workflow",
-                file_data=encoded_content,
-                file_name=file.filename
-            )
 
             # Process with full workflow
-            response = orchestrator.process_full_claim(user_message)
-            return response
+            async with spool_upload(file) as upload:
+                run = await orchestrator.execute_claim_pipeline({
+                    "file_path": upload.path,
+                    "file_name": upload.file_name,
+                    "stream_parse": STREAM_PARSE_ENABLED
+                })
+            return orchestrator.build_workflow_response(run)
         else:
             raise HTTPException(status_code=400, detail="Either files or claim_data must be provided")
 
     except json.JSONDecodeError as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON in claim_data: {str(e)}")
-        # Read file content
-        content = await file.read()
-        encoded_content = base64.b64encode(content).decode('utf-8')
-
-        # Create user message
-        user_message = UserMessage(
-            message=message or "Process full claim workflow",
-            file_data=encoded_content,
-            file_name=file.filename
-        )
-
-        # Process with full workflow
-        response = orchestrator.process_full_claim(user_message)
-        return response
-
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing claim: {str(e)}")
 
@@ -831,11 +1239,11 @@ async def generate_claim_draft(claim_id: str):
     Returns:
         Claim draft HTML
     """
-    claim = claimpilot_agent.get_claim(claim_id)
+    claim = await run_io(claimpilot_agent.get_claim, claim_id)
     if not claim:
         raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
 
-    result = claim_drafting_agent.generate_draft(claim)
+    result = await run_io(claim_drafting_agent.generate_draft, claim)
 
     if not result.success:
         raise HTTPException(status_code=400, detail=result.message)
@@ -856,11 +1264,11 @@ async def run_compliance_check(claim_id: str):
     Returns:
         Compliance check results
     """
-    claim = claimpilot_agent.get_claim(claim_id)
+    claim = await run_io(claimpilot_agent.get_claim, claim_id)
     if not claim:
         raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
 
-    result = compliance_agent.validate_claim(claim)
+    result = await run_io(compliance_agent.validate_claim, claim)
 
     if not result.success:
         raise HTTPException(status_code=400, detail=result.message)
@@ -875,107 +1283,49 @@ async def run_compliance_check(claim_id: str):
 @app.post("/api/claims/{claim_id}/run-all-agents")
 async def run_all_agents(claim_id: str):
     """
-    🎯 DEMO ENDPOINT: Run all 5 agents on a claim sequentially
+    🎯 DEMO ENDPOINT: Run all agents on a claim following their dependency graph
 
     This is the "WOW" endpoint for HackPrinceton demo:
     1. FinTrack: Estimates damage & payout
-    2. ShopFinder: Finds repair shops
-    3. Claim Drafting: Generates formal document
-    4. Compliance: Validates for submission
+    2. ShopFinder: Finds repair shops (runs alongside FinTrack)
+    3. Claim Drafting: Generates formal document (after FinTrack)
+    4. Compliance: Validates for submission (after Claim Drafting)
 
     Args:
         claim_id: Claim identifier
 
     Returns:
-        Complete agent outputs + timeline
+        Complete agent outputs + timeline with the critical path
     """
     try:
         # Get claim
-        claim = claimpilot_agent.get_claim(claim_id)
+        claim = await run_io(claimpilot_agent.get_claim, claim_id)
         if not claim:
             raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
 
-        # Initialize results
+        # Run independent agents concurrently, streaming progress to
+        # /api/claims/{claim_id}/events
+        run = await orchestrator.execute_claim_pipeline({"claim": claim}, claim_id)
+        orchestrator.record_pipeline_status(claim_id, run)
+
+        outputs = run.serialize()
         results = {
             "claim_id": claim_id,
-            "agents_run": 0,
-            "total_agents": 4,
-            "timeline": [],
-            "outputs": {}
+            "agents_run": len(outputs),
+            "total_agents": len(run.results),
+            "timeline": run.timeline(),
+            "critical_path": [run.results[name].stage.label for name in run.critical_path],
+            "outputs": outputs
         }
 
-        import time
-        start_time = time.time()
-
-        # 1. FinTrack Agent - Damage Estimation
-        print(f"🔷 Running FinTrack Agent for {claim_id}...")
-        fintrack_result = fintrack_agent.estimate_damage(claim)
-        if fintrack_result.success:
-            results["outputs"]["fintrack"] = fintrack_result.data
-            results["agents_run"] += 1
-            results["timeline"].append({
-                "agent": "FinTrack",
-                "status": "completed",
-                "time": f"{time.time() - start_time:.2f}s"
-            })
-
-        # 2. ShopFinder Agent - Shop Recommendations
-        print(f"🔷 Running ShopFinder Agent for {claim_id}...")
-        shop_result = shopfinder_agent.find_shops(claim, max_results=3)
-        if shop_result.success:
-            results["outputs"]["shopfinder"] = shop_result.data
-            results["agents_run"] += 1
-            results["timeline"].append({
-                "agent": "ShopFinder",
-                "status": "completed",
-                "time": f"{time.time() - start_time:.2f}s"
-            })
-
-        # 3. Claim Drafting Agent - Generate Document
-        print(f"🔷 Running Claim Drafting Agent for {claim_id}...")
-        draft_result = claim_drafting_agent.generate_draft(
-            claim,
-            financial_data=fintrack_result.data if fintrack_result.success else None
-        )
-        if draft_result.success:
-            results["outputs"]["claim_drafting"] = draft_result.data
-            results["agents_run"] += 1
-            results["timeline"].append({
-                "agent": "Claim Drafting",
-                "status": "completed",
-                "time": f"{time.time() - start_time:.2f}s"
-            })
-
-        # 4. Compliance Agent - Final Validation
-        print(f"🔷 Running Compliance Agent for {claim_id}...")
-        compliance_result = compliance_agent.validate_claim(
-            claim,
-            draft_html=draft_result.data.get("html_draft") if draft_result.success else None
-        )
-        if compliance_result.success:
-            results["outputs"]["compliance"] = compliance_result.data
-            results["agents_run"] += 1
-            results["timeline"].append({
-                "agent": "Compliance",
-                "status": "completed",
-                "time": f"{time.time() - start_time:.2f}s"
-            })
-
-        # Calculate total processing time
-        total_time = time.time() - start_time
+        total_time = run.total_time
         results["total_processing_time"] = f"{total_time:.2f}s"
         results["success"] = results["agents_run"] == results["total_agents"]
 
-        # Update orchestrator status
-        orchestrator.update_agent_status(claim_id, "FinTrack", "Complete")
-        orchestrator.update_agent_status(claim_id, "ShopFinder", "Complete")
-        orchestrator.update_agent_status(claim_id, "ClaimDrafting", "Complete")
-        orchestrator.update_agent_status(claim_id, "ComplianceCheck", "Complete")
-
         # Generate summary
         if results["success"]:
             results["summary"] = (
-                f"✅ Successfully processed claim {claim_id} through all 4 agents in {total_time:.2f}s. "
+                f"✅ Successfully processed claim {claim_id} through all {results['total_agents']} agents in {total_time:.2f}s. "
                 f"Estimated payout: ${results['outputs']['fintrack']['estimate']['payout_after_deductible']:,.2f}. "
                 f"Found {len(results['outputs']['shopfinder']['recommendations']['recommended_shops'])} repair shops. "
                 f"Claim draft generated and compliance {'✅ PASSED' if results['outputs']['compliance']['submission_ready'] else '⚠️  NEEDS REVIEW'}."
@@ -985,6 +1335,8 @@ async def run_all_agents(claim_id: str):
 
     except HTTPException:
         raise
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         print(f"Error running all agents: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error running agents: {str(e)}")
@@ -1034,6 +1386,8 @@ async def create_demo_claim():
 
         # Store in database
         claimpilot_agent.claims_database[claim_id] = sample_claim
+        claimpilot_agent.claim_cache.invalidate(claim_id)
+        portfolio.observe_claim(sample_claim)
 
         return {
             "success": True,
@@ -1046,6 +1400,146 @@ async def create_demo_claim():
         raise HTTPException(status_code=500, detail=f"Error creating demo claim: {str(e)}")
 
 
+# ==================== Background Job Endpoints ====================
+
+def _job_summary(job: Job) -> dict:
+    """Job status as returned by the job endpoints (payload and result left out)"""
+    summary = job.model_dump(mode="json", exclude={"payload", "result", "worker"})
+    summary["links"] = {
+        "status": f"/api/jobs/{job.job_id}",
+        "result": f"/api/jobs/{job.job_id}/result"
+    }
+    if job.claim_id:
+        summary["links"]["events"] = f"/api/claims/{job.claim_id}/events"
+    return summary
+
+
+@app.post("/api/jobs/full-claim", status_code=202)
+async def submit_full_claim_job(
+    request: Request,
+    file: Optional[UploadFile] = File(None),
+    claim_id: Optional[str] = Form(None),
+    priority: int = Form(0),
+    tenant: Optional[str] = Form(None)
+):
+    """
+    Queue the full claim workflow and return a job ID at once
+
+    The workflow runs on a background worker, so it is not tied to the
+    request (or a proxy timeout). Poll /api/jobs/{job_id}, follow
+    /api/claims/{claim_id}/events once the job has a claim_id, and fetch
+    /api/jobs/{job_id}/result when it completes.
+
+    Args:
+        file: Document to create the claim from
+        claim_id: Existing claim to run the agents on (instead of a file)
+        priority: Higher runs first (default 0)
+        tenant: Tenant for per-tenant concurrency (default: X-Tenant-ID header)
+
+    Returns:
+        Queued job
+    """
+    tenant = tenant or request.headers.get("x-tenant-id") or "default"
+    if file is not None:
+        upload = await keep_upload(file, JOB_UPLOAD_DIR)
+        payload = {"file_path": upload.path, "file_name": upload.file_name}
+    elif claim_id:
+        claim = await run_io(claimpilot_agent.get_claim, claim_id)
+        if not claim:
+            raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
+        payload = {"claim_id": claim_id}
+    else:
+        raise HTTPException(status_code=400, detail="Either file or claim_id must be provided")
+
+    try:
+        job = await run_io(job_queue.submit, "full_claim", payload, tenant, priority)
+    except BaseException:
+        if file is not None:
+            os.unlink(payload["file_path"])
+        raise
+    return _job_summary(job)
+
+
+@app.get("/api/jobs")
+async def list_jobs(tenant: Optional[str] = None, status: Optional[str] = None, limit: int = 50):
+    """
+    List background jobs, newest first
+
+    Args:
+        tenant: Only this tenant's jobs (optional)
+        status: Only jobs in this status (optional)
+        limit: Maximum number of jobs
+
+    Returns:
+        List of jobs
+    """
+    try:
+        job_status = JobStatus(status) if status else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+
+    jobs = await run_io(job_queue.list_jobs, tenant, job_status, min(max(limit, 1), 500))
+    return {"jobs": [_job_summary(job) for job in jobs], "count": len(jobs)}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get the status of a background job
+
+    Args:
+        job_id: Job identifier
+
+    Returns:
+        Job status
+    """
+    job = await run_io(job_queue.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_summary(job)
+
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Get the result of a completed job
+
+    Args:
+        job_id: Job identifier
+
+    Returns:
+        Job result; 202 with the status while the job is queued or running,
+        409 if it failed or was cancelled
+    """
+    job = await run_io(job_queue.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job.status == JobStatus.COMPLETED:
+        return {"job_id": job_id, "status": job.status, "result": job.result}
+    if job.status in (JobStatus.FAILED, JobStatus.CANCELLED):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} {job.status.value}: {job.error or 'no result'}")
+    return JSONResponse(status_code=202, content=_job_summary(job), headers={"Retry-After": "2"})
+
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancel a background job
+
+    Queued jobs are dropped; running jobs stop before their next agent.
+
+    Args:
+        job_id: Job identifier
+
+    Returns:
+        Job status after the request
+    """
+    job = await run_io(job_queue.cancel, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_summary(job)
+
+
 # ==================== Legal & Medical Advisor Endpoints ====================
 
 @app.post("/api/claims/{claim_id}/legal-guidance")
@@ -1062,12 +1556,12 @@ async def get_legal_guidance(claim_id: str, user_state: str = "NJ"):
     """
     try:
         # Get claim
-        claim = claimpilot_agent.get_claim(claim_id)
+        claim = await run_io(claimpilot_agent.get_claim, claim_id)
         if not claim:
             raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
 
         # Get legal guidance
-        result = legal_advisor_agent.get_legal_guidance(claim, user_state)
+        result = await run_io(legal_advisor_agent.get_legal_guidance, claim, user_state)
 
         if not result.success:
             raise HTTPException(status_code=400, detail=result.message)
@@ -1079,6 +1573,8 @@ async def get_legal_guidance(claim_id: str, user_state: str = "NJ"):
 
     except HTTPException:
         raise
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting legal guidance: {str(e)}")
 
@@ -1096,9 +1592,11 @@ async def verify_lawyer(lawyer_name: str, state: str = "NJ"):
         Verification results
     """
     try:
-        result = legal_advisor_agent.verify_lawyer(lawyer_name, state)
+        result = await run_io(legal_advisor_agent.verify_lawyer, lawyer_name, state)
         return result.data
 
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error verifying lawyer: {str(e)}")
 
@@ -1120,12 +1618,12 @@ async def get_medical_assessment(
     """
     try:
         # Get claim
-        claim = claimpilot_agent.get_claim(claim_id)
+        claim = await run_io(claimpilot_agent.get_claim, claim_id)
         if not claim:
             raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
 
         # Get medical assessment
-        result = medical_advisor_agent.assess_injuries(claim, symptoms)
+        result = await run_io(medical_advisor_agent.assess_injuries, claim, symptoms)
 
         if not result.success:
             raise HTTPException(status_code=400, detail=result.message)
@@ -1137,6 +1635,8 @@ async def get_medical_assessment(
 
     except HTTPException:
         raise
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting medical assessment: {str(e)}")
 
@@ -1157,13 +1657,15 @@ async def find_medical_facilities(
         List of medical facilities
     """
     try:
-        result = medical_advisor_agent.find_facilities(facility_type, max_results)
+        result = await run_io(medical_advisor_agent.find_facilities, facility_type, max_results)
 
         if not result.success:
             raise HTTPException(status_code=400, detail=result.message)
 
         return result.data
 
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error finding facilities: {str(e)}")
 
@@ -1178,17 +1680,64 @@ async def get_stats():
     Returns:
         System stats
     """
-    claims = claimpilot_agent.list_claims()
+    stats = await run_io(claimpilot_agent.claim_stats)
+    by_status = stats["by_status"]
 
     return {
-        "total_claims": len(claims),
+        "total_claims": stats["total"],
         "claims_by_status": {
-            "open": len([c for c in claims if c.status == ClaimStatus.OPEN]),
-            "processing": len([c for c in claims if c.status == ClaimStatus.PROCESSING]),
-            "closed": len([c for c in claims if c.status == ClaimStatus.CLOSED]),
+            "open": by_status[ClaimStatus.OPEN],
+            "processing": by_status[ClaimStatus.PROCESSING],
+            "closed": by_status[ClaimStatus.CLOSED],
         },
-        "claims_by_type": {},
-        "conversation_length": len(orchestrator.get_conversation_history())
+        "claims_by_type": stats["by_type"],
+        "conversation_length": orchestrator.conversations.metrics()["messages"]
+    }
+
+
+@app.get("/api/stats/portfolio")
+async def get_portfolio_stats(bucket: Optional[str] = None):
+    """
+    Get portfolio analytics
+
+    Claim counts and totals of estimated damage, payout and deductible by
+    incident type, status and severity, kept up to date on every claim
+    write and estimate (no claim scan per request).
+
+    Args:
+        bucket: Also roll the totals up by "day" or "month" of claim creation (optional)
+
+    Returns:
+        Portfolio totals
+    """
+    try:
+        return portfolio.snapshot(bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """
+    Get runtime metrics
+
+    Returns:
+        Worker pool usage and saturation
+    """
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "executors": executor_metrics(),
+        "llm": llm_gateway.metrics(),
+        "llm_cache": llm_cache.metrics(),
+        "claim_cache": claimpilot_agent.claim_cache.metrics(),
+        "estimate_cache": fintrack_agent.estimate_cache.metrics(),
+        "write_behind": write_behind.metrics(),
+        "conversations": orchestrator.conversations.metrics(),
+        "agent_status": orchestrator.agent_status.metrics(),
+        "claim_events": claim_events.metrics(),
+        "jobs": job_queue.metrics(),
+        "rate_tables": rate_tables.metrics(),
+        "portfolio": portfolio.metrics()
     }
 
 
@@ -1,4 +1,5 @@
 """Orchestrator package for ClaimPilot AI"""
-from .coordinator import orchestrator, ClaimPilotOrchestrator
+from .coordinator import orchestrator, ClaimPilotOrchestrator, claim_pipeline
+from .pipeline import Pipeline, PipelineRun, Stage
 
-__all__ = ['orchestrator', 'ClaimPilotOrchestrator']
+__all__ = ['orchestrator', 'ClaimPilotOrchestrator', 'claim_pipeline', 'Pipeline', 'PipelineRun', 'Stage']
@@ -0,0 +1,247 @@
+"""
+Compact per-claim agent status table
+
+The orchestrator used to keep {claim_id: {agent_name: status}} dicts,
+created on first read and never dropped. Here every tracked claim is one
+64-bit word in an array: agents get a fixed slot (4 bits each, up to 16
+agents) and statuses are small codes, so a claim costs two array elements
+(statuses and last update) plus its index entry. Claims are dropped when
+they are closed; once more than AGENT_STATUS_MAX_CLAIMS are tracked, the
+least recently updated eighth is dropped in one pass.
+
+Reads never insert: an untracked claim reads as every default agent
+Pending.
+
+subscribe() registers a callback that is called with every status
+transition (only actual changes), for one claim or for all claims, so
+clients can be pushed updates instead of polling.
+"""
+import heapq
+import os
+import threading
+from array import array
+from datetime import datetime
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional
+
+MAX_CLAIMS = int(os.getenv("AGENT_STATUS_MAX_CLAIMS", "100000"))
+
+# Agents reported for every claim, Pending until they run
+DEFAULT_AGENTS = ("ClaimPilot", "FinTrack", "ClaimDrafting", "ComplianceCheck")
+
+SLOT_BITS = 4
+MAX_AGENTS = 64 // SLOT_BITS
+
+
+class AgentState(IntEnum):
+    """Agent status codes (0 means the agent has no status)"""
+    PENDING = 1
+    IN_PROGRESS = 2
+    COMPLETE = 3
+    ERROR = 4
+
+
+STATE_NAMES = {
+    AgentState.PENDING: "Pending",
+    AgentState.IN_PROGRESS: "In Progress",
+    AgentState.COMPLETE: "Complete",
+    AgentState.ERROR: "Error",
+}
+STATES_BY_NAME = {name: state for state, name in STATE_NAMES.items()}
+
+StatusListener = Callable[[Dict], None]
+
+
+class AgentStatusTable:
+    """Agent statuses of claims, packed into one word per claim"""
+
+    def __init__(self, max_claims: int = MAX_CLAIMS, default_agents=DEFAULT_AGENTS):
+        """
+        Args:
+            max_claims: Claims tracked before the least recently updated are dropped
+            default_agents: Agents reported as Pending until they get a status
+        """
+        self.max_claims = max_claims
+        self._agents: List[str] = []
+        self._slots: Dict[str, int] = {}
+        for agent_name in default_agents:
+            self._slot(agent_name)
+        self._default_mask = sum(0xF << (self._slots[name] * SLOT_BITS) for name in default_agents)
+
+        self._words = array("Q")  # packed statuses per row
+        self._ticks = array("Q")  # update counter at each row's last update
+        self._claim_ids: List[Optional[str]] = []  # claim ID per row
+        self._rows: Dict[str, int] = {}  # claim_id -> row
+        self._free: List[int] = []
+        self._tick = 0
+        self._listeners: Dict[Optional[str], List[StatusListener]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"updates": 0, "transitions": 0, "evictions": 0, "closed": 0}
+
+    def get(self, claim_id: str) -> Dict[str, str]:
+        """
+        Get agent statuses of a claim (without starting to track it)
+
+        Args:
+            claim_id: Claim identifier
+
+        Returns:
+            Dictionary of agent name -> status
+        """
+        with self._lock:
+            row = self._rows.get(claim_id)
+            word = self._words[row] if row is not None else 0
+            agents = list(self._agents)
+
+        statuses = {}
+        for slot, agent_name in enumerate(agents):
+            code = (word >> (slot * SLOT_BITS)) & 0xF
+            if code:
+                statuses[agent_name] = STATE_NAMES[AgentState(code)]
+            elif (self._default_mask >> (slot * SLOT_BITS)) & 0xF:
+                statuses[agent_name] = STATE_NAMES[AgentState.PENDING]
+        return statuses
+
+    def update(self, claim_id: str, agent_name: str, status: str) -> bool:
+        """
+        Set an agent's status for a claim and notify subscribers of the change
+
+        Args:
+            claim_id: Claim identifier
+            agent_name: Name of the agent
+            status: New status (Pending, In Progress, Complete, Error)
+
+        Returns:
+            True if the status changed
+
+        Raises:
+            ValueError: If the status is unknown, or too many agents are registered
+        """
+        state = STATES_BY_NAME.get(status)
+        if state is None:
+            raise ValueError(f"Unknown agent status: {status} (expected one of {', '.join(STATES_BY_NAME)})")
+
+        with self._lock:
+            shift = self._slot(agent_name) * SLOT_BITS
+            row = self._rows.get(claim_id)
+            if row is None:
+                row = self._insert(claim_id)
+            self._tick += 1
+            self._ticks[row] = self._tick
+            word = self._words[row]
+            previous = (word >> shift) & 0xF
+            self.stats["updates"] += 1
+            if previous == state:
+                return False
+            self._words[row] = (word & ~(0xF << shift)) | (state << shift)
+            self.stats["transitions"] += 1
+            listeners = self._listeners.get(claim_id, []) + self._listeners.get(None, [])
+
+        if not previous and (self._default_mask >> shift) & 0xF:
+            previous = AgentState.PENDING
+        event = {
+            "claim_id": claim_id,
+            "agent": agent_name,
+            "status": status,
+            "previous": STATE_NAMES[AgentState(previous)] if previous else None,
+            "timestamp": datetime.now().isoformat()
+        }
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"⚠️ Agent status listener failed: {e}")
+        return True
+
+    def evict(self, claim_id: str, closed: bool = False):
+        """
+        Stop tracking a claim
+
+        Args:
+            claim_id: Claim identifier
+            closed: The claim was closed (counted separately in metrics)
+        """
+        with self._lock:
+            if claim_id in self._rows:
+                self._release(claim_id)
+                self.stats["closed" if closed else "evictions"] += 1
+
+    def subscribe(self, listener: StatusListener, claim_id: Optional[str] = None) -> Callable[[], None]:
+        """
+        Call a function with every status transition
+
+        The listener runs on the thread that made the update, so it should
+        return quickly (e.g. hand the event to a queue or event loop).
+
+        Args:
+            listener: Called with {"claim_id", "agent", "status", "previous", "timestamp"}
+            claim_id: Only this claim's transitions (optional; default all claims)
+
+        Returns:
+            Function that unsubscribes the listener
+        """
+        with self._lock:
+            self._listeners.setdefault(claim_id, []).append(listener)
+
+        def unsubscribe():
+            with self._lock:
+                listeners = self._listeners.get(claim_id, [])
+                if listener in listeners:
+                    listeners.remove(listener)
+                if not listeners:
+                    self._listeners.pop(claim_id, None)
+
+        return unsubscribe
+
+    def metrics(self) -> Dict:
+        """
+        Get table size and update counts
+
+        Returns:
+            Dictionary of status table metrics
+        """
+        with self._lock:
+            return {
+                **self.stats,
+                "claims": len(self._rows),
+                "agents": len(self._agents),
+                "subscribers": sum(len(listeners) for listeners in self._listeners.values()),
+                "table_bytes": (len(self._words) + len(self._ticks)) * 8
+            }
+
+    def _slot(self, agent_name: str) -> int:
+        """Slot of an agent, registering it on first use (lock held)"""
+        slot = self._slots.get(agent_name)
+        if slot is None:
+            if len(self._agents) >= MAX_AGENTS:
+                raise ValueError(f"Too many agents to track (max {MAX_AGENTS})")
+            slot = len(self._agents)
+            self._agents.append(agent_name)
+            self._slots[agent_name] = slot
+        return slot
+
+    def _insert(self, claim_id: str) -> int:
+        """Start tracking a claim, dropping the least recently updated (lock held)"""
+        if len(self._rows) >= self.max_claims:
+            count = max(1, self.max_claims // 8)
+            for row in heapq.nsmallest(count, self._rows.values(), key=self._ticks.__getitem__):
+                self._release(self._claim_ids[row])
+            self.stats["evictions"] += count
+
+        if self._free:
+            row = self._free.pop()
+            self._claim_ids[row] = claim_id
+        else:
+            row = len(self._words)
+            self._words.append(0)
+            self._ticks.append(0)
+            self._claim_ids.append(claim_id)
+        self._rows[claim_id] = row
+        return row
+
+    def _release(self, claim_id: str):
+        """Free a claim's row (lock held)"""
+        row = self._rows.pop(claim_id)
+        self._words[row] = 0
+        self._claim_ids[row] = None
+        self._free.append(row)
@@ -4,6 +4,7 @@ ClaimPilot AI Orchestrator
 Coordinates between ClaimPilot, FinTrack, ShopFinder, ClaimDrafting,
 and ComplianceCheck agents to provide seamless multi-agent workflow.
 """
+import os
 import re
 from typing import Optional, Dict, List
 from datetime import datetime
@@ -12,9 +13,21 @@ from agents.fintrack_agent import fintrack_agent
 from agents.shopfinder_agent import shopfinder_agent
 from agents.claim_drafting_agent import claim_drafting_agent
 from agents.compliance_agent import compliance_agent
-from utils.data_models import (
-    UserMessage, ChatResponse, Claim, FinancialEstimate,
-    ShopRecommendations, AgentResponse
+from utils.data_models import UserMessage, ChatResponse, Claim
+from utils.conversation_store import conversation_store
+from orchestrator.pipeline import Pipeline, PipelineRun, Stage
+from orchestrator.agent_status import AgentStatusTable, StatusListener
+from orchestrator.events import WorkflowEvents, claim_events
+from utils.jobs import JobCancelled, JobContext, job_queue
+
+# Create claims from the first confident pages of an upload and parse the
+# rest in the background
+STREAM_PARSE_ENABLED = os.getenv("STREAM_PARSE", "true").lower() == "true"
+
+# Where uploads for full-claim jobs are kept until the job has run
+JOB_UPLOAD_DIR = os.getenv(
+    "JOB_UPLOAD_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "job_uploads")
 )
 
 
@@ -42,36 +55,43 @@ class ClaimPilotOrchestrator:
             "compliance": compliance_agent
         }
 
-        # Conversation history (in-memory, use database in production)
-        self.conversation_history = []
+        # Conversation history, per claim and session
+        self.conversations = conversation_store
 
         # Agent status tracking per claim
-        self.agent_status = {}  # {claim_id: {agent_name: status}}
+        self.agent_status = AgentStatusTable()
+        self.agent_status.subscribe(
+            lambda event: claim_events.publish(event["claim_id"], "agent_status", event)
+        )
 
-    def process_message(self, user_message: UserMessage) -> ChatResponse:
+    def process_message(self, user_message: UserMessage, file_path: Optional[str] = None) -> ChatResponse:
         """
         Process user message and coordinate appropriate agents
 
         Args:
             user_message: UserMessage object
+            file_path: Path to a spooled upload accompanying the message
 
         Returns:
             ChatResponse with results
         """
         try:
             # Add to conversation history
-            self.conversation_history.append({
-                "role": "user",
-                "message": user_message.message,
-                "timestamp": user_message.context.get("timestamp") if user_message.context else None
-            })
+            context = user_message.context or {}
+            self.conversations.append(
+                "user",
+                user_message.message,
+                claim_id=user_message.claim_id,
+                session_id=context.get("session_id"),
+                timestamp=context.get("timestamp")
+            )
 
             # Determine intent
             intent = self._determine_intent(user_message)
 
             # Route to appropriate handler
             if intent == "process_document":
-                response = self._handle_document_processing(user_message)
+                response = self._handle_document_processing(user_message, file_path)
 
             elif intent == "estimate_damage":
                 response = self._handle_damage_estimation(user_message)
@@ -80,7 +100,7 @@ class ClaimPilotOrchestrator:
                 response = self._handle_shop_finding(user_message)
 
             elif intent == "full_claim_workflow":
-                response = self._handle_full_workflow(user_message)
+                response = self._handle_full_workflow(user_message, file_path)
 
             elif intent == "get_claim_status":
                 response = self._handle_claim_status(user_message)
@@ -92,11 +112,13 @@ class ClaimPilotOrchestrator:
                 response = self._handle_general_query(user_message)
 
             # Add to conversation history
-            self.conversation_history.append({
-                "role": "assistant",
-                "message": response.message,
-                "timestamp": response.timestamp
-            })
+            self.conversations.append(
+                "assistant",
+                response.message,
+                claim_id=user_message.claim_id or (response.claim.claim_id if response.claim else None),
+                session_id=context.get("session_id"),
+                timestamp=response.timestamp
+            )
 
             return response
 
@@ -144,31 +166,31 @@ class ClaimPilotOrchestrator:
         # Default to general query
         return "general_query"
 
-    def _handle_document_processing(self, user_message: UserMessage) -> ChatResponse:
+    def _handle_document_processing(self, user_message: UserMessage, file_path: Optional[str] = None) -> ChatResponse:
         """
         Handle document processing with ClaimPilot agent
 
         Args:
             user_message: UserMessage object
+            file_path: Path to a spooled upload (instead of base64 file_data)
 
         Returns:
             ChatResponse
         """
         # Process document with ClaimPilot
-        result = claimpilot_agent.process_document(
-            file_data=user_message.file_data,
-            file_name=user_message.file_name,
-            raw_text=None
-        )
-
-        if not result.success:
+        try:
+            claim = claimpilot_agent.ingest_document(
+                file_data=user_message.file_data,
+                file_name=user_message.file_name,
+                file_path=file_path
+            )
+        except Exception as e:
             return ChatResponse(
-                message=f"I couldn't process the document: {result.message}",
-                data=result.data
+                message=f"I couldn't process the document: {str(e)}",
+                data={}
             )
 
-        claim = Claim(**result.data["claim"])
-        summary = result.data["summary"]
+        summary = claim.summary
 
         # Create friendly response
         message = (
@@ -183,7 +205,7 @@ class ClaimPilotOrchestrator:
         return ChatResponse(
             message=message,
             claim=claim,
-            data=result.data,
+            data=claimpilot_agent.to_payload(claim),
             agent_used="ClaimPilot"
         )
 
@@ -205,16 +227,16 @@ class ClaimPilotOrchestrator:
             )
 
         # Estimate damage with FinTrack
-        result = fintrack_agent.estimate_damage(claim)
-
-        if not result.success:
+        try:
+            estimate = fintrack_agent.calculate_estimate(claim)
+        except Exception as e:
             return ChatResponse(
-                message=f"I couldn't estimate the damage: {result.message}",
-                data=result.data
+                message=f"I couldn't estimate the damage: {str(e)}",
+                data={}
             )
 
-        estimate = FinancialEstimate(**result.data["estimate"])
-        summary = result.data["summary"]
+        payload = fintrack_agent.to_payload(estimate)
+        summary = payload["summary"]
 
         # Create friendly response
         message = (
@@ -234,7 +256,7 @@ class ClaimPilotOrchestrator:
             message=message,
             claim=claim,
             financial_estimate=estimate,
-            data=result.data,
+            data=payload,
             agent_used="FinTrack"
         )
 
@@ -256,16 +278,16 @@ class ClaimPilotOrchestrator:
             )
 
         # Find shops with ShopFinder
-        result = shopfinder_agent.find_shops(claim, max_results=3)
-
-        if not result.success:
+        try:
+            recommendations = shopfinder_agent.recommend_shops(claim, max_results=3)
+        except Exception as e:
             return ChatResponse(
-                message=f"I couldn't find repair shops: {result.message}",
-                data=result.data
+                message=f"I couldn't find repair shops: {str(e)}",
+                data={}
             )
 
-        recommendations = ShopRecommendations(**result.data["recommendations"])
-        summary = result.data["summary"]
+        payload = shopfinder_agent.to_payload(recommendations)
+        summary = payload["summary"]
 
         # Create friendly response
         message = f"{summary}\n\n📍 Recommended Shops:\n\n"
@@ -285,78 +307,26 @@ class ClaimPilotOrchestrator:
             message=message,
             claim=claim,
             shop_recommendations=recommendations,
-            data=result.data,
+            data=payload,
             agent_used="ShopFinder"
         )
 
-    def _handle_full_workflow(self, user_message: UserMessage) -> ChatResponse:
+    def _handle_full_workflow(self, user_message: UserMessage, file_path: Optional[str] = None) -> ChatResponse:
         """
         Handle full claim workflow: process document, estimate damage, find shops
 
         Args:
             user_message: UserMessage object
+            file_path: Path to a spooled upload (instead of base64 file_data)
 
         Returns:
             ChatResponse with all data
         """
-        responses = []
-
-        # Step 1: Process document
-        claim_result = claimpilot_agent.process_document(
-            file_data=user_message.file_data,
-            file_name=user_message.file_name
-        )
-
-        if not claim_result.success:
-            return ChatResponse(
-                message=f"I couldn't process the document: {claim_result.message}"
-            )
-
-        claim = Claim(**claim_result.data["claim"])
-        responses.append(f"✅ Claim processed: {claim.claim_id}")
-
-        # Step 2: Estimate damage
-        estimate_result = fintrack_agent.estimate_damage(claim)
-        estimate = None
-        if estimate_result.success:
-            estimate = FinancialEstimate(**estimate_result.data["estimate"])
-            responses.append(f"✅ Damage estimated: ${estimate.estimated_damage:,.2f}")
-
-        # Step 3: Find shops
-        shops_result = shopfinder_agent.find_shops(claim)
-        recommendations = None
-        if shops_result.success:
-            recommendations = ShopRecommendations(**shops_result.data["recommendations"])
-            responses.append(f"✅ Found {len(recommendations.recommended_shops)} repair shops")
-
-        # Create comprehensive response
-        message = "I've completed a full analysis of your claim!\n\n"
-        message += "\n".join(responses)
-        message += f"\n\n📋 **Claim Summary**\n{claim.summary}\n\n"
-
-        if estimate:
-            message += (
-                f"💰 **Financial Estimate**\n"
-                f"Total Damage: ${estimate.estimated_damage:,.2f}\n"
-                f"Insurance Pays: ${estimate.payout_after_deductible:,.2f}\n"
-                f"Your Deductible: ${estimate.deductible:,.2f}\n\n"
-            )
-
-        if recommendations and recommendations.recommended_shops:
-            top_shop = recommendations.recommended_shops[0]
-            message += (
-                f"🔧 **Top Recommended Shop**\n"
-                f"{top_shop.name} - ⭐ {top_shop.rating}/5.0\n"
-                f"Distance: {top_shop.distance} | Price: {top_shop.price_level}\n"
-            )
-
-        return ChatResponse(
-            message=message,
-            claim=claim,
-            financial_estimate=estimate,
-            shop_recommendations=recommendations,
-            agent_used="All Agents"
+        run = claim_pipeline.run(
+            self._document_inputs(user_message, file_path),
+            targets=["fintrack", "shopfinder"]
         )
+        return self.build_workflow_response(run)
 
     def _handle_claim_status(self, user_message: UserMessage) -> ChatResponse:
         """
@@ -475,24 +445,65 @@ class ClaimPilotOrchestrator:
             return claimpilot_agent.get_claim(claim_id_match.group(0))
 
         # Get most recent claim
-        claims = claimpilot_agent.list_claims()
+        claims = claimpilot_agent.list_claims(limit=1)
         if claims:
             return claims[0]
 
         return None
 
-    def get_conversation_history(self) -> List[Dict]:
+    def get_conversation_history(
+        self,
+        claim_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
         """
-        Get conversation history
+        Get conversation history, oldest first
+
+        Args:
+            claim_id: Only this claim's messages (optional)
+            session_id: Only this session's messages (optional)
+            limit: Only the last `limit` messages (optional)
 
         Returns:
-            List of conversation messages
+            List of conversation messages (the latest across all
+            conversations when neither claim_id nor session_id is given)
+        """
+        if claim_id is None and session_id is None:
+            return self.conversations.recent(limit)
+        return self.conversations.get_messages(claim_id, session_id, limit)
+
+    def record_exchange(
+        self,
+        user_text: str,
+        reply: str,
+        claim_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ):
+        """
+        Record a user message and the reply to it
+
+        Args:
+            user_text: What the user said
+            reply: What the assistant answered
+            claim_id: Claim the conversation is about (optional)
+            session_id: Chat session (optional)
+        """
+        self.conversations.append("user", user_text, claim_id=claim_id, session_id=session_id)
+        self.conversations.append("assistant", reply, claim_id=claim_id, session_id=session_id)
+
+    def clear_conversation(self, claim_id: Optional[str] = None, session_id: Optional[str] = None) -> int:
         """
-        return self.conversation_history
+        Clear conversation history (see ConversationStore.clear)
 
-    def clear_conversation(self):
-        """Clear conversation history"""
-        self.conversation_history = []
+        Args:
+            claim_id: Only clear this claim's conversation, persisted messages included (optional)
+            session_id: Only clear this session's conversation (optional)
+
+        Returns:
+            Number of persisted messages deleted
+        """
+        return self.conversations.clear(claim_id, session_id)
 
     def get_agent_status(self, claim_id: str) -> Dict:
         """
@@ -504,16 +515,7 @@ class ClaimPilotOrchestrator:
         Returns:
             Dictionary of agent statuses
         """
-        if claim_id not in self.agent_status:
-            # Initialize default status
-            self.agent_status[claim_id] = {
-                "ClaimPilot": "Pending",
-                "FinTrack": "Pending",
-                "ClaimDrafting": "Pending",
-                "ComplianceCheck": "Pending"
-            }
-
-        return self.agent_status[claim_id]
+        return self.agent_status.get(claim_id)
 
     def update_agent_status(self, claim_id: str, agent_name: str, status: str):
         """
@@ -524,71 +526,163 @@ class ClaimPilotOrchestrator:
             agent_name: Name of the agent
             status: New status (Pending, In Progress, Complete, Error)
         """
-        if claim_id not in self.agent_status:
-            self.agent_status[claim_id] = {}
+        self.agent_status.update(claim_id, agent_name, status)
+
+    def subscribe_agent_status(self, listener: StatusListener, claim_id: Optional[str] = None):
+        """
+        Get pushed agent status transitions instead of polling
+
+        Args:
+            listener: Called with each transition event (on the updating thread)
+            claim_id: Only this claim's transitions (optional)
 
-        self.agent_status[claim_id][agent_name] = status
+        Returns:
+            Function that unsubscribes the listener
+        """
+        return self.agent_status.subscribe(listener, claim_id)
 
-    def process_full_claim(self, user_message: UserMessage) -> ChatResponse:
+    def process_full_claim(self, user_message: UserMessage, file_path: Optional[str] = None) -> ChatResponse:
         """
         Process a full claim workflow with all agents
 
         Args:
             user_message: UserMessage object
+            file_path: Path to a spooled upload (instead of base64 file_data)
 
         Returns:
             ChatResponse with complete results
         """
-        responses = []
-        claim = None
-        estimate = None
-        recommendations = None
-        draft_html = None
-        compliance_results = None
-
-        # Step 1: Process document with ClaimPilot
-        claim_result = claimpilot_agent.process_document(
-            file_data=user_message.file_data,
-            file_name=user_message.file_name
-        )
+        events = WorkflowEvents(claim_events, user_message.claim_id, self.update_agent_status)
+        events.started()
+        run = claim_pipeline.run(self._document_inputs(user_message, file_path), on_stage=events.on_stage)
+        events.finished(run)
+        return self.build_workflow_response(run)
+
+    def run_full_claim_job(self, payload: Dict, job: JobContext) -> Dict:
+        """
+        Job handler: run the claim pipeline on an upload or an existing claim
+
+        Args:
+            payload: {"file_path", "file_name"} of a kept upload (deleted
+                afterwards), or {"claim_id"} of an existing claim
+            job: Running job
+
+        Returns:
+            Workflow response (as from /api/process-full-claim)
+
+        Raises:
+            ValueError: If the claim does not exist
+            JobCancelled: If the job was cancelled while running
+        """
+        file_path = payload.get("file_path")
+        try:
+            claim_id = payload.get("claim_id")
+            if file_path:
+                inputs = {
+                    "file_path": file_path,
+                    "file_name": payload.get("file_name"),
+                    "stream_parse": STREAM_PARSE_ENABLED
+                }
+            else:
+                claim = claimpilot_agent.get_claim(claim_id)
+                if not claim:
+                    raise ValueError(f"Claim {claim_id} not found")
+                inputs = {"claim": claim}
+
+            events = WorkflowEvents(claim_events, claim_id, self.update_agent_status)
+
+            def on_stage(kind, result):
+                events.on_stage(kind, result)
+                if events.claim_id:
+                    job.set_claim_id(events.claim_id)
+
+            events.started()
+            run = claim_pipeline.run(inputs, on_stage=on_stage, should_cancel=job.cancelled)
+            events.finished(run)
+            if job.cancelled():
+                raise JobCancelled()
+            return self.build_workflow_response(run).model_dump(mode="json")
+        finally:
+            if file_path:
+                try:
+                    os.unlink(file_path)
+                except OSError:
+                    pass
+
+    async def execute_claim_pipeline(self, inputs: Dict, claim_id: Optional[str] = None) -> PipelineRun:
+        """
+        Run the claim pipeline, publishing progress to the claim's event stream
 
-        if not claim_result.success:
+        Args:
+            inputs: Pipeline inputs (the claim, or an uploaded document)
+            claim_id: Claim the run is for (None when the run creates it)
+
+        Returns:
+            Completed pipeline run
+        """
+        events = WorkflowEvents(claim_events, claim_id, self.update_agent_status)
+        events.started()
+        run = await claim_pipeline.execute(inputs, on_stage=events.on_stage)
+        events.finished(run)
+        return run
+
+    def _document_inputs(self, user_message: UserMessage, file_path: Optional[str] = None) -> Dict:
+        """Build claim pipeline inputs from an uploaded document"""
+        return {
+            "file_data": user_message.file_data,
+            "file_name": user_message.file_name,
+            "file_path": file_path,
+            "stream_parse": STREAM_PARSE_ENABLED
+        }
+
+    def record_pipeline_status(self, claim_id: str, run: PipelineRun):
+        """
+        Record agent status for every stage that ran in a pipeline run
+
+        Args:
+            claim_id: Claim identifier
+            run: Completed pipeline run
+        """
+        for result in run.results.values():
+            if not result.stage.status_name or result.status == "skipped":
+                continue
+            self.update_agent_status(
+                claim_id,
+                result.stage.status_name,
+                "Complete" if result.success else "Error"
+            )
+
+    def build_workflow_response(self, run: PipelineRun) -> ChatResponse:
+        """
+        Build the chat response for a document-driven claim pipeline run
+
+        Args:
+            run: Completed pipeline run
+
+        Returns:
+            ChatResponse with complete results
+        """
+        claim = run.value("document") or run.value("claim")
+        if not claim:
             return ChatResponse(
-                message=f"I couldn't process the document: {claim_result.message}"
+                message=f"I couldn't process the document: {run.results['claim'].error}"
             )
 
-        claim = Claim(**claim_result.data["claim"])
-        self.update_agent_status(claim.claim_id, "ClaimPilot", "Complete")
-        responses.append(f"✅ Claim processed: {claim.claim_id}")
+        self.record_pipeline_status(claim.claim_id, run)
 
-        # Step 2: Estimate damage with FinTrack
-        estimate_result = fintrack_agent.estimate_damage(claim)
-        if estimate_result.success:
-            estimate = FinancialEstimate(**estimate_result.data["estimate"])
-            self.update_agent_status(claim.claim_id, "FinTrack", "Complete")
-            responses.append(f"✅ Damage estimated: ${estimate.estimated_damage:,.2f}")
+        estimate = run.value("fintrack")
+        recommendations = run.value("shopfinder")
+        draft = run.value("claim_drafting")
+        compliance_results = run.value("compliance")
 
-        # Step 3: Find shops with ShopFinder
-        shops_result = shopfinder_agent.find_shops(claim)
-        if shops_result.success:
-            recommendations = ShopRecommendations(**shops_result.data["recommendations"])
+        responses = [f"✅ Claim processed: {claim.claim_id}"]
+        if estimate:
+            responses.append(f"✅ Damage estimated: ${estimate.estimated_damage:,.2f}")
+        if recommendations:
             responses.append(f"✅ Found {len(recommendations.recommended_shops)} repair shops")
-
-        # Step 4: Generate claim draft
-        draft_result = claim_drafting_agent.generate_draft(
-            claim,
-            estimate_result.data if estimate_result.success else None
-        )
-        if draft_result.success:
-            draft_html = draft_result.data["html_draft"]
-            self.update_agent_status(claim.claim_id, "ClaimDrafting", "Complete")
+        if draft:
             responses.append("✅ Claim draft generated")
-
-        # Step 5: Compliance check
-        compliance_result = compliance_agent.validate_claim(claim, draft_html)
-        if compliance_result.success:
-            compliance_results = compliance_result.data
-            self.update_agent_status(claim.claim_id, "ComplianceCheck", "Complete")
+        if compliance_results:
             status_emoji = "✅" if compliance_results["submission_ready"] else "⚠️"
             responses.append(f"{status_emoji} Compliance check complete")
 
@@ -624,11 +718,97 @@ class ClaimPilotOrchestrator:
             data={
                 "agent_status": self.get_agent_status(claim.claim_id),
                 "compliance": compliance_results,
-                "draft_html": draft_html
+                "draft_html": draft["html_draft"] if draft else None,
+                "timeline": run.timeline()
             },
             agent_used="All Agents"
         )
 
 
+def _parsed_claim(context: Dict) -> Claim:
+    """The claim with its whole document parsed ("document" when it ran)"""
+    return context.get("document") or context["claim"]
+
+
+def _shops_cache_key(context: Dict) -> tuple:
+    """Cache shop recommendations per claim, incident type and location"""
+    claim = context["claim"]
+    return (claim.claim_id, claim.incident_type, claim.location)
+
+
+# Shared claim pipeline behind run-all-agents, process_full_claim and the
+# chat full workflow. "claim" is produced from an uploaded document, or
+# passed in directly for an existing claim. FinTrack and ShopFinder are
+# independent; drafting uses the estimate and compliance uses the draft.
+# With stream_parse, "claim" is ready once the required fields are
+# confident and "document" finishes the rest of the file, producing the
+# stored claim with the late pages folded in: ShopFinder only needs the
+# required fields and starts early, FinTrack (amounts), drafting and
+# compliance (full text) wait for the whole document. Without stream_parse
+# (existing claims, whole-file parses) there is nothing to finish and
+# "document" is not run.
+claim_pipeline = Pipeline([
+    Stage(
+        "claim",
+        lambda context: claimpilot_agent.ingest_document(
+            file_data=context.get("file_data"),
+            file_name=context.get("file_name"),
+            raw_text=context.get("raw_text"),
+            file_path=context.get("file_path"),
+            stream=context.get("stream_parse", False)
+        ),
+        label="ClaimPilot",
+        serialize=claimpilot_agent.to_payload,
+        status_name="ClaimPilot"
+    ),
+    Stage(
+        "document",
+        lambda context: claimpilot_agent.finish_ingest(context["claim"].claim_id),
+        label="Document Parse",
+        depends_on=["claim"],
+        serialize=lambda claim: claimpilot_agent.to_payload(claim) if claim else None,
+        run_if=lambda inputs: inputs.get("stream_parse", False)
+    ),
+    Stage(
+        "fintrack",
+        lambda context: fintrack_agent.calculate_estimate(_parsed_claim(context)),
+        label="FinTrack",
+        depends_on=["claim"],
+        optional_deps=["document"],
+        serialize=fintrack_agent.to_payload,
+        # Not cached here: calculate_estimate() is memoized by claim fingerprint
+        status_name="FinTrack"
+    ),
+    Stage(
+        "shopfinder",
+        lambda context: shopfinder_agent.recommend_shops(context["claim"], max_results=3),
+        label="ShopFinder",
+        depends_on=["claim"],
+        serialize=shopfinder_agent.to_payload,
+        cache_key=_shops_cache_key,
+        status_name="ShopFinder"
+    ),
+    Stage(
+        "claim_drafting",
+        lambda context: claim_drafting_agent.build_draft(_parsed_claim(context), context["fintrack"]),
+        label="Claim Drafting",
+        depends_on=["claim"],
+        optional_deps=["fintrack", "document"],
+        status_name="ClaimDrafting"
+    ),
+    Stage(
+        "compliance",
+        lambda context: compliance_agent.check_claim(
+            _parsed_claim(context),
+            context["claim_drafting"]["html_draft"] if context["claim_drafting"] else None
+        ),
+        label="Compliance",
+        depends_on=["claim"],
+        optional_deps=["claim_drafting", "document"],
+        status_name="ComplianceCheck"
+    ),
+])
+
 # Singleton instance
 orchestrator = ClaimPilotOrchestrator()
+job_queue.register("full_claim", orchestrator.run_full_claim_job, upload_dir=JOB_UPLOAD_DIR)
@@ -0,0 +1,240 @@
+"""
+Claim progress events
+
+Workflows publish what they are doing to `claim_events`, keyed by claim ID,
+and /api/claims/{claim_id}/events streams them to the browser as
+Server-Sent Events while the workflow runs:
+
+- workflow_started / workflow_completed: a pipeline run began / ended
+  (with its timeline and critical path)
+- agent_started: a stage began
+- agent_completed / agent_failed / agent_skipped: a stage ended, with its
+  timings and, on success, its serialized result, so the UI can show
+  FinTrack output before compliance finishes
+- agent_status: an orchestrator agent status changed
+
+Each claim keeps the events of its latest workflow (CLAIM_EVENTS_HISTORY at
+most) so a client that subscribes just after starting a run, or reconnects
+with Last-Event-ID, does not miss the beginning.
+"""
+import asyncio
+import itertools
+import os
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from orchestrator.pipeline import PipelineRun, StageResult
+
+HISTORY_SIZE = int(os.getenv("CLAIM_EVENTS_HISTORY", "100"))
+MAX_CLAIMS = int(os.getenv("CLAIM_EVENTS_MAX_CLAIMS", "1000"))
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("CLAIM_EVENTS_QUEUE_SIZE", "256"))
+
+# Keep-alive comment interval of the SSE stream
+SSE_PING_SECONDS = int(os.getenv("CLAIM_EVENTS_PING_SECONDS", "15"))
+
+
+class ClaimEventBus:
+    """Fan-out of claim progress events to async subscribers"""
+
+    def __init__(self, history_size: int = HISTORY_SIZE, max_claims: int = MAX_CLAIMS):
+        """
+        Args:
+            history_size: Events kept per claim for late subscribers
+            max_claims: Claims whose history is kept (least recently active are dropped)
+        """
+        self.history_size = history_size
+        self.max_claims = max_claims
+        self._history: "OrderedDict[str, Deque[Dict]]" = OrderedDict()
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.stats = {"published": 0, "dropped": 0}
+
+    def publish(self, claim_id: str, event_type: str, data: Dict[str, Any]) -> Dict:
+        """
+        Publish an event to a claim's subscribers (safe from any thread)
+
+        Args:
+            claim_id: Claim identifier
+            event_type: Event name (workflow_started, agent_completed, ...)
+            data: JSON-ready event payload
+
+        Returns:
+            The published event
+        """
+        event = {
+            "id": next(self._ids),
+            "event": event_type,
+            "claim_id": claim_id,
+            "timestamp": datetime.now().isoformat(),
+            "data": data
+        }
+        with self._lock:
+            history = self._history.get(claim_id)
+            if history is None:
+                history = self._history[claim_id] = deque(maxlen=self.history_size)
+                while len(self._history) > self.max_claims:
+                    self._history.popitem(last=False)
+            else:
+                self._history.move_to_end(claim_id)
+            if event_type == "workflow_started":
+                history.clear()
+            history.append(event)
+            subscribers = list(self._subscribers.get(claim_id, ()))
+            self.stats["published"] += 1
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                # Subscriber's event loop is closed
+                pass
+        return event
+
+    async def subscribe(self, claim_id: str, after: Optional[int] = None) -> AsyncIterator[Dict]:
+        """
+        Iterate over a claim's events as they are published
+
+        Starts with the latest workflow's events (those after `after`), then
+        waits for new ones until the caller stops iterating.
+
+        Args:
+            claim_id: Claim identifier
+            after: Last event ID the client already has (optional)
+
+        Yields:
+            Events
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(claim_id, set()).add(subscriber)
+            backlog = [event for event in self._history.get(claim_id, ()) if after is None or event["id"] > after]
+
+        try:
+            last_id = after or 0
+            for event in backlog:
+                last_id = event["id"]
+                yield event
+            while True:
+                event = await queue.get()
+                if event["id"] > last_id:
+                    last_id = event["id"]
+                    yield event
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(claim_id)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._subscribers[claim_id]
+
+    def metrics(self) -> Dict:
+        """
+        Get event counts
+
+        Returns:
+            Dictionary of event bus metrics
+        """
+        with self._lock:
+            return {
+                **self.stats,
+                "claims": len(self._history),
+                "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values())
+            }
+
+    def _deliver(self, queue: asyncio.Queue, event: Dict):
+        """Queue an event for a subscriber, dropping its oldest if it falls behind"""
+        if queue.full():
+            queue.get_nowait()
+            self.stats["dropped"] += 1
+        queue.put_nowait(event)
+
+
+class WorkflowEvents:
+    """
+    Publishes one pipeline run's progress to the event bus
+
+    Pass on_stage as the pipeline's stage listener. When the run starts from
+    an upload, the claim ID is only known once the "claim" stage finishes;
+    events until then are held and published at that point.
+    """
+
+    def __init__(self, bus: ClaimEventBus, claim_id: Optional[str] = None, status_listener=None):
+        """
+        Args:
+            bus: Event bus to publish to
+            claim_id: Claim the workflow runs on (None if it creates the claim)
+            status_listener: Called with (claim_id, agent status name, status)
+                as agents start and finish, for live agent status
+        """
+        self.bus = bus
+        self.claim_id = claim_id
+        self.status_listener = status_listener
+        self._held: List[Tuple[str, Dict]] = []
+
+    def started(self):
+        """Publish the start of the run"""
+        self._publish("workflow_started", {})
+
+    def on_stage(self, kind: str, result: StageResult):
+        """Pipeline stage listener"""
+        stage = result.stage
+        data = {
+            "stage": stage.name,
+            "agent": stage.label,
+            "started": round(result.started_at, 3)
+        }
+        if kind == "started":
+            self._publish("agent_started", data)
+            self._set_status(stage.status_name, "In Progress")
+            return
+
+        data.update({
+            "status": result.status,
+            "finished": round(result.finished_at, 3),
+            "duration": round(result.duration, 3),
+            "cached": result.cached
+        })
+        if result.success:
+            data["result"] = stage.serialize(result.value) if stage.serialize else result.value
+            if stage.name == "claim" and self.claim_id is None and result.value is not None:
+                self.claim_id = result.value.claim_id
+            self._publish("agent_completed", data)
+            self._set_status(stage.status_name, "Complete")
+        elif result.status == "skipped":
+            data["error"] = result.error
+            self._publish("agent_skipped", data)
+        else:
+            data["error"] = result.error
+            self._publish("agent_failed", data)
+            self._set_status(stage.status_name, "Error")
+
+    def finished(self, run: PipelineRun):
+        """Publish the end of the run"""
+        self._publish("workflow_completed", {
+            "total_time": round(run.total_time, 3),
+            "timeline": run.timeline(),
+            "critical_path": [run.results[name].stage.label for name in run.critical_path]
+        })
+        # The claim never got created: nothing to publish under
+        self._held.clear()
+
+    def _publish(self, event_type: str, data: Dict):
+        if self.claim_id is None:
+            self._held.append((event_type, data))
+            return
+        held, self._held = self._held, []
+        for held_type, held_data in held:
+            self.bus.publish(self.claim_id, held_type, held_data)
+        self.bus.publish(self.claim_id, event_type, data)
+
+    def _set_status(self, status_name: Optional[str], status: str):
+        if status_name and self.claim_id and self.status_listener:
+            self.status_listener(self.claim_id, status_name, status)
+
+
+# Singleton instance
+claim_events = ClaimEventBus()
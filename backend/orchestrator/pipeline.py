@@ -0,0 +1,417 @@
+"""
+Staged pipeline engine for multi-agent claim workflows
+
+A pipeline is a declarative graph of stages. Each stage receives the typed
+values produced by its dependencies (Claim, FinancialEstimate, ...) and
+returns a typed value of its own, so nothing is dumped to dicts and
+re-validated between agents. Independent stages run concurrently, stage
+results can be cached, and serialization to JSON-ready payloads happens
+once, at the HTTP boundary, via PipelineRun.serialize().
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from utils.executors import BoundedExecutor, io_executor
+
+
+# Default per-stage timeout in seconds
+DEFAULT_STAGE_TIMEOUT = float(os.getenv("AGENT_TIMEOUT_SECONDS", "30"))
+
+# Maximum number of cached values kept per pipeline
+DEFAULT_STAGE_CACHE_SIZE = int(os.getenv("PIPELINE_CACHE_SIZE", "256"))
+
+# Called with ("started" | "finished", StageResult) as stages run
+StageListener = Callable[[str, "StageResult"], None]
+
+
+class Stage:
+    """A single stage of a pipeline"""
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Dict[str, Any]], Any],
+        label: Optional[str] = None,
+        depends_on: Optional[List[str]] = None,
+        optional_deps: Optional[List[str]] = None,
+        serialize: Optional[Callable[[Any], Any]] = None,
+        cache_key: Optional[Callable[[Dict[str, Any]], Hashable]] = None,
+        status_name: Optional[str] = None,
+        run_if: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        timeout: float = DEFAULT_STAGE_TIMEOUT
+    ):
+        """
+        Args:
+            name: Unique stage name, also the key of its value in the context
+            run: Synchronous callable receiving the context, returning a typed value
+            label: Display name used in the timeline
+            depends_on: Stages that must succeed first (otherwise this stage is skipped)
+            optional_deps: Stages that must finish first but may have failed (value None)
+            serialize: Converts the stage value to a JSON-ready payload
+            cache_key: Derives a cache key from the context; None disables caching
+            status_name: Orchestrator agent status name for this stage
+            run_if: Decides from the run inputs whether the stage is needed; when
+                it returns False the stage is treated as provided with value None
+            timeout: Seconds to wait for this stage before giving up
+        """
+        self.name = name
+        self.run = run
+        self.label = label or name
+        self.depends_on = depends_on or []
+        self.optional_deps = optional_deps or []
+        self.serialize = serialize
+        self.cache_key = cache_key
+        self.status_name = status_name
+        self.run_if = run_if
+        self.timeout = timeout
+
+    @property
+    def upstream(self) -> List[str]:
+        """All stages this stage waits on"""
+        return self.depends_on + self.optional_deps
+
+
+class StageResult:
+    """Outcome and timing of a single stage in a pipeline run"""
+
+    def __init__(self, stage: Stage):
+        self.stage = stage
+        self.status = "pending"  # pending, completed, failed, timeout, skipped
+        self.value: Any = None
+        self.error: Optional[str] = None
+        self.cached = False
+        self.started_at = 0.0
+        self.finished_at = 0.0
+
+    @property
+    def success(self) -> bool:
+        return self.status == "completed"
+
+    @property
+    def duration(self) -> float:
+        return self.finished_at - self.started_at
+
+
+class PipelineRun:
+    """Results of executing a Pipeline"""
+
+    def __init__(self, results: Dict[str, StageResult], inputs: Dict[str, Any], total_time: float):
+        self.results = results
+        self.inputs = inputs
+        self.total_time = total_time
+        self.critical_path = self._compute_critical_path()
+
+    def value(self, name: str) -> Any:
+        """Get the typed value of a stage or input, None if unavailable"""
+        if name in self.inputs:
+            return self.inputs[name]
+        result = self.results.get(name)
+        return result.value if result and result.success else None
+
+    def serialize(self) -> Dict[str, Any]:
+        """
+        Convert successful stage values to JSON-ready payloads
+
+        Returns:
+            Dictionary of stage name to serialized payload
+        """
+        outputs = {}
+        for name, result in self.results.items():
+            if result.success:
+                serialize = result.stage.serialize
+                outputs[name] = serialize(result.value) if serialize else result.value
+        return outputs
+
+    def _compute_critical_path(self) -> List[str]:
+        """
+        Walk back from the last stage to finish, always following the
+        upstream stage that finished last. That chain is what bounded the run.
+        """
+        if not self.results:
+            return []
+
+        current = max(self.results.values(), key=lambda r: r.finished_at)
+        path = [current.stage.name]
+        while True:
+            upstream = [self.results[dep] for dep in current.stage.upstream if dep in self.results]
+            if not upstream:
+                break
+            current = max(upstream, key=lambda r: r.finished_at)
+            path.append(current.stage.name)
+
+        path.reverse()
+        return path
+
+    def timeline(self) -> List[Dict]:
+        """
+        Build a timeline of stage runs ordered by finish time
+
+        Returns:
+            List of timeline entries with offsets relative to the run start
+        """
+        entries = []
+        for result in sorted(self.results.values(), key=lambda r: r.finished_at):
+            entry = {
+                "agent": result.stage.label,
+                "status": result.status,
+                "started": f"{result.started_at:.2f}s",
+                "time": f"{result.finished_at:.2f}s",
+                "duration": f"{result.duration:.2f}s",
+                "depends_on": [
+                    self.results[dep].stage.label
+                    for dep in result.stage.upstream if dep in self.results
+                ],
+                "critical_path": result.stage.name in self.critical_path,
+                "cached": result.cached
+            }
+            if result.error:
+                entry["error"] = result.error
+            entries.append(entry)
+        return entries
+
+
+class Pipeline:
+    """
+    Declarative stage graph with a concurrent async executor
+
+    Each stage receives a context dict holding the run inputs plus the
+    value of every upstream stage under its stage name (None if an
+    optional dependency failed). Stages whose name is already present in
+    the inputs, or whose run_if rejects the inputs, are treated as provided
+    and not run.
+    """
+
+    def __init__(self, stages: List[Stage], cache_size: int = DEFAULT_STAGE_CACHE_SIZE):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Duplicate stage names in pipeline")
+
+        for stage in stages:
+            for dep in stage.upstream:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        self.order = self._topological_order()
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _topological_order(self) -> List[str]:
+        """Order stages so each appears after its dependencies"""
+        order = []
+        visiting = set()
+        visited = set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle detected in pipeline at '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].upstream:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+
+        return order
+
+    def _select(self, targets: Optional[Iterable[str]], provided: Iterable[str]) -> List[str]:
+        """Stages needed to produce the targets, minus those already provided"""
+        provided = set(provided)
+        if targets is None:
+            needed = set(self.stages)
+        else:
+            needed = set()
+            pending = list(targets)
+            while pending:
+                name = pending.pop()
+                if name in needed or name in provided:
+                    continue
+                if name not in self.stages:
+                    raise ValueError(f"Unknown pipeline stage '{name}'")
+                needed.add(name)
+                pending.extend(self.stages[name].upstream)
+
+        return [name for name in self.order if name in needed and name not in provided]
+
+    def _cache_get(self, key: tuple) -> tuple:
+        """Look up a cached stage value, returning (hit, value)"""
+        with self._cache_lock:
+            if key not in self._cache:
+                return False, None
+            self._cache.move_to_end(key)
+            return True, self._cache[key]
+
+    def _cache_put(self, key: tuple, value: Any):
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        """Drop all cached stage values"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    async def execute(
+        self,
+        inputs: Optional[Dict[str, Any]] = None,
+        targets: Optional[Iterable[str]] = None,
+        executor: Optional[BoundedExecutor] = io_executor,
+        on_stage: Optional[StageListener] = None,
+        should_cancel: Optional[Callable[[], bool]] = None
+    ) -> PipelineRun:
+        """
+        Run the pipeline, starting each stage once its dependencies finish
+
+        Synchronous stage callables are run on the bounded io pool so the
+        event loop stays free while they execute.
+
+        Args:
+            inputs: Initial context (e.g. the claim or the uploaded document)
+            targets: Stages to produce; upstream stages are included automatically.
+                Defaults to every stage.
+            executor: Pool to run stages on; None runs them on plain threads
+            on_stage: Called on the event loop when a stage starts and when
+                it finishes (including skipped stages), for progress reporting
+            should_cancel: Checked before each stage starts; once it returns
+                True, stages that have not started are skipped
+
+        Returns:
+            PipelineRun with typed stage values, timeline and critical path
+        """
+        inputs = dict(inputs or {})
+        for stage in self.stages.values():
+            if stage.run_if is not None and stage.name not in inputs and not stage.run_if(inputs):
+                inputs[stage.name] = None
+        names = self._select(targets, inputs)
+        results = {name: StageResult(self.stages[name]) for name in names}
+        tasks: Dict[str, asyncio.Task] = {}
+        start = time.perf_counter()
+
+        def upstream_value(dep: str) -> Any:
+            if dep in inputs:
+                return inputs[dep]
+            return results[dep].value if results[dep].success else None
+
+        def notify(kind: str, result: StageResult):
+            if on_stage is None:
+                return
+            try:
+                on_stage(kind, result)
+            except Exception as e:
+                print(f"⚠️ Pipeline stage listener failed: {e}")
+
+        def submit(stage: Stage, context: Dict[str, Any]):
+            if executor is None:
+                return asyncio.to_thread(stage.run, context)
+            return executor.run(stage.run, context)
+
+        async def run_stage(name: str):
+            stage = self.stages[name]
+            result = results[name]
+
+            waiting = [tasks[dep] for dep in stage.upstream if dep in tasks]
+            if waiting:
+                await asyncio.gather(*waiting)
+
+            missing = [
+                dep for dep in stage.depends_on
+                if dep not in inputs and not results[dep].success
+            ]
+            if not missing and should_cancel is not None and should_cancel():
+                result.status = "skipped"
+                result.error = "Cancelled"
+                result.started_at = result.finished_at = time.perf_counter() - start
+                notify("finished", result)
+                return
+            if missing:
+                result.status = "skipped"
+                result.error = f"Skipped because {', '.join(missing)} did not complete"
+                result.started_at = result.finished_at = time.perf_counter() - start
+                notify("finished", result)
+                return
+
+            context = dict(inputs)
+            for dep in stage.upstream:
+                context[dep] = upstream_value(dep)
+
+            result.started_at = time.perf_counter() - start
+            notify("started", result)
+            try:
+                key = (name, stage.cache_key(context)) if stage.cache_key else None
+                hit, cached_value = self._cache_get(key) if key is not None else (False, None)
+                if hit:
+                    result.value = cached_value
+                    result.cached = True
+                else:
+                    print(f"🔷 Running {stage.label} Agent...")
+                    result.value = await asyncio.wait_for(
+                        submit(stage, context),
+                        timeout=stage.timeout
+                    )
+                    if key is not None:
+                        self._cache_put(key, result.value)
+                result.status = "completed"
+            except asyncio.TimeoutError:
+                result.status = "timeout"
+                result.error = f"{stage.label} timed out after {stage.timeout:.1f}s"
+            except Exception as e:
+                result.status = "failed"
+                result.error = str(e)
+            result.finished_at = time.perf_counter() - start
+            notify("finished", result)
+
+        for name in names:
+            tasks[name] = asyncio.create_task(run_stage(name))
+
+        if tasks:
+            await asyncio.gather(*tasks.values())
+
+        return PipelineRun(results, inputs, time.perf_counter() - start)
+
+    def run(
+        self,
+        inputs: Optional[Dict[str, Any]] = None,
+        targets: Optional[Iterable[str]] = None,
+        on_stage: Optional[StageListener] = None,
+        should_cancel: Optional[Callable[[], bool]] = None
+    ) -> PipelineRun:
+        """
+        Blocking entry point for synchronous callers
+
+        Synchronous callers are usually already running on a pool worker,
+        so stages run on plain threads rather than queueing behind it.
+
+        Args:
+            inputs: Initial context
+            targets: Stages to produce (defaults to every stage)
+            on_stage: Called as stages start and finish (see execute())
+            should_cancel: Checked before each stage starts (see execute())
+
+        Returns:
+            PipelineRun
+        """
+        def execute() -> PipelineRun:
+            return asyncio.run(self.execute(
+                inputs, targets, executor=None, on_stage=on_stage, should_cancel=should_cancel
+            ))
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return execute()
+
+        # Already inside an event loop: drive the pipeline on a helper thread
+        with ThreadPoolExecutor(max_workers=1) as helper:
+            return helper.submit(execute).result()
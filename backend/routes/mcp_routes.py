@@ -7,13 +7,16 @@ from pydantic import BaseModel
 from typing import Optional, Callable, Any
 import sys
 from pathlib import Path
-import tempfile
-import pdfplumber
-from openai import OpenAI
-import os
 import json
 from dotenv import load_dotenv
 
+from utils.executors import run_cpu, run_io, ExecutorSaturatedError
+from utils.uploads import spool_upload
+from utils.pdf_extract import extract_text
+from utils.llm_gateway import llm_gateway
+from utils.llm_cache import llm_cache
+from utils.mcp_tools import summary_messages, summary_cache_key, SUMMARY_MAX_TOKENS
+
 # Load environment
 load_dotenv()
 
@@ -65,32 +68,21 @@ class ProcessDocumentRequest(BaseModel):
 
 
 def parse_pdf_file(file_path: str) -> str:
-    """Extract text from PDF using pdfplumber (same as MCP tool)"""
-    text = ''
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text
-    return text
-
-
-def summarize_claim_text(claim_text: str) -> str:
-    """Generate claim summary using OpenAI (same as MCP tool)"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found")
-
-    client = OpenAI(api_key=api_key)
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are an insurance claims summarization assistant."},
-            {"role": "user", "content": f"Summarize the following claim in a few sentences, extract important information such as what may be owed, if the claim was denied, etc.:\n\n{claim_text}"}
-        ],
-        max_tokens=200
-    )
-    return response.choices[0].message.content
+    """Extract text from PDF (same engine as the MCP tool)"""
+    return extract_text(file_path, separator="")
+
+
+async def summarize_claim_text(claim_text: str) -> str:
+    """Generate claim summary using OpenAI (same prompt and cache as the MCP tool)"""
+    async def compute() -> str:
+        response = await llm_gateway.complete(
+            messages=summary_messages(claim_text),
+            provider="openai",
+            max_tokens=SUMMARY_MAX_TOKENS
+        )
+        return response.text
+
+    return await llm_cache.aget_or_compute(summary_cache_key(claim_text), compute)
 
 
 @router.post("/api/mcp-process-document")
@@ -103,35 +95,32 @@ async def process_document_with_mcp(
     Process document using comprehensive MCP tools
 
     This endpoint:
-    1. Saves the uploaded file temporarily
+    1. Spools the uploaded file to a temp file
     2. Uses parse_pdf to extract text
     3. Uses summarize_claim (OpenAI or Gemini) to generate AI summary
     4. Optionally extracts structured data
     5. Returns comprehensive analysis
     """
     try:
-        # Save file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
+        # Spool the upload to a temp file in chunks
+        async with spool_upload(file) as upload:
+            tmp_file_path = upload.path
 
-        try:
             # Step 1: Parse PDF using comprehensive MCP
             print(f"Parsing PDF: {file.filename}")
             if MCP_AVAILABLE:
-                parsed_text = parse_pdf(tmp_file_path)
+                parsed_text = await run_cpu(parse_pdf, tmp_file_path)
             else:
-                parsed_text = parse_pdf_file(tmp_file_path)
+                parsed_text = await run_cpu(parse_pdf_file, tmp_file_path)
 
             # Step 2: Summarize claim
             print(f"Generating summary with {'Gemini' if use_gemini else 'OpenAI'}...")
             if MCP_AVAILABLE and use_gemini:
-                summary = summarize_claim_gemini(parsed_text)
+                summary = await run_io(summarize_claim_gemini, parsed_text)
             elif MCP_AVAILABLE:
-                summary = summarize_claim_openai(parsed_text)
+                summary = await run_io(summarize_claim_openai, parsed_text)
             else:
-                summary = summarize_claim_text(parsed_text)
+                summary = await summarize_claim_text(parsed_text)
 
             result = {
                 "success": True,
@@ -146,7 +135,7 @@ async def process_document_with_mcp(
             structured_data = None
             if extract_data and MCP_AVAILABLE and extract_structured_data:
                 print("Extracting structured data...")
-                structured_data_str = extract_structured_data(parsed_text, use_gemini=use_gemini)
+                structured_data_str = await run_io(extract_structured_data, parsed_text, use_gemini=use_gemini)
                 try:
                     structured_data = json.loads(structured_data_str)
                     result["structured_data"] = structured_data
@@ -156,7 +145,8 @@ async def process_document_with_mcp(
             # Step 4: Generate insurance email template
             if MCP_AVAILABLE and generate_insurance_email:
                 print("Generating insurance email template...")
-                email_str = generate_insurance_email(
+                email_str = await run_io(
+                    generate_insurance_email,
                     claim_summary=summary,
                     claim_data=json.dumps(structured_data) if structured_data else None,
                     use_gemini=use_gemini
@@ -169,10 +159,8 @@ async def process_document_with_mcp(
 
             return result
 
-        finally:
-            # Clean up temp file
-            os.unlink(tmp_file_path)
-
+    except (HTTPException, ExecutorSaturatedError):
+        raise
     except Exception as e:
         print(f"Error processing document: {str(e)}")
         import traceback
@@ -189,10 +177,6 @@ async def mcp_health_check():
     try:
         # Check if required libraries are available
         import pdfplumber
-        from openai import OpenAI
-
-        openai_key = os.getenv("OPENAI_API_KEY")
-        gemini_key = os.getenv("GEMINI_API_KEY")
 
         tools = [
             "parse_pdf",
@@ -211,8 +195,8 @@ async def mcp_health_check():
             "mcp_tools_available": MCP_AVAILABLE,
             "comprehensive_mcp": MCP_AVAILABLE,
             "tools": tools,
-            "openai_api_key_set": bool(openai_key),
-            "gemini_api_key_set": bool(gemini_key)
+            "openai_api_key_set": llm_gateway.is_configured("openai"),
+            "gemini_api_key_set": llm_gateway.is_configured("gemini")
         }
     except Exception as e:
         return {
@@ -234,7 +218,8 @@ async def mcp_estimate_damage(
         raise HTTPException(status_code=503, detail="MCP tools not available")
 
     try:
-        result_str = estimate_damage(
+        result_str = await run_cpu(
+            estimate_damage,
             incident_type=incident_type,
             damages_description=damages_description,
             existing_estimate=existing_estimate,
@@ -242,6 +227,8 @@ async def mcp_estimate_damage(
         )
         result = json.loads(result_str)
         return {"success": True, "estimate": result}
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error estimating damage: {str(e)}")
 
@@ -258,7 +245,8 @@ async def mcp_find_shops(
         raise HTTPException(status_code=503, detail="MCP tools not available")
 
     try:
-        result_str = find_repair_shops(
+        result_str = await run_io(
+            find_repair_shops,
             incident_type=incident_type,
             location=location,
             max_results=max_results,
@@ -266,6 +254,8 @@ async def mcp_find_shops(
         )
         result = json.loads(result_str)
         return {"success": True, "shops": result}
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error finding shops: {str(e)}")
 
@@ -277,11 +267,14 @@ async def mcp_validate_claim(claim_data: dict, check_pii: bool = True):
         raise HTTPException(status_code=503, detail="MCP tools not available")
 
     try:
-        result_str = validate_claim_compliance(
+        result_str = await run_cpu(
+            validate_claim_compliance,
             claim_data=json.dumps(claim_data),
             check_pii=check_pii
         )
         result = json.loads(result_str)
         return {"success": True, "validation": result}
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error validating claim: {str(e)}")
@@ -0,0 +1,83 @@
+"""
+Tests for per-claim conversation buffers persisted to SQLite
+Run from the backend directory: python -m pytest test_conversation_store.py
+"""
+import pytest
+
+from utils import conversation_store as conversation_module
+from utils.conversation_store import ConversationStore
+from utils.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    storage = SQLiteStorage(str(tmp_path / "claims.db"))
+    for claim_id in ("CLM-1", "CLM-2"):
+        storage.save_claim({
+            "claim_id": claim_id,
+            "incident_type": "Car Accident",
+            "date": "2025-01-08",
+            "location": "Nassau Street, Princeton, NJ",
+            "damages_description": "Rear bumper damage",
+            "status": "Open",
+            "created_at": "2025-01-08T10:00:00",
+            "updated_at": "2025-01-08T10:00:00"
+        })
+    monkeypatch.setattr(conversation_module, "storage", storage)
+    yield storage
+    storage.close()
+
+
+def chat(store: ConversationStore):
+    store.append("user", "Where is my estimate?", claim_id="CLM-1", session_id="web")
+    store.append("assistant", "Estimate is $4,500", claim_id="CLM-1", session_id="web")
+    store.append("user", "Any update?", claim_id="CLM-1", session_id="mobile")
+    store.append("user", "Other claim", claim_id="CLM-2", session_id="web")
+
+
+def messages(store: ConversationStore, claim_id: str):
+    return [entry["message"] for entry in store.get_messages(claim_id)]
+
+
+def test_clearing_a_claim_deletes_its_persisted_messages(storage):
+    store = ConversationStore()
+    chat(store)
+
+    assert store.clear("CLM-1") == 3
+
+    assert store.get_messages("CLM-1") == []
+    # Still gone once reloaded from storage (another worker or a restart)
+    assert ConversationStore().get_messages("CLM-1") == []
+    assert messages(ConversationStore(), "CLM-2") == ["Other claim"]
+    assert [entry["claim_id"] for entry in store.recent()] == ["CLM-2"]
+
+
+def test_clearing_one_session_of_a_claim(storage):
+    store = ConversationStore()
+    chat(store)
+
+    assert store.clear("CLM-1", "web") == 2
+
+    assert messages(store, "CLM-1") == ["Any update?"]
+    assert messages(ConversationStore(), "CLM-1") == ["Any update?"]
+
+
+def test_clearing_everything_only_resets_memory(storage):
+    store = ConversationStore()
+    chat(store)
+
+    assert store.clear() == 0
+
+    assert store.recent() == []
+    assert messages(store, "CLM-1") == ["Where is my estimate?", "Estimate is $4,500", "Any update?"]
+
+
+def test_without_persistence_nothing_is_deleted(storage):
+    store = ConversationStore(persist=False)
+    ConversationStore().append("user", "Persisted", claim_id="CLM-1")
+    store.append("user", "In memory", claim_id="CLM-1")
+
+    assert store.clear("CLM-1") == 0
+
+    assert store.get_messages("CLM-1") == []
+    assert messages(ConversationStore(), "CLM-1") == ["Persisted"]
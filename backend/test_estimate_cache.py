@@ -0,0 +1,87 @@
+"""
+Tests for memoized FinTrack estimates
+Run from the backend directory: python -m pytest test_estimate_cache.py
+"""
+import pytest
+
+from agents.fintrack_agent import FinTrackAgent
+from utils.estimate_cache import EstimateCache
+
+
+@pytest.fixture
+def agent():
+    return FinTrackAgent()
+
+
+def test_returns_cached_estimate(agent, make_claim):
+    claim = make_claim()
+
+    first = agent.calculate_estimate(claim)
+    second = agent.calculate_estimate(claim)
+
+    assert second is first
+    metrics = agent.estimate_cache.metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["hit_rate"]) == (1, 1, 0.5)
+
+
+@pytest.mark.parametrize("field, value", [
+    ("estimated_damage", "$9,000"),
+    ("incident_type", "Home Damage"),
+    ("damages_description", "Extensive damage, vehicle destroyed"),
+    ("confidence", 0.5),
+])
+def test_changed_field_recomputes(agent, make_claim, field, value):
+    first = agent.calculate_estimate(make_claim())
+
+    second = agent.calculate_estimate(make_claim(**{field: value}))
+
+    assert second is not first
+    assert second == FinTrackAgent().calculate_estimate(make_claim(**{field: value}))
+    assert agent.estimate_cache.metrics()["invalidations"] == 1
+
+
+def test_overrides_are_cached_separately(agent, make_claim):
+    claim = make_claim()
+
+    default = agent.calculate_estimate(claim)
+    severe = agent.calculate_estimate(claim, severity="severe")
+    covered = agent.calculate_estimate(claim, coverage_override=0.5)
+
+    assert covered.insurance_coverage == 0.5
+    assert len({id(default), id(severe), id(covered)}) == 3
+    assert agent.calculate_estimate(claim, coverage_override=0.5) is covered
+
+
+def test_rate_table_version_is_part_of_the_fingerprint(make_claim):
+    cache = EstimateCache()
+    claim = make_claim()
+    estimate = FinTrackAgent().calculate_estimate(claim)
+    cache.put(claim, "1.0.0", estimate)
+
+    assert cache.get(claim, "1.0.0") is estimate
+    assert cache.get(claim, "1.1.0") is None
+    assert cache.metrics()["invalidations"] == 1
+
+
+@pytest.mark.parametrize("coverage", [1.5, -0.2, float("nan")])
+def test_invalid_coverage_is_rejected_like_the_batch_path(agent, make_claim, coverage):
+    claim = make_claim()
+
+    with pytest.raises(ValueError):
+        agent.calculate_estimate(claim, coverage_override=coverage)
+    with pytest.raises(ValueError):
+        agent.estimate_batch([claim], coverage_override=coverage)
+
+    assert agent.estimate_cache.metrics()["entries"] == 0
+
+
+def test_evicts_least_recently_used(make_claim):
+    cache = EstimateCache(max_entries=2)
+    claims = [make_claim(f"CLM-{n}") for n in range(3)]
+    estimates = [FinTrackAgent().calculate_estimate(claim) for claim in claims]
+    for claim, estimate in zip(claims, estimates):
+        cache.put(claim, "1.0.0", estimate)
+
+    assert cache.get(claims[0], "1.0.0") is None
+    assert cache.get(claims[2], "1.0.0") is estimates[2]
+    assert cache.metrics()["evictions"] == 1
@@ -0,0 +1,91 @@
+"""
+Tests for FinTrack Monte Carlo payout distributions
+Run from the backend directory: python -m pytest test_fintrack_simulation.py
+"""
+import pytest
+
+from agents.fintrack_agent import fintrack_agent
+from agents.fintrack_simulation import sample_range, simulate_payouts
+
+SAMPLES = 20_000
+
+
+def assert_brackets(distribution, point):
+    for measure in ("damage", "payout", "deductible"):
+        points = distribution[measure]
+        assert points["p10"] <= points["p50"] <= points["p90"]
+    assert distribution["damage_range"]["min"] <= point <= distribution["damage_range"]["max"]
+    assert distribution["damage"]["p10"] <= point <= distribution["damage"]["p90"]
+
+
+def test_distribution_centers_on_stated_amount(make_claim):
+    claim = make_claim(estimated_damage="$4,500")
+    point = fintrack_agent.calculate_estimate(claim).estimated_damage
+
+    distribution = fintrack_agent.estimate_distribution(claim, samples=SAMPLES)["moderate"]
+
+    assert point == 4500
+    assert_brackets(distribution, point)
+    assert distribution["damage"]["p50"] == pytest.approx(point, rel=0.02)
+
+
+def test_distribution_without_stated_amount_uses_severity_range(make_claim):
+    claim = make_claim(estimated_damage=None, damages_description="Significant damage to the rear bumper")
+    point = fintrack_agent.calculate_estimate(claim).estimated_damage
+
+    distribution = fintrack_agent.estimate_distribution(claim, samples=SAMPLES)["moderate"]
+
+    assert distribution["damage_range"] == {"min": 2000.0, "max": 8000.0}
+    assert_brackets(distribution, point)
+
+
+def test_every_compared_severity_brackets_its_point_estimate(make_claim):
+    claim = make_claim(estimated_damage="$1,200")
+    severities = ["minor", "moderate", "severe", "total_loss"]
+
+    result = fintrack_agent.compare_estimates(claim, severities)
+
+    assert result.success
+    for severity in severities:
+        point = result.data["comparisons"][severity]["estimated_damage"]
+        assert_brackets(result.data["distributions"][severity], point)
+
+
+def test_severity_without_range_is_a_fixed_amount(make_claim):
+    claim = make_claim(incident_type="Theft", estimated_damage="$900")
+
+    distribution = next(iter(fintrack_agent.estimate_distribution(claim, samples=SAMPLES).values()))
+
+    assert distribution["damage"] == {"p10": 900.0, "p50": 900.0, "p90": 900.0}
+
+
+def test_prob_exceeds_policy_deductible(make_claim):
+    claim = make_claim(estimated_damage="$4,500")
+
+    def probability(deductible):
+        distribution = fintrack_agent.estimate_distribution(claim, deductible=deductible, samples=SAMPLES)["moderate"]
+        assert distribution["policy_deductible"] == deductible
+        return distribution["prob_exceeds_deductible"]
+
+    assert probability(0) == 1.0
+    assert probability(1_000_000) == 0.0
+    assert 0.4 < probability(4500) < 0.6
+
+
+def test_sample_range_scales_severity_range():
+    assert sample_range(5000, (2000, 8000)) == (2000, 8000)
+    assert sample_range(4500, (2000, 8000)) == pytest.approx((1800, 7200))
+    assert sample_range(700, None) == (700, 700)
+    assert sample_range(float("inf"), (2000, 8000)) == (float("inf"), float("inf"))
+
+
+def test_simulation_is_seeded():
+    first = simulate_payouts([(1000, 2000)], [0.8], samples=1000, seed=7)
+    second = simulate_payouts([(1000, 2000)], [0.8], samples=1000, seed=7)
+
+    assert first == second
+
+
+def test_rejects_no_samples():
+    with pytest.raises(ValueError):
+        simulate_payouts([(1000, 2000)], [0.8], samples=0)
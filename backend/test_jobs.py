@@ -0,0 +1,223 @@
+"""
+Tests for the background job queue on the memory and SQLite backends
+Run from the backend directory: python -m pytest test_jobs.py
+"""
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from utils.data_models import Job, JobStatus
+from utils.jobs import JOB_MAX_ATTEMPTS, JobQueue, MemoryJobBackend
+from utils.sqlite_jobs import SQLiteJobBackend
+
+# A worker on this host whose process does not exist
+DEAD_WORKER = f"{socket.gethostname()}:999999999"
+
+
+def wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryJobBackend()
+    return SQLiteJobBackend(str(tmp_path / "jobs.db"))
+
+
+@pytest.fixture
+def queues():
+    started = []
+
+    def make(backend, **options):
+        queue = JobQueue(backend, poll_seconds=0.05, **options)
+        started.append(queue)
+        return queue
+
+    yield make
+    for queue in started:
+        queue.close(timeout=5)
+
+
+def add_job(backend, job_id: str, **fields) -> Job:
+    job = Job(job_id=job_id, kind="test", **fields)
+    backend.add(job)
+    return job
+
+
+def keep_file(directory, name: str, age: float = 0) -> str:
+    path = str(directory / name)
+    with open(path, "wb") as f:
+        f.write(b"%PDF")
+    if age:
+        os.utime(path, (time.time() - age, time.time() - age))
+    return path
+
+
+def test_claims_highest_priority_then_oldest(backend):
+    add_job(backend, "J-LOW", priority=0, created_at="2025-01-01T00:00:00")
+    add_job(backend, "J-HIGH-NEW", priority=5, created_at="2025-01-03T00:00:00")
+    add_job(backend, "J-HIGH-OLD", priority=5, created_at="2025-01-02T00:00:00")
+
+    order = [backend.claim_next("w", set()).job_id for _ in range(3)]
+
+    assert order == ["J-HIGH-OLD", "J-HIGH-NEW", "J-LOW"]
+    assert backend.claim_next("w", set()) is None
+    claimed = backend.get("J-LOW")
+    assert (claimed.status, claimed.worker, claimed.attempts) == (JobStatus.RUNNING, "w", 1)
+
+
+def test_claim_skips_capped_tenants(backend):
+    add_job(backend, "J-A", tenant="a", priority=9)
+    add_job(backend, "J-B", tenant="b")
+
+    assert backend.claim_next("w", {"a"}).job_id == "J-B"
+    assert backend.claim_next("w", {"a"}) is None
+    assert backend.claim_next("w", set()).job_id == "J-A"
+
+
+def test_sqlite_claims_each_job_once_across_connections(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    backends = [SQLiteJobBackend(path) for _ in range(4)]
+    for n in range(60):
+        add_job(backends[0], f"J-{n:03d}")
+    claimed, lock = [], threading.Lock()
+
+    def worker(backend, name):
+        while True:
+            job = backend.claim_next(name, set())
+            if job is None:
+                return
+            with lock:
+                claimed.append(job.job_id)
+
+    threads = [
+        threading.Thread(target=worker, args=(backends[n % 4], f"w{n}")) for n in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == [f"J-{n:03d}" for n in range(60)]
+    assert {job.attempts for job in backends[0].list_jobs(limit=None)} == {1}
+
+
+def test_tenant_concurrency_cap(backend, queues):
+    release = threading.Event()
+    running = []
+
+    def handler(payload, context):
+        running.append(payload["n"])
+        release.wait(5)
+        return {"n": payload["n"]}
+
+    queue = queues(backend, workers=3, tenant_concurrency=1)
+    queue.register("test", handler)
+    jobs = [
+        queue.submit("test", {"n": 1}, tenant="a"),
+        queue.submit("test", {"n": 2}, tenant="a"),
+        queue.submit("test", {"n": 3}, tenant="b"),
+    ]
+
+    wait_for(lambda: len(running) == 2)
+    time.sleep(0.2)
+    assert sorted(running) == [1, 3]
+    assert queue.metrics()["running_by_tenant"] == {"a": 1, "b": 1}
+    assert queue.get(jobs[1].job_id).status == JobStatus.QUEUED
+
+    release.set()
+    wait_for(lambda: all(queue.get(job.job_id).status == JobStatus.COMPLETED for job in jobs))
+    assert queue.get(jobs[1].job_id).result == {"n": 2}
+
+
+def test_cancel_queued_job_deletes_its_upload(backend, queues, tmp_path):
+    calls = []
+    queue = queues(backend, workers=0)
+    queue.register("test", lambda payload, context: calls.append(payload) or {}, upload_dir=str(tmp_path))
+    upload = keep_file(tmp_path, "upload.pdf")
+    job = queue.submit("test", {"file_path": upload})
+
+    cancelled = queue.cancel(job.job_id)
+
+    assert cancelled.status == JobStatus.CANCELLED
+    assert cancelled.finished_at is not None
+    assert not os.path.exists(upload)
+    assert not calls
+    # Finished jobs are left as they are
+    assert queue.cancel(job.job_id).status == JobStatus.CANCELLED
+
+
+def test_cancel_running_job_stops_its_handler(backend, queues):
+    started = threading.Event()
+
+    def handler(payload, context):
+        started.set()
+        while not context.cancelled():
+            time.sleep(0.01)
+        return {"done": True}
+
+    queue = queues(backend, workers=1)
+    queue.register("test", handler)
+    job = queue.submit("test", {})
+    assert started.wait(5)
+
+    assert queue.cancel(job.job_id).status in (JobStatus.CANCELLING, JobStatus.CANCELLED)
+
+    wait_for(lambda: queue.get(job.job_id).status == JobStatus.CANCELLED)
+    assert queue.get(job.job_id).result is None
+    assert queue.metrics()["cancelled"] == 1
+
+
+def test_recovery_requeues_or_ends_jobs_of_dead_workers(backend, queues, tmp_path):
+    uploads = {name: keep_file(tmp_path, f"{name}.pdf") for name in ("retry", "failed", "cancelling", "alive")}
+    add_job(backend, "J-RETRY", status=JobStatus.RUNNING, worker=DEAD_WORKER, attempts=1,
+            payload={"file_path": uploads["retry"]})
+    add_job(backend, "J-FAILED", status=JobStatus.RUNNING, worker=DEAD_WORKER, attempts=JOB_MAX_ATTEMPTS,
+            payload={"file_path": uploads["failed"]})
+    add_job(backend, "J-CANCELLING", status=JobStatus.CANCELLING, worker=DEAD_WORKER, attempts=1,
+            payload={"file_path": uploads["cancelling"]})
+    add_job(backend, "J-ALIVE", status=JobStatus.RUNNING, worker=f"{socket.gethostname()}:{os.getppid()}",
+            attempts=1, payload={"file_path": uploads["alive"]})
+
+    queue = queues(backend, workers=0)
+    queue.register("test", lambda payload, context: {}, upload_dir=str(tmp_path))
+    queue.start()
+
+    retried = backend.get("J-RETRY")
+    assert (retried.status, retried.worker) == (JobStatus.QUEUED, None)
+    assert backend.get("J-FAILED").status == JobStatus.FAILED
+    assert backend.get("J-CANCELLING").status == JobStatus.CANCELLED
+    assert backend.get("J-ALIVE").status == JobStatus.RUNNING
+    assert {name for name, path in uploads.items() if os.path.exists(path)} == {"retry", "alive"}
+    assert queue.metrics()["requeued"] == 1
+
+
+def test_recovery_purges_old_jobs_and_sweeps_orphaned_uploads(backend, queues, tmp_path):
+    hour = 3600
+    purged = keep_file(tmp_path, "purged.pdf")
+    queued = keep_file(tmp_path, "queued.pdf", age=2 * hour)
+    orphan = keep_file(tmp_path, "orphan.pdf", age=2 * hour)
+    recent = keep_file(tmp_path, "recent.pdf")
+    add_job(backend, "J-OLD", status=JobStatus.COMPLETED, finished_at="2000-01-01T00:00:00",
+            payload={"file_path": purged})
+    add_job(backend, "J-QUEUED", payload={"file_path": queued})
+
+    queue = queues(backend, workers=0)
+    queue.register("test", lambda payload, context: {}, upload_dir=str(tmp_path))
+    queue.start()
+
+    assert backend.get("J-OLD") is None
+    assert [path for path in (purged, queued, orphan, recent) if os.path.exists(path)] == [queued, recent]
+    assert queue.metrics()["uploads_removed"] == 2
+
+
+def test_submit_rejects_unknown_kind(backend, queues):
+    with pytest.raises(ValueError):
+        queues(backend, workers=0).submit("unknown", {})
@@ -0,0 +1,162 @@
+"""
+Tests for the LLM gateway against a local stub provider
+Run from the backend directory: python -m pytest test_llm_gateway.py
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import llm_gateway as gateway_module
+from utils.llm_gateway import GeminiProvider, LLMError, LLMGateway, OpenAIProvider
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers completions from the server's scripted replies"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, so pooled connections are reused
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.requests.append({"path": self.path, "body": body, "port": self.client_address[1]})
+            status, payload, delay = server.replies.pop(0) if server.replies else (200, server.ok, 0)
+        if delay:
+            time.sleep(delay)
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+OPENAI_OK = {"choices": [{"message": {"content": "stub reply"}}], "usage": {"total_tokens": 3}}
+GEMINI_OK = {"candidates": [{"content": {"parts": [{"text": "stub "}, {"text": "reply"}]}}]}
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.replies = []
+    server.ok = OPENAI_OK
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def gateway(stub_server, monkeypatch):
+    monkeypatch.setattr(gateway_module, "LLM_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(gateway_module, "LLM_MAX_RETRIES", 2)
+    base_url = f"http://127.0.0.1:{stub_server.server_port}"
+    gateway = LLMGateway(providers=[
+        OpenAIProvider("test-key", base_url, "stub-model", max_concurrency=2),
+        GeminiProvider("test-key", base_url, "stub-gemini", max_concurrency=2)
+    ], default_provider="openai")
+    yield gateway
+    gateway.close()
+
+
+MESSAGES = [{"role": "system", "content": "Be brief"}, {"role": "user", "content": "Hi"}]
+
+
+def test_openai_completion(gateway, stub_server):
+    response = gateway.complete_sync(MESSAGES)
+
+    assert response.text == "stub reply"
+    assert response.usage == {"total_tokens": 3}
+    request = stub_server.requests[0]
+    assert request["path"] == "/chat/completions"
+    assert request["body"]["model"] == "stub-model"
+    assert request["body"]["messages"] == MESSAGES
+
+
+def test_gemini_completion(gateway, stub_server):
+    stub_server.ok = GEMINI_OK
+
+    response = gateway.complete_sync(MESSAGES, provider="gemini")
+
+    assert response.text == "stub reply"
+    request = stub_server.requests[0]
+    assert request["path"] == "/models/stub-gemini:generateContent"
+    assert request["body"]["systemInstruction"] == {"parts": [{"text": "Be brief"}]}
+    assert request["body"]["contents"] == [{"role": "user", "parts": [{"text": "Hi"}]}]
+
+
+def test_retries_retryable_status(gateway, stub_server):
+    stub_server.replies = [(503, {"error": "busy"}, 0), (429, {"error": "slow down"}, 0)]
+
+    response = gateway.complete_sync(MESSAGES)
+
+    assert response.text == "stub reply"
+    assert len(stub_server.requests) == 3
+    assert gateway.metrics()["openai"]["retries"] == 2
+    assert gateway.metrics()["openai"]["failures"] == 0
+
+
+def test_gives_up_after_max_retries(gateway, stub_server):
+    stub_server.replies = [(500, {"error": "down"}, 0)] * 3
+
+    with pytest.raises(LLMError) as error:
+        gateway.complete_sync(MESSAGES)
+
+    assert error.value.status_code == 500
+    assert len(stub_server.requests) == 3
+    assert gateway.metrics()["openai"]["failures"] == 1
+
+
+def test_does_not_retry_client_errors(gateway, stub_server):
+    stub_server.replies = [(400, {"error": "bad request"}, 0)]
+
+    with pytest.raises(LLMError) as error:
+        gateway.complete_sync(MESSAGES)
+
+    assert error.value.status_code == 400
+    assert len(stub_server.requests) == 1
+
+
+def test_timeout_is_retried_then_raised(gateway, stub_server, monkeypatch):
+    monkeypatch.setattr(gateway_module, "LLM_TIMEOUT", 0.2)
+    monkeypatch.setattr(gateway_module, "LLM_MAX_RETRIES", 1)
+    stub_server.replies = [(200, OPENAI_OK, 1.0)] * 2
+
+    with pytest.raises(LLMError, match="request failed"):
+        gateway.complete_sync(MESSAGES)
+
+    assert len(stub_server.requests) == 2
+    assert gateway.metrics()["openai"]["retries"] == 1
+
+
+def test_reuses_pooled_connection(gateway, stub_server):
+    for _ in range(5):
+        gateway.complete_sync(MESSAGES)
+
+    # Every request arrived over the same keep-alive connection
+    assert len({request["port"] for request in stub_server.requests}) == 1
+
+
+def test_concurrency_limit(gateway, stub_server):
+    stub_server.replies = [(200, OPENAI_OK, 0.2)] * 6
+
+    start = time.perf_counter()
+    futures = [gateway.submit(MESSAGES) for _ in range(6)]
+    results = [future.result(timeout=10) for future in futures]
+    elapsed = time.perf_counter() - start
+
+    assert [result.text for result in results] == ["stub reply"] * 6
+    # max_concurrency=2: six 0.2s requests take at least three rounds
+    assert elapsed >= 0.55
+    assert len({request["port"] for request in stub_server.requests}) <= 2
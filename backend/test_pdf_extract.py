@@ -0,0 +1,33 @@
+"""
+Tests for PDF page limits
+Run from the backend directory: python -m pytest test_pdf_extract.py
+"""
+import pytest
+
+from utils.pdf_extract import extract_pages, extract_text, iter_pages
+
+
+@pytest.mark.parametrize("max_pages", [0, -2])
+def test_page_limit_below_one_is_rejected(max_pages):
+    # Checked before the document is opened
+    with pytest.raises(ValueError):
+        extract_pages(b"not a pdf", max_pages=max_pages)
+    with pytest.raises(ValueError):
+        extract_text(b"not a pdf", max_pages=max_pages)
+    with pytest.raises(ValueError):
+        next(iter_pages(b"not a pdf", max_pages=max_pages))
+
+
+def test_process_claim_rejects_page_limit_below_one():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    response = TestClient(main.app).post(
+        "/api/process-claim",
+        files={"file": ("report.pdf", b"%PDF-1.4", "application/pdf")},
+        data={"max_pages": "-2"}
+    )
+
+    assert response.status_code == 400
+    assert "max_pages" in response.json()["detail"]
@@ -0,0 +1,137 @@
+"""
+Tests for incremental portfolio analytics
+Run from the backend directory: python -m pytest test_portfolio.py
+"""
+import sys
+
+import pytest
+
+from agents.fintrack_agent import FinTrackAgent
+from utils import portfolio as portfolio_module
+from utils.data_models import ClaimStatus
+from utils.portfolio import PortfolioStats
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = PortfolioStats()
+    # FinTrackAgent reports estimates to the module's singleton
+    monkeypatch.setattr(sys.modules["agents.fintrack_agent"], "portfolio", stats)
+    return stats
+
+
+def test_totals_follow_claim_writes_and_estimates(stats, make_claim):
+    agent = FinTrackAgent()
+    claims = [
+        make_claim("CLM-1"),
+        make_claim("CLM-2", incident_type="Home Damage", estimated_damage="$20,000", created_at="2025-02-01T09:00:00"),
+        make_claim("CLM-3", estimated_damage=None, damages_description="Scratches"),
+    ]
+    for claim in claims:
+        stats.observe_claim(claim)
+    estimates = [agent.calculate_estimate(claim) for claim in claims]
+
+    claims[0].status = ClaimStatus.CLOSED
+    stats.observe_claim(claims[0])
+    snapshot = stats.snapshot(bucket="month")
+
+    assert snapshot["claims"] == snapshot["estimated_claims"] == 3
+    assert snapshot["estimated_damage"] == pytest.approx(sum(e.estimated_damage for e in estimates))
+    assert snapshot["payout"] == pytest.approx(sum(e.payout_after_deductible for e in estimates))
+    assert snapshot["by_status"]["Closed"]["claims"] == 1
+    assert snapshot["by_status"]["Open"]["claims"] == 2
+    assert snapshot["by_incident_type"]["Home Damage"]["estimated_damage"] == 20000
+    assert sum(group["claims"] for group in snapshot["by_severity"].values()) == 3
+    assert {month: rollup["claims"] for month, rollup in snapshot["rollups"].items()} == {"2025-01": 2, "2025-02": 1}
+
+
+def test_changed_inputs_drop_amounts_until_reestimated(stats, make_claim):
+    agent = FinTrackAgent()
+    claim = make_claim()
+    agent.calculate_estimate(claim)
+
+    edited = make_claim(estimated_damage="$9,000")
+    stats.observe_claim(edited)
+    assert stats.snapshot()["estimated_claims"] == 0
+    assert stats.snapshot()["claims"] == 1
+
+    agent.calculate_estimate(edited)
+    assert stats.snapshot()["estimated_damage"] == 9000
+
+    # Back to the original inputs: the cached estimate is served and still counted
+    stats.observe_claim(claim)
+    agent.calculate_estimate(claim)
+    assert stats.snapshot()["estimated_damage"] == 4500
+
+
+@pytest.mark.parametrize("stated", ["inf", "-inf", "nan", "1e400"])
+def test_non_finite_amounts_leave_the_claim_unpriced(stats, make_claim, stated):
+    claim = make_claim(estimated_damage=stated)
+
+    # Pricing still succeeds, as in the batch path
+    estimate = FinTrackAgent().calculate_estimate(claim)
+    batch = FinTrackAgent().estimate_batch([claim])
+
+    assert str(estimate.estimated_damage) == str(float(batch.estimated_damage[0]))
+    snapshot = stats.snapshot()
+    assert snapshot["claims"] == 1
+    assert snapshot["estimated_claims"] == 0
+    assert snapshot["estimated_damage"] == 0
+    assert stats.metrics()["unpriced_estimates"] == 1
+
+
+def test_seed_skips_non_finite_amounts(stats, make_claim):
+    claims = [make_claim("CLM-1"), make_claim("CLM-2", estimated_damage="inf"), make_claim("CLM-3", estimated_damage="nan")]
+    batch = FinTrackAgent().estimate_batch(claims)
+
+    added = stats.seed(
+        claims,
+        batch.estimated_damage.tolist(),
+        batch.payout_after_deductible.tolist(),
+        batch.deductible.tolist(),
+        [batch.severity(index) for index in range(len(batch))]
+    )
+
+    assert added == 3
+    snapshot = stats.snapshot()
+    assert (snapshot["claims"], snapshot["estimated_claims"], snapshot["estimated_damage"]) == (3, 1, 4500)
+
+
+def test_bookkeeping_errors_never_reach_the_caller(stats, make_claim, monkeypatch):
+    def broken(claim):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(portfolio_module, "estimate_inputs", broken)
+
+    estimate = FinTrackAgent().calculate_estimate(make_claim())
+    stats.observe_claim(make_claim())
+
+    assert estimate.estimated_damage == 4500
+    assert stats.metrics()["errors"] == 2
+    assert stats.snapshot()["claims"] == 0
+
+
+def test_unknown_bucket(stats):
+    with pytest.raises(ValueError):
+        stats.snapshot(bucket="year")
+
+
+def test_startup_seed_skips_invalid_rows(stats, monkeypatch):
+    import main
+
+    def record(claim_id, **incident_data):
+        return {
+            "claim_id": claim_id,
+            "status": "Open",
+            "incident_data": {"type": "Car Accident", "date": "2025-01-08", "location": "Princeton, NJ", **incident_data},
+            "damage_data": {"description": "Rear bumper damage", "estimated_damage": "$4,500"},
+            "created_at": "2025-01-08T10:00:00"
+        }
+
+    batches = [[record("CLM-1"), record("CLM-BAD", confidence="high")], [record("CLM-2")]]
+    monkeypatch.setattr(main.storage, "iter_claims", lambda columns=None: iter(batches))
+    monkeypatch.setattr(main, "portfolio", stats)
+
+    assert main._seed_portfolio() == {"seeded": 2, "skipped": 1}
+    assert stats.snapshot()["claims"] == 2
+    assert stats.metrics()["skipped_claims"] == 1
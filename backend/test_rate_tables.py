@@ -0,0 +1,80 @@
+"""
+Tests for rate table validation and hot reloading
+Run from the backend directory: python -m pytest test_rate_tables.py
+"""
+import json
+import os
+
+import pytest
+
+from utils.rate_tables import RATE_TABLES_PATH, RateTable, RateTableStore
+
+with open(RATE_TABLES_PATH, "r", encoding="utf-8") as f:
+    BASE_TABLE = json.load(f)
+
+
+def table_with(version: str, **car_accident) -> dict:
+    data = json.loads(json.dumps(BASE_TABLE))
+    data["version"] = version
+    data["incident_types"]["Car Accident"].update(car_accident)
+    return data
+
+
+def write(path, content, bump: int):
+    path.write_text(content if isinstance(content, str) else json.dumps(content))
+    # Distinct mtimes even on coarse-grained filesystems
+    os.utime(path, ns=(bump * 10**9, bump * 10**9))
+
+
+@pytest.mark.parametrize("car_accident", [
+    {"severity_thresholds": [5000]},
+    {"severity_thresholds": [[5000]]},
+    {"severity_thresholds": {"5000": "moderate"}},
+    {"severity_thresholds": [["high", "severe"]]},
+    {"damage_ranges": [[500, 2000]]},
+])
+def test_malformed_incident_rates_raise_value_error(car_accident):
+    with pytest.raises(ValueError):
+        RateTable(table_with("2.0.0", **car_accident))
+
+
+@pytest.mark.parametrize("keywords", [{"severe": "total"}, {"severe": [1, 2]}, {"severe": None}])
+def test_malformed_severity_keywords_raise_value_error(keywords):
+    data = table_with("2.0.0")
+    data["severity_keywords"] = keywords
+
+    with pytest.raises(ValueError):
+        RateTable(data)
+
+
+@pytest.mark.parametrize("suffix, content", [
+    (".json", table_with("2.0.0", severity_thresholds=[5000])),
+    (".json", "{not json"),
+    (".yaml", "version: 2.0.0\nincident_types: [unclosed"),
+])
+def test_invalid_file_keeps_the_previous_table(tmp_path, suffix, content):
+    path = tmp_path / f"rates{suffix}"
+    write(path, table_with("1.0.0"), bump=1)
+    store = RateTableStore(str(path), check_seconds=0)
+
+    write(path, content, bump=2)
+    table = store.current()
+
+    assert table.version == "1.0.0"
+    assert table.estimate("Car Accident", "Bumper damage", "$4,500")["severity"] == "moderate"
+    assert store.metrics()["failed_reloads"] == 1
+    with pytest.raises(ValueError):
+        store.reload()
+
+
+def test_valid_file_replaces_the_table(tmp_path):
+    path = tmp_path / "rates.json"
+    write(path, table_with("1.0.0"), bump=1)
+    store = RateTableStore(str(path), check_seconds=0)
+
+    write(path, table_with("1.1.0", severity_thresholds=[[1000, "moderate"], [4000, "severe"]]), bump=2)
+    table = store.current()
+
+    assert table.version == "1.1.0"
+    assert table.severity_thresholds["Car Accident"] == ((4000, "severe"), (1000, "moderate"))
+    assert table.estimate("Car Accident", "Bumper damage", "$4,500")["severity"] == "severe"
@@ -0,0 +1,56 @@
+"""
+Tests for SQLite claim counts
+Run from the backend directory: python -m pytest test_sqlite_storage.py
+"""
+import pytest
+
+from utils.storage import StorageBackend
+from utils.sqlite_storage import SQLiteStorage
+
+
+def claim_data(claim_id: str, status: str, incident_type: str) -> dict:
+    return {
+        "claim_id": claim_id,
+        "incident_type": incident_type,
+        "date": "2025-01-08",
+        "location": "Nassau Street, Princeton, NJ",
+        "parties_involved": [],
+        "damages_description": "Rear bumper damage",
+        "estimated_damage": "$4,500",
+        "confidence": 0.9,
+        "status": status,
+        "summary": "Rear-end collision",
+        "created_at": f"2025-01-08T10:00:{claim_id[-2:]}",
+        "updated_at": f"2025-01-08T10:00:{claim_id[-2:]}"
+    }
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "claims.db"))
+    yield storage
+    storage.close()
+
+
+def test_count_claims_groups_by_status_and_type(storage):
+    storage.save_claims([
+        claim_data("CLM-01", "Open", "Car Accident"),
+        claim_data("CLM-02", "Open", "Theft"),
+        claim_data("CLM-03", "Closed", "Car Accident"),
+        claim_data("CLM-04", "Processing", "Car Accident"),
+    ])
+    storage.update_claim("CLM-02", {"status": "Closed"})
+
+    counts = storage.count_claims()
+
+    assert counts == {
+        "total": 4,
+        "by_status": {"Open": 1, "Closed": 2, "Processing": 1},
+        "by_type": {"Car Accident": 3, "Theft": 1}
+    }
+    # Same answer as walking every claim
+    assert counts == StorageBackend.count_claims(storage)
+
+
+def test_count_claims_empty(storage):
+    assert storage.count_claims() == {"total": 0, "by_status": {}, "by_type": {}}
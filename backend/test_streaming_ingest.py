@@ -0,0 +1,95 @@
+"""
+Tests for streamed document ingestion in ClaimPilotAgent
+Run from the backend directory: python -m pytest test_streaming_ingest.py
+"""
+import sys
+import threading
+
+import pytest
+
+from agents.claimpilot_agent import ClaimPilotAgent
+from utils.data_models import ClaimStatus
+
+EARLY_PAGE = (
+    "POLICE REPORT\n"
+    "Incident: Car accident on Nassau Street, Princeton, NJ on 01/08/2025.\n"
+    "The rear bumper was damaged when the vehicle was struck from behind. Damage to the trunk.\n"
+    "Driver: John Smith\n"
+)
+LATE_PAGE = "Witness: Jane Doe\nRepair estimate: $4,500.00\n"
+
+
+@pytest.fixture
+def agent():
+    agent = ClaimPilotAgent()
+    # Template summaries only: no LLM calls
+    agent._wants_ai_summary = lambda claim: False
+    return agent
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    """Serve the report's pages, holding the late page until released"""
+    release = threading.Event()
+    parser = sys.modules["agents.claimpilot_agent"].pdf_parser
+
+    def iter_file_pages(path, file_name=None):
+        yield EARLY_PAGE
+        release.wait(5)
+        yield LATE_PAGE
+
+    monkeypatch.setattr(parser, "iter_file_pages", iter_file_pages)
+    return release
+
+
+def test_late_pages_are_stored_as_an_updated_claim(agent, pages):
+    claim = agent.ingest_document(file_path="report.txt", file_name="report.txt", stream=True)
+    assert claim.estimated_damage is None
+    assert agent.claim_cache.get(claim.claim_id) is None
+    agent.get_claim(claim.claim_id)  # cached as created
+
+    pages.set()
+    parsed = agent.finish_ingest(claim.claim_id, timeout=5)
+
+    assert parsed is not claim
+    assert claim.estimated_damage is None
+    assert parsed.estimated_damage == "$4,500.00"
+    assert "Estimated damage is $4,500.00" in parsed.summary
+    assert LATE_PAGE.strip() in parsed.raw_text
+    assert agent.get_claim(claim.claim_id).estimated_damage == "$4,500.00"
+    assert agent.to_payload(parsed)["parse"]["complete"] is True
+    assert not agent._pending_ingests
+
+
+def test_changes_made_during_the_parse_are_kept(agent, pages):
+    claim = agent.ingest_document(file_path="report.txt", file_name="report.txt", stream=True)
+
+    agent.update_claim_status(claim.claim_id, ClaimStatus.PENDING_INFO)
+    pages.set()
+    parsed = agent.finish_ingest(claim.claim_id, timeout=5)
+
+    assert parsed.status == ClaimStatus.PENDING_INFO
+    assert parsed.estimated_damage == "$4,500.00"
+
+
+def test_finished_parses_are_forgotten_without_a_waiter(agent, pages):
+    claim = agent.ingest_document(file_path="report.txt", file_name="report.txt", stream=True)
+    future = agent._pending_ingests[claim.claim_id]
+
+    pages.set()
+    future.result(timeout=5)
+
+    assert claim.claim_id not in agent._pending_ingests
+    assert agent.finish_ingest(claim.claim_id).estimated_damage == "$4,500.00"
+
+
+def test_parse_reports_are_bounded(agent, monkeypatch):
+    monkeypatch.setattr(sys.modules["agents.claimpilot_agent"], "PARSE_REPORT_MAX_ENTRIES", 2)
+
+    for claim_id in ("C-1", "C-2", "C-3"):
+        agent._record_parse_report(claim_id, {"complete": True})
+    agent._record_parse_report("C-2", {"complete": True})
+    agent._record_parse_report("C-4", {"complete": True})
+
+    assert list(agent.parse_reports) == ["C-2", "C-4"]
+    assert agent.finish_ingest("C-1") is None
@@ -0,0 +1,198 @@
+"""
+Tests for the write-behind queue against a SQLite stand-in for Supabase
+Run from the backend directory: python -m pytest test_write_behind.py
+"""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from utils.write_behind import WriteBehindQueue
+
+
+class SQLiteClient:
+    """
+    Minimal stand-in for the Supabase client's table().upsert()/insert() calls
+
+    Counts the requests it receives and can be told to fail the next ones.
+    """
+
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.conn.execute("CREATE TABLE claims (claim_id TEXT PRIMARY KEY, status TEXT)")
+        self.conn.execute("CREATE TABLE chat_messages (claim_id TEXT, content TEXT)")
+        self.lock = threading.Lock()
+        self.requests = []  # (table, op, row count)
+        self.fail_next = 0
+
+    def table(self, name: str) -> "SQLiteTable":
+        return SQLiteTable(self, name)
+
+    def rows(self, sql: str) -> list:
+        with self.lock:
+            return self.conn.execute(sql).fetchall()
+
+
+class SQLiteTable:
+    def __init__(self, client: SQLiteClient, name: str):
+        self.client = client
+        self.name = name
+        self.op = None
+        self.data = []
+        self.on_conflict = None
+
+    def upsert(self, rows, on_conflict=None):
+        self.op, self.data, self.on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def insert(self, rows):
+        self.op, self.data = "insert", rows
+        return self
+
+    def execute(self):
+        client = self.client
+        with client.lock:
+            client.requests.append((self.name, self.op, len(self.data)))
+            if client.fail_next:
+                client.fail_next -= 1
+                raise ConnectionError("database unavailable")
+            for row in self.data:
+                columns = ", ".join(row)
+                placeholders = ", ".join("?" for _ in row)
+                sql = f"INSERT INTO {self.name} ({columns}) VALUES ({placeholders})"
+                if self.op == "upsert":
+                    updates = ", ".join(f"{column} = excluded.{column}" for column in row if column != self.on_conflict)
+                    sql += f" ON CONFLICT({self.on_conflict}) DO UPDATE SET {updates}"
+                client.conn.execute(sql, list(row.values()))
+            client.conn.commit()
+
+
+@pytest.fixture
+def client():
+    return SQLiteClient()
+
+
+@pytest.fixture
+def make_queue():
+    queues = []
+
+    def make(**kwargs):
+        kwargs.setdefault("flush_interval", 60.0)
+        queue = WriteBehindQueue(**kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close(timeout=5)
+
+
+def claim_row(claim_id: str, status: str) -> dict:
+    return {"claim_id": claim_id, "status": status}
+
+
+def test_coalesces_upserts_of_the_same_row(client, make_queue):
+    queue = make_queue()
+    for status in ["Open", "Processing", "Pending Info", "Processing", "Closed"]:
+        queue.upsert(client, "claims", claim_row("CLM-1", status), on_conflict="claim_id")
+    queue.upsert(client, "claims", claim_row("CLM-2", "Open"), on_conflict="claim_id")
+
+    assert queue.flush(timeout=5)
+
+    assert client.rows("SELECT claim_id, status FROM claims ORDER BY claim_id") == [
+        ("CLM-1", "Closed"), ("CLM-2", "Open")
+    ]
+    assert client.requests == [("claims", "upsert", 2)]
+    metrics = queue.metrics()
+    assert metrics["coalesced"] == 4
+    assert metrics["written"] == 2
+
+
+def test_inserts_are_not_coalesced(client, make_queue):
+    queue = make_queue()
+    queue.insert(client, "chat_messages", {"claim_id": "CLM-1", "content": "hi"})
+    queue.insert(client, "chat_messages", {"claim_id": "CLM-1", "content": "hi"})
+
+    assert queue.flush(timeout=5)
+
+    assert len(client.rows("SELECT * FROM chat_messages")) == 2
+    assert queue.metrics()["coalesced"] == 0
+
+
+def test_flushes_when_batch_is_full(client, make_queue):
+    queue = make_queue(max_batch=3)
+    for n in range(3):
+        queue.upsert(client, "claims", claim_row(f"CLM-{n}", "Open"), on_conflict="claim_id")
+
+    deadline = time.monotonic() + 5
+    while queue.metrics()["written"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert client.rows("SELECT COUNT(*) FROM claims") == [(3,)]
+    assert client.requests == [("claims", "upsert", 3)]
+
+
+def test_flushes_after_interval(client, make_queue):
+    queue = make_queue(flush_interval=0.05)
+    queue.upsert(client, "claims", claim_row("CLM-1", "Open"), on_conflict="claim_id")
+
+    deadline = time.monotonic() + 5
+    while queue.metrics()["written"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert client.rows("SELECT claim_id FROM claims") == [("CLM-1",)]
+
+
+def test_close_drains_pending_writes(client, make_queue):
+    queue = make_queue()
+    for n in range(5):
+        queue.upsert(client, "claims", claim_row(f"CLM-{n}", "Open"), on_conflict="claim_id")
+    queue.insert(client, "chat_messages", {"claim_id": "CLM-0", "content": "hi"})
+
+    assert queue.close(timeout=5) == 0
+
+    assert client.rows("SELECT COUNT(*) FROM claims") == [(5,)]
+    assert client.rows("SELECT COUNT(*) FROM chat_messages") == [(1,)]
+    assert queue.metrics()["pending"] == 0
+
+
+def test_retries_failed_batches(client, make_queue):
+    queue = make_queue(retry_backoff=0.01, max_retries=3)
+    client.fail_next = 2
+    queue.upsert(client, "claims", claim_row("CLM-1", "Open"), on_conflict="claim_id")
+    queue.upsert(client, "claims", claim_row("CLM-2", "Open"), on_conflict="claim_id")
+
+    assert queue.flush(timeout=5)
+
+    assert client.rows("SELECT COUNT(*) FROM claims") == [(2,)]
+    metrics = queue.metrics()
+    assert metrics["retries"] == 4  # two rows, two failed attempts each
+    assert metrics["failed"] == 0
+    assert metrics["written"] == 2
+
+
+def test_drops_rows_after_max_retries(client, make_queue):
+    queue = make_queue(retry_backoff=0.01, max_retries=2)
+    client.fail_next = 100
+    queue.upsert(client, "claims", claim_row("CLM-1", "Open"), on_conflict="claim_id")
+
+    assert queue.flush(timeout=5)
+
+    assert len(client.requests) == 3  # first attempt + 2 retries
+    metrics = queue.metrics()
+    assert metrics["failed"] == 1
+    assert metrics["pending"] == 0
+    assert client.rows("SELECT COUNT(*) FROM claims") == [(0,)]
+
+
+def test_newer_write_replaces_failed_one(client, make_queue):
+    queue = make_queue(retry_backoff=0.2)
+    client.fail_next = 1
+    queue.upsert(client, "claims", claim_row("CLM-1", "Open"), on_conflict="claim_id")
+    queue.flush(timeout=0.1)
+    queue.upsert(client, "claims", claim_row("CLM-1", "Closed"), on_conflict="claim_id")
+
+    assert queue.flush(timeout=5)
+
+    assert client.rows("SELECT status FROM claims") == [("Closed",)]
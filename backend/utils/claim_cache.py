@@ -0,0 +1,120 @@
+"""
+Read-through cache for claim lookups
+
+ClaimPilotAgent.get_claim() checks this cache first and only goes to claim
+storage (or the in-memory store) on a miss.
+
+Entries live for CLAIM_CACHE_TTL_SECONDS and at most CLAIM_CACHE_MAX_ENTRIES
+are kept (least recently used are evicted). Writes invalidate explicitly:
+status updates, claim creation and every upsert.
+
+Staleness is reported as the age of the entries served from the cache.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from utils.data_models import Claim
+
+DEFAULT_TTL = float(os.getenv("CLAIM_CACHE_TTL_SECONDS", "30"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("CLAIM_CACHE_MAX_ENTRIES", "1024"))
+
+
+class ClaimCache:
+    """TTL + LRU cache of Claim objects by claim ID"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            ttl: Seconds before an entry expires
+            max_entries: Maximum entries kept
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # claim_id -> (claim, cached_at)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "invalidations": 0, "expirations": 0, "evictions": 0}
+        self._hit_age_total = 0.0
+        self._hit_age_max = 0.0
+
+    def get(self, claim_id: str) -> Optional[Claim]:
+        """
+        Look up a cached claim
+
+        Args:
+            claim_id: Claim identifier
+
+        Returns:
+            Cached claim, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(claim_id)
+            if entry is not None:
+                claim, cached_at = entry
+                age = now - cached_at
+                if age < self.ttl:
+                    self._entries.move_to_end(claim_id)
+                    self.stats["hits"] += 1
+                    self._hit_age_total += age
+                    self._hit_age_max = max(self._hit_age_max, age)
+                    return claim
+                del self._entries[claim_id]
+                self.stats["expirations"] += 1
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, claim: Claim):
+        """
+        Cache a claim, evicting least recently used entries
+
+        Args:
+            claim: Claim loaded from storage
+        """
+        with self._lock:
+            self._entries[claim.claim_id] = (claim, time.monotonic())
+            self._entries.move_to_end(claim.claim_id)
+            self.stats["sets"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, claim_id: str):
+        """
+        Drop a claim after it was written so the next read reloads it
+
+        Args:
+            claim_id: Claim identifier
+        """
+        with self._lock:
+            if self._entries.pop(claim_id, None) is not None:
+                self.stats["invalidations"] += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict:
+        """
+        Get cache size, hit rate and staleness
+
+        Returns:
+            Dictionary of cache metrics
+        """
+        now = time.monotonic()
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            ages = [now - cached_at for _, cached_at in self._entries.values()]
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl,
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+                "avg_hit_age_seconds": round(self._hit_age_total / self.stats["hits"], 3) if self.stats["hits"] else 0.0,
+                "max_hit_age_seconds": round(self._hit_age_max, 3),
+                "oldest_entry_age_seconds": round(max(ages), 3) if ages else 0.0
+            }
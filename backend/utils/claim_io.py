@@ -0,0 +1,301 @@
+"""
+Bulk claim import/export formats
+
+Claims are exchanged as flat Claim records (the /api/claims/{id} shape) in
+one of three formats:
+
+- jsonl: one JSON object per line
+- parquet: Parquet file, one row group per batch
+- arrow: Arrow IPC stream, one record batch per batch
+
+Encoding is a generator over batches of Claim JSON texts that yields bytes
+as each batch is written, so an export holds one batch in memory however
+many claims it covers. Parquet and Arrow batches are parsed by pyarrow's
+JSON reader, so claims are never decoded into Python objects. Decoding
+reads a file in chunks and validates each chunk in one pass through a
+pydantic TypeAdapter; invalid records are reported by position and the
+rest of the chunk is kept.
+
+Parquet and Arrow need pyarrow.
+"""
+import io
+import os
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from utils.data_models import Claim
+
+FORMATS = ("jsonl", "parquet", "arrow")
+
+MEDIA_TYPES = {
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+EXTENSIONS = {
+    "jsonl": ".jsonl",
+    "parquet": ".parquet",
+    "arrow": ".arrows",
+}
+
+# Claims per validation chunk when importing
+IMPORT_CHUNK_SIZE = int(os.getenv("CLAIM_IMPORT_CHUNK_SIZE", "5000"))
+
+_claims_adapter = TypeAdapter(List[Claim])
+
+
+def format_from_filename(file_name: str) -> Optional[str]:
+    """
+    Guess the format from a file extension
+
+    Args:
+        file_name: File name (.jsonl/.ndjson, .parquet, .arrow/.arrows/.ipc)
+
+    Returns:
+        Format name, or None if the extension is not recognised
+    """
+    extension = os.path.splitext(file_name or "")[1].lower()
+    return {
+        ".jsonl": "jsonl", ".ndjson": "jsonl",
+        ".parquet": "parquet",
+        ".arrow": "arrow", ".arrows": "arrow", ".ipc": "arrow",
+    }.get(extension)
+
+
+def check_format(fmt: str) -> str:
+    """
+    Validate a format name
+
+    Raises:
+        ValueError: If the format is unknown
+        RuntimeError: If the format needs pyarrow and it is not installed
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt} (expected one of {', '.join(FORMATS)})")
+    if fmt != "jsonl":
+        _arrow()
+    return fmt
+
+
+def _arrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise RuntimeError("Parquet and Arrow formats need pyarrow. Install it with: pip install pyarrow")
+
+
+def claim_schema():
+    """Arrow schema of a Claim record"""
+    pa = _arrow()
+    party = pa.struct([
+        ("name", pa.string()),
+        ("role", pa.string()),
+        ("contact", pa.string()),
+        ("insurance_info", pa.string()),
+    ])
+    return pa.schema([
+        ("claim_id", pa.string()),
+        ("incident_type", pa.string()),
+        ("date", pa.string()),
+        ("location", pa.string()),
+        ("parties_involved", pa.list_(party)),
+        ("damages_description", pa.string()),
+        ("estimated_damage", pa.string()),
+        ("confidence", pa.float64()),
+        ("status", pa.string()),
+        ("summary", pa.string()),
+        ("raw_text", pa.string()),
+        ("created_at", pa.string()),
+        ("updated_at", pa.string()),
+    ])
+
+
+class _ChunkSink:
+    """Write-only file object that hands back what was written since the last drain"""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def encode_claims(batches: Iterable[List[str]], fmt: str) -> Iterator[bytes]:
+    """
+    Encode batches of claims, yielding bytes after every batch
+
+    Args:
+        batches: Lists of Claim JSON texts, one object each
+        fmt: Output format
+
+    Yields:
+        Encoded bytes; concatenated they form one file
+
+    Raises:
+        ValueError: If the format is unknown
+        RuntimeError: If the format needs pyarrow and it is not installed
+    """
+    check_format(fmt)
+    if fmt == "jsonl":
+        for batch in batches:
+            if batch:
+                yield ("\n".join(batch) + "\n").encode("utf-8")
+        return
+
+    pa = _arrow()
+    import pyarrow.json as pa_json
+    schema = claim_schema()
+    parse_options = pa_json.ParseOptions(explicit_schema=schema, unexpected_field_behavior="ignore")
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        for batch in batches:
+            if batch:
+                lines = ("\n".join(batch) + "\n").encode("utf-8")
+                table = pa_json.read_json(
+                    io.BytesIO(lines),
+                    read_options=pa_json.ReadOptions(block_size=len(lines) + 1, use_threads=False),
+                    parse_options=parse_options
+                )
+                writer.write_table(table)
+                data = sink.drain()
+                if data:
+                    yield data
+    finally:
+        writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def _read_jsonl(source: IO[bytes], chunk_size: int) -> Iterator[Tuple[int, List[bytes]]]:
+    """(offset of first line, non-blank lines) chunks of a JSONL file"""
+    chunk: List[bytes] = []
+    offset = 0
+    for line in source:
+        line = line.strip()
+        if not line:
+            continue
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield offset, chunk
+            offset += len(chunk)
+            chunk = []
+    if chunk:
+        yield offset, chunk
+
+
+def _read_arrow(source: IO[bytes], fmt: str, chunk_size: int) -> Iterator[Tuple[int, List[Dict]]]:
+    """(offset of first row, row dicts) chunks of a Parquet or Arrow IPC file"""
+    pa = _arrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(source).iter_batches(batch_size=chunk_size)
+    else:
+        batches = pa.ipc.open_stream(source)
+
+    offset = 0
+    for batch in batches:
+        rows = batch.to_pylist()
+        for start in range(0, len(rows), chunk_size):
+            yield offset + start, rows[start:start + chunk_size]
+        offset += len(rows)
+
+
+def _validate(chunk: List, is_json: bool) -> Tuple[List[Claim], Dict[int, str]]:
+    """Validate a chunk in one pass, retrying without the invalid records"""
+    positions = list(range(len(chunk)))
+    errors: Dict[int, str] = {}
+    while chunk:
+        try:
+            if is_json:
+                claims = _claims_adapter.validate_json(b"[" + b",".join(chunk) + b"]")
+            else:
+                claims = _claims_adapter.validate_python(chunk)
+        except ValidationError as e:
+            bad: Dict[int, str] = {}
+            for error in e.errors():
+                if error["loc"] and isinstance(error["loc"][0], int):
+                    field = ".".join(str(part) for part in error["loc"][1:])
+                    bad.setdefault(error["loc"][0], f"{field}: {error['msg']}" if field else error["msg"])
+            if not bad or max(bad) >= len(chunk):
+                # Malformed JSON (or a line holding several values) is not
+                # attributable to one record
+                return _validate_each(chunk, positions, errors, is_json)
+            for index, message in bad.items():
+                errors[positions[index]] = message
+            chunk = [record for index, record in enumerate(chunk) if index not in bad]
+            positions = [position for index, position in enumerate(positions) if index not in bad]
+            continue
+
+        if len(claims) != len(chunk):
+            # A line held more than one JSON value
+            return _validate_each(chunk, positions, errors, is_json)
+        return claims, errors
+    return [], errors
+
+
+def _validate_each(
+    chunk: List,
+    positions: List[int],
+    errors: Dict[int, str],
+    is_json: bool
+) -> Tuple[List[Claim], Dict[int, str]]:
+    """Validate records one at a time"""
+    claims = []
+    for record, position in zip(chunk, positions):
+        try:
+            claims.append(Claim.model_validate_json(record) if is_json else Claim.model_validate(record))
+        except ValidationError as e:
+            errors[position] = e.errors()[0]["msg"]
+    return claims, errors
+
+
+def decode_claims(
+    source: IO[bytes],
+    fmt: str,
+    chunk_size: int = IMPORT_CHUNK_SIZE
+) -> Iterator[Tuple[List[Claim], List[Dict[str, Any]]]]:
+    """
+    Read and validate claims from a binary file, one chunk at a time
+
+    Args:
+        source: Binary file object (seekable for Parquet)
+        fmt: Input format
+        chunk_size: Records validated together
+
+    Yields:
+        (valid claims, errors) per chunk; each error is
+        {"record": position in the file (0-based), "error": message}
+
+    Raises:
+        ValueError: If the format is unknown
+        RuntimeError: If the format needs pyarrow and it is not installed
+    """
+    check_format(fmt)
+    chunks = _read_jsonl(source, chunk_size) if fmt == "jsonl" else _read_arrow(source, fmt, chunk_size)
+    for offset, chunk in chunks:
+        claims, errors = _validate(chunk, fmt == "jsonl")
+        yield claims, [{"record": offset + index, "error": message} for index, message in sorted(errors.items())]
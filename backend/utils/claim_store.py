@@ -0,0 +1,217 @@
+"""
+Indexed in-process claim store
+
+In-memory claims held by ClaimPilotAgent, with secondary indexes kept up
+to date on every write:
+
+- by status and by incident type: sorted (created_at, claim_id) keys, so the
+  size of each group is an O(1) count
+- by created_at: all claims as sorted (created_at, claim_id) keys
+
+Listings walk an index newest first and stop after `limit` claims. Pages
+continue from an opaque cursor holding the last (created_at, claim_id)
+returned, so a page costs O(log n + limit) however many claims are held.
+
+Claims are mutable models: call put() again after changing status,
+incident_type or created_at so the indexes follow.
+"""
+import base64
+import json
+import threading
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from utils.data_models import Claim, ClaimStatus
+
+SortKey = Tuple[str, str]  # (created_at, claim_id)
+
+
+def encode_cursor(created_at: str, claim_id: str) -> str:
+    """Opaque pagination cursor for the position after a claim"""
+    raw = json.dumps([created_at, claim_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    """
+    Decode a cursor from encode_cursor()
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, claim_id = json.loads(raw)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not isinstance(created_at, str) or not isinstance(claim_id, str):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return created_at, claim_id
+
+
+class ClaimStore:
+    """
+    In-memory claims with status, incident type and created_at indexes
+
+    Supports the dict operations the agents use (store[id] = claim,
+    store.get(id), id in store, len(store)). Safe to use from several
+    worker threads.
+    """
+
+    def __init__(self):
+        self._claims: Dict[str, Claim] = {}
+        self._keys: Dict[str, Tuple[ClaimStatus, str, str]] = {}  # indexed (status, type, created_at)
+        self._by_created = SortedList()
+        self._by_status: Dict[ClaimStatus, SortedList] = {}
+        self._by_type: Dict[str, SortedList] = {}
+        self._lock = threading.RLock()
+
+    def put(self, claim: Claim):
+        """
+        Add or replace a claim, updating the indexes
+
+        Args:
+            claim: Claim to store
+        """
+        keys = (claim.status, claim.incident_type, claim.created_at)
+        with self._lock:
+            previous = self._keys.get(claim.claim_id)
+            self._claims[claim.claim_id] = claim
+            if previous == keys:
+                return
+            if previous is not None:
+                self._unindex(claim.claim_id, previous)
+            self._keys[claim.claim_id] = keys
+            sort_key = (claim.created_at, claim.claim_id)
+            self._by_created.add(sort_key)
+            self._by_status.setdefault(claim.status, SortedList()).add(sort_key)
+            self._by_type.setdefault(claim.incident_type, SortedList()).add(sort_key)
+
+    def remove(self, claim_id: str) -> Optional[Claim]:
+        """
+        Remove a claim
+
+        Args:
+            claim_id: Claim identifier
+
+        Returns:
+            The removed claim, or None if it was not stored
+        """
+        with self._lock:
+            claim = self._claims.pop(claim_id, None)
+            if claim is not None:
+                self._unindex(claim_id, self._keys.pop(claim_id))
+            return claim
+
+    def _unindex(self, claim_id: str, keys: Tuple[ClaimStatus, str, str]):
+        status, incident_type, created_at = keys
+        sort_key = (created_at, claim_id)
+        self._by_created.remove(sort_key)
+        self._by_status[status].remove(sort_key)
+        self._by_type[incident_type].remove(sort_key)
+
+    def get(self, claim_id: str, default: Optional[Claim] = None) -> Optional[Claim]:
+        """Get a claim by ID"""
+        return self._claims.get(claim_id, default)
+
+    def __getitem__(self, claim_id: str) -> Claim:
+        return self._claims[claim_id]
+
+    def __setitem__(self, claim_id: str, claim: Claim):
+        if claim_id != claim.claim_id:
+            raise KeyError(f"Claim stored under {claim_id} has ID {claim.claim_id}")
+        self.put(claim)
+
+    def __contains__(self, claim_id: str) -> bool:
+        return claim_id in self._claims
+
+    def __len__(self) -> int:
+        return len(self._claims)
+
+    def values(self) -> List[Claim]:
+        """All claims, in no particular order"""
+        return list(self._claims.values())
+
+    def count(self, status: Optional[ClaimStatus] = None, incident_type: Optional[str] = None) -> int:
+        """
+        Number of claims, optionally with one status or incident type (O(1))
+
+        With both filters, counts the smaller group's matches.
+        """
+        with self._lock:
+            if status is None and incident_type is None:
+                return len(self._claims)
+            if incident_type is None:
+                return len(self._by_status.get(status, ()))
+            if status is None:
+                return len(self._by_type.get(incident_type, ()))
+            return sum(1 for _ in self._iter_keys(status, incident_type, None))
+
+    def counts_by_status(self) -> Dict[ClaimStatus, int]:
+        """Number of claims per status, for every status"""
+        with self._lock:
+            return {status: len(self._by_status.get(status, ())) for status in ClaimStatus}
+
+    def counts_by_type(self) -> Dict[str, int]:
+        """Number of claims per incident type that has any claims"""
+        with self._lock:
+            return {incident_type: len(keys) for incident_type, keys in self._by_type.items() if keys}
+
+    def _iter_keys(
+        self,
+        status: Optional[ClaimStatus],
+        incident_type: Optional[str],
+        after: Optional[SortKey]
+    ) -> Iterator[SortKey]:
+        """Sort keys newest first, strictly after `after`, matching the filters"""
+        # Walk the smallest index that applies and filter on the other field
+        candidates = [self._by_created]
+        if status is not None:
+            candidates.append(self._by_status.get(status, SortedList()))
+        if incident_type is not None:
+            candidates.append(self._by_type.get(incident_type, SortedList()))
+        index = min(candidates, key=len)
+
+        keys = index.irange(maximum=after, inclusive=(True, False), reverse=True) if after else reversed(index)
+        for sort_key in keys:
+            indexed_status, indexed_type, _ = self._keys[sort_key[1]]
+            if status is not None and indexed_status != status:
+                continue
+            if incident_type is not None and indexed_type != incident_type:
+                continue
+            yield sort_key
+
+    def page(
+        self,
+        status: Optional[ClaimStatus] = None,
+        incident_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Claim], Optional[str]]:
+        """
+        List claims newest first, one page at a time
+
+        Args:
+            status: Only claims with this status (optional)
+            incident_type: Only claims of this incident type (optional)
+            limit: Page size (None returns every remaining claim)
+            cursor: next_cursor from the previous page (optional)
+
+        Returns:
+            (claims, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = decode_cursor(cursor) if cursor else None
+        with self._lock:
+            keys = self._iter_keys(status, incident_type, after)
+            if limit is None:
+                return [self._claims[claim_id] for _, claim_id in keys], None
+
+            page_keys = list(islice(keys, limit + 1))
+            claims = [self._claims[claim_id] for _, claim_id in page_keys[:limit]]
+            next_cursor = encode_cursor(*page_keys[limit - 1]) if len(page_keys) > limit and limit > 0 else None
+            return claims, next_cursor
@@ -0,0 +1,272 @@
+"""
+Per-claim conversation log
+
+Chat messages go into a ring buffer per conversation:
+
+- messages about a claim share that claim's buffer (each message records
+  the session it came from)
+- messages without a claim are kept per session
+
+Each buffer holds the last CONVERSATION_MAX_MESSAGES messages and at most
+CONVERSATION_MAX_CONVERSATIONS buffers stay in memory (least recently used
+are dropped), so memory is bounded however long the server runs. Reading
+the last k messages of a conversation is O(k).
+
+With CONVERSATION_PERSIST on, claim messages are also written to the
+storage backend's chat_messages table, and a claim whose buffer was dropped
+(or that was chatted about before a restart) is reloaded from there on the
+next read. Clearing a claim's conversation deletes its persisted messages.
+"""
+import os
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from itertools import islice
+from typing import Deque, Dict, List, Optional, Tuple
+
+from utils.storage import storage
+
+MAX_MESSAGES = int(os.getenv("CONVERSATION_MAX_MESSAGES", "200"))
+MAX_CONVERSATIONS = int(os.getenv("CONVERSATION_MAX_CONVERSATIONS", "10000"))
+PERSIST_ENABLED = os.getenv("CONVERSATION_PERSIST", "true").lower() == "true"
+
+# Messages kept across all conversations for /api/conversation/history
+RECENT_MESSAGES = int(os.getenv("CONVERSATION_RECENT_MESSAGES", "200"))
+
+DEFAULT_SESSION = "default"
+
+
+def _key(claim_id: Optional[str], session_id: Optional[str]) -> Tuple[str, str]:
+    """Buffer a message belongs to"""
+    if claim_id:
+        return ("claim", claim_id)
+    return ("session", session_id or DEFAULT_SESSION)
+
+
+def _message_from_record(record: Dict) -> Dict:
+    """Conversation message of a chat_messages record"""
+    metadata = record.get('metadata') or {}
+    return {
+        "role": record.get('role'),
+        "message": record.get('content', ''),
+        "timestamp": str(record['created_at']) if record.get('created_at') else None,
+        "claim_id": record.get('claim_id'),
+        "session_id": metadata.get('session_id', DEFAULT_SESSION)
+    }
+
+
+class ConversationStore:
+    """Bounded ring buffers of chat messages by claim and session"""
+
+    def __init__(
+        self,
+        max_messages: int = MAX_MESSAGES,
+        max_conversations: int = MAX_CONVERSATIONS,
+        persist: bool = PERSIST_ENABLED
+    ):
+        """
+        Args:
+            max_messages: Messages kept per conversation
+            max_conversations: Conversations kept in memory
+            persist: Write claim messages to the storage backend
+        """
+        self.max_messages = max_messages
+        self.max_conversations = max_conversations
+        self.persist = persist
+        self._buffers: "OrderedDict[Tuple[str, str], Deque[Dict]]" = OrderedDict()
+        self._recent: Deque[Dict] = deque(maxlen=RECENT_MESSAGES)
+        self._lock = threading.Lock()
+        self.stats = {"appended": 0, "persisted": 0, "loads": 0, "evictions": 0}
+
+    def append(
+        self,
+        role: str,
+        message: str,
+        claim_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        timestamp: Optional[str] = None
+    ) -> Dict:
+        """
+        Record a chat message
+
+        Args:
+            role: Message role (user/assistant/system)
+            message: Message text
+            claim_id: Claim the message is about (optional)
+            session_id: Chat session (optional)
+            timestamp: ISO timestamp (defaults to now)
+
+        Returns:
+            The stored message
+        """
+        entry = {
+            "role": role,
+            "message": message,
+            "timestamp": timestamp or datetime.now().isoformat(),
+            "claim_id": claim_id,
+            "session_id": session_id or DEFAULT_SESSION
+        }
+        key = _key(claim_id, session_id)
+        loaded: List[Dict] = []
+        if claim_id and self.persist:
+            with self._lock:
+                resident = key in self._buffers
+            if not resident:
+                # Load the persisted tail first so this message lands after it
+                loaded = self._load(claim_id)
+
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._insert(key, loaded)
+            else:
+                self._buffers.move_to_end(key)
+            buffer.append(entry)
+            self._recent.append(entry)
+            self.stats["appended"] += 1
+
+        if claim_id and self.persist:
+            if storage.save_chat_message(claim_id, role, message, {"session_id": entry["session_id"]}):
+                self.stats["persisted"] += 1
+        return entry
+
+    def get_messages(
+        self,
+        claim_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Get the last messages of a conversation, oldest first
+
+        Args:
+            claim_id: Claim whose messages to return (optional)
+            session_id: Session to return, or to filter a claim's messages by (optional)
+            limit: Return only the last `limit` messages (optional)
+
+        Returns:
+            List of messages
+        """
+        key = _key(claim_id, session_id)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is not None:
+                self._buffers.move_to_end(key)
+                return self._tail(buffer, claim_id, session_id, limit)
+
+        if not (claim_id and self.persist):
+            return []
+        loaded = self._load(claim_id)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._insert(key, loaded)
+            return self._tail(buffer, claim_id, session_id, limit)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Get the latest messages across every conversation, oldest first
+
+        Args:
+            limit: Return only the last `limit` messages (optional)
+
+        Returns:
+            List of messages
+        """
+        with self._lock:
+            return self._tail(self._recent, None, None, limit)
+
+    def clear(self, claim_id: Optional[str] = None, session_id: Optional[str] = None) -> int:
+        """
+        Forget conversations
+
+        With persistence on, a claim's conversation (or one session of it)
+        is deleted from the storage backend too, so it does not come back on
+        the next read. Without a claim_id only what is held in memory is
+        reset; persisted claim messages are reloaded when next read.
+
+        Args:
+            claim_id: Only forget this claim's conversation (optional)
+            session_id: Only forget this session's conversation, or this
+                session's part of the claim's conversation (optional)
+
+        Returns:
+            Number of persisted messages deleted
+        """
+        deleted = 0
+        if claim_id and self.persist:
+            # Before the buffer goes, so a concurrent read cannot reload the messages
+            deleted = storage.delete_chat_messages(claim_id, session_id)
+
+        with self._lock:
+            if claim_id is None and session_id is None:
+                self._buffers.clear()
+                self._recent.clear()
+                return deleted
+
+            def cleared(entry: Dict) -> bool:
+                if claim_id:
+                    return entry["claim_id"] == claim_id and session_id in (None, entry["session_id"])
+                return _key(entry["claim_id"], entry["session_id"]) == ("session", session_id)
+
+            key = _key(claim_id, session_id)
+            buffer = self._buffers.get(key)
+            if buffer is not None and claim_id and session_id:
+                self._buffers[key] = deque(
+                    (entry for entry in buffer if not cleared(entry)), maxlen=buffer.maxlen
+                )
+            else:
+                self._buffers.pop(key, None)
+            self._recent = deque((entry for entry in self._recent if not cleared(entry)), maxlen=self._recent.maxlen)
+        return deleted
+
+    def metrics(self) -> Dict:
+        """
+        Get conversation counts
+
+        Returns:
+            Dictionary of conversation metrics
+        """
+        with self._lock:
+            return {
+                **self.stats,
+                "conversations": len(self._buffers),
+                "messages": sum(len(buffer) for buffer in self._buffers.values()),
+                "max_messages_per_conversation": self.max_messages,
+                "max_conversations": self.max_conversations,
+                "persist": self.persist
+            }
+
+    def _insert(self, key: Tuple[str, str], messages: List[Dict]) -> Deque[Dict]:
+        """Add a buffer, dropping least recently used ones (lock held)"""
+        buffer = deque(messages, maxlen=self.max_messages)
+        self._buffers[key] = buffer
+        while len(self._buffers) > self.max_conversations:
+            self._buffers.popitem(last=False)
+            self.stats["evictions"] += 1
+        return buffer
+
+    def _load(self, claim_id: str) -> List[Dict]:
+        """Last persisted messages of a claim"""
+        self.stats["loads"] += 1
+        records = storage.get_chat_messages(claim_id, limit=self.max_messages)
+        return [_message_from_record(record) for record in records]
+
+    @staticmethod
+    def _tail(
+        buffer: Deque[Dict],
+        claim_id: Optional[str],
+        session_id: Optional[str],
+        limit: Optional[int]
+    ) -> List[Dict]:
+        """Last `limit` messages of a buffer, optionally of one session of a claim"""
+        newest_first = reversed(buffer)
+        if claim_id and session_id:
+            newest_first = (entry for entry in newest_first if entry["session_id"] == session_id)
+        messages = list(islice(newest_first, limit))
+        messages.reverse()
+        return messages
+
+
+# Singleton instance
+conversation_store = ConversationStore()
@@ -15,6 +15,16 @@ class ClaimStatus(str, Enum):
     PENDING_INFO = "Pending Info"
 
 
+class JobStatus(str, Enum):
+    """Background job status enumeration"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    CANCELLING = "cancelling"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
 class IncidentType(str, Enum):
     """Types of incidents"""
     CAR_ACCIDENT = "Car Accident"
@@ -60,6 +70,7 @@ class FinancialEstimate(BaseModel):
     breakdown: Optional[dict] = None  # Detailed cost breakdown
     confidence: float = Field(ge=0.0, le=1.0)
     notes: Optional[str] = None
+    rate_table_version: Optional[str] = None  # Version of the rate tables used
 
 
 class RepairShop(BaseModel):
@@ -112,3 +123,21 @@ class ChatResponse(BaseModel):
     shop_recommendations: Optional[ShopRecommendations] = None
     agent_used: Optional[str] = None
     timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
+
+
+class Job(BaseModel):
+    """Background job (see utils/jobs.py)"""
+    job_id: str
+    kind: str
+    tenant: str = "default"
+    priority: int = 0
+    status: JobStatus = JobStatus.QUEUED
+    payload: dict = {}
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    claim_id: Optional[str] = None
+    worker: Optional[str] = None
+    attempts: int = 0
+    created_at: str = Field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
@@ -0,0 +1,202 @@
+"""
+Memoized FinTrack estimates
+
+FinTrackAgent.calculate_estimate() keeps the FinancialEstimate of each
+(claim, severity override, coverage override) here and returns it as long
+as the claim's fingerprint is unchanged, so /api/estimate, the claim
+pipeline and the chat flow share one computation per claim.
+
+The fingerprint holds every input that drives the result: incident type,
+stated damage, a SHA-256 of the damages description, the extraction
+confidence (it feeds the estimate's confidence) and the rate-table
+version. An entry whose fingerprint no longer matches is dropped and
+recomputed, so edited claims and reloaded rate tables never serve a stale
+estimate. At most ESTIMATE_CACHE_MAX_ENTRIES estimates are kept (least
+recently used are evicted).
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from utils.data_models import Claim, FinancialEstimate
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("ESTIMATE_CACHE_MAX_ENTRIES", "4096"))
+ESTIMATE_CACHE_ENABLED = os.getenv("ESTIMATE_CACHE_ENABLED", "true").lower() == "true"
+
+
+def estimate_inputs(claim: Claim) -> tuple:
+    """
+    Fields of a claim that drive its estimate
+
+    Args:
+        claim: Claim object
+
+    Returns:
+        Hashable tuple (the description as a SHA-256 digest)
+    """
+    description = claim.damages_description or ""
+    return (
+        claim.incident_type,
+        claim.estimated_damage,
+        hashlib.sha256(description.encode("utf-8")).hexdigest(),
+        claim.confidence
+    )
+
+
+def estimate_fingerprint(claim: Claim, rate_table_version: str) -> tuple:
+    """
+    Inputs of a claim that drive its estimate, with the rate-table version
+
+    Args:
+        claim: Claim object
+        rate_table_version: Version of the rate table pricing the claim
+
+    Returns:
+        Hashable fingerprint
+    """
+    return estimate_inputs(claim) + (rate_table_version,)
+
+
+class EstimateCache:
+    """LRU cache of FinancialEstimate objects validated by claim fingerprint"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, enabled: bool = ESTIMATE_CACHE_ENABLED):
+        """
+        Args:
+            max_entries: Maximum estimates kept
+            enabled: False computes every estimate (the cache only counts misses)
+        """
+        self.max_entries = max_entries
+        self.enabled = enabled
+        # (claim_id, severity, coverage_override) -> (fingerprint, estimate)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "invalidations": 0, "evictions": 0}
+
+    def get(
+        self,
+        claim: Claim,
+        rate_table_version: str,
+        severity: Optional[str] = None,
+        coverage_override: Optional[float] = None
+    ) -> Optional[FinancialEstimate]:
+        """
+        Look up a cached estimate
+
+        Args:
+            claim: Claim object
+            rate_table_version: Version of the current rate table
+            severity: Severity level override (optional)
+            coverage_override: Custom coverage percentage (optional)
+
+        Returns:
+            Cached estimate, or None on a miss or a changed fingerprint
+        """
+        key = (claim.claim_id, severity, coverage_override)
+        fingerprint = estimate_fingerprint(claim, rate_table_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == fingerprint:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self.stats["invalidations"] += 1
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(
+        self,
+        claim: Claim,
+        rate_table_version: str,
+        estimate: FinancialEstimate,
+        severity: Optional[str] = None,
+        coverage_override: Optional[float] = None
+    ):
+        """
+        Cache an estimate, evicting least recently used entries
+
+        Args:
+            claim: Claim the estimate was computed from
+            rate_table_version: Version of the rate table that priced it
+            estimate: Computed estimate
+            severity: Severity level override (optional)
+            coverage_override: Custom coverage percentage (optional)
+        """
+        if not self.enabled:
+            return
+        key = (claim.claim_id, severity, coverage_override)
+        fingerprint = estimate_fingerprint(claim, rate_table_version)
+        with self._lock:
+            self._entries[key] = (fingerprint, estimate)
+            self._entries.move_to_end(key)
+            self.stats["sets"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def get_or_compute(
+        self,
+        claim: Claim,
+        rate_table_version: str,
+        compute: Callable[[], FinancialEstimate],
+        severity: Optional[str] = None,
+        coverage_override: Optional[float] = None
+    ) -> FinancialEstimate:
+        """
+        Return the cached estimate, or compute and cache it
+
+        Args:
+            claim: Claim object
+            rate_table_version: Version of the current rate table
+            compute: Computes the estimate on a miss
+            severity: Severity level override (optional)
+            coverage_override: Custom coverage percentage (optional)
+
+        Returns:
+            FinancialEstimate object
+        """
+        estimate = self.get(claim, rate_table_version, severity, coverage_override)
+        if estimate is None:
+            estimate = compute()
+            self.put(claim, rate_table_version, estimate, severity, coverage_override)
+        return estimate
+
+    def invalidate(self, claim_id: str):
+        """
+        Drop every cached estimate of a claim
+
+        Args:
+            claim_id: Claim identifier
+        """
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == claim_id]
+            for key in stale:
+                del self._entries[key]
+            self.stats["invalidations"] += len(stale)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict:
+        """
+        Get cache size and hit rate
+
+        Returns:
+            Dictionary of cache metrics
+        """
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0
+            }
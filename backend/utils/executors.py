@@ -0,0 +1,205 @@
+"""
+Bounded executors for running synchronous agent work from async routes
+
+Agents, PDF parsing, LLM clients and Supabase calls are all synchronous.
+Calling them directly from an `async def` route blocks the event loop, so
+one slow LLM call stalls every other request on the worker. Routes hand
+that work to one of two dedicated pools instead:
+
+- cpu: PDF parsing and regex extraction
+- io:  LLM calls, database calls and agent calls that wrap them
+
+Each pool has a fixed number of workers and a bounded queue. When both are
+full, new work is rejected with ExecutorSaturatedError instead of piling up.
+"""
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when a pool's workers and queue are all in use"""
+
+    def __init__(self, pool_name: str, limit: int):
+        self.pool_name = pool_name
+        self.limit = limit
+        super().__init__(
+            f"The {pool_name} worker pool is saturated ({limit} tasks in flight). "
+            f"Please retry shortly."
+        )
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a bounded queue and saturation metrics
+
+    At most `max_workers` tasks run at once and at most `max_queue` more
+    wait for a worker. Anything beyond that is rejected immediately.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        """
+        Args:
+            name: Pool name used in metrics and errors
+            max_workers: Number of worker threads
+            max_queue: Maximum number of tasks waiting for a worker
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._active = 0
+        self._peak_in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of tasks running or queued at once"""
+        return self.max_workers + self.max_queue
+
+    def _acquire(self):
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise ExecutorSaturatedError(self.name, self.capacity)
+            self._in_flight += 1
+            self._submitted += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def _invoke(self, func: Callable, queued_at: float) -> Any:
+        started_at = time.perf_counter()
+        with self._lock:
+            self._active += 1
+            self._total_wait += started_at - queued_at
+        succeeded = False
+        try:
+            result = func()
+            succeeded = True
+            return result
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._in_flight -= 1
+                self._total_run += time.perf_counter() - started_at
+                if succeeded:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a synchronous callable on this pool without blocking the event loop
+
+        Args:
+            func: Callable to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            ExecutorSaturatedError: If the pool's workers and queue are full
+        """
+        self._acquire()
+        call = functools.partial(func, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._pool, self._invoke, call, time.perf_counter())
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        return await future
+
+    def metrics(self) -> Dict:
+        """
+        Get pool usage and saturation metrics
+
+        Returns:
+            Dictionary of pool metrics
+        """
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queued": self._in_flight - self._active,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "saturation": round(self._in_flight / self.capacity, 3),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._total_wait / finished * 1000, 2) if finished else 0.0,
+                "avg_run_ms": round(self._total_run / finished * 1000, 2) if finished else 0.0
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and release the worker threads"""
+        self._pool.shutdown(wait=wait)
+
+
+# Pool sizes are configurable per deployment
+cpu_executor = BoundedExecutor(
+    "cpu",
+    max_workers=int(os.getenv("CPU_POOL_SIZE", str(os.cpu_count() or 2))),
+    max_queue=int(os.getenv("CPU_QUEUE_DEPTH", "64"))
+)
+io_executor = BoundedExecutor(
+    "io",
+    max_workers=int(os.getenv("IO_POOL_SIZE", "32")),
+    max_queue=int(os.getenv("IO_QUEUE_DEPTH", "256"))
+)
+
+
+async def run_cpu(func: Callable, *args, **kwargs) -> Any:
+    """Run CPU-bound work (PDF parsing, regex extraction) on the cpu pool"""
+    return await cpu_executor.run(func, *args, **kwargs)
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Run I/O-bound work (LLM, database, agent calls) on the io pool"""
+    return await io_executor.run(func, *args, **kwargs)
+
+
+async def iterate_io(iterator: Iterator) -> AsyncIterator:
+    """
+    Drain a blocking iterator (such as an agent generator) on the io pool
+
+    Each item is fetched by its own io task, so no worker is held while the
+    consumer (a streaming response) is busy with the previous item. The
+    iterator is closed if the consumer stops early.
+    """
+    finished = object()
+    try:
+        while True:
+            item = await run_io(next, iterator, finished)
+            if item is finished:
+                break
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await run_io(close)
+
+
+def executor_metrics() -> Dict:
+    """Get metrics for every pool"""
+    return {
+        "cpu": cpu_executor.metrics(),
+        "io": io_executor.metrics()
+    }
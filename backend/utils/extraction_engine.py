@@ -0,0 +1,321 @@
+"""
+Single-pass structured field extraction
+
+PDFParser.extract_structured_data() used to run a separate regex scan per
+pattern (15+ passes), split the whole text into sentences and test every
+sentence against every damage keyword. ExtractionEngine compiles all of it
+into one alternation regex at import time and walks the text once:
+
+- incident keywords, damage keywords, dates, money, party labels, location
+  labels, "City, ST" and "at/near/on " are alternatives of the combined regex
+- sentence boundaries ([.!?]+) are alternatives too, so damage sentences are
+  collected as the scan passes them instead of splitting the text
+- party labels, location labels and street triggers only mark candidate
+  positions; the full pattern is then matched at that position
+- once a field is settled (a location label, the first MM/DD/YYYY date, three
+  damage sentences...) its alternatives are dropped from the regex for the
+  rest of the scan
+
+Output is identical to the previous multi-pass implementation, including its
+case-folding rules ((?i) for regex fields, str.lower() for damage keywords).
+
+Tables are in priority order, with the confidence of a match (used by
+IncrementalExtractor).
+"""
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+INCIDENT_TYPE_KEYWORDS = [
+    ("Car Accident", ("car accident", "vehicle collision", "auto accident", "traffic accident", "car crash"), 0.9),
+    ("Home Damage", ("home damage", "house damage", "property damage", "water damage", "fire damage"), 0.9),
+    ("Theft", ("theft", "burglary", "stolen", "robbery"), 0.9),
+    ("Medical", ("medical", "injury", "hospital", "treatment", "doctor"), 0.6),  # generic words, weak signal
+]
+
+DATE_PATTERNS = [
+    (r"\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b", 0.9),  # MM/DD/YYYY or MM-DD-YYYY
+    (r"\b(\d{4}[/-]\d{1,2}[/-]\d{1,2})\b", 0.9),    # YYYY-MM-DD
+    (r"\b([A-Za-z]+\s+\d{1,2},?\s+\d{4})\b", 0.8),  # Month DD, YYYY
+]
+
+LOCATION_PATTERNS = [
+    (r"(?i)(?:location|address|scene):\s*([^\n]+)", 0.95),
+    (r"(?i)(?:at|near|on)\s+([A-Z][A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr)[^\n]*)", 0.8),
+    (r"\b([A-Z][a-z]+,\s*[A-Z]{2})\b", 0.6),  # City, STATE
+]
+
+PARTY_LABELS = ("driver", "owner", "claimant")
+
+DAMAGE_KEYWORDS = [
+    "damage", "broken", "dent", "scratch", "shatter", "crack",
+    "injury", "harm", "collision", "impact", "destroyed"
+]
+
+# Damage sentences kept in the description
+MAX_DAMAGE_SENTENCES = 3
+
+# Words that start a street-location match ("on Main Street")
+_STREET_TRIGGERS = ("at", "near", "on")
+
+# Non-ASCII characters that (?i) matches for these ASCII letters
+_CASE_FOLD_EXTRAS = {"i": "\u0130\u0131", "k": "\u212a", "s": "\u017f"}
+
+
+def _alternation(words) -> str:
+    # Longest first so a keyword never loses to its own prefix
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+def _first_char(letter: str, lowered: bool = False) -> str:
+    """Character class for the first letter of a case-insensitive word"""
+    extras = _CASE_FOLD_EXTRAS.get(letter, "")
+    if lowered:
+        # str.lower() semantics (damage keywords): only KELVIN SIGN lowers to ASCII
+        extras = "\u212a" if letter == "k" else ""
+    return "[" + letter.upper() + letter + extras + "]"
+
+
+def _lowered_word(word: str) -> str:
+    """Pattern matching the places where `word in text.lower()` holds"""
+    return "".join(_first_char(c, lowered=True) if c.isalpha() else re.escape(c) for c in word)
+
+
+# Every alternative of the scan regex starts with a literal or a character
+# class, so the regex engine rejects it after one character at positions
+# where it cannot match. The rest of a token is matched after that first
+# character (or looked ahead for, when the value is needed). The scan
+# restarts one character after each token, so overlapping tokens are all
+# seen; tokens that can start at the same position (a "Month DD, YYYY" or
+# "City, ST" that starts with a keyword or "on ") are checked by hand.
+# Group names map to (kind, detail): date index, incident rank, party role.
+_GROUPS: Dict[str, Tuple[str, object]] = {}
+_ALTERNATIVES: Dict[str, List[str]] = {}
+
+
+def _add(kind: str, pattern: str, group: str, detail=None):
+    _GROUPS[group] = (kind, detail)
+    _ALTERNATIVES.setdefault(kind, []).append(pattern)
+
+
+_add("money", r"\$(?=(?P<money>\s*[\d,]+(?:\.\d{2})?))", "money")
+_add("date0", r"\d(?<=\b\d)(?=(?P<date0>\d?[/-]\d{1,2}[/-]\d{2,4}\b))", "date0", 0)
+_add("date1", r"\d(?<=\b\d)(?=(?P<date1>\d{3}[/-]\d{1,2}[/-]\d{1,2}\b))", "date1", 1)
+_add("date2", r"[A-Za-z](?<=\b[A-Za-z])(?=(?P<date2>[A-Za-z]*\s+\d{1,2},?\s+\d{4}\b))", "date2", 2)
+_add("city", r"[A-Z](?<=\b[A-Z])(?=(?P<city>[a-z]+,\s*[A-Z]{2}\b))", "city")
+for _label in PARTY_LABELS:
+    _add("party", _first_char(_label[0]) + "(?i:" + _label[1:] + ":)(?P<party_" + _label + ">)", "party_" + _label, _label)
+for _letter in sorted({word[0] for word in ("location", "address", "scene")}):
+    _rest = [word[1:] for word in ("location", "address", "scene") if word[0] == _letter]
+    _add("label", _first_char(_letter) + "(?i:(?:" + "|".join(_rest) + "):)(?P<label_" + _letter + ">)", "label_" + _letter)
+for _rank, (_, _keywords, _) in enumerate(INCIDENT_TYPE_KEYWORDS):
+    for _letter in sorted({keyword[0] for keyword in _keywords}):
+        _rest = [keyword[1:] for keyword in _keywords if keyword[0] == _letter]
+        _group = "incident%d_%s" % (_rank, _letter)
+        _add("incident", _first_char(_letter) + "(?i:" + _alternation(_rest) + ")(?P<" + _group + ">)", _group, _rank)
+for _letter in sorted({keyword[0] for keyword in DAMAGE_KEYWORDS}):
+    _rest = sorted((keyword[1:] for keyword in DAMAGE_KEYWORDS if keyword[0] == _letter), key=len, reverse=True)
+    _add(
+        "damage",
+        _first_char(_letter, lowered=True) + "(?:" + "|".join(_lowered_word(rest) for rest in _rest) + ")(?P<damage_" + _letter + ">)",
+        "damage_" + _letter
+    )
+for _trigger in _STREET_TRIGGERS:
+    _add("street", _first_char(_trigger[0]) + "(?i:" + _trigger[1:] + r")\s(?P<street_" + _trigger + ">)", "street_" + _trigger)
+_add("stop", r"[.!?]+(?P<stop>)", "stop")
+
+# Alternation order decides which token is reported when several start at
+# the same position
+_KIND_ORDER = ("money", "date0", "date1", "date2", "city", "party", "label", "incident", "damage", "street", "stop")
+
+
+@lru_cache(maxsize=None)
+def _scan_regex(kinds: frozenset):
+    """Combined regex for the fields that are still open"""
+    return re.compile("|".join(
+        pattern for kind in _KIND_ORDER if kind in kinds for pattern in _ALTERNATIVES[kind]
+    ))
+
+
+_KIND_RES = {kind: _scan_regex(frozenset([kind])) for kind in ("incident", "damage", "street")}
+_PARTY_RES = {
+    label: re.compile(r"(?i)" + label + r":\s*([A-Z][a-z]+\s+[A-Z][a-z]+)")
+    for label in PARTY_LABELS
+}
+_LOCATION_LABEL_RE = re.compile(LOCATION_PATTERNS[0][0])
+_LOCATION_STREET_RE = re.compile(LOCATION_PATTERNS[1][0])
+_STREET_RUN_RE = re.compile(r"(?i)[A-Za-z\s]*")
+
+
+class FieldMatches:
+    """Raw result of one scan: best candidate per field plus collected lists"""
+
+    def __init__(self):
+        self.incident_type: Optional[Tuple[str, int]] = None  # (value, priority rank)
+        self.date: Optional[Tuple[str, int]] = None
+        self.location: Optional[Tuple[str, int]] = None
+        self.parties: List[Dict] = []
+        self.damage_sentences: List[str] = []
+        self.amounts: List[float] = []
+
+
+class ExtractionEngine:
+    """Precompiled single-pass extractor for claim fields"""
+
+    def scan(self, text: str, max_damage_sentences: int = MAX_DAMAGE_SENTENCES) -> FieldMatches:
+        """
+        Scan text once and collect every field candidate
+
+        Args:
+            text: Document text
+            max_damage_sentences: Damage sentences to keep
+
+        Returns:
+            FieldMatches with the highest-priority candidate per field
+        """
+        matches = FieldMatches()
+        incident_rank = len(INCIDENT_TYPE_KEYWORDS)
+        dates: List[Optional[str]] = [None] * len(DATE_PATTERNS)
+        parties: Dict[str, List[str]] = {label: [] for label in PARTY_LABELS}
+        party_ends: Dict[str, int] = {label: 0 for label in PARTY_LABELS}
+        location: Optional[Tuple[str, int]] = None
+        city = None
+        street_failed_until = -1
+
+        sentence_start = 0
+        sentence_has_damage = False
+
+        # Fields drop out of the regex once nothing later in the text can change them
+        open_kinds = set(_KIND_ORDER)
+        if max_damage_sentences <= 0:
+            open_kinds -= {"damage", "stop"}
+        scan_re = _scan_regex(frozenset(open_kinds))
+
+        def close(*kinds):
+            nonlocal scan_re
+            if open_kinds.intersection(kinds):
+                open_kinds.difference_update(kinds)
+                scan_re = _scan_regex(frozenset(open_kinds))
+
+        def match_street(position: int) -> bool:
+            nonlocal location, street_failed_until
+            # A failed street match rules out every later trigger in the same
+            # run of letters and spaces, so each run is only scanned once
+            if position < street_failed_until:
+                return False
+            match = _LOCATION_STREET_RE.match(text, position)
+            if match:
+                location = (match.group(1).strip(), 1)
+                close("street", "city")
+                return True
+            street_failed_until = _STREET_RUN_RE.match(text, position).end()
+            return False
+
+        position = 0
+        while True:
+            match = scan_re.search(text, position)
+            if match is None:
+                break
+            start = match.start()
+            position = start + 1
+            kind, detail = _GROUPS[match.lastgroup]
+
+            if kind == "stop":
+                if sentence_has_damage and len(matches.damage_sentences) < max_damage_sentences:
+                    matches.damage_sentences.append(text[sentence_start:start].strip())
+                    if len(matches.damage_sentences) >= max_damage_sentences:
+                        close("damage", "stop")
+                sentence_start = position = match.end()
+                sentence_has_damage = False
+                continue
+            if kind == "money":
+                token = text[start:match.end(kind)]
+                try:
+                    matches.amounts.append(float(token.replace('$', '').replace(',', '').strip()))
+                except ValueError:
+                    pass
+                continue
+            if kind == "party":
+                # Same non-overlapping semantics as finditer per role
+                party = _PARTY_RES[detail].match(text, start)
+                if party and start >= party_ends[detail]:
+                    parties[detail].append(party.group(1))
+                    party_ends[detail] = party.end()
+                continue
+            if kind == "label":
+                label = _LOCATION_LABEL_RE.match(text, start)
+                if label:
+                    location = (label.group(1).strip(), 0)
+                    close("label", "street", "city")
+                continue
+            if kind in ("date0", "date1", "date2"):
+                if dates[detail] is None:
+                    dates[detail] = text[start:match.end(kind)]
+                close(*("date0", "date1", "date2")[detail:])
+            elif kind == "city":
+                city = text[start:match.end(kind)]
+                close("city")
+
+            # Keywords and street triggers can start where a date or city
+            # starts, and "injury" is both an incident and a damage keyword
+            shared = kind == "date2" or kind == "city"
+            if kind == "incident":
+                incident_rank = min(incident_rank, detail)
+            elif shared and "incident" in open_kinds:
+                keyword = _KIND_RES["incident"].match(text, start)
+                if keyword:
+                    incident_rank = min(incident_rank, _GROUPS[keyword.lastgroup][1])
+            if incident_rank == 0:
+                close("incident")
+            if kind == "damage" or (
+                (shared or kind == "incident") and "damage" in open_kinds and _KIND_RES["damage"].match(text, start)
+            ):
+                sentence_has_damage = True
+            if kind == "street" or (shared and "street" in open_kinds and _KIND_RES["street"].match(text, start)):
+                match_street(start)
+
+        if sentence_has_damage and len(matches.damage_sentences) < max_damage_sentences:
+            matches.damage_sentences.append(text[sentence_start:].strip())
+
+        if incident_rank < len(INCIDENT_TYPE_KEYWORDS):
+            matches.incident_type = (INCIDENT_TYPE_KEYWORDS[incident_rank][0], incident_rank)
+
+        for rank, value in enumerate(dates):
+            if value is not None:
+                matches.date = (value, rank)
+                break
+
+        if location is None and city is not None:
+            location = (city, 2)
+        matches.location = location
+        matches.parties = [
+            {"name": name, "role": "involved party"}
+            for label in PARTY_LABELS
+            for name in parties[label]
+        ]
+        return matches
+
+    def extract(self, text: str) -> Dict:
+        """
+        Extract structured claim fields with one scan of the text
+
+        Args:
+            text: Raw text from document
+
+        Returns:
+            Dictionary with incident_type, date, location, parties, damages and amounts
+        """
+        matches = self.scan(text)
+        return {
+            "incident_type": matches.incident_type[0] if matches.incident_type else "Other",
+            "date": matches.date[0] if matches.date else datetime.now().strftime("%Y-%m-%d"),
+            "location": matches.location[0] if matches.location else "Location not specified",
+            "parties": matches.parties,
+            "damages": " ".join(matches.damage_sentences) or "Damage description not available",
+            "amounts": matches.amounts,
+        }
+
+
+# Singleton instance
+extraction_engine = ExtractionEngine()
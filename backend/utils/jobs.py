@@ -0,0 +1,619 @@
+"""
+Background job queue
+
+Long workflows (a full claim: parse, summary, estimate, shops, draft,
+compliance) used to run inside the HTTP request, so a proxy timeout killed
+the work. They are submitted here instead: submit() stores the job and
+returns its ID at once, and a pool of JOB_WORKERS threads runs queued jobs
+through the handler registered for their kind.
+
+- Highest priority first, oldest first within a priority
+- At most JOB_TENANT_CONCURRENCY jobs of one tenant run at once in this
+  process; other tenants' jobs are picked meanwhile
+- Results (or errors) are stored on the job for later retrieval
+- Cancelling a queued job drops it; a running job is asked to stop
+  (JobContext.cancelled()) and its result is discarded
+- Kinds registered with an upload_dir own the file at payload["file_path"]:
+  the handler deletes it when it runs, and the queue deletes it when the job
+  ends without running (cancelled while queued, failed or cancelled by
+  recovery, purged). Recovery also deletes files there that no unfinished
+  job refers to
+
+Backends (JOB_BACKEND):
+- sqlite: jobs table in the claims SQLite file (default). Jobs survive
+  restarts: jobs left running by a worker process that no longer exists are
+  queued again (up to JOB_MAX_ATTEMPTS runs)
+- memory: in-process only, for development
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from utils.data_models import Job, JobStatus
+
+JOB_BACKEND = os.getenv("JOB_BACKEND", "sqlite")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_TENANT_CONCURRENCY = int(os.getenv("JOB_TENANT_CONCURRENCY", "1"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "7"))
+
+# How often idle workers look for jobs submitted by other processes
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+
+# Kept uploads younger than this are never swept (their job may not be submitted yet)
+JOB_UPLOAD_GRACE_SECONDS = float(os.getenv("JOB_UPLOAD_GRACE_SECONDS", "3600"))
+
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+UNFINISHED_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING, JobStatus.CANCELLING)
+
+# This process, as recorded on the jobs it runs
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobBackend(ABC):
+    """Job persistence"""
+
+    name = "base"
+
+    @abstractmethod
+    def add(self, job: Job):
+        """
+        Store a new job
+
+        Args:
+            job: Queued job
+        """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Retrieve a job
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Job or None
+        """
+
+    @abstractmethod
+    def list_jobs(
+        self,
+        tenant: Optional[str] = None,
+        status: Optional[JobStatus] = None,
+        limit: Optional[int] = 50
+    ) -> List[Job]:
+        """
+        List jobs, newest first
+
+        Args:
+            tenant: Optional tenant filter
+            status: Optional status filter
+            limit: Maximum number of jobs (None for all)
+
+        Returns:
+            List of jobs
+        """
+
+    @abstractmethod
+    def claim_next(self, worker: str, skip_tenants: Set[str]) -> Optional[Job]:
+        """
+        Atomically mark the next queued job as running
+
+        Args:
+            worker: Worker claiming the job
+            skip_tenants: Tenants whose jobs must not be picked
+
+        Returns:
+            The claimed job, or None if nothing is runnable
+        """
+
+    @abstractmethod
+    def update(self, job_id: str, updates: Dict[str, Any], statuses: Optional[Iterable[JobStatus]] = None) -> bool:
+        """
+        Update fields of a job
+
+        Args:
+            job_id: Job identifier
+            updates: Field -> new value
+            statuses: Only update if the job is in one of these statuses (optional)
+
+        Returns:
+            True if the job was updated
+        """
+
+    @abstractmethod
+    def purge(self, finished_before: str) -> List[Job]:
+        """
+        Delete finished jobs
+
+        Args:
+            finished_before: ISO timestamp; older finished jobs are deleted
+
+        Returns:
+            The deleted jobs
+        """
+
+
+class MemoryJobBackend(JobBackend):
+    """Jobs in a dict (lost on restart)"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def add(self, job: Job):
+        with self._lock:
+            self._jobs[job.job_id] = job.model_copy(deep=True)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy(deep=True) if job else None
+
+    def list_jobs(
+        self,
+        tenant: Optional[str] = None,
+        status: Optional[JobStatus] = None,
+        limit: Optional[int] = 50
+    ) -> List[Job]:
+        with self._lock:
+            jobs = [
+                job.model_copy(deep=True) for job in reversed(self._jobs.values())
+                if (tenant is None or job.tenant == tenant) and (status is None or job.status == status)
+            ]
+        return jobs[:limit] if limit is not None else jobs
+
+    def claim_next(self, worker: str, skip_tenants: Set[str]) -> Optional[Job]:
+        with self._lock:
+            queued = [
+                job for job in self._jobs.values()
+                if job.status == JobStatus.QUEUED and job.tenant not in skip_tenants
+            ]
+            if not queued:
+                return None
+            job = min(queued, key=lambda job: (-job.priority, job.created_at))
+            job.status = JobStatus.RUNNING
+            job.worker = worker
+            job.attempts += 1
+            job.started_at = datetime.now().isoformat()
+            return job.model_copy(deep=True)
+
+    def update(self, job_id: str, updates: Dict[str, Any], statuses: Optional[Iterable[JobStatus]] = None) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or (statuses is not None and job.status not in tuple(statuses)):
+                return False
+            for field, value in updates.items():
+                setattr(job, field, value)
+            return True
+
+    def purge(self, finished_before: str) -> List[Job]:
+        with self._lock:
+            old = [
+                job_id for job_id, job in self._jobs.items()
+                if job.status in FINISHED_STATUSES and (job.finished_at or "") < finished_before
+            ]
+            return [self._jobs.pop(job_id) for job_id in old]
+
+
+class JobCancelled(Exception):
+    """Raised by handlers that stop early because their job was cancelled"""
+
+
+class JobContext:
+    """What a running handler can see of its job"""
+
+    def __init__(self, queue: "JobQueue", job: Job, cancel_event: threading.Event):
+        self.job = job
+        self._queue = queue
+        self._cancel_event = cancel_event
+
+    @property
+    def job_id(self) -> str:
+        return self.job.job_id
+
+    def cancelled(self) -> bool:
+        """Whether the job was cancelled (here or by another process)"""
+        if self._cancel_event.is_set():
+            return True
+        current = self._queue.backend.get(self.job.job_id)
+        if current is not None and current.status == JobStatus.CANCELLING:
+            self._cancel_event.set()
+        return self._cancel_event.is_set()
+
+    def set_claim_id(self, claim_id: str):
+        """Record the claim the job is working on, once known"""
+        if self.job.claim_id != claim_id:
+            self.job.claim_id = claim_id
+            self._queue.backend.update(self.job.job_id, {"claim_id": claim_id})
+
+
+JobHandler = Callable[[Dict[str, Any], JobContext], Dict[str, Any]]
+
+
+class JobQueue:
+    """Priority job queue with per-tenant concurrency caps"""
+
+    def __init__(
+        self,
+        backend: JobBackend,
+        workers: int = JOB_WORKERS,
+        tenant_concurrency: int = JOB_TENANT_CONCURRENCY,
+        poll_seconds: float = JOB_POLL_SECONDS
+    ):
+        """
+        Args:
+            backend: Job persistence
+            workers: Worker threads
+            tenant_concurrency: Jobs of one tenant running at once in this process
+            poll_seconds: Idle wait between looks for jobs from other processes
+        """
+        self.backend = backend
+        self.workers = workers
+        self.tenant_concurrency = tenant_concurrency
+        self.poll_seconds = poll_seconds
+        self._handlers: Dict[str, JobHandler] = {}
+        self._upload_dirs: Dict[str, str] = {}  # kind -> directory of kept uploads
+        self._running: Dict[str, threading.Event] = {}  # job_id -> cancel event
+        self._running_by_tenant: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+        self.stats = {
+            "submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "requeued": 0, "uploads_removed": 0
+        }
+
+    def register(self, kind: str, handler: JobHandler, upload_dir: Optional[str] = None):
+        """
+        Register the handler that runs jobs of a kind
+
+        Args:
+            kind: Job kind
+            handler: Called with (payload, JobContext) on a worker thread;
+                returns the JSON-ready result
+            upload_dir: Directory of the uploads these jobs keep at
+                payload["file_path"] (optional); the handler deletes the file
+                when it runs, the queue when the job ends without running
+        """
+        self._handlers[kind] = handler
+        if upload_dir is not None:
+            self._upload_dirs[kind] = os.path.abspath(upload_dir)
+
+    def start(self):
+        """Recover jobs from a previous run and start the workers"""
+        with self._cond:
+            if self._threads or self._closed:
+                return
+            self._recover()
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"job-worker-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        print(f"✅ Job queue started: {self.workers} workers ({self.backend.name} backend)")
+
+    def submit(self, kind: str, payload: Dict[str, Any], tenant: str = "default", priority: int = 0) -> Job:
+        """
+        Queue a job
+
+        Args:
+            kind: Job kind (must have a registered handler)
+            payload: JSON-ready handler input
+            tenant: Tenant the job counts against
+            priority: Higher runs first
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If no handler is registered for the kind
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = Job(
+            job_id=f"J-{uuid.uuid4().hex[:12].upper()}",
+            kind=kind,
+            tenant=tenant or "default",
+            priority=priority,
+            payload=payload,
+            claim_id=payload.get("claim_id")
+        )
+        self.backend.add(job)
+        self.start()
+        with self._cond:
+            self.stats["submitted"] += 1
+            self._cond.notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Get a job
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Job or None
+        """
+        return self.backend.get(job_id)
+
+    def list_jobs(
+        self,
+        tenant: Optional[str] = None,
+        status: Optional[JobStatus] = None,
+        limit: Optional[int] = 50
+    ) -> List[Job]:
+        """
+        List jobs, newest first
+
+        Args:
+            tenant: Optional tenant filter
+            status: Optional status filter
+            limit: Maximum number of jobs
+
+        Returns:
+            List of jobs
+        """
+        return self.backend.list_jobs(tenant, status, limit)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job
+
+        A queued job is cancelled at once and its kept upload deleted. A
+        running job is marked cancelling; its handler stops at its next
+        check and the job ends cancelled. Finished jobs are left as they are.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            The job after the request, or None if it does not exist
+        """
+        now = datetime.now().isoformat()
+        if self.backend.update(
+            job_id, {"status": JobStatus.CANCELLED, "finished_at": now}, statuses=[JobStatus.QUEUED]
+        ):
+            with self._cond:
+                self.stats["cancelled"] += 1
+            job = self.backend.get(job_id)
+            if job is not None:
+                # Its handler never runs, so the queue deletes the upload
+                self._remove_upload(job)
+            return job
+        if self.backend.update(job_id, {"status": JobStatus.CANCELLING}, statuses=[JobStatus.RUNNING]):
+            with self._cond:
+                cancel_event = self._running.get(job_id)
+            if cancel_event is not None:
+                cancel_event.set()
+        return self.backend.get(job_id)
+
+    def close(self, timeout: float = 10.0) -> int:
+        """
+        Stop taking jobs and wait for running ones
+
+        Jobs still running after the timeout are queued again when the
+        queue next starts (their worker process is gone by then).
+
+        Args:
+            timeout: Seconds to wait for running jobs
+
+        Returns:
+            Number of jobs still running
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        deadline = datetime.now() + timedelta(seconds=timeout)
+        for thread in threads:
+            thread.join(max(0.0, (deadline - datetime.now()).total_seconds()))
+        with self._cond:
+            return len(self._running)
+
+    def metrics(self) -> Dict:
+        """
+        Get job counts
+
+        Returns:
+            Dictionary of job queue metrics
+        """
+        with self._cond:
+            return {
+                **self.stats,
+                "backend": self.backend.name,
+                "workers": len(self._threads),
+                "running": len(self._running),
+                "running_by_tenant": dict(self._running_by_tenant),
+                "tenant_concurrency": self.tenant_concurrency
+            }
+
+    def _recover(self):
+        """
+        Requeue jobs whose worker process died, purge old finished jobs and
+        delete kept uploads no unfinished job refers to
+        """
+        for job in self.backend.list_jobs(limit=None, status=JobStatus.RUNNING) + \
+                self.backend.list_jobs(limit=None, status=JobStatus.CANCELLING):
+            if _worker_alive(job.worker):
+                continue
+            if job.status == JobStatus.CANCELLING:
+                updates = {"status": JobStatus.CANCELLED, "finished_at": datetime.now().isoformat()}
+            elif job.attempts >= JOB_MAX_ATTEMPTS:
+                updates = {
+                    "status": JobStatus.FAILED,
+                    "error": f"Worker stopped during the job {job.attempts} times",
+                    "finished_at": datetime.now().isoformat()
+                }
+            else:
+                updates = {"status": JobStatus.QUEUED, "worker": None}
+            if not self.backend.update(job.job_id, updates, statuses=[job.status]):
+                continue
+            if updates["status"] == JobStatus.QUEUED:
+                self.stats["requeued"] += 1
+            else:
+                # The handler never got to delete the upload
+                self._remove_upload(job)
+
+        cutoff = (datetime.now() - timedelta(days=JOB_RETENTION_DAYS)).isoformat()
+        purged = self.backend.purge(cutoff)
+        for job in purged:
+            self._remove_upload(job)
+        if purged:
+            print(f"✅ Purged {len(purged)} finished jobs older than {JOB_RETENTION_DAYS:g} days")
+
+        swept = sum(self._sweep_uploads(kind, directory) for kind, directory in self._upload_dirs.items())
+        if swept:
+            print(f"✅ Removed {swept} orphaned job uploads")
+
+    def _remove_upload(self, job: Job) -> bool:
+        """Delete the upload a job kept, if its kind keeps one"""
+        file_path = job.payload.get("file_path")
+        if job.kind not in self._upload_dirs or not file_path:
+            return False
+        try:
+            os.unlink(file_path)
+        except OSError:
+            return False
+        with self._cond:
+            self.stats["uploads_removed"] += 1
+        return True
+
+    def _sweep_uploads(self, kind: str, directory: str) -> int:
+        """Delete files in a kind's upload directory that no unfinished job refers to"""
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return 0
+        in_use = {
+            os.path.abspath(job.payload["file_path"])
+            for status in UNFINISHED_STATUSES
+            for job in self.backend.list_jobs(limit=None, status=status)
+            if job.kind == kind and job.payload.get("file_path")
+        }
+        cutoff = time.time() - JOB_UPLOAD_GRACE_SECONDS
+        swept = 0
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                if path in in_use or not os.path.isfile(path) or os.path.getmtime(path) > cutoff:
+                    continue
+                os.unlink(path)
+            except OSError:
+                continue
+            swept += 1
+        with self._cond:
+            self.stats["uploads_removed"] += swept
+        return swept
+
+    def _next_job(self) -> Optional[Job]:
+        """Wait for a runnable job and claim it (None once closed)"""
+        with self._cond:
+            while not self._closed:
+                skip = {
+                    tenant for tenant, running in self._running_by_tenant.items()
+                    if running >= self.tenant_concurrency
+                }
+                job = self.backend.claim_next(WORKER_ID, skip)
+                if job is not None:
+                    self._running[job.job_id] = threading.Event()
+                    self._running_by_tenant[job.tenant] = self._running_by_tenant.get(job.tenant, 0) + 1
+                    return job
+                self._cond.wait(self.poll_seconds)
+            return None
+
+    def _run(self):
+        """Worker loop"""
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                self._execute(job)
+            finally:
+                with self._cond:
+                    self._running.pop(job.job_id, None)
+                    self._running_by_tenant[job.tenant] -= 1
+                    if not self._running_by_tenant[job.tenant]:
+                        del self._running_by_tenant[job.tenant]
+                    self._cond.notify_all()
+
+    def _execute(self, job: Job):
+        """Run one claimed job and store its outcome"""
+        context = JobContext(self, job, self._running[job.job_id])
+        active = [JobStatus.RUNNING, JobStatus.CANCELLING]
+        try:
+            handler = self._handlers.get(job.kind)
+            if handler is None:
+                raise ValueError(f"No handler registered for job kind {job.kind}")
+            result = handler(job.payload, context)
+            if context.cancelled():
+                raise JobCancelled()
+            updates = {"status": JobStatus.COMPLETED, "result": result, "error": None}
+            outcome = "completed"
+        except JobCancelled:
+            updates = {"status": JobStatus.CANCELLED}
+            outcome = "cancelled"
+        except Exception as e:
+            print(f"⚠️ Job {job.job_id} ({job.kind}) failed: {e}")
+            updates = {"status": JobStatus.FAILED, "error": str(e)}
+            outcome = "failed"
+
+        updates["finished_at"] = datetime.now().isoformat()
+        if context.job.claim_id:
+            updates["claim_id"] = context.job.claim_id
+        self.backend.update(job.job_id, updates, statuses=active)
+        with self._cond:
+            self.stats[outcome] += 1
+
+
+def _worker_alive(worker: Optional[str]) -> bool:
+    """Whether the process that claimed a job still runs (other hosts are assumed alive)"""
+    if not worker or ":" not in worker:
+        return False
+    host, pid = worker.rsplit(":", 1)
+    if host != socket.gethostname():
+        return True
+    if worker == WORKER_ID:
+        # This process, restarted queue: nothing of ours is running yet
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+def create_job_backend(backend: str = JOB_BACKEND) -> JobBackend:
+    """
+    Create a job backend by name
+
+    Args:
+        backend: "sqlite" or "memory"
+
+    Returns:
+        JobBackend instance
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend == "sqlite":
+        from utils.sqlite_jobs import SQLiteJobBackend
+        return SQLiteJobBackend()
+    if backend == "memory":
+        return MemoryJobBackend()
+    raise ValueError(f"Unknown JOB_BACKEND: {backend} (expected 'sqlite' or 'memory')")
+
+
+# Singleton instance
+job_queue = JobQueue(create_job_backend())
@@ -0,0 +1,235 @@
+"""
+Content-addressed cache for LLM results
+
+Summaries and structured extractions depend only on the document text, the
+prompt template and the model. Users retry uploads of the same police
+report all the time, so results are cached under a hash of:
+
+    namespace + prompt version + model + extra params + normalized text
+
+Two tiers:
+- memory: LRU bounded by LLM_CACHE_MAX_ENTRIES
+- disk (optional): SQLite file at LLM_CACHE_PATH, bounded by
+  LLM_CACHE_DISK_MAX_ENTRIES, shared across restarts and workers
+
+Entries expire after LLM_CACHE_TTL_SECONDS. Bump a prompt version whenever
+its template changes so stale results are never served.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_TTL = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+DEFAULT_DISK_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "10000"))
+
+
+def normalize_text(text: str) -> str:
+    """Normalize document text so cosmetic differences hash the same"""
+    text = unicodedata.normalize("NFC", text or "")
+    return " ".join(text.split())
+
+
+class LLMCache:
+    """Two-tier (memory + optional SQLite) cache for LLM outputs"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        disk_max_entries: int = DEFAULT_DISK_MAX_ENTRIES
+    ):
+        """
+        Args:
+            path: SQLite file for the disk tier; None keeps the cache in memory only
+            ttl: Seconds before an entry expires
+            max_entries: Maximum entries kept in memory
+            disk_max_entries: Maximum entries kept on disk
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk_max_entries = disk_max_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(namespace: str, text: str, prompt_version: str, model: str, **params) -> str:
+        """
+        Build a content-addressed cache key
+
+        Args:
+            namespace: What is being cached (e.g. "summary", "extract")
+            text: Document text (normalized before hashing)
+            prompt_version: Version of the prompt template
+            model: Model name
+            **params: Other inputs that change the output (max_tokens, ...)
+
+        Returns:
+            Hex digest key
+        """
+        digest = hashlib.sha256()
+        header = json.dumps([namespace, prompt_version, model, sorted(params.items())])
+        digest.update(header.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_text(text).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached value
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._db.execute(
+                        "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                    self._db.commit()
+                    self._remember(key, row[0], row[1])
+                    self.stats["disk_hits"] += 1
+                    return row[0]
+                if row is not None:
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str):
+        """
+        Store a value in every tier
+
+        Args:
+            key: Key from make_key()
+            value: Value to cache
+        """
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self.stats["sets"] += 1
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now)
+                )
+                overflow = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.disk_max_entries
+                if overflow > 0:
+                    self._db.execute(
+                        "DELETE FROM llm_cache WHERE key IN ("
+                        "SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                        (overflow,)
+                    )
+                    self.stats["evictions"] += overflow
+                self._db.commit()
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        """Insert into the memory tier, evicting least recently used entries"""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        """
+        Return the cached value or compute and cache it
+
+        Exceptions from compute propagate and nothing is cached.
+
+        Args:
+            key: Key from make_key()
+            compute: Produces the value on a miss
+
+        Returns:
+            Cached or freshly computed value
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Async version of get_or_compute() for coroutine producers"""
+        value = self.get(key)
+        if value is None:
+            value = await compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def metrics(self) -> Dict:
+        """
+        Get cache size and hit/miss counters
+
+        Returns:
+            Dictionary of cache metrics
+        """
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return {
+                **self.stats,
+                "memory_entries": len(self._memory),
+                "disk_enabled": self._db is not None,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+            }
+
+
+# Singleton instance
+llm_cache = LLMCache(path=os.getenv("LLM_CACHE_PATH") or None)
@@ -0,0 +1,452 @@
+"""
+Process-wide LLM gateway for OpenAI and Gemini
+
+Every LLM call in the backend goes through `llm_gateway`:
+
+- One persistent httpx.AsyncClient per provider, so TLS connections are
+  reused across requests instead of re-handshaking per call
+- A per-provider concurrency limit
+- Retry with jittered exponential backoff on 429, 5xx and transport errors
+- A common chat-style interface over both providers
+
+The clients live on a dedicated background event loop. Async callers
+`await llm_gateway.complete(...)`; synchronous callers (agents running on
+worker threads, MCP tools) use `llm_gateway.complete_sync(...)`, or
+`llm_gateway.submit(...)` to send a batch at once. All share the same
+connection pools.
+
+Provider base URLs can be pointed at a local stub server via
+OPENAI_BASE_URL and GEMINI_BASE_URL.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Request timeout in seconds
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+
+# Number of retries after the first attempt
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+
+# Backoff base and cap in seconds
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Raised when an LLM request fails"""
+
+    def __init__(self, message: str, provider: str, status_code: Optional[int] = None):
+        self.provider = provider
+        self.status_code = status_code
+        super().__init__(message)
+
+
+class LLMNotConfiguredError(LLMError):
+    """Raised when a provider has no API key"""
+
+
+class LLMResponse:
+    """Text completion returned by a provider"""
+
+    def __init__(self, text: str, provider: str, model: str, latency: float, usage: Optional[Dict] = None):
+        self.text = text
+        self.provider = provider
+        self.model = model
+        self.latency = latency
+        self.usage = usage or {}
+
+
+class LLMProvider:
+    """
+    Base class for an HTTP LLM provider
+
+    Messages use the chat format [{"role": "system"|"user"|"assistant",
+    "content": str}] regardless of provider.
+    """
+
+    name = "base"
+    key_env = ""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str,
+        default_model: str,
+        max_concurrency: int
+    ):
+        """
+        Args:
+            api_key: Provider API key (None disables the provider)
+            base_url: API base URL
+            default_model: Model used when a call does not name one
+            max_concurrency: Maximum concurrent requests to this provider
+        """
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.default_model = default_model
+        self.max_concurrency = max_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.stats = {"requests": 0, "failures": 0, "retries": 0, "in_flight": 0, "total_latency": 0.0}
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def client(self) -> httpx.AsyncClient:
+        """Persistent client, created on first use on the gateway loop"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.auth_headers(),
+                timeout=LLM_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+        return self._client
+
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def auth_headers(self) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def build_request(self, messages: List[Dict], model: str, max_tokens: int, temperature: float) -> tuple:
+        """Return (path, json body) for a completion request"""
+        raise NotImplementedError
+
+    def parse_response(self, payload: Dict) -> tuple:
+        """Return (text, usage) from a completion response"""
+        raise NotImplementedError
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI chat completions API"""
+
+    name = "openai"
+    key_env = "OPENAI_API_KEY"
+
+    def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    def build_request(self, messages: List[Dict], model: str, max_tokens: int, temperature: float) -> tuple:
+        return "/chat/completions", {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+
+    def parse_response(self, payload: Dict) -> tuple:
+        try:
+            text = payload["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError):
+            raise LLMError("OpenAI returned no choices", self.name)
+        return text, payload.get("usage", {})
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini generateContent API"""
+
+    name = "gemini"
+    key_env = "GEMINI_API_KEY"
+
+    def auth_headers(self) -> Dict[str, str]:
+        return {"x-goog-api-key": self.api_key or ""}
+
+    def build_request(self, messages: List[Dict], model: str, max_tokens: int, temperature: float) -> tuple:
+        system_parts = []
+        contents = []
+        for message in messages:
+            if message["role"] == "system":
+                system_parts.append({"text": message["content"]})
+            else:
+                contents.append({
+                    "role": "model" if message["role"] == "assistant" else "user",
+                    "parts": [{"text": message["content"]}]
+                })
+
+        body = {
+            "contents": contents,
+            "generationConfig": {
+                "maxOutputTokens": max_tokens,
+                "temperature": temperature
+            }
+        }
+        if system_parts:
+            body["systemInstruction"] = {"parts": system_parts}
+        return f"/models/{model}:generateContent", body
+
+    def parse_response(self, payload: Dict) -> tuple:
+        candidates = payload.get("candidates") or []
+        if not candidates:
+            raise LLMError("Gemini returned no candidates", self.name)
+        parts = candidates[0].get("content", {}).get("parts", [])
+        text = "".join(part.get("text", "") for part in parts)
+        return text, payload.get("usageMetadata", {})
+
+
+class LLMGateway:
+    """Shared entry point for all LLM calls"""
+
+    def __init__(self, providers: Optional[List[LLMProvider]] = None, default_provider: Optional[str] = None):
+        """
+        Args:
+            providers: Providers to use (defaults to OpenAI and Gemini from env)
+            default_provider: Provider used when a call does not name one
+        """
+        if providers is None:
+            providers = [
+                OpenAIProvider(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+                    default_model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+                    max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+                ),
+                GeminiProvider(
+                    api_key=os.getenv("GEMINI_API_KEY"),
+                    base_url=os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta"),
+                    default_model=os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp"),
+                    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+                )
+            ]
+        self.providers = {provider.name: provider for provider in providers}
+        self.default_provider = default_provider or os.getenv("LLM_PROVIDER")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def is_configured(self, provider: Optional[str] = None) -> bool:
+        """Check whether a provider (or any provider) has an API key"""
+        if provider is None:
+            return any(p.configured for p in self.providers.values())
+        return provider in self.providers and self.providers[provider].configured
+
+    def _resolve(self, provider: Optional[str]) -> LLMProvider:
+        name = provider or self.default_provider
+        if name is None:
+            # Prefer the first configured provider
+            name = next((p.name for p in self.providers.values() if p.configured), "openai")
+        if name not in self.providers:
+            raise LLMError(f"Unknown LLM provider: {name}", name)
+
+        resolved = self.providers[name]
+        if not resolved.configured:
+            raise LLMNotConfiguredError(
+                f"{resolved.key_env} not found in environment variables", name
+            )
+        return resolved
+
+    def model_for(self, provider: Optional[str] = None) -> str:
+        """Model a call to this provider uses when none is named"""
+        return self._resolve(provider).default_model
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="llm-gateway", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), LLM_BACKOFF_MAX)
+            except ValueError:
+                pass
+        # Full jitter keeps retrying clients from synchronizing
+        return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+    async def _complete(
+        self,
+        provider: LLMProvider,
+        messages: List[Dict],
+        model: Optional[str],
+        max_tokens: int,
+        temperature: float
+    ) -> LLMResponse:
+        model = model or provider.default_model
+        path, body = provider.build_request(messages, model, max_tokens, temperature)
+
+        async with provider.semaphore():
+            provider.stats["in_flight"] += 1
+            start = time.perf_counter()
+            try:
+                attempt = 0
+                while True:
+                    retry_after = None
+                    try:
+                        response = await provider.client().post(path, json=body)
+                        if response.status_code < 400:
+                            text, usage = provider.parse_response(response.json())
+                            latency = time.perf_counter() - start
+                            provider.stats["requests"] += 1
+                            provider.stats["total_latency"] += latency
+                            return LLMResponse(text, provider.name, model, latency, usage)
+
+                        error = LLMError(
+                            f"{provider.name} request failed with status {response.status_code}: "
+                            f"{response.text[:200]}",
+                            provider.name,
+                            response.status_code
+                        )
+                        if response.status_code not in RETRYABLE_STATUS:
+                            raise error
+                        retry_after = response.headers.get("retry-after")
+                    except httpx.TransportError as e:
+                        error = LLMError(f"{provider.name} request failed: {str(e)}", provider.name)
+
+                    if attempt >= LLM_MAX_RETRIES:
+                        raise error
+                    provider.stats["retries"] += 1
+                    await asyncio.sleep(self._backoff(attempt, retry_after))
+                    attempt += 1
+            except Exception:
+                provider.stats["failures"] += 1
+                raise
+            finally:
+                provider.stats["in_flight"] -= 1
+
+    async def complete(
+        self,
+        messages: List[Dict],
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.3
+    ) -> LLMResponse:
+        """
+        Run a chat completion
+
+        Args:
+            messages: Chat messages [{"role": ..., "content": ...}]
+            provider: "openai" or "gemini" (defaults to LLM_PROVIDER or the first configured)
+            model: Model name (defaults to the provider's default)
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+
+        Returns:
+            LLMResponse with the generated text
+
+        Raises:
+            LLMNotConfiguredError: If the provider has no API key
+            LLMError: If the request fails after retries
+        """
+        resolved = self._resolve(provider)
+        future = asyncio.run_coroutine_threadsafe(
+            self._complete(resolved, messages, model, max_tokens, temperature),
+            self._ensure_loop()
+        )
+        return await asyncio.wrap_future(future)
+
+    def complete_sync(
+        self,
+        messages: List[Dict],
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.3
+    ) -> LLMResponse:
+        """
+        Blocking version of complete() for synchronous callers
+
+        Must not be called from a running event loop; use complete() there.
+        """
+        return self.submit(messages, provider, model, max_tokens, temperature).result()
+
+    def submit(
+        self,
+        messages: List[Dict],
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.3
+    ) -> Future:
+        """
+        Start a chat completion without waiting for it
+
+        Lets synchronous callers send a batch of requests at once and collect
+        them with concurrent.futures.as_completed(); the provider's
+        concurrency limit still applies.
+
+        Returns:
+            Future resolving to an LLMResponse
+
+        Raises:
+            LLMNotConfiguredError: If the provider has no API key
+        """
+        resolved = self._resolve(provider)
+        return asyncio.run_coroutine_threadsafe(
+            self._complete(resolved, messages, model, max_tokens, temperature),
+            self._ensure_loop()
+        )
+
+    def metrics(self) -> Dict:
+        """
+        Get per-provider request metrics
+
+        Returns:
+            Dictionary of provider name to metrics
+        """
+        metrics = {}
+        for name, provider in self.providers.items():
+            stats = provider.stats
+            metrics[name] = {
+                "configured": provider.configured,
+                "max_concurrency": provider.max_concurrency,
+                "in_flight": stats["in_flight"],
+                "requests": stats["requests"],
+                "failures": stats["failures"],
+                "retries": stats["retries"],
+                "avg_latency_ms": round(stats["total_latency"] / stats["requests"] * 1000, 2)
+                if stats["requests"] else 0.0
+            }
+        return metrics
+
+    def close(self):
+        """Close provider connection pools and stop the gateway loop"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None or not thread.is_alive():
+            return
+
+        async def shutdown():
+            for provider in self.providers.values():
+                await provider.aclose()
+            # Semaphores belong to the closed loop
+            for provider in self.providers.values():
+                provider._semaphore = None
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+
+# Singleton instance
+llm_gateway = LLMGateway()
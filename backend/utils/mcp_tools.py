@@ -9,15 +9,22 @@ from pathlib import Path
 # Add document_mcp directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'document_mcp'))
 
-import pdfplumber
-from openai import OpenAI
 from dotenv import load_dotenv
-import io
 import base64
 
+from concurrent.futures import as_completed
+from typing import Dict, Hashable, Iterator, List, Tuple, Union
+
+from utils.llm_gateway import llm_gateway
+from utils.pdf_extract import extract_text
+from utils.llm_cache import llm_cache
+
 # Load environment variables
 load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
+
+# Bump whenever the summary prompt below changes
+SUMMARY_PROMPT_VERSION = "claim-summary-v1"
+SUMMARY_MAX_TOKENS = 200
 
 
 def parse_pdf_from_bytes(pdf_bytes: bytes) -> str:
@@ -30,14 +37,7 @@ def parse_pdf_from_bytes(pdf_bytes: bytes) -> str:
     Returns:
         Extracted text from all pages
     """
-    text = ''
-    pdf_file = io.BytesIO(pdf_bytes)
-    with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return text.strip()
+    return extract_text(pdf_bytes)
 
 
 def parse_pdf_from_base64(file_data: str) -> str:
@@ -54,26 +54,94 @@ def parse_pdf_from_base64(file_data: str) -> str:
     return parse_pdf_from_bytes(pdf_bytes)
 
 
+def summary_messages(claim_text: str) -> List[Dict]:
+    """Chat messages for the claim summary prompt"""
+    return [
+        {"role": "system", "content": "You are an insurance claims summarization assistant."},
+        {"role": "user", "content": f"Summarize the following claim in a few sentences, extract important information such as what may be owed, if the claim was denied, etc.:\n\n{claim_text}"}
+    ]
+
+
+def summary_cache_key(claim_text: str) -> str:
+    """Content-addressed cache key for an OpenAI claim summary"""
+    return llm_cache.make_key(
+        "summary",
+        claim_text,
+        SUMMARY_PROMPT_VERSION,
+        llm_gateway.model_for("openai"),
+        max_tokens=SUMMARY_MAX_TOKENS
+    )
+
+
 def summarize_claim(claim_text: str) -> str:
     """
     Generate a summary of an insurance claim using OpenAI GPT.
 
+    Summaries are cached by document content, so re-uploading the same
+    document does not call the LLM again.
+
     Args:
         claim_text: The full text of the insurance claim
 
     Returns:
         AI-generated summary of the claim
     """
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
-
-    client = OpenAI(api_key=api_key)
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are an insurance claims summarization assistant."},
-            {"role": "user", "content": f"Summarize the following claim in a few sentences, extract important information such as what may be owed, if the claim was denied, etc.:\n\n{claim_text}"}
-        ],
-        max_tokens=200
+    return llm_cache.get_or_compute(
+        summary_cache_key(claim_text),
+        lambda: llm_gateway.complete_sync(
+            messages=summary_messages(claim_text),
+            provider="openai",
+            max_tokens=SUMMARY_MAX_TOKENS
+        ).text
     )
-    return response.choices[0].message.content
+
+
+def summarize_claims(claim_texts: Dict[Hashable, str]) -> Iterator[Tuple[Hashable, Union[str, Exception]]]:
+    """
+    Summarize a batch of claims, yielding each summary as it completes
+
+    Cached summaries are yielded first. Every remaining document is sent to
+    the gateway at once (identical documents share one request), so the
+    batch takes about as long as its slowest summary instead of the sum.
+
+    Args:
+        claim_texts: Claim text by caller-chosen ID
+
+    Yields:
+        (ID, summary) pairs, or (ID, exception) for summaries that failed
+    """
+    pending: Dict[str, List[Hashable]] = {}
+    cached = []
+    for claim_id, claim_text in claim_texts.items():
+        key = summary_cache_key(claim_text)
+        summary = llm_cache.get(key)
+        if summary is not None:
+            cached.append((claim_id, summary))
+        else:
+            pending.setdefault(key, []).append(claim_id)
+
+    futures = {}
+    failed = []
+    for key, claim_ids in pending.items():
+        try:
+            future = llm_gateway.submit(
+                messages=summary_messages(claim_texts[claim_ids[0]]),
+                provider="openai",
+                max_tokens=SUMMARY_MAX_TOKENS
+            )
+            futures[future] = key
+        except Exception as e:
+            failed.extend((claim_id, e) for claim_id in claim_ids)
+
+    yield from cached
+    yield from failed
+
+    for future in as_completed(futures):
+        key = futures[future]
+        try:
+            result = future.result().text
+            llm_cache.set(key, result)
+        except Exception as e:
+            result = e
+        for claim_id in pending[key]:
+            yield claim_id, result
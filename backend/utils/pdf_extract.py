@@ -0,0 +1,234 @@
+"""
+Page-parallel PDF text extraction
+
+Every PDF reader in the backend (PDFParser, mcp_tools, the MCP server and
+the MCP routes) goes through extract_text(). Long claim packets (police
+report + estimates + medical bills) are split into contiguous page ranges
+that are extracted concurrently in a process pool. Results are joined in
+page order with a list builder.
+
+iter_pages() yields pages lazily for streaming consumers.
+
+Short documents are extracted inline: below PDF_PARALLEL_MIN_PAGES the cost
+of handing work to another process outweighs the gain.
+"""
+import io
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import IO, Iterator, List, Optional, Union
+
+PdfSource = Union[str, bytes, bytearray, memoryview, IO[bytes]]
+
+# Worker processes used for page-parallel extraction
+PDF_PROCESS_WORKERS = int(os.getenv("PDF_PROCESS_WORKERS", str(min(os.cpu_count() or 1, 4))))
+
+# Documents with fewer pages are extracted in the calling thread
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _open_pdf(source: Union[str, IO[bytes]]):
+    """Open a PDF with pdfplumber, falling back to PyPDF2"""
+    try:
+        import pdfplumber
+        return "pdfplumber", pdfplumber.open(source)
+    except ImportError:
+        pass
+    try:
+        import PyPDF2
+        return "pypdf2", PyPDF2.PdfReader(source)
+    except ImportError:
+        raise Exception("No PDF parsing library available. Install pdfplumber or PyPDF2.")
+
+
+def _close(backend: str, pdf):
+    if backend == "pdfplumber":
+        pdf.close()
+
+
+def _extract_range(source: Union[str, IO[bytes]], start: int, end: int) -> List[str]:
+    """
+    Extract text for pages [start, end) of a PDF
+
+    Runs in worker processes, so it only takes picklable arguments when
+    called through the pool (a file path).
+    """
+    backend, pdf = _open_pdf(source)
+    try:
+        return [(page.extract_text() or "") for page in pdf.pages[start:end]]
+    finally:
+        _close(backend, pdf)
+
+
+def page_count(source: Union[str, IO[bytes]]) -> int:
+    """Number of pages in a PDF"""
+    backend, pdf = _open_pdf(source)
+    try:
+        return len(pdf.pages)
+    finally:
+        _close(backend, pdf)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the parent runs worker threads, which fork does not copy safely
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_pool(wait: bool = True):
+    """Stop the extraction worker processes"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
+
+
+def _split(start: int, end: int, parts: int) -> List[tuple]:
+    """Split [start, end) into at most `parts` contiguous ranges"""
+    size = math.ceil((end - start) / parts)
+    return [(i, min(i + size, end)) for i in range(start, end, size)]
+
+
+def _check_max_pages(max_pages: Optional[int]):
+    """
+    Reject a page limit below 1 (a negative slice would drop the last pages)
+
+    Raises:
+        ValueError: If max_pages is below 1
+    """
+    if max_pages is not None and max_pages < 1:
+        raise ValueError(f"max_pages must be at least 1, got {max_pages}")
+
+
+def extract_pages(
+    source: PdfSource,
+    max_pages: Optional[int] = None,
+    workers: Optional[int] = None
+) -> List[str]:
+    """
+    Extract the text of each page, in page order
+
+    Args:
+        source: PDF path, raw bytes, or binary file object
+        max_pages: Only extract the first N pages (fast mode)
+        workers: Worker processes to use (defaults to PDF_PROCESS_WORKERS; 1 = inline)
+
+    Returns:
+        List of page texts
+
+    Raises:
+        ValueError: If max_pages is below 1
+    """
+    _check_max_pages(max_pages)
+    workers = PDF_PROCESS_WORKERS if workers is None else workers
+    spooled = None
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+
+    try:
+        backend, pdf = _open_pdf(source)
+        try:
+            total = len(pdf.pages)
+            end = total if max_pages is None else min(max_pages, total)
+            if workers <= 1 or end < PDF_PARALLEL_MIN_PAGES:
+                return [(page.extract_text() or "") for page in pdf.pages[:end]]
+        finally:
+            _close(backend, pdf)
+
+        # Workers open the document themselves, so they need a path
+        if not isinstance(source, str):
+            source.seek(0)
+            spooled = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
+            with spooled:
+                while True:
+                    chunk = source.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    spooled.write(chunk)
+            source = spooled.name
+
+        pool = _get_pool()
+        try:
+            futures = [pool.submit(_extract_range, source, start, stop) for start, stop in _split(0, end, workers)]
+            pages: List[str] = []
+            for future in futures:
+                pages.extend(future.result())
+            return pages
+        except BrokenProcessPool as e:
+            # A worker died (OOM kill, crash); replace the pool and finish inline
+            print(f"⚠️  PDF worker pool failed ({e}), extracting inline")
+            shutdown_pool(wait=False)
+            return _extract_range(source, 0, end)
+    finally:
+        if spooled is not None:
+            os.unlink(spooled.name)
+
+
+def iter_pages(source: PdfSource, max_pages: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of each page, in page order, as it is extracted
+
+    Pages are extracted lazily in the calling thread, so a consumer that
+    stops early (see IncrementalExtractor) never pays for the rest of the
+    document. The PDF stays open until the generator is exhausted or closed.
+
+    Args:
+        source: PDF path, raw bytes, or binary file object
+        max_pages: Only yield the first N pages
+
+    Yields:
+        Page text ("" for pages without a text layer)
+
+    Raises:
+        ValueError: If max_pages is below 1
+    """
+    _check_max_pages(max_pages)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+
+    backend, pdf = _open_pdf(source)
+    try:
+        pages = pdf.pages if max_pages is None else pdf.pages[:max_pages]
+        for page in pages:
+            yield page.extract_text() or ""
+    finally:
+        _close(backend, pdf)
+
+
+def extract_text(
+    source: PdfSource,
+    max_pages: Optional[int] = None,
+    separator: str = "\n",
+    workers: Optional[int] = None
+) -> str:
+    """
+    Extract the text of a PDF, pages joined in order
+
+    Args:
+        source: PDF path, raw bytes, or binary file object
+        max_pages: Only extract the first N pages (fast mode)
+        separator: String placed between pages
+        workers: Worker processes to use (defaults to PDF_PROCESS_WORKERS; 1 = inline)
+
+    Returns:
+        Extracted text, stripped
+
+    Raises:
+        ValueError: If max_pages is below 1
+    """
+    return separator.join(page for page in extract_pages(source, max_pages, workers) if page).strip()
@@ -1,12 +1,27 @@
 """
 PDF parsing utilities for ClaimPilot AI
 """
-import re
-from typing import Dict, List, Optional
+import os
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Sequence, Union
 from datetime import datetime
 import base64
 import io
 
+from utils.extraction_engine import (
+    DATE_PATTERNS,
+    INCIDENT_TYPE_KEYWORDS,
+    LOCATION_PATTERNS,
+    MAX_DAMAGE_SENTENCES,
+    extraction_engine
+)
+from utils.pdf_extract import extract_text, iter_pages
+
+# Confidence every required field must reach before a streaming parse stops early
+STREAM_PARSE_CONFIDENCE = float(os.getenv("STREAM_PARSE_CONFIDENCE", "0.8"))
+
+# Extracted fields backing the required Claim fields
+# (incident_type, date, location, damages_description)
+REQUIRED_FIELDS = ("incident_type", "date", "location", "damages")
 
 class PDFParser:
     """Parse PDF documents and extract relevant information"""
@@ -16,7 +31,7 @@ class PDFParser:
 
     def parse_document(self, file_data: str, file_name: str) -> str:
         """
-        Parse a document and extract text content
+        Parse a base64 encoded document (legacy JSON chat API)
 
         Args:
             file_data: Base64 encoded file content
@@ -26,85 +41,124 @@ class PDFParser:
             Extracted text content
         """
         try:
-            # Decode base64 data
             decoded_data = base64.b64decode(file_data)
+        except Exception as e:
+            raise Exception(f"Error parsing document: {str(e)}")
+        return self.parse_bytes(decoded_data, file_name)
+
+    def parse_bytes(self, data: bytes, file_name: str, max_pages: Optional[int] = None) -> str:
+        """
+        Parse an in-memory document
+
+        Args:
+            data: Raw file content
+            file_name: Name of the file
+            max_pages: Only read the first N pages of a PDF
 
-            # Check file type
+        Returns:
+            Extracted text content
+        """
+        try:
             if file_name.lower().endswith('.txt'):
-                return decoded_data.decode('utf-8')
+                return bytes(data).decode('utf-8')
             elif file_name.lower().endswith('.pdf'):
-                return self._parse_pdf(decoded_data)
+                return self._parse_pdf(io.BytesIO(data), max_pages)
             else:
                 raise ValueError(f"Unsupported file format: {file_name}")
 
         except Exception as e:
             raise Exception(f"Error parsing document: {str(e)}")
 
-    def _parse_pdf(self, pdf_data: bytes) -> str:
+    def parse_file(self, path: str, file_name: Optional[str] = None, max_pages: Optional[int] = None) -> str:
         """
-        Parse PDF file content
-        Parse PDF file content using MCP tools
+        Parse a document on disk without loading it into memory first
 
         Args:
-            pdf_data: Raw PDF bytes
+            path: Path to the file
+            file_name: Original file name, used to detect the format (defaults to path)
+            max_pages: Only read the first N pages of a PDF
 
         Returns:
-            Extracted text
+            Extracted text content
         """
+        file_name = file_name or path
         try:
-            # Try using PyPDF2
-            import PyPDF2
-            pdf_file = io.BytesIO(pdf_data)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-
-            return text.strip()
-        except ImportError:
-            # Fallback: try pdfplumber
-            try:
-                import pdfplumber
-                pdf_file = io.BytesIO(pdf_data)
-                text = ""
-                with pdfplumber.open(pdf_file) as pdf:
-                    for page in pdf.pages:
-                        text += page.extract_text() + "\n"
-                return text.strip()
-            except ImportError:
-                raise Exception("No PDF parsing library available. Install PyPDF2 or pdfplumber.")
-            # Use MCP parse_pdf tool
-            from utils.mcp_tools import parse_pdf_from_bytes
-            return parse_pdf_from_bytes(pdf_data)
+            if file_name.lower().endswith('.txt'):
+                with open(path, 'r', encoding='utf-8') as f:
+                    return f.read()
+            elif file_name.lower().endswith('.pdf'):
+                return self._parse_pdf(path, max_pages)
+            else:
+                raise ValueError(f"Unsupported file format: {file_name}")
+
         except Exception as e:
-            # Fallback to PyPDF2/pdfplumber if MCP tools fail
-            try:
-                import PyPDF2
-                pdf_file = io.BytesIO(pdf_data)
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-
-                return text.strip()
-            except ImportError:
-                # Final fallback: try pdfplumber
-                try:
-                    import pdfplumber
-                    pdf_file = io.BytesIO(pdf_data)
-                    text = ""
-                    with pdfplumber.open(pdf_file) as pdf:
-                        for page in pdf.pages:
-                            text += page.extract_text() + "\n"
-                    return text.strip()
-                except ImportError:
-                    raise Exception("No PDF parsing library available. Install PyPDF2 or pdfplumber.")
+            raise Exception(f"Error parsing document: {str(e)}")
+
+    def _parse_pdf(self, pdf_source: Union[str, IO[bytes]], max_pages: Optional[int] = None) -> str:
+        """
+        Parse PDF file content
+
+        Args:
+            pdf_source: Path to a PDF file or a binary file object
+            max_pages: Only read the first N pages
+
+        Returns:
+            Extracted text
+        """
+        return extract_text(pdf_source, max_pages=max_pages)
+
+    def iter_file_pages(self, path: str, file_name: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield a document on disk page by page
+
+        PDFs are extracted lazily one page at a time; text files are split
+        on form feeds (a file without them is a single page).
+
+        Args:
+            path: Path to the file
+            file_name: Original file name, used to detect the format (defaults to path)
+
+        Yields:
+            Page text
+        """
+        file_name = file_name or path
+        if file_name.lower().endswith('.txt'):
+            with open(path, 'r', encoding='utf-8') as f:
+                yield from f.read().split('\f')
+        elif file_name.lower().endswith('.pdf'):
+            yield from iter_pages(path)
+        else:
+            raise ValueError(f"Unsupported file format: {file_name}")
+
+    def extract_streaming(
+        self,
+        pages: Iterable[str],
+        threshold: float = STREAM_PARSE_CONFIDENCE,
+        required_fields: Sequence[str] = REQUIRED_FIELDS
+    ) -> "IncrementalExtractor":
+        """
+        Feed pages into an IncrementalExtractor until the required fields are confident
+
+        Pages after the stopping point are left unread in `pages`, so the
+        caller can finish the document later (or never) with feed().
+
+        Args:
+            pages: Page texts in order, usually a generator from iter_file_pages()
+            threshold: Confidence each required field must reach
+            required_fields: Fields that must be confident before stopping
+
+        Returns:
+            IncrementalExtractor holding the early result and consumed pages
+        """
+        extractor = IncrementalExtractor(threshold, required_fields)
+        for page in pages:
+            if extractor.feed(page):
+                break
+        return extractor
 
     def extract_structured_data(self, text: str) -> Dict:
         """
-        Extract structured data from raw text using regex patterns
+        Extract structured data from raw text in a single scan
 
         Args:
             text: Raw text from document
@@ -112,122 +166,119 @@ class PDFParser:
         Returns:
             Dictionary with extracted fields
         """
-        data = {
-            "incident_type": self._extract_incident_type(text),
-            "date": self._extract_date(text),
-            "location": self._extract_location(text),
-            "parties": self._extract_parties(text),
-            "damages": self._extract_damages(text),
-            "amounts": self._extract_monetary_amounts(text),
-        }
+        return extraction_engine.extract(text)
+
+
+class IncrementalExtractor:
+    """
+    Page-at-a-time structured data extraction with per-field confidence
+
+    Each fed page is scanned once by the extraction engine, so work is
+    proportional to the pages consumed, never to the whole document.
+    Parties and amounts accumulate over every page fed. A lower-priority
+    match (e.g. a "Medical" incident type) is replaced if a later page has a
+    higher-priority one, so the result converges on what
+    extract_structured_data() returns for the same text.
+    """
+
+    def __init__(
+        self,
+        threshold: float = STREAM_PARSE_CONFIDENCE,
+        required_fields: Sequence[str] = REQUIRED_FIELDS
+    ):
+        """
+        Args:
+            threshold: Confidence each required field must reach
+            required_fields: Fields that must be confident for is_complete
+        """
+        self.threshold = threshold
+        self.required_fields = tuple(required_fields)
+        self.pages: List[str] = []
+        self.complete_at: Optional[int] = None  # page count when the fields became confident
+        self.confidence: Dict[str, float] = {field: 0.0 for field in REQUIRED_FIELDS}
+        self._rank: Dict[str, int] = {}
+        self._values: Dict[str, str] = {}
+        self._damage_sentences: List[str] = []
+        self._parties: List[Dict] = []
+        self._amounts: List[float] = []
+
+    @property
+    def is_complete(self) -> bool:
+        """True once every required field is at or above the threshold"""
+        return all(self.confidence.get(field, 0.0) >= self.threshold for field in self.required_fields)
+
+    @property
+    def text(self) -> str:
+        """Text of the pages consumed so far"""
+        return "\n".join(page for page in self.pages if page).strip()
+
+    def feed(self, page: str) -> bool:
+        """
+        Consume one page
 
-        return data
+        Args:
+            page: Page text
 
-    def _extract_incident_type(self, text: str) -> Optional[str]:
-        """Extract incident type from text"""
-        patterns = {
-            "Car Accident": r"(?i)(car accident|vehicle collision|auto accident|traffic accident|car crash)",
-            "Home Damage": r"(?i)(home damage|house damage|property damage|water damage|fire damage)",
-            "Theft": r"(?i)(theft|burglary|stolen|robbery)",
-            "Medical": r"(?i)(medical|injury|hospital|treatment|doctor)",
+        Returns:
+            True if the required fields are now complete
+        """
+        self.pages.append(page)
+        matches = extraction_engine.scan(page, MAX_DAMAGE_SENTENCES - len(self._damage_sentences))
+
+        self._take_ranked("incident_type", matches.incident_type, [c for _, _, c in INCIDENT_TYPE_KEYWORDS])
+        self._take_ranked("date", matches.date, [c for _, c in DATE_PATTERNS])
+        self._take_ranked("location", matches.location, [c for _, c in LOCATION_PATTERNS])
+
+        if matches.damage_sentences:
+            self._damage_sentences.extend(matches.damage_sentences)
+            self.confidence["damages"] = round(len(self._damage_sentences) / MAX_DAMAGE_SENTENCES, 2)
+
+        self._parties.extend(matches.parties)
+        self._amounts.extend(matches.amounts)
+
+        if self.complete_at is None and self.is_complete:
+            self.complete_at = len(self.pages)
+        return self.is_complete
+
+    def _take_ranked(self, field: str, candidate: Optional[tuple], confidences: List[float]):
+        """Keep the highest-priority match seen so far for a field"""
+        if candidate is None:
+            return
+        value, rank = candidate
+        if rank < self._rank.get(field, len(confidences)):
+            self._rank[field] = rank
+            self._values[field] = value
+            self.confidence[field] = confidences[rank]
+
+    @property
+    def data(self) -> Dict:
+        """
+        Structured data from the pages consumed so far
+
+        Same shape and fallbacks as PDFParser.extract_structured_data().
+        """
+        return {
+            "incident_type": self._values.get("incident_type", "Other"),
+            "date": self._values.get("date", datetime.now().strftime("%Y-%m-%d")),
+            "location": self._values.get("location", "Location not specified"),
+            "parties": list(self._parties),
+            "damages": " ".join(self._damage_sentences) or "Damage description not available",
+            "amounts": list(self._amounts),
         }
 
-        for incident_type, pattern in patterns.items():
-            if re.search(pattern, text):
-                return incident_type
-
-        return "Other"
-
-    def _extract_date(self, text: str) -> Optional[str]:
-        """Extract date from text"""
-        # Common date patterns
-        date_patterns = [
-            r"\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b",  # MM/DD/YYYY or MM-DD-YYYY
-            r"\b(\d{4}[/-]\d{1,2}[/-]\d{1,2})\b",    # YYYY-MM-DD
-            r"\b([A-Za-z]+\s+\d{1,2},?\s+\d{4})\b",  # Month DD, YYYY
-        ]
-
-        for pattern in date_patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1)
-
-        # Default to today if not found
-        return datetime.now().strftime("%Y-%m-%d")
-
-    def _extract_location(self, text: str) -> Optional[str]:
-        """Extract location from text"""
-        # Look for common location patterns
-        location_patterns = [
-            r"(?i)(?:location|address|scene):\s*([^\n]+)",
-            r"(?i)(?:at|near|on)\s+([A-Z][A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr)[^\n]*)",
-            r"\b([A-Z][a-z]+,\s*[A-Z]{2})\b",  # City, STATE
-        ]
-
-        for pattern in location_patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1).strip()
-
-        return "Location not specified"
-
-    def _extract_parties(self, text: str) -> List[Dict]:
-        """Extract parties involved from text"""
-        parties = []
-
-        # Look for name patterns
-        name_patterns = [
-            r"(?i)driver:\s*([A-Z][a-z]+\s+[A-Z][a-z]+)",
-            r"(?i)owner:\s*([A-Z][a-z]+\s+[A-Z][a-z]+)",
-            r"(?i)claimant:\s*([A-Z][a-z]+\s+[A-Z][a-z]+)",
-        ]
-
-        for pattern in name_patterns:
-            matches = re.finditer(pattern, text)
-            for match in matches:
-                parties.append({
-                    "name": match.group(1),
-                    "role": "involved party"
-                })
-
-        return parties
-
-    def _extract_damages(self, text: str) -> str:
-        """Extract damage description from text"""
-        damage_keywords = [
-            "damage", "broken", "dent", "scratch", "shatter", "crack",
-            "injury", "harm", "collision", "impact", "destroyed"
-        ]
-
-        # Find sentences containing damage keywords
-        sentences = re.split(r'[.!?]+', text)
-        damage_sentences = []
-
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in damage_keywords):
-                damage_sentences.append(sentence.strip())
-
-        if damage_sentences:
-            return " ".join(damage_sentences[:3])  # Return first 3 relevant sentences
-
-        return "Damage description not available"
-
-    def _extract_monetary_amounts(self, text: str) -> List[float]:
-        """Extract monetary amounts from text"""
-        # Pattern for currency amounts
-        pattern = r"\$\s*[\d,]+(?:\.\d{2})?"
-        matches = re.findall(pattern, text)
-
-        amounts = []
-        for match in matches:
-            # Remove $ and commas, convert to float
-            amount_str = match.replace('$', '').replace(',', '').strip()
-            try:
-                amounts.append(float(amount_str))
-            except ValueError:
-                continue
-
-        return amounts
+    def report(self) -> Dict:
+        """
+        Summarize how much of the document was consumed
+
+        Returns:
+            Dictionary with pages consumed, early stop page and field confidence
+        """
+        return {
+            "pages_consumed": len(self.pages),
+            "complete_at_page": self.complete_at,
+            "threshold": self.threshold,
+            "field_confidence": dict(self.confidence)
+        }
 
 
 # Singleton instance
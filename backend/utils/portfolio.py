@@ -0,0 +1,282 @@
+"""
+Incremental portfolio analytics
+
+/api/stats/portfolio reports claim counts and the running totals of
+estimated damage, payout and deductible by incident type, status and
+severity, optionally rolled up by day or month of claim creation. Rather
+than rescanning every claim per request, PortfolioStats keeps one record
+per claim and adjusts the affected totals in place whenever a claim is
+created or updated (observe_claim) or estimated (observe_estimate), so a
+snapshot costs O(groups) however many claims are held.
+
+Amounts come from each claim's latest default estimate (no severity or
+coverage override). When a claim changes a field that drives its estimate,
+its amounts drop out of the totals until it is estimated again; the
+estimated_claims counts tell how many claims the amounts cover. Amounts
+are summed in integer cents, so adding and removing claims never drifts;
+an estimate with a non-finite amount (a stated damage of "inf" or "nan")
+leaves its claim unpriced. Bookkeeping errors are logged and counted, never
+raised to the claim write or estimate that reported the change.
+
+Aggregates live in this process: they are seeded from claim storage at
+startup and follow the writes this worker makes.
+"""
+import math
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from utils.data_models import Claim
+from utils.estimate_cache import estimate_inputs
+
+# Dimensions every claim is counted under (severity only once estimated)
+DIMENSIONS = ("incident_type", "status", "severity")
+BUCKETS = {"day": 10, "month": 7}  # Rollup granularity -> created_at prefix length
+
+Amounts = Tuple[int, int, int]  # (damage, payout, deductible) in cents
+
+
+def _cents(amount: float) -> int:
+    return int(round(amount * 100))
+
+
+class _ClaimRecord:
+    """What one claim contributes to the totals"""
+
+    __slots__ = ("incident_type", "status", "created_at", "inputs", "estimated_inputs", "severity", "amounts")
+
+    def __init__(self, claim: Claim):
+        self.incident_type = claim.incident_type
+        self.status = claim.status.value
+        self.created_at = claim.created_at
+        self.inputs = estimate_inputs(claim)
+        self.estimated_inputs: Optional[tuple] = None  # inputs of the latest estimate
+        self.severity: Optional[str] = None
+        self.amounts: Optional[Amounts] = None
+
+    def priced(self) -> Optional[Amounts]:
+        """Amounts that count toward the totals (None while the estimate is stale)"""
+        if self.amounts is not None and self.estimated_inputs == self.inputs:
+            return self.amounts
+        return None
+
+    def groups(self):
+        """(dimension, key) pairs the claim is counted under"""
+        yield "incident_type", self.incident_type
+        yield "status", self.status
+        if self.priced() is not None:
+            yield "severity", self.severity
+        for bucket, length in BUCKETS.items():
+            yield bucket, self.created_at[:length]
+
+
+class PortfolioStats:
+    """Running claim counts and estimate totals by incident type, status, severity and date"""
+
+    def __init__(self):
+        self._records: Dict[str, _ClaimRecord] = {}
+        # dimension -> key -> [claims, estimated_claims, damage, payout, deductible]
+        self._totals: Dict[str, Dict[str, list]] = {dimension: {} for dimension in (*DIMENSIONS, *BUCKETS)}
+        self._overall = [0, 0, 0, 0, 0]
+        self._lock = threading.RLock()
+        self.stats = {
+            "claim_updates": 0, "estimate_updates": 0, "seeded_claims": 0, "skipped_claims": 0,
+            "unpriced_estimates": 0, "errors": 0
+        }
+        self.updated_at: Optional[str] = None
+
+    def observe_claim(self, claim: Claim):
+        """
+        Count a created or updated claim under its current incident type and status
+
+        Args:
+            claim: Claim as stored
+        """
+        try:
+            with self._lock:
+                record = self._records.get(claim.claim_id)
+                if record is None:
+                    self._replace(claim, None, None, None, None)
+                else:
+                    self._replace(claim, record, record.estimated_inputs, record.severity, record.amounts)
+                self.stats["claim_updates"] += 1
+        except Exception as e:
+            self._failed(claim, e)
+
+    def observe_estimate(self, claim: Claim, damage: float, payout: float, deductible: float, severity: str):
+        """
+        Record a claim's default estimate
+
+        Args:
+            claim: Claim the estimate was computed from
+            damage: Estimated damage
+            payout: Payout after deductible
+            deductible: Deductible (out-of-pocket cost)
+            severity: Assessed severity level
+        """
+        try:
+            with self._lock:
+                self._observe_estimate(claim, damage, payout, deductible, severity)
+                self.stats["estimate_updates"] += 1
+        except Exception as e:
+            self._failed(claim, e)
+
+    def seed(self, claims, damage, payout, deductible, severities) -> int:
+        """
+        Add stored claims and their estimates in one pass, skipping claims
+        this process already tracks
+
+        Args:
+            claims: Claim objects
+            damage: Estimated damage per claim
+            payout: Payout after deductible per claim
+            deductible: Deductible per claim
+            severities: Assessed severity per claim
+
+        Returns:
+            Number of claims added
+        """
+        added = 0
+        with self._lock:
+            for claim, claim_damage, claim_payout, claim_deductible, severity in zip(
+                claims, damage, payout, deductible, severities
+            ):
+                if claim.claim_id in self._records:
+                    continue
+                try:
+                    self._observe_estimate(claim, claim_damage, claim_payout, claim_deductible, severity)
+                except Exception as e:
+                    self._failed(claim, e)
+                    continue
+                added += 1
+            self.stats["seeded_claims"] += added
+        return added
+
+    def record_skipped(self, count: int):
+        """
+        Count stored claims that could not be seeded (not in the totals)
+
+        Args:
+            count: Number of claims skipped
+        """
+        with self._lock:
+            self.stats["skipped_claims"] += count
+
+    def _observe_estimate(self, claim: Claim, damage: float, payout: float, deductible: float, severity: str):
+        """Record an estimate (lock held)"""
+        previous = self._records.get(claim.claim_id)
+        if not all(math.isfinite(amount) for amount in (damage, payout, deductible)):
+            # Leave the claim unpriced rather than poison the totals
+            self._replace(claim, previous, None, None, None)
+            self.stats["unpriced_estimates"] += 1
+            return
+        amounts = (_cents(damage), _cents(payout), _cents(deductible))
+        self._replace(claim, previous, estimate_inputs(claim), severity, amounts)
+
+    def _failed(self, claim: Claim, error: Exception):
+        """Log a bookkeeping error instead of failing the caller"""
+        with self._lock:
+            self.stats["errors"] += 1
+        print(f"⚠️ Portfolio analytics not updated for claim {claim.claim_id}: {error}")
+
+    def _replace(
+        self,
+        claim: Claim,
+        previous: Optional[_ClaimRecord],
+        estimated_inputs: Optional[tuple],
+        severity: Optional[str],
+        amounts: Optional[Amounts]
+    ):
+        """Swap a claim's contribution to the totals for its new one (lock held)"""
+        # Build the new record before touching the totals, so a claim that
+        # cannot be recorded leaves them unchanged
+        record = _ClaimRecord(claim)
+        record.estimated_inputs = estimated_inputs
+        record.severity = severity
+        record.amounts = amounts
+        groups = list(record.groups())
+        if previous is not None:
+            self._apply(previous, list(previous.groups()), -1)
+        self._records[claim.claim_id] = record
+        self._apply(record, groups, 1)
+        self.updated_at = datetime.now().isoformat()
+
+    def _apply(self, record: _ClaimRecord, groups: list, sign: int):
+        """Add (sign 1) or remove (sign -1) a claim's contribution to its groups"""
+        amounts = record.priced()
+        delta = [sign, 0, 0, 0, 0]
+        if amounts is not None:
+            delta[1] = sign
+            delta[2], delta[3], delta[4] = (sign * amount for amount in amounts)
+        for index, value in enumerate(delta):
+            self._overall[index] += value
+        for dimension, key in groups:
+            keys = self._totals[dimension]
+            totals = keys.setdefault(key, [0, 0, 0, 0, 0])
+            for index, value in enumerate(delta):
+                totals[index] += value
+            if totals[0] == 0:
+                del keys[key]
+
+    def snapshot(self, bucket: Optional[str] = None) -> Dict:
+        """
+        Current aggregates
+
+        Args:
+            bucket: Also roll totals up by "day" or "month" of claim creation (optional)
+
+        Returns:
+            Overall totals, totals per incident type, status and severity,
+            and the rollups when a bucket was given
+
+        Raises:
+            ValueError: If the bucket is unknown
+        """
+        if bucket is not None and bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket: {bucket} (expected one of {', '.join(BUCKETS)})")
+
+        with self._lock:
+            snapshot = {
+                **self._format(self._overall),
+                **{
+                    f"by_{dimension}": {key: self._format(totals) for key, totals in self._totals[dimension].items()}
+                    for dimension in DIMENSIONS
+                },
+                "updated_at": self.updated_at
+            }
+            if bucket is not None:
+                snapshot["bucket"] = bucket
+                snapshot["rollups"] = {
+                    key: self._format(self._totals[bucket][key]) for key in sorted(self._totals[bucket])
+                }
+            return snapshot
+
+    @staticmethod
+    def _format(totals: list) -> Dict:
+        claims, estimated_claims, damage, payout, deductible = totals
+        return {
+            "claims": claims,
+            "estimated_claims": estimated_claims,
+            "estimated_damage": damage / 100,
+            "payout": payout / 100,
+            "deductible": deductible / 100
+        }
+
+    def metrics(self) -> Dict:
+        """
+        Get update counts and the number of tracked claims
+
+        Returns:
+            Dictionary of portfolio metrics
+        """
+        with self._lock:
+            return {
+                **self.stats,
+                "claims": self._overall[0],
+                "estimated_claims": self._overall[1],
+                "updated_at": self.updated_at
+            }
+
+
+# Singleton instance
+portfolio = PortfolioStats()
@@ -0,0 +1,438 @@
+"""
+FinTrack rate tables
+
+Damage ranges, coverage rates, severity rules and cost breakdown ratios
+live in one versioned file (RATE_TABLES_PATH, config/rate_tables.json by
+default; .yaml/.yml files need PyYAML). FinTrackAgent, its batch
+estimator and the MCP estimate_damage tool all price claims through the
+same compiled RateTable, so they always agree, and every estimate records
+the version of the table it used.
+
+A RateTable is compiled once per file version into flat lookups (range
+midpoints keyed by (incident type, severity), thresholds and ratios as
+tuples) and never changes afterwards. rate_tables.current() checks the
+file for changes at most every RATE_TABLES_CHECK_SECONDS; a changed file is
+loaded and compiled completely before it replaces the current table in one
+assignment, so an estimate that already holds a table finishes with it.
+A file that does not load or validate is reported and the previous table
+stays in use. Every worker process watches the file, so editing it updates
+all of them without a restart.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+RATE_TABLES_PATH = os.getenv("RATE_TABLES_PATH", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "rate_tables.json"
+))
+CHECK_SECONDS = float(os.getenv("RATE_TABLES_CHECK_SECONDS", "5"))
+
+
+def parse_amount(text: str) -> Optional[float]:
+    """Stated damage amount ("$1,234.56"), or None if it is not a number"""
+    try:
+        return float(text.replace('$', '').replace(',', ''))
+    except ValueError:
+        return None
+
+
+def check_coverage_override(coverage_override: Optional[float]):
+    """
+    Reject a coverage override outside 0-1 (None or 0 means no override)
+
+    Raises:
+        ValueError: If coverage_override is outside 0-1
+    """
+    if coverage_override and not 0.0 <= coverage_override <= 1.0:
+        raise ValueError(f"Coverage override must be between 0 and 1, got {coverage_override}")
+
+
+def _number(value: Any, what: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{what} must be a number, got {value!r}")
+    return value
+
+
+def _rate(value: Any, what: str) -> float:
+    value = _number(value, what)
+    if not 0.0 <= value <= 1.0:
+        raise ValueError(f"{what} must be between 0 and 1, got {value}")
+    return value
+
+
+def _ratios(ratios: Any, what: str) -> Tuple[Tuple[str, float], ...]:
+    if not isinstance(ratios, dict) or not ratios:
+        raise ValueError(f"{what} must map cost categories to ratios")
+    return tuple((str(category), _rate(ratio, f"{what} {category}")) for category, ratio in ratios.items())
+
+
+def _keywords(words: Any, what: str) -> Tuple[str, ...]:
+    if not isinstance(words, (list, tuple)) or not all(isinstance(word, str) for word in words):
+        raise ValueError(f"{what} must be a list of keywords, got {words!r}")
+    return tuple(word.lower() for word in words)
+
+
+def _thresholds(thresholds: Any, what: str) -> Tuple[Tuple[float, str], ...]:
+    """[[minimum, severity], ...] as (minimum, severity) pairs, highest minimum first"""
+    if not isinstance(thresholds, (list, tuple)):
+        raise ValueError(f"{what} must be a list of [minimum, severity] pairs")
+    pairs = []
+    for threshold in thresholds:
+        if not isinstance(threshold, (list, tuple)) or len(threshold) != 2:
+            raise ValueError(f"{what} must be [minimum, severity] pairs, got {threshold!r}")
+        minimum, level = threshold
+        pairs.append((_number(minimum, f"{what} {level}"), str(level)))
+    return tuple(sorted(pairs, key=lambda pair: pair[0], reverse=True))
+
+
+class RateTable:
+    """One compiled version of the rate tables (read-only)"""
+
+    def __init__(self, data: Dict, source: Optional[str] = None):
+        """
+        Args:
+            data: Parsed rate table file
+            source: File the table was loaded from (optional)
+
+        Raises:
+            ValueError: If the table is incomplete or invalid
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Rate table must be an object")
+        version = data.get("version")
+        if not version or not isinstance(version, (str, int, float)):
+            raise ValueError("Rate table needs a version")
+
+        self.version = str(version)
+        self.source = source
+        self.loaded_at = datetime.now().isoformat()
+        self.default_damage = float(_number(data.get("default_damage", 3000.0), "default_damage"))
+        self.default_coverage = _rate(data.get("default_coverage", 0.75), "default_coverage")
+        self.base_severity = str(data.get("base_severity", "minor"))
+        self.default_breakdown = _ratios(data.get("default_breakdown"), "default_breakdown")
+
+        keywords = data.get("severity_keywords") or {}
+        if not isinstance(keywords, dict):
+            raise ValueError("severity_keywords must map severities to keyword lists")
+        # (severity, keywords) in the order they are checked
+        self.severity_keywords: Tuple[Tuple[str, Tuple[str, ...]], ...] = tuple(
+            (str(level), _keywords(words, f"severity_keywords {level}")) for level, words in keywords.items()
+        )
+
+        incident_types = data.get("incident_types")
+        if not isinstance(incident_types, dict) or not incident_types:
+            raise ValueError("Rate table needs incident_types")
+
+        self.incident_types: Tuple[str, ...] = tuple(incident_types)
+        self.damage_ranges: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        self.midpoints: Dict[Tuple[str, str], float] = {}
+        self.coverage: Dict[str, float] = {}
+        self.severity_thresholds: Dict[str, Tuple[Tuple[float, str], ...]] = {}
+        self.breakdown_ratios: Dict[str, Tuple[Tuple[str, float], ...]] = {}
+
+        for name, rates in incident_types.items():
+            if not isinstance(rates, dict):
+                raise ValueError(f"Rates for {name} must be an object")
+            if "coverage" in rates:
+                self.coverage[name] = _rate(rates["coverage"], f"{name} coverage")
+
+            damage_ranges = rates.get("damage_ranges") or {}
+            if not isinstance(damage_ranges, dict):
+                raise ValueError(f"{name} damage_ranges must map severities to [min, max]")
+            ranges = {}
+            for level, bounds in damage_ranges.items():
+                if not isinstance(bounds, (list, tuple)) or len(bounds) != 2:
+                    raise ValueError(f"{name} {level} damage range must be [min, max]")
+                low = _number(bounds[0], f"{name} {level} minimum")
+                high = _number(bounds[1], f"{name} {level} maximum")
+                if low > high:
+                    raise ValueError(f"{name} {level} damage range has min above max")
+                ranges[level] = (low, high)
+                self.midpoints[(name, level)] = (low + high) / 2
+            if ranges:
+                self.damage_ranges[name] = ranges
+
+            thresholds = rates.get("severity_thresholds")
+            if thresholds:
+                self.severity_thresholds[name] = _thresholds(thresholds, f"{name} severity_thresholds")
+
+            if "breakdown" in rates:
+                self.breakdown_ratios[name] = _ratios(rates["breakdown"], f"{name} breakdown")
+
+        # Every severity the table knows
+        self.severities: Tuple[str, ...] = tuple(dict.fromkeys([
+            self.base_severity,
+            *(level for ranges in self.damage_ranges.values() for level in ranges),
+            *(level for thresholds in self.severity_thresholds.values() for _, level in thresholds),
+            *(level for level, _ in self.severity_keywords)
+        ]))
+
+    def coverage_for(self, incident_type: str) -> float:
+        """Default insurance coverage of an incident type"""
+        return self.coverage.get(incident_type, self.default_coverage)
+
+    def ratios_for(self, incident_type: str) -> Tuple[Tuple[str, float], ...]:
+        """Cost breakdown ratios of an incident type"""
+        return self.breakdown_ratios.get(incident_type, self.default_breakdown)
+
+    def assess_severity(
+        self,
+        incident_type: str,
+        estimated_damage: Optional[str],
+        damages_description: str
+    ) -> str:
+        """
+        Severity from the stated damage amount, else from description keywords
+
+        Args:
+            incident_type: Type of incident
+            estimated_damage: Stated damage amount (optional)
+            damages_description: Description of damages
+
+        Returns:
+            Severity level
+        """
+        thresholds = self.severity_thresholds.get(incident_type)
+        if thresholds is not None and estimated_damage:
+            amount = parse_amount(estimated_damage)
+            if amount is not None:
+                for minimum, level in thresholds:
+                    if amount >= minimum:
+                        return level
+                return self.base_severity
+
+        damages_lower = damages_description.lower()
+        for level, keywords in self.severity_keywords:
+            if any(keyword in damages_lower for keyword in keywords):
+                return level
+        return self.base_severity
+
+    def damage_for(self, incident_type: str, severity: str, estimated_damage: Optional[str] = None) -> float:
+        """
+        Damage amount: the stated amount, else the midpoint of the severity's range
+
+        Args:
+            incident_type: Type of incident
+            severity: Severity level
+            estimated_damage: Stated damage amount (optional)
+
+        Returns:
+            Estimated damage amount
+        """
+        if estimated_damage:
+            amount = parse_amount(estimated_damage)
+            if amount is not None:
+                return amount
+        return self.midpoints.get((incident_type, severity), self.default_damage)
+
+    def breakdown(self, incident_type: str, total_damage: float) -> Dict[str, float]:
+        """
+        Cost breakdown of a damage amount
+
+        Args:
+            incident_type: Type of incident
+            total_damage: Total estimated damage
+
+        Returns:
+            Amount per cost category, and the total
+        """
+        breakdown = {category: round(total_damage * ratio, 2) for category, ratio in self.ratios_for(incident_type)}
+        breakdown["total"] = total_damage
+        return breakdown
+
+    def estimate(
+        self,
+        incident_type: str,
+        damages_description: str,
+        estimated_damage: Optional[str] = None,
+        severity: Optional[str] = None,
+        coverage_override: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Price a claim
+
+        Args:
+            incident_type: Type of incident
+            damages_description: Description of damages
+            estimated_damage: Stated damage amount (optional)
+            severity: Severity level override (optional)
+            coverage_override: Custom coverage percentage (optional)
+
+        Returns:
+            Dictionary with severity, estimated_damage, insurance_coverage,
+            deductible, payout_after_deductible, breakdown and rate_table_version
+
+        Raises:
+            ValueError: If coverage_override is outside 0-1
+        """
+        check_coverage_override(coverage_override)
+        severity = severity or self.assess_severity(incident_type, estimated_damage, damages_description)
+        damage = self.damage_for(incident_type, severity, estimated_damage)
+        coverage = coverage_override or self.coverage_for(incident_type)
+        deductible = damage * (1 - coverage)
+        payout = damage - deductible
+        return {
+            "severity": severity,
+            "estimated_damage": damage,
+            "insurance_coverage": coverage,
+            "deductible": round(deductible, 2),
+            "payout_after_deductible": round(payout, 2),
+            "breakdown": self.breakdown(incident_type, damage),
+            "rate_table_version": self.version
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Get the table's version and contents
+
+        Returns:
+            Dictionary with version, source, load time and rates by incident type
+        """
+        return {
+            "version": self.version,
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+            "default_coverage": self.default_coverage,
+            "incident_types": {
+                name: {
+                    "coverage": self.coverage_for(name),
+                    "damage_ranges": {level: list(bounds) for level, bounds in self.damage_ranges.get(name, {}).items()},
+                    "breakdown": dict(self.ratios_for(name))
+                }
+                for name in self.incident_types
+            }
+        }
+
+
+def load_rate_table(path: str) -> RateTable:
+    """
+    Load and compile a rate table file
+
+    Args:
+        path: JSON file, or YAML (.yaml/.yml) if PyYAML is installed
+
+    Returns:
+        RateTable
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a valid rate table
+        RuntimeError: If the file is YAML and PyYAML is not installed
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise RuntimeError("YAML rate tables need PyYAML. Install with: pip install pyyaml") from e
+            try:
+                data = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"Invalid YAML: {e}") from e
+        else:
+            data = json.load(f)
+    return RateTable(data, source=path)
+
+
+class RateTableStore:
+    """The current rate table, reloaded when its file changes"""
+
+    def __init__(self, path: str = RATE_TABLES_PATH, check_seconds: float = CHECK_SECONDS):
+        """
+        Args:
+            path: Rate table file
+            check_seconds: Minimum time between checks of the file
+
+        Raises:
+            OSError, ValueError, RuntimeError: If the file cannot be loaded
+        """
+        self.path = path
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._file_key = self._stat()
+        self._table = load_rate_table(path)
+        self._checked_at = time.monotonic()
+        self.stats = {"reloads": 0, "failed_reloads": 0, "checks": 0}
+        print(f"✅ Rate tables version {self._table.version}: {path}")
+
+    def current(self) -> RateTable:
+        """
+        Get the current rate table, picking up a changed file
+
+        Returns:
+            RateTable (hold on to it for the rest of an estimate)
+        """
+        if time.monotonic() - self._checked_at >= self.check_seconds:
+            # One thread checks; the others keep using the current table meanwhile
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._checked_at = time.monotonic()
+                    self.stats["checks"] += 1
+                    file_key = self._stat()
+                    if file_key != self._file_key:
+                        self._file_key = file_key
+                        self._swap(reason="file changed")
+                finally:
+                    self._lock.release()
+        return self._table
+
+    def reload(self) -> RateTable:
+        """
+        Load the rate table file now
+
+        Returns:
+            The new current RateTable
+
+        Raises:
+            OSError, ValueError, RuntimeError: If the file cannot be loaded
+                (the previous table stays in use)
+        """
+        with self._lock:
+            self._file_key = self._stat()
+            self._checked_at = time.monotonic()
+            self._swap(reason="reload requested", raise_errors=True)
+            return self._table
+
+    def metrics(self) -> Dict:
+        """
+        Get reload counts and the current version
+
+        Returns:
+            Dictionary of rate table metrics
+        """
+        return {
+            **self.stats,
+            "version": self._table.version,
+            "loaded_at": self._table.loaded_at,
+            "path": self.path
+        }
+
+    def _swap(self, reason: str, raise_errors: bool = False):
+        """Load the file and make it the current table (lock held)"""
+        try:
+            table = load_rate_table(self.path)
+        except Exception as e:
+            # Whatever is wrong with the file, estimates keep the previous table
+            self.stats["failed_reloads"] += 1
+            print(f"⚠️ Rate tables not reloaded ({reason}), keeping version {self._table.version}: {e}")
+            if raise_errors:
+                raise
+            return
+        previous, self._table = self._table, table
+        self.stats["reloads"] += 1
+        print(f"✅ Rate tables reloaded ({reason}): version {previous.version} -> {table.version}")
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        """Identity of the file's current contents (None if it is missing)"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+# Singleton instance
+rate_tables = RateTableStore()
@@ -0,0 +1,172 @@
+"""
+SQLite job backend
+
+Keeps the job queue in a jobs table of the claims SQLite file (JOBS_DB_PATH,
+by default CLAIMS_DB_PATH), so queued and finished jobs survive restarts
+and every worker process on the host shares one queue. A job is claimed
+with a single UPDATE ... RETURNING, so two workers never run the same job.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from utils.data_models import Job, JobStatus
+from utils.jobs import FINISHED_STATUSES, JobBackend
+
+DEFAULT_PATH = os.getenv("JOBS_DB_PATH", os.getenv(
+    "CLAIMS_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "claimpilot.db")
+))
+BUSY_TIMEOUT_SECONDS = float(os.getenv("CLAIMS_DB_BUSY_TIMEOUT_SECONDS", "5"))
+
+JOB_COLUMNS = (
+    "job_id", "kind", "tenant", "priority", "status", "payload", "result", "error",
+    "claim_id", "worker", "attempts", "created_at", "started_at", "finished_at"
+)
+JSON_COLUMNS = {"payload", "result"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+  job_id TEXT PRIMARY KEY,
+  kind TEXT NOT NULL,
+  tenant TEXT NOT NULL,
+  priority INTEGER NOT NULL DEFAULT 0,
+  status TEXT NOT NULL,
+  payload TEXT NOT NULL DEFAULT '{}',
+  result TEXT,
+  error TEXT,
+  claim_id TEXT,
+  worker TEXT,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  created_at TEXT NOT NULL,
+  started_at TEXT,
+  finished_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, priority DESC, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_tenant ON jobs(tenant, created_at DESC);
+"""
+
+INSERT_JOB = f"INSERT INTO jobs ({', '.join(JOB_COLUMNS)}) VALUES ({', '.join('?' for _ in JOB_COLUMNS)})"
+SELECT_JOB = "SELECT * FROM jobs WHERE job_id = ?"
+CLAIM_NEXT_JOB = """
+UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, started_at = ?
+WHERE job_id = (
+  SELECT job_id FROM jobs
+  WHERE status = 'queued' AND tenant NOT IN (SELECT value FROM json_each(?))
+  ORDER BY priority DESC, created_at
+  LIMIT 1
+) AND status = 'queued'
+RETURNING *
+"""
+
+
+def _job_from_row(row: sqlite3.Row) -> Job:
+    record = dict(row)
+    for column in JSON_COLUMNS:
+        if record[column] is not None:
+            record[column] = json.loads(record[column])
+    return Job(**record)
+
+
+def _column_value(column: str, value: Any) -> Any:
+    if column in JSON_COLUMNS:
+        return json.dumps(value, default=str) if value is not None else None
+    return getattr(value, "value", value)
+
+
+class SQLiteJobBackend(JobBackend):
+    """Jobs in a local SQLite database"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        """
+        Args:
+            path: Database file (created with its directory if missing)
+        """
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, job: Job):
+        record = job.model_dump()
+        conn = self._conn()
+        with conn:
+            conn.execute(INSERT_JOB, [_column_value(column, record[column]) for column in JOB_COLUMNS])
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._conn().execute(SELECT_JOB, (job_id,)).fetchone()
+        return _job_from_row(row) if row else None
+
+    def list_jobs(
+        self,
+        tenant: Optional[str] = None,
+        status: Optional[JobStatus] = None,
+        limit: Optional[int] = 50
+    ) -> List[Job]:
+        conditions, params = [], []
+        if tenant is not None:
+            conditions.append("tenant = ?")
+            params.append(tenant)
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(JobStatus(status).value)
+        sql = "SELECT * FROM jobs"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [_job_from_row(row) for row in self._conn().execute(sql, params).fetchall()]
+
+    def claim_next(self, worker: str, skip_tenants: Set[str]) -> Optional[Job]:
+        conn = self._conn()
+        with conn:
+            row = conn.execute(
+                CLAIM_NEXT_JOB, (worker, datetime.now().isoformat(), json.dumps(sorted(skip_tenants)))
+            ).fetchone()
+        return _job_from_row(row) if row else None
+
+    def update(self, job_id: str, updates: Dict[str, Any], statuses: Optional[Iterable[JobStatus]] = None) -> bool:
+        columns = [column for column in updates if column in JOB_COLUMNS and column != "job_id"]
+        if not columns:
+            return False
+        sql = f"UPDATE jobs SET {', '.join(f'{column} = ?' for column in columns)} WHERE job_id = ?"
+        params = [_column_value(column, updates[column]) for column in columns] + [job_id]
+        if statuses is not None:
+            statuses = [JobStatus(status).value for status in statuses]
+            sql += f" AND status IN ({', '.join('?' for _ in statuses)})"
+            params += statuses
+        conn = self._conn()
+        with conn:
+            return conn.execute(sql, params).rowcount > 0
+
+    def purge(self, finished_before: str) -> List[Job]:
+        statuses = [status.value for status in FINISHED_STATUSES]
+        conn = self._conn()
+        with conn:
+            rows = conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' for _ in statuses)}) AND finished_at < ? "
+                "RETURNING *",
+                [*statuses, finished_before]
+            ).fetchall()
+        return [_job_from_row(row) for row in rows]
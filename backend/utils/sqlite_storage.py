@@ -0,0 +1,414 @@
+"""
+Embedded SQLite storage backend
+
+Keeps claims and chat messages in one SQLite file so they survive restarts
+and are shared by every uvicorn worker on the host. The tables follow
+database-schema.sql, with JSONB columns stored as JSON text and decoded on
+read, so records match what Supabase returns.
+
+- WAL journal: readers never block on the writer, and each thread keeps its
+  own connection, so lookups by claim_id stay well under a millisecond
+- Statements are fixed strings with ? parameters and are prepared once per
+  connection (sqlite3 statement cache)
+- Indexes mirror database-schema.sql; status and created_at also carry the
+  (created_at, claim_id) keyset order so filtered pages are read in index
+  order, and incident_data->>'type' has an expression index
+- Foreign keys are declared but not enforced (SQLite's default), so chat
+  can be saved for claims that were never persisted
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.storage import StorageBackend
+from utils.supabase_client import _claim_row
+
+DEFAULT_PATH = os.getenv(
+    "CLAIMS_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "claimpilot.db")
+)
+BUSY_TIMEOUT_SECONDS = float(os.getenv("CLAIMS_DB_BUSY_TIMEOUT_SECONDS", "5"))
+
+CLAIM_COLUMNS = (
+    "id", "user_id", "claim_id", "status", "incident_data", "vehicle_data", "insurance_data",
+    "damage_data", "police_report", "orchestrator_state", "created_at", "updated_at"
+)
+JSON_COLUMNS = {
+    "incident_data", "vehicle_data", "insurance_data", "damage_data", "police_report",
+    "orchestrator_state", "metadata"
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS claims (
+  id TEXT PRIMARY KEY,
+  user_id TEXT,
+  claim_id TEXT UNIQUE NOT NULL,
+  status TEXT NOT NULL DEFAULT 'draft',
+  incident_data TEXT NOT NULL DEFAULT '{}',
+  vehicle_data TEXT NOT NULL DEFAULT '{}',
+  insurance_data TEXT NOT NULL DEFAULT '{}',
+  damage_data TEXT NOT NULL DEFAULT '{}',
+  police_report TEXT,
+  orchestrator_state TEXT DEFAULT '{}',
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS chat_messages (
+  id TEXT PRIMARY KEY,
+  claim_id TEXT NOT NULL REFERENCES claims(claim_id) ON DELETE CASCADE,
+  role TEXT NOT NULL CHECK (role IN ('user', 'assistant', 'system')),
+  content TEXT NOT NULL,
+  metadata TEXT,
+  created_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_claims_claim_id ON claims(claim_id);
+CREATE INDEX IF NOT EXISTS idx_claims_user_id ON claims(user_id);
+CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status, created_at DESC, claim_id DESC);
+CREATE INDEX IF NOT EXISTS idx_claims_created_at ON claims(created_at DESC, claim_id DESC);
+CREATE INDEX IF NOT EXISTS idx_claims_incident_type ON claims(json_extract(incident_data, '$.type'));
+CREATE INDEX IF NOT EXISTS idx_chat_messages_claim_id ON chat_messages(claim_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_chat_messages_created_at ON chat_messages(created_at);
+"""
+
+UPSERT_CLAIM = """
+INSERT INTO claims (
+  id, claim_id, status, incident_data, vehicle_data, insurance_data,
+  damage_data, police_report, orchestrator_state, created_at, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(claim_id) DO UPDATE SET
+  status = excluded.status,
+  incident_data = excluded.incident_data,
+  vehicle_data = excluded.vehicle_data,
+  insurance_data = excluded.insurance_data,
+  damage_data = excluded.damage_data,
+  police_report = excluded.police_report,
+  orchestrator_state = excluded.orchestrator_state,
+  updated_at = excluded.updated_at
+"""
+SELECT_CLAIM = "SELECT * FROM claims WHERE claim_id = ?"
+# One statement, so both groupings see the same snapshot; the type grouping
+# reads the idx_claims_incident_type expression
+COUNT_CLAIMS = """
+SELECT 'status', status, COUNT(*) FROM claims GROUP BY status
+UNION ALL
+SELECT 'type', json_extract(incident_data, '$.type'), COUNT(*) FROM claims GROUP BY 2
+"""
+INSERT_CHAT_MESSAGE = """
+INSERT INTO chat_messages (id, claim_id, role, content, metadata, created_at)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+SELECT_CHAT_MESSAGES = "SELECT * FROM chat_messages WHERE claim_id = ? ORDER BY created_at, rowid"
+DELETE_CHAT_MESSAGES = "DELETE FROM chat_messages WHERE claim_id = ?"
+# Messages saved without a session belong to the default one
+DELETE_SESSION_CHAT_MESSAGES = """
+DELETE FROM chat_messages
+WHERE claim_id = ? AND COALESCE(json_extract(metadata, '$.session_id'), 'default') = ?
+"""
+SELECT_LATEST_CHAT_MESSAGES = """
+SELECT id, claim_id, role, content, metadata, created_at FROM (
+  SELECT *, rowid AS seq FROM chat_messages WHERE claim_id = ? ORDER BY created_at DESC, rowid DESC LIMIT ?
+) ORDER BY created_at, seq
+"""
+
+# Claim JSON built by SQLite; must match utils.storage.claim_data_from_record()
+CLAIM_JSON = """
+json_object(
+  'claim_id', claim_id,
+  'incident_type', coalesce(json_extract(incident_data, '$.type'), 'Unknown'),
+  'date', coalesce(json_extract(incident_data, '$.date'), ''),
+  'location', coalesce(json_extract(incident_data, '$.location'), ''),
+  'parties_involved', CASE WHEN json_type(incident_data, '$.parties') = 'array'
+                      THEN json_extract(incident_data, '$.parties') ELSE json_array() END,
+  'damages_description', coalesce(json_extract(damage_data, '$.description'), ''),
+  'estimated_damage', CASE WHEN json_type(damage_data, '$.estimated_damage') IS NULL
+                      THEN '' ELSE json_extract(damage_data, '$.estimated_damage') END,
+  'confidence', coalesce(json_extract(incident_data, '$.confidence'), 0.8),
+  'status', CASE WHEN status IN ('Open', 'Processing', 'Closed', 'Pending Info') THEN status ELSE 'Open' END,
+  'summary', coalesce(nullif(json_extract(incident_data, '$.summary'), ''), json_extract(incident_data, '$.description'), ''),
+  'raw_text', NULL,
+  'created_at', created_at,
+  'updated_at', updated_at
+)
+"""
+
+
+def _dump_json(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value)
+
+
+def _decode_row(row: sqlite3.Row) -> Dict[str, Any]:
+    """Row as a dict with JSON columns decoded"""
+    record = dict(row)
+    for column in JSON_COLUMNS.intersection(record):
+        if record[column] is not None:
+            record[column] = json.loads(record[column])
+    return record
+
+
+class SQLiteStorage(StorageBackend):
+    """Claims and chat messages in a local SQLite database"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        """
+        Args:
+            path: Database file (created with its directory if missing); not
+                ":memory:", since every thread opens its own connection
+        """
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        print(f"✅ SQLite claim storage: {path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _claim_params(self, claim_data: Dict[str, Any], now: str) -> tuple:
+        row = _claim_row(claim_data)
+        status = claim_data.get('status', 'draft')
+        return (
+            str(uuid.uuid4()),
+            row['claim_id'],
+            getattr(status, 'value', status),
+            _dump_json(row['incident_data']),
+            _dump_json(row['vehicle_data']),
+            _dump_json(row['insurance_data']),
+            _dump_json(row['damage_data']),
+            _dump_json(row['police_report']),
+            _dump_json(row['orchestrator_state']),
+            claim_data.get('created_at') or now,
+            claim_data.get('updated_at') or now
+        )
+
+    def save_claim(self, claim_data: Dict[str, Any]) -> bool:
+        return self.save_claims([claim_data])
+
+    def save_claims(self, claims_data: List[Dict[str, Any]]) -> bool:
+        if not claims_data:
+            return False
+
+        try:
+            now = datetime.now().isoformat()
+            conn = self._conn()
+            with conn:
+                conn.executemany(UPSERT_CLAIM, [self._claim_params(claim_data, now) for claim_data in claims_data])
+            return True
+
+        except Exception as e:
+            print(f"Error saving claims to SQLite: {e}")
+            return False
+
+    def get_claim(self, claim_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = self._conn().execute(SELECT_CLAIM, (claim_id,)).fetchone()
+            return _decode_row(row) if row else None
+
+        except Exception as e:
+            print(f"Error retrieving claim {claim_id}: {e}")
+            return None
+
+    def list_claims(
+        self,
+        status: Optional[str] = None,
+        incident_type: Optional[str] = None,
+        columns: str = '*',
+        limit: Optional[int] = None,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        try:
+            sql, params = self._select_claims(status, incident_type, columns, limit, after)
+            rows = self._conn().execute(sql, params).fetchall()
+            return [_decode_row(row) for row in rows]
+
+        except Exception as e:
+            print(f"Error listing claims: {e}")
+            return []
+
+    def _select_claims(
+        self,
+        status: Optional[str],
+        incident_type: Optional[str],
+        columns: str,
+        limit: Optional[int],
+        after: Optional[Tuple[str, str]]
+    ) -> Tuple[str, List[Any]]:
+        """SQL and parameters listing claims newest first"""
+        if columns.strip() != '*':
+            selected = [column.strip() for column in columns.split(',')]
+            unknown = set(selected) - set(CLAIM_COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+            columns = ", ".join(selected)
+        return self._claims_query(columns, status, incident_type, limit, after)
+
+    def _claims_query(
+        self,
+        select: str,
+        status: Optional[str],
+        incident_type: Optional[str],
+        limit: Optional[int],
+        after: Optional[Tuple[str, str]]
+    ) -> Tuple[str, List[Any]]:
+        sql = [f"SELECT {select} FROM claims WHERE 1 = 1"]
+        params: List[Any] = []
+        if status:
+            sql.append("AND status = ?")
+            params.append(status)
+        if incident_type:
+            sql.append("AND json_extract(incident_data, '$.type') = ?")
+            params.append(incident_type)
+        if after:
+            # Row value comparison, so the keyset seeks in the index
+            sql.append("AND (created_at, claim_id) < (?, ?)")
+            params.extend(after)
+        sql.append("ORDER BY created_at DESC, claim_id DESC")
+        if limit is not None:
+            sql.append("LIMIT ?")
+            params.append(limit)
+        return " ".join(sql), params
+
+    def iter_claims(
+        self,
+        status: Optional[str] = None,
+        incident_type: Optional[str] = None,
+        columns: str = '*',
+        batch_size: int = 1000
+    ) -> Iterator[List[Dict[str, Any]]]:
+        sql, params = self._select_claims(status, incident_type, columns, None, None)
+        for rows in self._scan(sql, params, batch_size):
+            yield [_decode_row(row) for row in rows]
+
+    def iter_claims_json(
+        self,
+        status: Optional[str] = None,
+        incident_type: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[str]]:
+        # SQLite builds each object, so rows are never decoded in Python
+        sql, params = self._claims_query(CLAIM_JSON, status, incident_type, None, None)
+        for rows in self._scan(sql, params, batch_size):
+            yield [row[0] for row in rows]
+
+    def _scan(self, sql: str, params: List[Any], batch_size: int) -> Iterator[List[sqlite3.Row]]:
+        """Run one query on a dedicated connection (a single snapshot), batch by batch"""
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            conn.close()
+
+    def count_claims(self) -> Dict[str, Any]:
+        try:
+            by_status: Dict[str, int] = {}
+            by_type: Dict[str, int] = {}
+            for grouping, key, count in self._conn().execute(COUNT_CLAIMS).fetchall():
+                if grouping == 'status':
+                    by_status[key] = count
+                else:
+                    key = key or 'Unknown'
+                    by_type[key] = by_type.get(key, 0) + count
+            return {"total": sum(by_status.values()), "by_status": by_status, "by_type": by_type}
+
+        except Exception as e:
+            print(f"Error counting claims: {e}")
+            return {"total": 0, "by_status": {}, "by_type": {}}
+
+    def update_claim(self, claim_id: str, updates: Dict[str, Any]) -> bool:
+        try:
+            unknown = set(updates) - set(CLAIM_COLUMNS[3:])
+            if unknown:
+                raise ValueError(f"Cannot update columns: {', '.join(sorted(unknown))}")
+
+            # Stands in for the update_updated_at_column trigger
+            updates = {"updated_at": datetime.now().isoformat(), **updates}
+            columns = sorted(updates)
+            params = [
+                _dump_json(updates[column]) if column in JSON_COLUMNS else getattr(updates[column], 'value', updates[column])
+                for column in columns
+            ]
+            conn = self._conn()
+            with conn:
+                cursor = conn.execute(
+                    f"UPDATE claims SET {', '.join(f'{column} = ?' for column in columns)} WHERE claim_id = ?",
+                    [*params, claim_id]
+                )
+            return cursor.rowcount > 0
+
+        except Exception as e:
+            print(f"Error updating claim {claim_id}: {e}")
+            return False
+
+    def save_chat_message(self, claim_id: str, role: str, content: str, metadata: Optional[Dict] = None) -> bool:
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute(INSERT_CHAT_MESSAGE, (
+                    str(uuid.uuid4()), claim_id, role, content, _dump_json(metadata), datetime.now().isoformat()
+                ))
+            return True
+
+        except Exception as e:
+            print(f"Error saving chat message: {e}")
+            return False
+
+    def get_chat_messages(self, claim_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        try:
+            if limit is None:
+                rows = self._conn().execute(SELECT_CHAT_MESSAGES, (claim_id,)).fetchall()
+            else:
+                rows = self._conn().execute(SELECT_LATEST_CHAT_MESSAGES, (claim_id, limit)).fetchall()
+            return [_decode_row(row) for row in rows]
+
+        except Exception as e:
+            print(f"Error retrieving chat messages for {claim_id}: {e}")
+            return []
+
+    def delete_chat_messages(self, claim_id: str, session_id: Optional[str] = None) -> int:
+        try:
+            conn = self._conn()
+            with conn:
+                if session_id is None:
+                    cursor = conn.execute(DELETE_CHAT_MESSAGES, (claim_id,))
+                else:
+                    cursor = conn.execute(DELETE_SESSION_CHAT_MESSAGES, (claim_id, session_id))
+            return cursor.rowcount
+
+        except Exception as e:
+            print(f"Error deleting chat messages for {claim_id}: {e}")
+            return 0
+
+    def close(self):
+        """Close every thread's connection"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,318 @@
+"""
+Pluggable claim storage backends
+
+Agents and endpoints persist claims and chat messages through `storage`
+instead of calling utils.supabase_client directly. Every backend speaks the
+claims table layout from database-schema.sql (incident_data/damage_data
+JSON, created_at, ...), so records look the same whichever one is used.
+
+claim_data_from_record() turns a record back into Claim fields.
+
+Backends (STORAGE_BACKEND):
+- sqlite: embedded SQLite file at CLAIMS_DB_PATH, shared by every worker
+  process on the host (default while Supabase is disabled)
+- supabase: utils.supabase_client (default when Supabase is enabled)
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils import supabase_client
+
+# Columns claim_data_from_record() reads
+CLAIM_DATA_COLUMNS = "claim_id,status,incident_data,damage_data,created_at,updated_at"
+
+CLAIM_STATUSES = ('Open', 'Processing', 'Closed', 'Pending Info')
+
+
+def claim_data_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Claim fields of a claims table record, as JSON-compatible values
+
+    Args:
+        record: Claims table record (columns may be missing when only some
+            were selected)
+
+    Returns:
+        Dictionary of Claim fields
+    """
+    incident_data = record.get('incident_data') or {}
+    damage_data = record.get('damage_data') or {}
+    confidence = incident_data.get('confidence')
+    now = datetime.now().isoformat()
+    return {
+        'claim_id': record['claim_id'],
+        'incident_type': incident_data.get('type', 'Unknown'),
+        'date': incident_data.get('date', ''),
+        'location': incident_data.get('location', ''),
+        'parties_involved': incident_data.get('parties') or [],
+        'damages_description': damage_data.get('description', ''),
+        'estimated_damage': damage_data.get('estimated_damage', ''),
+        'confidence': confidence if confidence is not None else 0.8,
+        'status': record.get('status') if record.get('status') in CLAIM_STATUSES else 'Open',
+        'summary': incident_data.get('summary') or incident_data.get('description', ''),
+        'raw_text': None,
+        'created_at': str(record.get('created_at') or now),
+        'updated_at': str(record.get('updated_at') or now)
+    }
+
+
+class StorageBackend(ABC):
+    """Claim and chat message persistence"""
+
+    name = "base"
+
+    @abstractmethod
+    def save_claim(self, claim_data: Dict[str, Any]) -> bool:
+        """
+        Save (insert or replace) a claim
+
+        Args:
+            claim_data: Claim data dictionary (Claim.model_dump() layout)
+
+        Returns:
+            True if saved or queued, False otherwise
+        """
+
+    def save_claims(self, claims_data: List[Dict[str, Any]]) -> bool:
+        """
+        Save many claims at once
+
+        Args:
+            claims_data: List of claim data dictionaries
+
+        Returns:
+            True if saved or queued, False otherwise
+        """
+        return all([self.save_claim(claim_data) for claim_data in claims_data]) if claims_data else False
+
+    @abstractmethod
+    def get_claim(self, claim_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a claim record
+
+        Args:
+            claim_id: Claim identifier
+
+        Returns:
+            Claims table record or None
+        """
+
+    @abstractmethod
+    def list_claims(
+        self,
+        status: Optional[str] = None,
+        incident_type: Optional[str] = None,
+        columns: str = '*',
+        limit: Optional[int] = None,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List claim records ordered by (created_at, claim_id) descending
+
+        Args:
+            status: Optional status filter
+            incident_type: Optional incident type filter
+            columns: Comma-separated columns to select
+            limit: Maximum number of rows (optional)
+            after: (created_at, claim_id) of the last row already returned (optional)
+
+        Returns:
+            List of claim records
+        """
+
+    def iter_claims(
+        self,
+        status: Optional[str] = None,
+        incident_type: Optional[str] = None,
+        columns: str = '*',
+        batch_size: int = 1000
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Walk every matching claim record newest first, one batch at a time
+
+        Pages through list_claims() by keyset, so `columns` must include
+        created_at and claim_id.
+
+        Args:
+            status: Optional status filter
+            incident_type: Optional incident type filter
+            columns: Comma-separated columns to select
+            batch_size: Records per batch
+
+        Yields:
+            Lists of up to batch_size claim records
+        """
+        after = None
+        while True:
+            rows = self.list_claims(status, incident_type, columns, batch_size, after)
+            if rows:
+                yield rows
+            if len(rows) < batch_size:
+                return
+            after = (str(rows[-1]['created_at']), rows[-1]['claim_id'])
+
+    def iter_claims_json(
+        self,
+        status: Optional[str] = None,
+        incident_type: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[str]]:
+        """
+        Walk every matching claim newest first as Claim JSON objects
+
+        Used by bulk export; backends may build the JSON natively.
+
+        Args:
+            status: Optional status filter
+            incident_type: Optional incident type filter
+            batch_size: Claims per batch
+
+        Yields:
+            Lists of up to batch_size JSON texts, one Claim each
+        """
+        for records in self.iter_claims(status, incident_type, CLAIM_DATA_COLUMNS, batch_size):
+            yield [json.dumps(claim_data_from_record(record)) for record in records]
+
+    def count_claims(self) -> Dict[str, Any]:
+        """
+        Count claims by status and incident type
+
+        Backends override this with a grouped query; the default walks the
+        status and incident type of every claim.
+
+        Returns:
+            {"total": n, "by_status": {status: n}, "by_type": {incident type: n}}
+        """
+        total = 0
+        by_status: Dict[str, int] = {}
+        by_type: Dict[str, int] = {}
+        for records in self.iter_claims(columns='claim_id,status,incident_data,created_at'):
+            for record in records:
+                total += 1
+                by_status[record.get('status')] = by_status.get(record.get('status'), 0) + 1
+                incident_type = (record.get('incident_data') or {}).get('type') or 'Unknown'
+                by_type[incident_type] = by_type.get(incident_type, 0) + 1
+        return {"total": total, "by_status": by_status, "by_type": by_type}
+
+    @abstractmethod
+    def update_claim(self, claim_id: str, updates: Dict[str, Any]) -> bool:
+        """
+        Update columns of a claim
+
+        Args:
+            claim_id: Claim identifier
+            updates: Column -> new value
+
+        Returns:
+            True if successful, False otherwise
+        """
+
+    @abstractmethod
+    def save_chat_message(self, claim_id: str, role: str, content: str, metadata: Optional[Dict] = None) -> bool:
+        """
+        Save a chat message
+
+        Args:
+            claim_id: Associated claim ID
+            role: Message role (user/assistant/system)
+            content: Message content
+            metadata: Optional metadata
+
+        Returns:
+            True if saved or queued, False otherwise
+        """
+
+    @abstractmethod
+    def get_chat_messages(self, claim_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get chat messages for a claim, oldest first
+
+        Args:
+            claim_id: Claim identifier
+            limit: Return only the latest `limit` messages (optional)
+
+        Returns:
+            List of chat messages
+        """
+
+    @abstractmethod
+    def delete_chat_messages(self, claim_id: str, session_id: Optional[str] = None) -> int:
+        """
+        Delete the chat messages of a claim
+
+        Args:
+            claim_id: Claim identifier
+            session_id: Only this chat session's messages (optional)
+
+        Returns:
+            Number of messages deleted
+        """
+
+
+class SupabaseStorage(StorageBackend):
+    """Supabase through utils.supabase_client (writes go through the write-behind queue)"""
+
+    name = "supabase"
+
+    def save_claim(self, claim_data: Dict[str, Any]) -> bool:
+        return supabase_client.save_claim_to_db(claim_data)
+
+    def save_claims(self, claims_data: List[Dict[str, Any]]) -> bool:
+        return supabase_client.save_claims_to_db(claims_data)
+
+    def get_claim(self, claim_id: str) -> Optional[Dict[str, Any]]:
+        return supabase_client.get_claim_from_db(claim_id)
+
+    def list_claims(
+        self,
+        status: Optional[str] = None,
+        incident_type: Optional[str] = None,
+        columns: str = '*',
+        limit: Optional[int] = None,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        return supabase_client.list_claims_from_db(status, incident_type, columns, limit, after)
+
+    def update_claim(self, claim_id: str, updates: Dict[str, Any]) -> bool:
+        return supabase_client.update_claim_in_db(claim_id, updates)
+
+    def save_chat_message(self, claim_id: str, role: str, content: str, metadata: Optional[Dict] = None) -> bool:
+        return supabase_client.save_chat_message(claim_id, role, content, metadata)
+
+    def get_chat_messages(self, claim_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return supabase_client.get_chat_messages(claim_id, limit)
+
+    def delete_chat_messages(self, claim_id: str, session_id: Optional[str] = None) -> int:
+        return supabase_client.delete_chat_messages(claim_id, session_id)
+
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase" if supabase_client.supabase else "sqlite")
+
+
+def create_storage(backend: str = STORAGE_BACKEND) -> StorageBackend:
+    """
+    Create a storage backend by name
+
+    Args:
+        backend: "sqlite" or "supabase"
+
+    Returns:
+        StorageBackend instance
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend == "sqlite":
+        from utils.sqlite_storage import SQLiteStorage
+        return SQLiteStorage()
+    if backend == "supabase":
+        return SupabaseStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend} (expected 'sqlite' or 'supabase')")
+
+
+# Singleton instance
+storage = create_storage()
+print(f"✅ Claim storage backend: {storage.name}")
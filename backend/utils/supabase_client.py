@@ -2,10 +2,12 @@
 Supabase client for ClaimPilot backend
 """
 import os
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from utils.write_behind import write_behind
+
 # Load environment variables
 load_dotenv()
 
@@ -36,49 +38,68 @@ else:
     print("⚠️ Supabase credentials not found. Using in-memory storage.")
 
 
+def _claim_row(claim_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert claim data to a row of the claims table"""
+    return {
+        'claim_id': claim_data.get('claim_id'),
+        'status': claim_data.get('status', 'draft'),
+        'incident_data': {
+            'type': claim_data.get('incident_type', ''),
+            'date': claim_data.get('date', ''),
+            'location': claim_data.get('location', ''),
+            'description': claim_data.get('damages_description', ''),
+            'summary': claim_data.get('summary', ''),
+            'parties': claim_data.get('parties_involved', []),
+            'confidence': claim_data.get('confidence')
+        },
+        'vehicle_data': {},
+        'insurance_data': {},
+        'damage_data': {
+            'description': claim_data.get('damages_description', ''),
+            'estimated_damage': claim_data.get('estimated_damage', '')
+        },
+        'police_report': None,
+        'orchestrator_state': {}
+    }
+
+
 def save_claim_to_db(claim_data: Dict[str, Any]) -> bool:
     """
-    Save a claim to Supabase database
+    Queue a claim for saving to Supabase database
+
+    The write-behind queue upserts it in the background, coalesced with any
+    other pending save of the same claim.
 
     Args:
         claim_data: Claim data dictionary
 
     Returns:
-        True if successful, False otherwise
+        True if queued, False if Supabase is not configured
     """
     if not supabase:
         return False
 
-    try:
-        # Prepare data for Supabase
-        db_data = {
-            'claim_id': claim_data.get('claim_id'),
-            'status': claim_data.get('status', 'draft'),
-            'incident_data': {
-                'type': claim_data.get('incident_type', ''),
-                'date': claim_data.get('date', ''),
-                'location': claim_data.get('location', ''),
-                'description': claim_data.get('damages_description', '')
-            },
-            'vehicle_data': {},
-            'insurance_data': {},
-            'damage_data': {
-                'description': claim_data.get('damages_description', ''),
-                'estimated_damage': claim_data.get('estimated_damage', '')
-            },
-            'police_report': None,
-            'orchestrator_state': {}
-        }
-
-        # Insert into database
-        result = supabase.table('claims').insert(db_data).execute()
-        print(f"✅ Claim {claim_data.get('claim_id')} saved to database")
-        return True
+    write_behind.upsert(supabase, 'claims', _claim_row(claim_data), on_conflict='claim_id')
+    return True
 
-    except Exception as e:
-        print(f"Error saving claim to database: {e}")
+
+def save_claims_to_db(claims_data: List[Dict[str, Any]]) -> bool:
+    """
+    Queue many claims for saving to Supabase database
+
+    Args:
+        claims_data: List of claim data dictionaries
+
+    Returns:
+        True if queued, False if Supabase is not configured
+    """
+    if not supabase or not claims_data:
         return False
 
+    for claim_data in claims_data:
+        write_behind.upsert(supabase, 'claims', _claim_row(claim_data), on_conflict='claim_id')
+    return True
+
 
 def get_claim_from_db(claim_id: str) -> Optional[Dict[str, Any]]:
     """
@@ -106,12 +127,30 @@ def get_claim_from_db(claim_id: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def list_claims_from_db(status: Optional[str] = None) -> List[Dict[str, Any]]:
+def _quote_filter_value(value: str) -> str:
+    """Quote a value for a PostgREST or=() filter (cursors come from clients)"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def list_claims_from_db(
+    status: Optional[str] = None,
+    incident_type: Optional[str] = None,
+    columns: str = '*',
+    limit: Optional[int] = None,
+    after: Optional[Tuple[str, str]] = None
+) -> List[Dict[str, Any]]:
     """
-    List all claims from Supabase database
+    List claims from Supabase database, newest first
+
+    Ordered by (created_at, claim_id) descending so `after` can continue
+    from the last row of a previous page (keyset pagination).
 
     Args:
         status: Optional status filter
+        incident_type: Optional incident type filter
+        columns: Comma-separated columns to select
+        limit: Maximum number of rows (optional)
+        after: (created_at, claim_id) of the last row already returned (optional)
 
     Returns:
         List of claims
@@ -120,12 +159,24 @@ def list_claims_from_db(status: Optional[str] = None) -> List[Dict[str, Any]]:
         return []
 
     try:
-        query = supabase.table('claims').select('*')
+        query = supabase.table('claims').select(columns)
 
         if status:
             query = query.eq('status', status)
+        if incident_type:
+            query = query.eq('incident_data->>type', incident_type)
+        if after:
+            created_at, claim_id = (_quote_filter_value(value) for value in after)
+            query = query.or_(
+                f'created_at.lt.{created_at},'
+                f'and(created_at.eq.{created_at},claim_id.lt.{claim_id})'
+            )
 
-        result = query.order('created_at', desc=True).execute()
+        query = query.order('created_at', desc=True).order('claim_id', desc=True)
+        if limit is not None:
+            query = query.limit(limit)
+
+        result = query.execute()
 
         return result.data if result.data else []
 
@@ -160,7 +211,7 @@ def update_claim_in_db(claim_id: str, updates: Dict[str, Any]) -> bool:
 
 def save_chat_message(claim_id: str, role: str, content: str, metadata: Optional[Dict] = None) -> bool:
     """
-    Save a chat message to Supabase database
+    Queue a chat message for saving to Supabase database
 
     Args:
         claim_id: Associated claim ID
@@ -169,33 +220,29 @@ def save_chat_message(claim_id: str, role: str, content: str, metadata: Optional
         metadata: Optional metadata
 
     Returns:
-        True if successful, False otherwise
+        True if queued, False if Supabase is not configured
     """
     if not supabase:
         return False
 
-    try:
-        message_data = {
-            'claim_id': claim_id,
-            'role': role,
-            'content': content,
-            'metadata': metadata
-        }
-
-        result = supabase.table('chat_messages').insert(message_data).execute()
-        return True
+    message_data = {
+        'claim_id': claim_id,
+        'role': role,
+        'content': content,
+        'metadata': metadata
+    }
 
-    except Exception as e:
-        print(f"Error saving chat message: {e}")
-        return False
+    write_behind.insert(supabase, 'chat_messages', message_data)
+    return True
 
 
-def get_chat_messages(claim_id: str) -> List[Dict[str, Any]]:
+def get_chat_messages(claim_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
     """
-    Get all chat messages for a claim
+    Get chat messages for a claim, oldest first
 
     Args:
         claim_id: Claim identifier
+        limit: Return only the latest `limit` messages (optional)
 
     Returns:
         List of chat messages
@@ -204,10 +251,44 @@ def get_chat_messages(claim_id: str) -> List[Dict[str, Any]]:
         return []
 
     try:
-        result = supabase.table('chat_messages').select('*').eq('claim_id', claim_id).order('created_at', desc=False).execute()
+        query = supabase.table('chat_messages').select('*').eq('claim_id', claim_id)
+        if limit is None:
+            result = query.order('created_at', desc=False).execute()
+            return result.data if result.data else []
 
-        return result.data if result.data else []
+        result = query.order('created_at', desc=True).limit(limit).execute()
+        return list(reversed(result.data)) if result.data else []
 
     except Exception as e:
         print(f"Error retrieving chat messages for {claim_id}: {e}")
         return []
+
+
+def delete_chat_messages(claim_id: str, session_id: Optional[str] = None) -> int:
+    """
+    Delete chat messages of a claim from Supabase database
+
+    Queued writes are flushed first, so messages saved before the call are
+    deleted too.
+
+    Args:
+        claim_id: Claim identifier
+        session_id: Only this chat session's messages (optional)
+
+    Returns:
+        Number of messages deleted
+    """
+    if not supabase:
+        return 0
+
+    try:
+        write_behind.flush(timeout=10)
+        query = supabase.table('chat_messages').delete().eq('claim_id', claim_id)
+        if session_id:
+            query = query.eq('metadata->>session_id', session_id)
+        result = query.execute()
+        return len(result.data) if result.data else 0
+
+    except Exception as e:
+        print(f"Error deleting chat messages for {claim_id}: {e}")
+        return 0
@@ -0,0 +1,121 @@
+"""
+Streaming ingestion for uploaded documents
+
+Uploads are copied to a named temp file in fixed-size chunks and handed to
+the parser by path, so a document is never held in memory as bytes plus a
+base64 string plus decoded bytes. Base64 remains only for the legacy JSON
+chat API (UserMessage.file_data).
+"""
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, UploadFile
+
+# Maximum accepted size of a single uploaded file
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "25")) * 1024 * 1024)
+
+# Maximum accepted size of a whole batch upload (every file in the request)
+MAX_BATCH_UPLOAD_BYTES = int(float(os.getenv("MAX_BATCH_UPLOAD_MB", "200")) * 1024 * 1024)
+
+# Maximum accepted size of a bulk claim import file
+MAX_IMPORT_UPLOAD_BYTES = int(float(os.getenv("MAX_IMPORT_UPLOAD_MB", "2048")) * 1024 * 1024)
+
+# Chunk size used when spooling uploads to disk
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_KB", "1024")) * 1024
+
+
+class SpooledUpload:
+    """An uploaded file spooled to a temp file on disk"""
+
+    def __init__(self, path: str, file_name: str, size: int):
+        self.path = path
+        self.file_name = file_name
+        self.size = size
+
+
+def _too_large(file_name: Optional[str], max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"{file_name or 'Upload'} exceeds the {max_bytes / (1024 * 1024):g} MB upload limit"
+    )
+
+
+async def _copy_upload(file: UploadFile, out, max_bytes: int) -> int:
+    """Copy an upload to an open binary file in chunks, returning its size"""
+    size = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise _too_large(file.filename, max_bytes)
+        out.write(chunk)
+    return size
+
+
+@asynccontextmanager
+async def spool_upload(file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> AsyncIterator[SpooledUpload]:
+    """
+    Spool an upload to a temp file in chunks, deleting it afterwards
+
+    Args:
+        file: Uploaded file
+        max_bytes: Size cap; larger uploads are rejected with 413
+
+    Yields:
+        SpooledUpload with the temp file path
+
+    Raises:
+        HTTPException: 413 if the upload is larger than max_bytes
+    """
+    # Reject before copying anything when the size is already known
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(file.filename, max_bytes)
+
+    suffix = os.path.splitext(file.filename or "")[1]
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, prefix="claimpilot-upload-")
+    try:
+        with tmp:
+            size = await _copy_upload(file, tmp, max_bytes)
+
+        yield SpooledUpload(tmp.name, file.filename or os.path.basename(tmp.name), size)
+    finally:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+
+
+async def keep_upload(file: UploadFile, directory: str, max_bytes: int = MAX_UPLOAD_BYTES) -> SpooledUpload:
+    """
+    Spool an upload to a file the caller owns (and must delete)
+
+    Used when the file outlives the request, e.g. by a background job.
+
+    Args:
+        file: Uploaded file
+        directory: Directory to write to (created if missing)
+        max_bytes: Size cap; larger uploads are rejected with 413
+
+    Returns:
+        SpooledUpload with the file path
+
+    Raises:
+        HTTPException: 413 if the upload is larger than max_bytes
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(file.filename, max_bytes)
+
+    os.makedirs(directory, exist_ok=True)
+    suffix = os.path.splitext(file.filename or "")[1]
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, prefix="claimpilot-upload-", dir=directory)
+    try:
+        with tmp:
+            size = await _copy_upload(file, tmp, max_bytes)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+    return SpooledUpload(tmp.name, file.filename or os.path.basename(tmp.name), size)
@@ -0,0 +1,281 @@
+"""
+Write-behind queue for Supabase writes
+
+Claim and chat writers enqueue rows here and return immediately; a
+background thread writes them in batches.
+
+- Coalescing: an upsert replaces any pending upsert of the same row (same
+  client, table and conflict key), so a claim updated several times before
+  a flush is written once with its latest state. Inserts (chat messages)
+  are never coalesced.
+- Batching: pending rows are flushed when WRITE_BEHIND_MAX_BATCH are waiting
+  or the oldest has waited WRITE_BEHIND_FLUSH_MS, as one bulk request per
+  client, table and operation.
+- Retries: a failed batch is retried with exponential backoff starting at
+  WRITE_BEHIND_RETRY_BACKOFF_MS, up to WRITE_BEHIND_MAX_RETRIES times, then
+  dropped and counted in the metrics.
+- Shutdown: close() flushes everything still pending, waiting at most
+  WRITE_BEHIND_DRAIN_SECONDS.
+
+Rows go through the client's table(name).upsert(rows, on_conflict=...) and
+table(name).insert(rows) calls, so any object with that interface (a local
+SQLite or Postgres stand-in) can be passed instead of a Supabase client.
+"""
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+DEFAULT_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "100"))
+DEFAULT_FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_MS", "250")) / 1000
+DEFAULT_MAX_RETRIES = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "5"))
+DEFAULT_RETRY_BACKOFF = float(os.getenv("WRITE_BEHIND_RETRY_BACKOFF_MS", "200")) / 1000
+MAX_RETRY_BACKOFF = 30.0
+DEFAULT_DRAIN_TIMEOUT = float(os.getenv("WRITE_BEHIND_DRAIN_SECONDS", "10"))
+
+
+class _Write:
+    """One pending row"""
+
+    __slots__ = ("client", "table", "op", "on_conflict", "row", "enqueued_at", "attempts", "not_before")
+
+    def __init__(self, client: Any, table: str, op: str, on_conflict: Optional[str], row: Dict):
+        self.client = client
+        self.table = table
+        self.op = op
+        self.on_conflict = on_conflict
+        self.row = row
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+        self.not_before = 0.0
+
+    @property
+    def group(self) -> tuple:
+        """Rows with the same group are written in one request"""
+        return (id(self.client), self.table, self.op, self.on_conflict)
+
+
+class WriteBehindQueue:
+    """Coalescing, batching background writer"""
+
+    def __init__(
+        self,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF
+    ):
+        """
+        Args:
+            max_batch: Pending rows that trigger a flush, and most rows per flush
+            flush_interval: Seconds the oldest pending row may wait before a flush
+            max_retries: Retries of a failed row before it is dropped
+            retry_backoff: Seconds before the first retry (doubles per retry)
+        """
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._pending: "OrderedDict[Hashable, _Write]" = OrderedDict()
+        self._inflight = 0
+        self._insert_ids = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._flush_requested = False
+        self.stats = {
+            "enqueued": 0, "coalesced": 0, "written": 0, "batches": 0,
+            "retries": 0, "failed": 0, "flush_time_ms": 0.0
+        }
+
+    def upsert(self, client: Any, table: str, row: Dict, on_conflict: str):
+        """
+        Queue an upsert, replacing any pending upsert of the same row
+
+        Args:
+            client: Supabase client (or stand-in) to write with
+            table: Table name
+            row: Row to write (not copied; pass a fresh dict)
+            on_conflict: Unique column identifying the row
+        """
+        self._enqueue((id(client), table, row[on_conflict]), _Write(client, table, "upsert", on_conflict, row))
+
+    def insert(self, client: Any, table: str, row: Dict):
+        """
+        Queue an insert
+
+        Args:
+            client: Supabase client (or stand-in) to write with
+            table: Table name
+            row: Row to write (not copied; pass a fresh dict)
+        """
+        self._enqueue(("insert", next(self._insert_ids)), _Write(client, table, "insert", None, row))
+
+    def _enqueue(self, key: Hashable, write: _Write):
+        with self._cond:
+            previous = self._pending.pop(key, None)
+            if previous is not None:
+                # Keep the original wait so a hot row still flushes on time
+                write.enqueued_at = previous.enqueued_at
+                self.stats["coalesced"] += 1
+            self._pending[key] = write
+            self.stats["enqueued"] += 1
+            self._ensure_worker()
+            self._cond.notify_all()
+
+    def _ensure_worker(self):
+        """Start the writer thread on first use (lock held)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> Optional[list]:
+        """Wait until a batch is due and take it, or return None to stop (lock held)"""
+        while True:
+            now = time.monotonic()
+            due = [key for key, write in self._pending.items() if write.not_before <= now]
+            if due and (
+                self._closing
+                or self._flush_requested
+                or len(due) >= self.max_batch
+                or min(self._pending[key].enqueued_at for key in due) + self.flush_interval <= now
+            ):
+                batch = [(key, self._pending.pop(key)) for key in due[:self.max_batch]]
+                self._inflight += len(batch)
+                return batch
+
+            if not self._pending:
+                self._flush_requested = False
+                self._cond.notify_all()
+                if self._closing:
+                    return None
+
+            wake_at = [write.not_before for write in self._pending.values() if write.not_before > now]
+            if due:
+                wake_at.append(min(self._pending[key].enqueued_at for key in due) + self.flush_interval)
+            self._cond.wait(timeout=max(min(wake_at) - now, 0.001) if wake_at else None)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                batch = self._next_batch()
+            if batch is None:
+                return
+            self._write(batch)
+
+    def _write(self, batch: list):
+        """Write a batch as one request per group, requeueing failed groups"""
+        groups: Dict[tuple, list] = {}
+        for key, write in batch:
+            groups.setdefault(write.group, []).append((key, write))
+
+        start = time.perf_counter()
+        failed = []
+        for entries in groups.values():
+            first = entries[0][1]
+            rows = [write.row for _, write in entries]
+            try:
+                table = first.client.table(first.table)
+                if first.op == "upsert":
+                    table.upsert(rows, on_conflict=first.on_conflict).execute()
+                else:
+                    table.insert(rows).execute()
+            except Exception as e:
+                print(f"Error writing {len(rows)} rows to {first.table}: {e}")
+                failed.extend(entries)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._cond:
+            self._inflight -= len(batch)
+            self.stats["batches"] += 1
+            self.stats["written"] += len(batch) - len(failed)
+            self.stats["flush_time_ms"] += elapsed_ms
+            now = time.monotonic()
+            for key, write in failed:
+                if key in self._pending:
+                    # A newer write of the same row replaces the failed one
+                    self.stats["coalesced"] += 1
+                    continue
+                write.attempts += 1
+                if write.attempts > self.max_retries:
+                    self.stats["failed"] += 1
+                    print(f"Dropping write to {write.table} after {self.max_retries} retries")
+                    continue
+                self.stats["retries"] += 1
+                write.not_before = now + min(self.retry_backoff * 2 ** (write.attempts - 1), MAX_RETRY_BACKOFF)
+                self._pending[key] = write
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write everything pending now instead of waiting for a threshold
+
+        Args:
+            timeout: Seconds to wait (None waits until done)
+
+        Returns:
+            True if nothing is left pending or in flight
+        """
+        with self._cond:
+            if not self._pending and not self._inflight:
+                return True
+            self._flush_requested = True
+            self._ensure_worker()
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._pending and not self._inflight, timeout=timeout)
+
+    def close(self, timeout: float = DEFAULT_DRAIN_TIMEOUT) -> int:
+        """
+        Drain the queue and stop the writer thread
+
+        Writes queued afterwards start a new writer thread.
+
+        Args:
+            timeout: Seconds to wait for pending writes, including retries
+
+        Returns:
+            Number of rows still unwritten when the timeout expired
+        """
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return 0
+            self._closing = True
+            self._cond.notify_all()
+
+        thread.join(timeout)
+
+        with self._cond:
+            remaining = len(self._pending) + self._inflight
+            if not thread.is_alive():
+                self._closing = False
+                self._thread = None
+        if remaining:
+            print(f"⚠️ Write-behind queue closed with {remaining} unwritten rows")
+        return remaining
+
+    def metrics(self) -> Dict:
+        """
+        Get queue depth, coalescing and write statistics
+
+        Returns:
+            Dictionary of queue metrics
+        """
+        now = time.monotonic()
+        with self._cond:
+            oldest = min((write.enqueued_at for write in self._pending.values()), default=now)
+            return {
+                **self.stats,
+                "flush_time_ms": round(self.stats["flush_time_ms"], 1),
+                "pending": len(self._pending),
+                "inflight": self._inflight,
+                "oldest_pending_age_seconds": round(now - oldest, 3),
+                "max_batch": self.max_batch,
+                "flush_interval_ms": self.flush_interval * 1000
+            }
+
+
+# Singleton instance
+write_behind = WriteBehindQueue()
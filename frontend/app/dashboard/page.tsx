@@ -32,7 +32,9 @@ export default function Dashboard() {
 
   const fetchClaims = async () => {
     try {
-      const response = await fetch('http://localhost:8000/api/claims')
+      const response = await fetch(
+        'http://localhost:8000/api/claims?fields=claim_id,incident_type,date,location,status,summary,estimated_damage,updated_at'
+      )
       const data = await response.json()
       setClaims(data.claims || [])
     } catch (error) {